@@ -0,0 +1,65 @@
+import asyncio
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from benchmarks.synthetic_repo import DEFAULT_SEED, SCALES, SyntheticRepo, generate_repo
+from filesystem_operations_mcp.main import build_server
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+GENERATED_MARKER = ".synthetic-repo-complete"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--repo-scale", choices=list(SCALES), default="1k", help="The number of files in the synthetic repository.")
+    parser.addoption("--repo-seed", type=int, default=DEFAULT_SEED, help="The seed used to generate the synthetic repository.")
+
+
+@pytest.fixture(scope="session")
+def synthetic_repo(request: pytest.FixtureRequest) -> SyntheticRepo:
+    """The synthetic repository, generated once per scale and seed and kept in the pytest cache between runs."""
+    scale: str = request.config.getoption("--repo-scale")
+    seed: int = request.config.getoption("--repo-seed")
+
+    root: Path = request.config.cache.mkdir(f"synthetic-repo-{scale}-{seed}")
+
+    # Generation is deterministic, so a completed repository is re-used and an interrupted one is regenerated
+    marker = root / GENERATED_MARKER
+
+    if marker.exists():
+        file_count, ignored_file_count = (int(count) for count in marker.read_text().split())
+        return SyntheticRepo(root=root, seed=seed, file_count=file_count, ignored_file_count=ignored_file_count)
+
+    repo = generate_repo(root=root, files=SCALES[scale], seed=seed)
+
+    _ = marker.write_text(f"{repo.file_count} {repo.ignored_file_count}")
+
+    return repo
+
+
+@pytest.fixture(scope="session")
+def runner() -> Iterator[asyncio.Runner]:
+    """A single event loop for the benchmarks, so the client and the server outlive individual rounds."""
+    with asyncio.Runner() as runner:
+        yield runner
+
+
+@pytest.fixture(scope="session")
+def server(synthetic_repo: SyntheticRepo) -> FastMCP[None]:
+    return build_server(root_dir_path=synthetic_repo.root, default_summarize=False)
+
+
+@pytest.fixture(scope="session")
+def client(runner: asyncio.Runner, server: FastMCP[None]) -> Iterator[Client]:
+    """An in-memory client connected to the server."""
+    client = Client(server)
+
+    _ = runner.run(client.__aenter__())
+
+    yield client
+
+    _ = runner.run(client.__aexit__(None, None, None))
@@ -0,0 +1,152 @@
+"""Generate deterministic synthetic repositories to benchmark the server against.
+
+Run as a module to generate a repository on disk:
+
+    python -m benchmarks.synthetic_repo /tmp/synthetic-repo --files 100000 --seed 42
+"""
+
+import argparse
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+SCALES: dict[str, int] = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+DEFAULT_SEED = 42
+
+MAX_DEPTH = 12
+FILES_PER_DIRECTORY = 24
+
+HUGE_FILE_BYTES = 8 * 1024 * 1024
+HUGE_FILE_RATIO = 1 / 5_000
+BINARY_FILE_RATIO = 1 / 20
+IGNORED_FILE_RATIO = 1 / 10
+
+IGNORED_DIRECTORIES = ["node_modules", "build", ".venv"]
+
+WORDS = [
+    *("alpha", "beta", "gamma", "delta", "epsilon", "zeta", "theta", "lambda", "sigma", "omega"),
+    *("cache", "index", "query", "parse", "token", "batch", "stream", "worker", "buffer", "schema"),
+    *("record", "config", "handler", "client", "server", "request", "response", "payload", "router", "session"),
+]
+
+SOURCE_TEMPLATES: dict[str, str] = {
+    "py": 'class {Name}:\n    """{sentence}"""\n\n    def {name}(self, {arg}: int) -> int:\n        return {arg} * {number}\n',
+    "js": "export class {Name} {{\n  // {sentence}\n  {name}({arg}) {{\n    return {arg} * {number};\n  }}\n}}\n",
+    "ts": "export function {name}({arg}: number): number {{\n  // {sentence}\n  return {arg} * {number};\n}}\n",
+    "go": "package {name}\n\n// {Name} {sentence}\nfunc {Name}({arg} int) int {{\n\treturn {arg} * {number}\n}}\n",
+    "rs": "/// {sentence}\npub fn {name}({arg}: i64) -> i64 {{\n    {arg} * {number}\n}}\n",
+    "java": (
+        "public class {Name} {{\n    /** {sentence} */\n    public int {name}(int {arg}) {{\n        return {arg} * {number};\n    }}\n}}\n"
+    ),
+    "c": "/* {sentence} */\nint {name}(int {arg}) {{\n    return {arg} * {number};\n}}\n",
+    "sh": "#!/usr/bin/env bash\n# {sentence}\n{name}() {{\n  echo $(( $1 * {number} ))\n}}\n",
+    "md": "# {Name}\n\n{sentence}\n\n## {name}\n\n{sentence}\n",
+    "json": '{{"{name}": {number}, "{arg}": "{sentence}"}}\n',
+    "yaml": "{name}:\n  {arg}: {number}\n  description: {sentence}\n",
+    "txt": "{sentence}\n{sentence}\n",
+}
+
+BINARY_EXTENSIONS = ["png", "zip", "bin", "so"]
+
+
+@dataclass(frozen=True)
+class SyntheticRepo:
+    root: Path
+    seed: int
+    file_count: int
+    """The number of files that are not gitignored."""
+
+    ignored_file_count: int
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _source(rng: random.Random, extension: str) -> str:
+    name = rng.choice(WORDS)
+    return SOURCE_TEMPLATES[extension].format(
+        name=name,
+        Name=name.capitalize(),
+        arg=rng.choice(WORDS),
+        number=rng.randint(1, 1000),
+        sentence=_sentence(rng),
+    )
+
+
+def _directories(rng: random.Random, root: Path, count: int) -> list[Path]:
+    """Grow a tree of `count` directories whose depth varies from flat to `MAX_DEPTH` levels."""
+    directories: list[Path] = [root]
+
+    while len(directories) < count:
+        parent = rng.choice(directories)
+
+        if len(parent.relative_to(root).parts) >= MAX_DEPTH:
+            continue
+
+        directories.append(parent / f"{rng.choice(WORDS)}_{len(directories)}")
+
+    return directories
+
+
+def generate_repo(root: Path, files: int, seed: int = DEFAULT_SEED) -> SyntheticRepo:
+    """Generate a repository with roughly `files` files under `root`.
+
+    The same `files` and `seed` always produce the same tree: source files across many languages in a tree of varying
+    depth, a few huge files, binary files, and gitignored directories full of files the tools should skip.
+    """
+    rng = random.Random(seed)
+
+    root.mkdir(parents=True, exist_ok=True)
+
+    (root / ".git").mkdir(exist_ok=True)
+    _ = (root / ".gitignore").write_text("\n".join(f"{directory}/" for directory in IGNORED_DIRECTORIES) + "\n*.log\n")
+
+    ignored_files = int(files * IGNORED_FILE_RATIO)
+    visible_files = files - ignored_files
+    huge_files = max(1, int(visible_files * HUGE_FILE_RATIO))
+
+    directories = _directories(rng, root, max(1, visible_files // FILES_PER_DIRECTORY))
+    extensions = list(SOURCE_TEMPLATES)
+
+    for directory in directories:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    for index in range(visible_files):
+        directory = rng.choice(directories)
+
+        if index < huge_files:
+            path = directory / f"huge_{index}.txt"
+            line = _sentence(rng, words=16) + "\n"
+            _ = path.write_text(line * (HUGE_FILE_BYTES // len(line)))
+        elif rng.random() < BINARY_FILE_RATIO:
+            path = directory / f"blob_{index}.{rng.choice(BINARY_EXTENSIONS)}"
+            _ = path.write_bytes(rng.randbytes(rng.randint(64, 4096)))
+        else:
+            extension = rng.choice(extensions)
+            path = directory / f"{rng.choice(WORDS)}_{index}.{extension}"
+            _ = path.write_text(_source(rng, extension) * rng.randint(1, 20))
+
+    for index in range(ignored_files):
+        directory = root / rng.choice(IGNORED_DIRECTORIES) / f"package_{index // FILES_PER_DIRECTORY}"
+        directory.mkdir(parents=True, exist_ok=True)
+        _ = (directory / f"vendored_{index}.js").write_text(_source(rng, "js"))
+
+    return SyntheticRepo(root=root, seed=seed, file_count=visible_files, ignored_file_count=ignored_files)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("root", type=Path, help="The directory to generate the repository in.")
+    _ = parser.add_argument("--files", type=int, default=SCALES["1k"], help="The number of files to generate.")
+    _ = parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="The seed for the random generator.")
+    args = parser.parse_args()
+
+    repo = generate_repo(root=args.root, files=args.files, seed=args.seed)
+
+    print(f"Generated {repo.file_count} files and {repo.ignored_file_count} gitignored files in {repo.root}")
+
+
+if __name__ == "__main__":
+    main()
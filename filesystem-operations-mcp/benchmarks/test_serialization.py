@@ -0,0 +1,49 @@
+from collections.abc import Callable
+from typing import Any
+
+import orjson
+import pytest
+from fastmcp.tools.tool import default_serializer
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.synthetic_repo import SyntheticRepo
+from filesystem_operations_mcp.filesystem.nodes import FileEntry
+from filesystem_operations_mcp.filesystem.utils.serialization import serialize_tool_result
+from filesystem_operations_mcp.filesystem.view import FileExportableField, ResponseModel
+from filesystem_operations_mcp.main import FileSystem
+
+LISTING_FIELDS = FileExportableField(type=True, size=True, extension=True, modified_at=True, preview=None)
+
+SERIALIZERS: dict[str, Callable[[Any], str]] = {
+    "pydantic": default_serializer,
+    "orjson": serialize_tool_result,
+}
+
+
+@pytest.fixture(scope="module")
+def listing(runner: Any, synthetic_repo: SyntheticRepo) -> dict[str, Any]:  # pyright: ignore[reportAny]
+    """The fields of every file in the synthetic repository, as the file materializer would return them."""
+    file_system = FileSystem(path=synthetic_repo.root)
+
+    async def _list() -> list[FileEntry]:
+        return [file async for file in file_system.afind_files(max_depth=32, excluded_types=[])]
+
+    results: dict[str, Any] = {}
+
+    for file in runner.run(_list()):
+        model, _ = LISTING_FIELDS.apply(file)
+        results[model.pop("relative_path_str")] = model
+
+    return results
+
+
+@pytest.mark.parametrize("serializer", SERIALIZERS.keys())
+@pytest.mark.parametrize("columnar", [False, True], ids=["objects", "columnar"])
+def test_listing_serialization(benchmark: BenchmarkFixture, listing: dict[str, Any], serializer: str, columnar: bool) -> None:
+    response = ResponseModel(results=listing, max_results=len(listing) + 1, columnar=columnar)
+
+    payload: str = benchmark(SERIALIZERS[serializer], response)
+
+    assert orjson.loads(payload)["result_count"] == len(listing)
+
+    benchmark.extra_info.update({"result_count": len(listing), "payload_bytes": len(payload.encode())})
@@ -0,0 +1,80 @@
+import asyncio
+import resource
+import statistics
+from typing import Any
+
+import orjson
+import pytest
+from fastmcp import Client
+from fastmcp.client.client import CallToolResult
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.synthetic_repo import SyntheticRepo
+
+ROUNDS = 5
+
+TOOL_CALLS: dict[str, tuple[str, dict[str, Any]]] = {
+    "find_files": ("find_files", {"max_depth": 12, "max_results": 500}),
+    "find_files_by_type": ("find_files", {"included_types": ["py"], "max_depth": 12, "max_results": 500}),
+    "search_files": ("search_files", {"patterns": ["cache"], "max_depth": 12, "max_results": 500}),
+    "search_files_case_sensitive": ("search_files", {"patterns": ["Cache"], "case_sensitive": True, "max_depth": 12, "max_results": 500}),
+    "get_structure": ("get_structure", {"depth": 12, "max_results": 10_000}),
+    "get_directory_stats": ("get_directory_stats", {"depth": 3}),
+    "summarize_code": ("find_files", {"included_globs": ["*.py", "*.ts", "*.go"], "summarize": True, "max_depth": 12, "max_results": 100}),
+    "summarize_text": ("find_files", {"included_globs": ["*.md", "*.txt"], "summarize": True, "max_depth": 12, "max_results": 100}),
+}
+
+
+def peak_rss_bytes() -> int:
+    """The peak resident set size of this process. `ru_maxrss` is reported in kilobytes on Linux."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def returned_result_count(result: CallToolResult) -> int:
+    """The number of files or directories a tool call returned."""
+    response: dict[str, Any] = orjson.loads(result.content[0].text)  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType]
+
+    if "result_count" in response:
+        return response["result_count"]
+
+    return len(response.get("directories", ()))
+
+
+def record_latency_stats(benchmark: BenchmarkFixture, synthetic_repo: SyntheticRepo, result_count: int) -> None:
+    """Add p50/p95 latency, peak RSS and throughput to the benchmark report.
+
+    Nothing is recorded when benchmarking is disabled, e.g. with `--benchmark-disable`, as no timings are collected."""
+    if benchmark.stats is None:
+        return
+
+    durations: list[float] = sorted(benchmark.stats.stats.data)
+
+    p50 = statistics.median(durations)
+    p95 = statistics.quantiles(durations, n=20, method="inclusive")[-1] if len(durations) > 1 else durations[0]
+
+    benchmark.extra_info.update(
+        {
+            "repo_files": synthetic_repo.file_count,
+            "result_count": result_count,
+            "p50_seconds": p50,
+            "p95_seconds": p95,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "results_per_second": result_count / p50 if p50 else 0,
+        }
+    )
+
+
+@pytest.mark.parametrize("call", TOOL_CALLS.keys())
+def test_tool_latency(
+    benchmark: BenchmarkFixture, runner: asyncio.Runner, client: Client, synthetic_repo: SyntheticRepo, call: str
+) -> None:
+    tool_name, arguments = TOOL_CALLS[call]
+
+    def _call_tool() -> CallToolResult:
+        result = runner.run(client.call_tool(tool_name, arguments))
+        assert not result.is_error
+        return result
+
+    result = benchmark.pedantic(_call_tool, rounds=ROUNDS, warmup_rounds=1)
+
+    record_latency_stats(benchmark, synthetic_repo, result_count=returned_result_count(result))
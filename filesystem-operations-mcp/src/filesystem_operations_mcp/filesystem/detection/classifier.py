@@ -0,0 +1,409 @@
+import json
+import mimetypes
+import re
+import shutil
+import subprocess
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from functools import cached_property
+from itertools import product
+from pathlib import Path
+from typing import Literal
+
+import magika
+from magika.types.content_type_label import ContentTypeLabel
+
+from filesystem_operations_mcp.filesystem.detection.file_type import FileEntryTypeEnum, is_binary_mime_type
+from filesystem_operations_mcp.filesystem.mappings.magika_to_tree_sitter import (
+    code_mappings,
+    data_mappings,
+    script_mappings,
+    text_mappings,
+)
+from filesystem_operations_mcp.logging import BASE_LOGGER
+
+logger = BASE_LOGGER.getChild(__name__)
+
+MAGIKA_CONTENT_TYPES_KB = Path(magika.__file__).parent / "config" / "content_types_kb.min.json"
+
+SHEBANG_SNIFF_BYTES = 128
+
+ClassificationSource = Literal["override", "filename", "extension", "pattern", "mimetype", "shebang", "magika"]
+
+OVERRIDE_EXTENSIONS: dict[str, FileEntryTypeEnum] = {
+    ".yml": FileEntryTypeEnum.DATA,
+    ".yaml": FileEntryTypeEnum.DATA,
+    ".json": FileEntryTypeEnum.DATA,
+    ".log": FileEntryTypeEnum.DATA,
+    ".csv": FileEntryTypeEnum.DATA,
+    ".tsv": FileEntryTypeEnum.DATA,
+    ".jsonl": FileEntryTypeEnum.DATA,
+    ".md": FileEntryTypeEnum.TEXT,
+    ".markdown": FileEntryTypeEnum.TEXT,
+    ".asciidoc": FileEntryTypeEnum.TEXT,
+    ".txt": FileEntryTypeEnum.TEXT,
+}
+"""Hardcoded rules that take precedence over everything else."""
+
+OVERRIDE_FILENAMES: dict[str, ContentTypeLabel] = {
+    "Dockerfile": ContentTypeLabel.DOCKERFILE,
+    "Containerfile": ContentTypeLabel.DOCKERFILE,
+    "Makefile": ContentTypeLabel.MAKEFILE,
+    "makefile": ContentTypeLabel.MAKEFILE,
+    "GNUmakefile": ContentTypeLabel.MAKEFILE,
+}
+
+RIPGREP_TYPE_LABELS: dict[str, ContentTypeLabel] = {
+    "ada": ContentTypeLabel.ADA,
+    "asm": ContentTypeLabel.ASM,
+    "c": ContentTypeLabel.C,
+    "cpp": ContentTypeLabel.CPP,
+    "cs": ContentTypeLabel.CS,
+    "css": ContentTypeLabel.CSS,
+    "csv": ContentTypeLabel.CSV,
+    "dart": ContentTypeLabel.DART,
+    "docker": ContentTypeLabel.DOCKERFILE,
+    "elixir": ContentTypeLabel.ELIXIR,
+    "erlang": ContentTypeLabel.ERLANG,
+    "fortran": ContentTypeLabel.FORTRAN,
+    "go": ContentTypeLabel.GO,
+    "haskell": ContentTypeLabel.HASKELL,
+    "java": ContentTypeLabel.JAVA,
+    "js": ContentTypeLabel.JAVASCRIPT,
+    "json": ContentTypeLabel.JSON,
+    "jsonl": ContentTypeLabel.JSONL,
+    "kotlin": ContentTypeLabel.KOTLIN,
+    "lua": ContentTypeLabel.LUA,
+    "make": ContentTypeLabel.MAKEFILE,
+    "markdown": ContentTypeLabel.MARKDOWN,
+    "matlab": ContentTypeLabel.MATLAB,
+    "php": ContentTypeLabel.PHP,
+    "ps": ContentTypeLabel.POWERSHELL,
+    "py": ContentTypeLabel.PYTHON,
+    "r": ContentTypeLabel.R,
+    "ruby": ContentTypeLabel.RUBY,
+    "rust": ContentTypeLabel.RUST,
+    "scala": ContentTypeLabel.SCALA,
+    "sh": ContentTypeLabel.SHELL,
+    "sql": ContentTypeLabel.SQL,
+    "swift": ContentTypeLabel.SWIFT,
+    "toml": ContentTypeLabel.TOML,
+    "ts": ContentTypeLabel.TYPESCRIPT,
+    "txt": ContentTypeLabel.TXT,
+    "verilog": ContentTypeLabel.VERILOG,
+    "vhdl": ContentTypeLabel.VHDL,
+    "xml": ContentTypeLabel.XML,
+    "yaml": ContentTypeLabel.YAML,
+    "zig": ContentTypeLabel.ZIG,
+}
+"""The ripgrep types whose definitions we use, and the content type their files contain."""
+
+IGNORED_RIPGREP_GLOBS: set[str] = {"*.properties", "*.jsp", "*.jspx", "*.Rmd", "*.Rnw", "*.livemd", "*.heex", "*.eex", "*.leex", "*.phtml"}
+"""Globs from the ripgrep type definitions for files that embed a language rather than being written in it."""
+
+SHEBANG_INTERPRETER_LABELS: dict[str, ContentTypeLabel] = {
+    "python": ContentTypeLabel.PYTHON,
+    "sh": ContentTypeLabel.SHELL,
+    "bash": ContentTypeLabel.SHELL,
+    "zsh": ContentTypeLabel.SHELL,
+    "ksh": ContentTypeLabel.SHELL,
+    "dash": ContentTypeLabel.SHELL,
+    "ash": ContentTypeLabel.SHELL,
+    "node": ContentTypeLabel.JAVASCRIPT,
+    "nodejs": ContentTypeLabel.JAVASCRIPT,
+    "deno": ContentTypeLabel.JAVASCRIPT,
+    "ts-node": ContentTypeLabel.TYPESCRIPT,
+    "ruby": ContentTypeLabel.RUBY,
+    "php": ContentTypeLabel.PHP,
+    "perl": ContentTypeLabel.PERL,
+    "lua": ContentTypeLabel.LUA,
+    "Rscript": ContentTypeLabel.R,
+    "pwsh": ContentTypeLabel.POWERSHELL,
+    "make": ContentTypeLabel.MAKEFILE,
+}
+
+_BRACKET_PATTERN = re.compile(r"\[([^\]]+)\]")
+_INTERPRETER_VERSION = re.compile(r"[\d.]+$")
+
+
+@dataclass(frozen=True)
+class FileClassification:
+    """The type of a file, and the content type label if the classification identified a single one."""
+
+    type: FileEntryTypeEnum
+    label: ContentTypeLabel | None
+    source: ClassificationSource
+
+
+@dataclass
+class ClassifierStats:
+    """How files were classified, to measure how often the fast path avoids running magika."""
+
+    sources: Counter[ClassificationSource] = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        return sum(self.sources.values())
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of classifications that did not need magika."""
+        if not self.total:
+            return 0
+        return 1 - self.sources["magika"] / self.total
+
+    def reset(self) -> None:
+        self.sources.clear()
+
+
+def label_to_type(label: ContentTypeLabel, is_text: bool = True) -> FileEntryTypeEnum:
+    """The file type that magika's detection of `label` would produce."""
+    if label in code_mappings or label in script_mappings:
+        return FileEntryTypeEnum.CODE
+    if label in text_mappings:
+        return FileEntryTypeEnum.TEXT
+    if label in data_mappings:
+        return FileEntryTypeEnum.DATA
+    if not is_text:
+        return FileEntryTypeEnum.BINARY
+    return FileEntryTypeEnum.UNKNOWN
+
+
+def expand_glob_brackets(glob: str) -> list[str]:
+    """Expand simple character classes, e.g. `[Mm]akefile` into `Makefile` and `makefile`."""
+    parts = _BRACKET_PATTERN.split(glob)
+
+    # Odd parts are the contents of brackets
+    if any(not part.isalnum() for part in parts[1::2]):
+        return [glob]
+
+    choices = [[part] if i % 2 == 0 else list(part) for i, part in enumerate(parts)]
+
+    return ["".join(combination) for combination in product(*choices)]
+
+
+def parse_shebang(head: bytes) -> str | None:
+    """The name of the interpreter in a shebang line, without any version suffix."""
+    if not head.startswith(b"#!"):
+        return None
+
+    line = head[2:].split(b"\n", 1)[0].decode("utf-8", errors="ignore")
+
+    tokens = line.split()
+
+    if not tokens:
+        return None
+
+    interpreter = tokens[0].rsplit("/", 1)[-1]
+
+    # `#!/usr/bin/env -S python3 -u`
+    if interpreter == "env":
+        arguments = [token for token in tokens[1:] if not token.startswith("-") and "=" not in token]
+        if not arguments:
+            return None
+        interpreter = arguments[0]
+
+    return _INTERPRETER_VERSION.sub("", interpreter) or None
+
+
+def _resolve(
+    candidates: set[tuple[FileEntryTypeEnum, ContentTypeLabel | None]],
+) -> tuple[FileEntryTypeEnum, ContentTypeLabel | None] | None:
+    """Reduce the candidates for a name to a single classification. The type must be unanimous, the label is kept only
+    if it is unanimous too."""
+    types = {file_type for file_type, _ in candidates}
+
+    if len(types) != 1:
+        return None
+
+    labels = {label for _, label in candidates}
+
+    return types.pop(), labels.pop() if len(labels) == 1 else None
+
+
+Candidates = dict[str, set[tuple[FileEntryTypeEnum, ContentTypeLabel | None]]]
+
+
+@dataclass
+class ClassificationTables:
+    filenames: dict[str, FileClassification] = field(default_factory=dict)
+    extensions: dict[str, FileClassification] = field(default_factory=dict)
+    patterns: list[tuple[str, FileClassification]] = field(default_factory=list)
+
+
+def _collect_ripgrep_candidates() -> tuple[Candidates, Candidates, list[tuple[str, FileClassification]]]:
+    """Split the ripgrep type definitions into extension, filename and glob pattern candidates."""
+    extensions: Candidates = defaultdict(set)
+    filenames: Candidates = defaultdict(set)
+    patterns: list[tuple[str, FileClassification]] = []
+
+    for ripgrep_type, globs in load_ripgrep_type_globs().items():
+        if not (label := RIPGREP_TYPE_LABELS.get(ripgrep_type)):
+            continue
+
+        candidate = (label_to_type(label), label)
+
+        for glob in globs:
+            if glob in IGNORED_RIPGREP_GLOBS:
+                continue
+
+            for expanded in expand_glob_brackets(glob):
+                if expanded.startswith("*.") and expanded.count(".") == 1 and not any(c in expanded[1:] for c in "*?["):
+                    extensions[expanded[1:]].add(candidate)
+                elif not any(c in expanded for c in "*?["):
+                    filenames[expanded].add(candidate)
+                else:
+                    patterns.append((expanded, FileClassification(type=candidate[0], label=label, source="pattern")))
+
+    return extensions, filenames, patterns
+
+
+def build_classification_tables() -> ClassificationTables:
+    """Build the filename, extension and glob tables from magika's content types and ripgrep's type definitions."""
+    tables = ClassificationTables()
+
+    magika_extensions: Candidates = defaultdict(set)
+
+    for label, extensions, is_text in load_magika_extensions():
+        # Content types we have no mapping for are not worth a guess, the model may well detect a type we do map
+        if (file_type := label_to_type(label, is_text)) == FileEntryTypeEnum.UNKNOWN:
+            continue
+
+        for extension in extensions:
+            magika_extensions[f".{extension}"].add((file_type, label))
+
+    ripgrep_extensions, ripgrep_filenames, tables.patterns = _collect_ripgrep_candidates()
+
+    for extension in magika_extensions.keys() | ripgrep_extensions.keys():
+        magika_candidates = magika_extensions.get(extension, set())
+        resolved = _resolve(magika_candidates)
+
+        # Ripgrep breaks ties between magika's content types, or fills in extensions magika does not know
+        if resolved is None and (ripgrep_candidates := ripgrep_extensions.get(extension)):
+            resolved = _resolve((ripgrep_candidates & magika_candidates) or ripgrep_candidates)
+
+        if resolved is not None:
+            tables.extensions[extension] = FileClassification(type=resolved[0], label=resolved[1], source="extension")
+
+    for extension, file_type in OVERRIDE_EXTENSIONS.items():
+        existing = tables.extensions.get(extension)
+        label = existing.label if existing and existing.type == file_type else None
+        tables.extensions[extension] = FileClassification(type=file_type, label=label, source="override")
+
+    for filename, candidates in ripgrep_filenames.items():
+        if resolved := _resolve(candidates):
+            tables.filenames[filename] = FileClassification(type=resolved[0], label=resolved[1], source="filename")
+
+    for filename, label in OVERRIDE_FILENAMES.items():
+        tables.filenames[filename] = FileClassification(type=label_to_type(label), label=label, source="override")
+
+    logger.debug(
+        f"Built file classification tables with {len(tables.filenames)} filenames, {len(tables.extensions)} extensions "
+        f"and {len(tables.patterns)} globs"
+    )
+
+    return tables
+
+
+class FileClassifier:
+    """Classifies files from precomputed filename, extension and glob tables, falling back to sniffing shebangs.
+
+    The tables are built from the extensions magika knows for each content type and from ripgrep's type definitions.
+    Magika's own extensions take precedence, and ripgrep's definitions fill the gaps and break ties where magika
+    knows several content types for one extension. Names that still map to more than one type are ambiguous and
+    are left for magika to inspect.
+    """
+
+    def __init__(self) -> None:
+        self.stats: ClassifierStats = ClassifierStats()
+
+    @cached_property
+    def tables(self) -> "ClassificationTables":
+        return build_classification_tables()
+
+    def classify_by_name(self, path: Path) -> FileClassification | None:
+        """Classify a file from its name alone. Returns None if the contents need to be inspected."""
+        tables = self.tables
+
+        if classification := tables.filenames.get(path.name):
+            return classification
+
+        if path.suffix and (classification := tables.extensions.get(path.suffix) or tables.extensions.get(path.suffix.lower())):
+            return classification
+
+        for pattern, classification in tables.patterns:
+            if fnmatchcase(path.name, pattern):
+                return classification
+
+        if is_binary_mime_type(mimetypes.guess_type(path)[0] or "unknown"):
+            return FileClassification(type=FileEntryTypeEnum.BINARY, label=None, source="mimetype")
+
+        return None
+
+    def classify_by_shebang(self, path: Path) -> FileClassification | None:
+        """Classify a file from the interpreter in its shebang line."""
+        try:
+            with path.open("rb") as f:
+                head = f.read(SHEBANG_SNIFF_BYTES)
+        except OSError:
+            return None
+
+        if (interpreter := parse_shebang(head)) and (label := SHEBANG_INTERPRETER_LABELS.get(interpreter)):
+            return FileClassification(type=label_to_type(label), label=label, source="shebang")
+
+        return None
+
+    def classify(self, path: Path) -> FileClassification | None:
+        """Classify a file without running magika. Returns None if magika needs to inspect the file.
+
+        Only files without an extension are opened to look for a shebang."""
+        classification = self.classify_by_name(path)
+
+        if classification is None and not path.suffix:
+            classification = self.classify_by_shebang(path)
+
+        self.stats.sources[classification.source if classification else "magika"] += 1
+
+        return classification
+
+
+def load_magika_extensions() -> list[tuple[ContentTypeLabel, list[str], bool]]:
+    """The extensions magika associates with each content type, and whether the content type is text."""
+    try:
+        content_types = json.loads(MAGIKA_CONTENT_TYPES_KB.read_text())
+    except (OSError, ValueError):
+        logger.warning(f"Unable to load magika content types from {MAGIKA_CONTENT_TYPES_KB}")
+        return []
+
+    valid_labels = {label.value for label in ContentTypeLabel}
+
+    return [
+        (ContentTypeLabel(name), info.get("extensions") or [], bool(info.get("is_text")))
+        for name, info in content_types.items()
+        if name in valid_labels
+    ]
+
+
+def load_ripgrep_type_globs() -> dict[str, list[str]]:
+    """The globs in ripgrep's built-in type definitions, by type name."""
+    if not (ripgrep := shutil.which("rg")):
+        logger.warning("ripgrep not found, file classification will not use ripgrep type definitions")
+        return {}
+
+    try:
+        result = subprocess.run([ripgrep, "--type-list"], capture_output=True, check=True, text=True, timeout=10)  # noqa: S603
+    except (OSError, subprocess.SubprocessError):
+        logger.warning("Unable to list ripgrep types, file classification will not use ripgrep type definitions")
+        return {}
+
+    type_globs: dict[str, list[str]] = {}
+
+    for line in result.stdout.splitlines():
+        name, _, globs = line.partition(":")
+        type_globs[name.strip()] = [glob.strip() for glob in globs.split(",") if glob.strip()]
+
+    return type_globs
+
+
+file_classifier: FileClassifier = FileClassifier()
@@ -1,5 +1,25 @@
+from enum import StrEnum
+
 from magika import Magika
 
 
+class FileEntryTypeEnum(StrEnum):
+    CODE = "code"
+    TEXT = "text"
+    DATA = "data"
+    BINARY = "binary"
+    UNKNOWN = "unknown"
+
+
 def init_magika() -> Magika:
     return Magika()
+
+
+def is_binary_mime_type(mime_type: str) -> bool:
+    if mime_type.startswith(("image/", "video/", "audio/")):
+        return True
+
+    if mime_type.startswith("application/") and not (mime_type.endswith(("json", "xml", "sh"))):  # noqa: SIM103
+        return True
+
+    return False
@@ -70,6 +70,13 @@ class FileIsNotTextError(FilesystemServerError):
         super().__init__(f"File {path} is not text.")
 
 
+class SnapshotNotFoundError(FilesystemServerError):
+    """An exception for when a changed-files token does not refer to a known snapshot."""
+
+    def __init__(self, token: str):
+        super().__init__(f"No snapshot found for token {token}. It may have expired. Call without a token to start from a new snapshot.")
+
+
 class FilePatchDoesNotMatchError(FilesystemServerError):
     """An exception for when a file patch does not match the current file."""
 
@@ -1,4 +1,8 @@
+import asyncio
+import heapq
+from collections import Counter, defaultdict
 from collections.abc import AsyncIterator
+from functools import cached_property
 from pathlib import Path
 from typing import Annotated, Any, Literal
 
@@ -6,8 +10,32 @@ from pydantic import Field, model_serializer
 from pydantic.fields import computed_field
 from pydantic.main import BaseModel
 
-from filesystem_operations_mcp.filesystem.nodes import BaseNode, DirectoryEntry, FileEntry, FileLines
+from filesystem_operations_mcp.filesystem.errors import SnapshotNotFoundError
+from filesystem_operations_mcp.filesystem.nodes import (
+    DEFAULT_EXCLUDED_TYPES,
+    DEPTH_PARAM,
+    EXCLUDE_FILE_TYPES,
+    EXCLUDE_FILES_GLOBS,
+    INCLUDE_FILE_TYPES,
+    INCLUDE_FILES_GLOBS,
+    BaseNode,
+    DirectoryEntry,
+    FileEntry,
+    FileEntryTypeEnum,
+    FileLines,
+    classify_file_type_by_name,
+)
 from filesystem_operations_mcp.filesystem.patches.file import FileAppendPatch, FileDeletePatch, FileInsertPatch, FileReplacePatch
+from filesystem_operations_mcp.filesystem.utils.batch_stat import astat_paths
+from filesystem_operations_mcp.filesystem.utils.hashing import find_duplicate_groups
+from filesystem_operations_mcp.filesystem.utils.scan import ascan_file_sizes
+from filesystem_operations_mcp.filesystem.utils.snapshot import (
+    Snapshot,
+    SnapshotStore,
+    default_snapshot_directory,
+    diff_snapshots,
+    file_signature,
+)
 from filesystem_operations_mcp.logging import BASE_LOGGER
 
 logger = BASE_LOGGER.getChild("file_system")
@@ -56,6 +84,19 @@ Depth = Annotated[int, Field(description="The depth of the filesystem to get.",
 FileReadStart = Annotated[int, Field(description="The 1-indexed line number to start reading from.", examples=[1])]
 FileReadCount = Annotated[int, Field(description="The number of lines to read.", examples=[100])]
 
+LargestFilesCount = Annotated[int, Field(description="The number of largest files to report for each directory.", examples=[5])]
+
+MinimumFileSize = Annotated[int, Field(description="Files smaller than this many bytes are ignored.", examples=[1, 1024])]
+
+SinceToken = Annotated[
+    str | None,
+    Field(description="The token returned by a previous call. If not provided, a new snapshot is taken and no changes are reported."),
+]
+
+SNAPSHOT_MAX_DEPTH = 32
+
+DIRECTORY_STATS_MAX_DEPTH = 32
+
 
 class ReadFileLinesResponse(BaseModel):
     path: str = Field(description="The path of the file.")
@@ -95,6 +136,119 @@ class FileSystemStructureResponse(BaseModel):
         return kv
 
 
+class DuplicateFileGroup(BaseModel):
+    """A group of files with identical contents."""
+
+    size: int = Field(description="The size of each file in the group in bytes.")
+    paths: list[str] = Field(description="The paths of the identical files.")
+
+    @computed_field
+    @property
+    def wasted_bytes(self) -> int:
+        """The number of bytes taken up by the redundant copies."""
+        return self.size * (len(self.paths) - 1)
+
+
+class FindDuplicateFilesResponse(BaseModel):
+    """The response to a request for duplicate files."""
+
+    max_results: int = Field(description="The maximum number of groups to return.", exclude=True)
+    duplicate_groups: list[DuplicateFileGroup] = Field(description="The groups of identical files, largest waste first.")
+
+    @computed_field
+    @property
+    def max_results_reached(self) -> bool:
+        """Whether the maximum number of results has been reached."""
+        return len(self.duplicate_groups) >= self.max_results
+
+    @model_serializer
+    def serialize(self) -> dict[str, Any]:
+        kv: dict[str, Any] = {
+            "duplicate_groups": [group.model_dump() for group in self.duplicate_groups],
+        }
+
+        if self.max_results_reached:
+            kv["max_results_reached"] = True
+            kv["max_results"] = self.max_results
+
+        return kv
+
+
+class DirectoryStats(BaseModel):
+    """Aggregated statistics for a directory and all of its descendants."""
+
+    total_size: int = Field(default=0, description="The total size of the files in bytes.")
+    file_count: int = Field(default=0, description="The number of files.")
+    types: dict[str, int] = Field(default_factory=dict, description="The number of files of each type.")
+    largest_files: dict[str, int] = Field(default_factory=dict, description="The largest files and their sizes in bytes.")
+
+
+class DirectoryStatsResponse(BaseModel):
+    """The response to a request for directory statistics."""
+
+    max_results: int = Field(description="The maximum number of directories to return.", exclude=True)
+    max_depth: int = Field(description="The maximum depth of the files counted in the statistics.", exclude=True)
+    max_depth_reached: bool = Field(
+        default=False, description="Whether files were found at the maximum depth, so deeper files may be missing from the statistics."
+    )
+    directories: dict[str, DirectoryStats] = Field(description="The statistics for each directory, keyed by path.")
+
+    @computed_field
+    @property
+    def max_results_reached(self) -> bool:
+        """Whether the maximum number of results has been reached."""
+        return len(self.directories) >= self.max_results
+
+    @model_serializer
+    def serialize(self) -> dict[str, Any]:
+        kv: dict[str, Any] = {
+            "directories": {path: stats.model_dump() for path, stats in self.directories.items()},
+        }
+
+        if self.max_results_reached:
+            kv["max_results_reached"] = True
+            kv["max_results"] = self.max_results
+
+        if self.max_depth_reached:
+            kv["max_depth_reached"] = True
+            kv["max_depth"] = self.max_depth
+
+        return kv
+
+
+class ChangedFilesResponse(BaseModel):
+    """The response to a request for the files changed since a previous snapshot."""
+
+    max_results: int = Field(description="The maximum number of paths to return for each kind of change.", exclude=True)
+    token: str = Field(description="The token to pass to the next call to get the changes made after this one.")
+    added: list[str] = Field(default_factory=list, description="The paths of the files that were added.")
+    modified: list[str] = Field(default_factory=list, description="The paths of the files that were modified.")
+    deleted: list[str] = Field(default_factory=list, description="The paths of the files that were deleted.")
+
+    @computed_field
+    @property
+    def max_results_reached(self) -> bool:
+        """Whether the maximum number of results has been reached for any kind of change."""
+        return max(len(self.added), len(self.modified), len(self.deleted)) > self.max_results
+
+    @model_serializer
+    def serialize(self) -> dict[str, Any]:
+        kv: dict[str, Any] = {
+            "token": self.token,
+        }
+
+        for change, paths in (("added", self.added), ("modified", self.modified), ("deleted", self.deleted)):
+            if paths:
+                kv[change] = paths[: self.max_results]
+                kv[f"{change}_count"] = len(paths)
+
+        if self.max_results_reached:
+            kv["max_results_reached"] = True
+            kv["max_results"] = self.max_results
+
+        return kv
+
+
 class FileSystem(DirectoryEntry):
     """A virtual filesystem rooted in a specific directory on disk."""
 
@@ -133,6 +287,154 @@ class FileSystem(DirectoryEntry):
             directories=accumulated_results,
         )
 
+    async def get_directory_stats(
+        self,
+        path: DirectoryPath | None = None,
+        depth: Depth = 2,
+        largest_files: LargestFilesCount = 5,
+        *,
+        included_globs: INCLUDE_FILES_GLOBS = None,
+        excluded_globs: EXCLUDE_FILES_GLOBS = None,
+        excluded_types: EXCLUDE_FILE_TYPES = DEFAULT_EXCLUDED_TYPES,
+        max_depth: DEPTH_PARAM = DIRECTORY_STATS_MAX_DEPTH,
+        max_results: int = 200,
+    ) -> DirectoryStatsResponse:
+        """Gets the total size, file count, file types and largest files of each directory up to the given depth.
+
+        Statistics for a directory include all of its descendants up to `max_depth`, not just the directories up to the
+        given depth. If files are found at `max_depth`, the response reports that deeper files may be missing.
+        Honors gitignore files. File types are determined from file names only, so some files may be `unknown`.
+
+        If a path is provided, the statistics will be returned for the directory at that path. If no path is provided,
+        the statistics will be returned for the root of the filesystem.
+        """
+        root = self.get_directory(path=path) if path else self
+
+        names_by_directory: dict[Path, set[str]] = defaultdict(set)
+        max_depth_reached: bool = False
+
+        async for relative_path in root.afind_file_paths(
+            included_globs=included_globs,
+            excluded_globs=excluded_globs,
+            excluded_types=excluded_types,
+            max_depth=max_depth,
+        ):
+            names_by_directory[relative_path.parent].add(relative_path.name)
+            max_depth_reached = max_depth_reached or len(relative_path.parts) >= max_depth
+
+        sizes_by_directory = await ascan_file_sizes({root.path / directory: names for directory, names in names_by_directory.items()})
+
+        totals: dict[Path, list[int]] = defaultdict(lambda: [0, 0])
+        types: dict[Path, Counter[str]] = defaultdict(Counter)
+        largest: dict[Path, list[tuple[int, str]]] = defaultdict(list)
+
+        for directory, sizes in sizes_by_directory.items():
+            relative_directory = directory.relative_to(root.path)
+            ancestors = [Path(*relative_directory.parts[:i]) for i in range(min(depth, len(relative_directory.parts)) + 1)]
+
+            for name, size in sizes:
+                file_type = classify_file_type_by_name(directory / name) or FileEntryTypeEnum.UNKNOWN
+                relative_file_path = str(relative_directory / name)
+
+                for ancestor in ancestors:
+                    totals[ancestor][0] += size
+                    totals[ancestor][1] += 1
+                    types[ancestor][file_type.value] += 1
+
+                    if len(largest[ancestor]) < largest_files:
+                        heapq.heappush(largest[ancestor], (size, relative_file_path))
+                    elif largest_files:
+                        _ = heapq.heappushpop(largest[ancestor], (size, relative_file_path))
+
+        directories: dict[str, DirectoryStats] = {}
+
+        for directory in sorted(totals)[:max_results]:
+            total_size, file_count = totals[directory]
+            directories[str(directory)] = DirectoryStats(
+                total_size=total_size,
+                file_count=file_count,
+                types=dict(types[directory].most_common()),
+                largest_files={file_path: size for size, file_path in sorted(largest[directory], reverse=True)},
+            )
+
+        return DirectoryStatsResponse(
+            max_results=max_results, max_depth=max_depth, max_depth_reached=max_depth_reached, directories=directories
+        )
+
+    @cached_property
+    def snapshot_store(self) -> SnapshotStore:
+        return SnapshotStore(directory=default_snapshot_directory(self.path))
+
+    async def atake_snapshot(self) -> Snapshot:
+        """Stat every non-ignored file in the filesystem, recording its size, modification time and inode."""
+        relative_paths = [relative_path async for relative_path in self.afind_file_paths(excluded_types=[], max_depth=SNAPSHOT_MAX_DEPTH)]
+
+        stats = await astat_paths([self.path / relative_path for relative_path in relative_paths])
+
+        return {str(relative_path): file_signature(stat) for relative_path, stat in zip(relative_paths, stats, strict=True) if stat}
+
+    async def find_changed_files(self, since_token: SinceToken = None, max_results: int = 200) -> ChangedFilesResponse:
+        """Finds the files that were added, modified or deleted since a previous call, and returns a token for the next call.
+
+        Call without a token to get a token for the current state of the filesystem. Honors gitignore files. A file is
+        modified if its size, modification time or inode changed. Renamed files are reported as deleted and added.
+        """
+        previous: Snapshot | None = None
+
+        if since_token is not None:
+            previous = await asyncio.to_thread(self.snapshot_store.load, since_token)
+
+            if previous is None:
+                raise SnapshotNotFoundError(since_token)
+
+        current = await self.atake_snapshot()
+
+        token = await asyncio.to_thread(self.snapshot_store.save, current)
+
+        if previous is None:
+            return ChangedFilesResponse(max_results=max_results, token=token)
+
+        diff = diff_snapshots(previous, current)
+
+        return ChangedFilesResponse(max_results=max_results, token=token, added=diff.added, modified=diff.modified, deleted=diff.deleted)
+
+    async def find_duplicate_files(
+        self,
+        *,
+        included_globs: INCLUDE_FILES_GLOBS = None,
+        excluded_globs: EXCLUDE_FILES_GLOBS = None,
+        included_types: INCLUDE_FILE_TYPES = None,
+        excluded_types: EXCLUDE_FILE_TYPES = DEFAULT_EXCLUDED_TYPES,
+        max_depth: DEPTH_PARAM = 6,
+        min_size: MinimumFileSize = 1,
+        max_results: int = 50,
+    ) -> FindDuplicateFilesResponse:
+        """Finds files with identical contents. Accepts the same globs and types as `find_files`.
+
+        Files are grouped by size first and only files that share a size are hashed, so this is cheap even on
+        large trees. Groups are returned with the most wasted bytes first.
+        """
+        paths_by_size: dict[int, list[Path]] = defaultdict(list)
+
+        async for file_entry in self.afind_files(
+            included_globs=included_globs,
+            excluded_globs=excluded_globs,
+            included_types=included_types,
+            excluded_types=excluded_types,
+            max_depth=max_depth,
+        ):
+            if file_entry.size >= min_size:
+                paths_by_size[file_entry.size].append(file_entry.path)
+
+        duplicate_groups = [
+            DuplicateFileGroup(size=size, paths=sorted(str(path.relative_to(self.path)) for path in paths))
+            for size, paths in await find_duplicate_groups(paths_by_size)
+        ]
+
+        duplicate_groups.sort(key=lambda group: (-group.wasted_bytes, group.paths[0]))
+
+        return FindDuplicateFilesResponse(max_results=max_results, duplicate_groups=duplicate_groups[:max_results])
+
     async def create_file(self, path: FilePath, content: FileContent) -> bool:
         """Creates a file.
 
@@ -1,14 +1,17 @@
+import asyncio
 import mimetypes
+import os
 from collections.abc import AsyncIterator, Generator, Iterator
 from contextlib import asynccontextmanager, contextmanager
 from datetime import UTC, datetime
-from enum import StrEnum
 from fnmatch import fnmatch
 from functools import cached_property
 from io import TextIOWrapper
+from itertools import batched
 from os import stat_result
 from pathlib import Path
-from typing import Annotated, Any, ClassVar, Literal, get_args
+from stat import S_ISDIR
+from typing import Annotated, Any, ClassVar, Literal, Self, get_args
 
 from aiofiles import open as aopen
 from aiofiles.os import mkdir as amkdir
@@ -16,6 +19,7 @@ from aiofiles.os import remove as aremove
 from aiofiles.os import rmdir as armdir
 from aiofiles.threadpool.text import AsyncTextIOWrapper
 from aioshutil import rmtree
+from asyncstdlib import batched as abatched
 from magika.types import ContentTypeInfo, Status
 from magika.types.content_type_label import ContentTypeLabel
 from pydantic import BaseModel, Field, RootModel
@@ -27,7 +31,8 @@ from rpygrep import (
 )
 from rpygrep.types import RIPGREP_TYPE_LIST, RipGrepContext, RipGrepSearchResult
 
-from filesystem_operations_mcp.filesystem.detection.file_type import init_magika
+from filesystem_operations_mcp.filesystem.detection.classifier import FileClassification, file_classifier
+from filesystem_operations_mcp.filesystem.detection.file_type import FileEntryTypeEnum, init_magika
 from filesystem_operations_mcp.filesystem.errors import (
     DirectoryAlreadyExistsError,
     FileAlreadyExistsError,
@@ -42,6 +47,7 @@ from filesystem_operations_mcp.filesystem.mappings.magika_to_tree_sitter import
     text_mappings,
 )
 from filesystem_operations_mcp.filesystem.patches.file import FileMultiplePatchTypes, FilePatchTypes
+from filesystem_operations_mcp.filesystem.utils.batch_stat import STAT_BATCH_SIZE, astat_paths
 from filesystem_operations_mcp.logging import BASE_LOGGER
 
 logger = BASE_LOGGER.getChild(__name__)
@@ -99,6 +105,19 @@ EXCLUDE_FILES_GLOBS = Annotated[
     ),
 ]
 
+INCLUDE_FILE_TYPES = Annotated[
+    list[str] | None,
+    Field(description="The types (not extensions!) of files to search for."),
+]
+EXCLUDE_FILE_TYPES = Annotated[
+    list[str] | None,
+    Field(
+        description="""The types (not extensions!) of files to exclude from the search.
+                Many common types are excluded by default, be sure to overwrite the default if you want to include them.
+                """
+    ),
+]
+
 DEPTH_PARAM = Annotated[int, Field(description="The depth of the search.")]
 MATCHES_PER_FILE_PARAM = Annotated[int, Field(description="The maximum number of matches to return per file.")]
 
@@ -187,8 +206,18 @@ class FileSystemEntry(BaseNode):
 
         super().__init__(path=path, filesystem=filesystem, **kwargs)
 
+    @classmethod
+    def from_stat(cls, path: Path, filesystem: "BaseNode", stat: stat_result, **kwargs: Any) -> Self:  # pyright: ignore[reportAny]
+        """Build an entry for an absolute path that has already been statted.
+
+        The stat result is used in place of the entry's own `stat` call, and the existence check and validation that
+        the constructor performs are skipped."""
+        entry = cls.model_construct(path=path, filesystem=filesystem, **kwargs)  # pyright: ignore[reportAny]
+        entry.__dict__["_stat"] = stat
+        return entry
+
     @computed_field
-    @property
+    @cached_property
     def relative_path(self) -> Path:
         return self.relative_to(self.filesystem)
 
@@ -256,14 +285,6 @@ class FileEntryMatch(BaseModel):
     after: FileLines = Field(default_factory=FileLines, description="The lines of text after the line")
 
 
-class FileEntryTypeEnum(StrEnum):
-    CODE = "code"
-    TEXT = "text"
-    DATA = "data"
-    BINARY = "binary"
-    UNKNOWN = "unknown"
-
-
 class FileEntry(FileSystemEntry):
     """A file entry in the virtual filesystem."""
 
@@ -287,16 +308,10 @@ class FileEntry(FileSystemEntry):
 
     @computed_field
     @cached_property
-    def type(self) -> FileEntryTypeEnum:  # noqa: PLR0911
-        # Hardcoded rules for data files
-        if self.extension in {".yml", ".yaml", ".json", ".log", ".csv", ".tsv", ".jsonl"}:
-            return FileEntryTypeEnum.DATA
-        if self.extension in {".md", ".markdown", ".asciidoc", ".txt"}:
-            return FileEntryTypeEnum.TEXT
-
-        # detect binary via mimetype
-        if is_binary_mime_type(self.mime_type):
-            return FileEntryTypeEnum.BINARY
+    def type(self) -> FileEntryTypeEnum:
+        # Name, extension and shebang rules resolve most files without running the model
+        if self.classification:
+            return self.classification.type
 
         # Allow magika to detect the type
         if self.magika_content_type_label in code_mappings or self.magika_content_type_label in script_mappings:
@@ -308,6 +323,11 @@ class FileEntry(FileSystemEntry):
 
         return FileEntryTypeEnum.UNKNOWN
 
+    @cached_property
+    def classification(self) -> FileClassification | None:
+        """The type of the file as determined without inspecting it with magika, if it can be."""
+        return file_classifier.classify(self.path)
+
     @cached_property
     def magika_content_type(self) -> ContentTypeInfo | None:
         result = magika.identify_path(self.path)  # pyright: ignore[reportUnknownMemberType]
@@ -317,11 +337,19 @@ class FileEntry(FileSystemEntry):
 
     @cached_property
     def tree_sitter_language(self) -> TreeSitterLanguage | None:
-        if self.magika_content_type_label and self.magika_content_type_label in code_mappings:
-            return code_mappings[self.magika_content_type_label]
+        if self.content_type_label and self.content_type_label in code_mappings:
+            return code_mappings[self.content_type_label]
 
         return None
 
+    @property
+    def content_type_label(self) -> ContentTypeLabel | None:
+        """The content type of the file, from the fast classification if it identified one and otherwise from magika."""
+        if self.classification and self.classification.label:
+            return self.classification.label
+
+        return self.magika_content_type_label
+
     @property
     def magika_content_type_label(self) -> ContentTypeLabel | None:
         if self.magika_content_type:
@@ -505,13 +533,17 @@ class DirectoryEntry(FileSystemEntry):
     ) -> AsyncIterator[FileEntry]:
         """Get a list of specific file entries by path."""
 
-        for path in paths:
-            resolved_path = self._validate_path(path)
-            if resolved_path.is_dir():
-                for file in self.get_directory_files(resolved_path):
+        resolved_paths = [self._validate_path(path) for path in paths]
+
+        for resolved_path, stat in zip(resolved_paths, await astat_paths(resolved_paths), strict=True):
+            if stat is None:
+                raise FileNotFoundError(resolved_path)
+
+            if S_ISDIR(stat.st_mode):
+                async for file in self.aget_directory_files(resolved_path):
                     yield file
             else:
-                yield self.get_file(resolved_path)
+                yield FileEntry.from_stat(path=resolved_path, filesystem=self, stat=stat)
 
     def get_file(self, path: str | Path) -> FileEntry:
         """Get a specific file entry by path."""
@@ -530,6 +562,15 @@ class DirectoryEntry(FileSystemEntry):
             if file.is_file():
                 yield self.get_file(file)
 
+    async def aget_directory_files(self, path: Path) -> AsyncIterator[FileEntry]:
+        """Get a list of files in a directory, statting them together."""
+        file_paths = await asyncio.to_thread(_list_directory_files, path)
+
+        for batch in batched(file_paths, STAT_BATCH_SIZE, strict=False):
+            for file_path, stat in zip(batch, await astat_paths(batch), strict=True):
+                if stat is not None:
+                    yield FileEntry.from_stat(path=file_path, filesystem=self, stat=stat)
+
     def get_descendent_directories(self, root: "DirectoryEntry", depth: int) -> Generator["DirectoryEntry"]:
         """Get a list of child directory entries by path."""
         if depth == 0:
@@ -556,23 +597,41 @@ class DirectoryEntry(FileSystemEntry):
         *,
         included_globs: INCLUDE_FILES_GLOBS = None,
         excluded_globs: EXCLUDE_FILES_GLOBS = None,
-        included_types: Annotated[
-            list[str] | None,
-            Field(description="The types (not extensions!) of files to search for."),
-        ] = None,
-        excluded_types: Annotated[
-            list[str] | None,
-            Field(
-                description="""The types (not extensions!) of files to exclude from the search.
-                Many common types are excluded by default, be sure to overwrite the default if you want to include them.
-                """
-            ),
-        ] = DEFAULT_EXCLUDED_TYPES,
+        included_types: INCLUDE_FILE_TYPES = None,
+        excluded_types: EXCLUDE_FILE_TYPES = DEFAULT_EXCLUDED_TYPES,
         max_depth: DEPTH_PARAM = 6,
     ) -> AsyncIterator[FileEntry]:
         """Find files in the directory using a mix of Globs and types, with the ability to limit the depth of the search.
 
         Honors gitignore files. If no globs are provided, all non-ignored files are in scope."""
+        matched_paths = self.afind_file_paths(
+            included_globs=included_globs,
+            excluded_globs=excluded_globs,
+            included_types=included_types,
+            excluded_types=excluded_types,
+            max_depth=max_depth,
+        )
+
+        # Matches are statted in batches off the event loop rather than one by one as entries are built
+        async for batch in abatched(matched_paths, STAT_BATCH_SIZE):
+            batch_paths = [self.path / matched_path for matched_path in batch]
+
+            for path, stat in zip(batch_paths, await astat_paths(batch_paths), strict=True):
+                if stat is not None:
+                    yield FileEntry.from_stat(path=path, filesystem=self.filesystem, stat=stat)
+
+    async def afind_file_paths(
+        self,
+        *,
+        included_globs: INCLUDE_FILES_GLOBS = None,
+        excluded_globs: EXCLUDE_FILES_GLOBS = None,
+        included_types: INCLUDE_FILE_TYPES = None,
+        excluded_types: EXCLUDE_FILE_TYPES = DEFAULT_EXCLUDED_TYPES,
+        max_depth: DEPTH_PARAM = 6,
+    ) -> AsyncIterator[Path]:
+        """Find the paths of files in the directory, relative to the directory, without building file entries for them.
+
+        Accepts the same arguments as `afind_files`."""
         included_globs_list, excluded_globs_list, included_type_list, excluded_type_list = prepare_ripgrep_arguments(
             included_globs, excluded_globs, included_types, excluded_types
         )
@@ -586,8 +645,7 @@ class DirectoryEntry(FileSystemEntry):
         )
 
         async for matched_path in ripgrep.arun():
-            file_entry = FileEntry(path=self.path / matched_path, filesystem=self.filesystem)
-            yield file_entry
+            yield matched_path
 
     async def asearch_files(
         self,
@@ -595,18 +653,8 @@ class DirectoryEntry(FileSystemEntry):
         *,
         included_globs: INCLUDE_FILES_GLOBS = None,
         excluded_globs: EXCLUDE_FILES_GLOBS = None,
-        included_types: Annotated[
-            list[str] | None,
-            Field(description="The types (not extensions!) of files to search for."),
-        ] = None,
-        excluded_types: Annotated[
-            list[str] | None,
-            Field(
-                description="""The types (not extensions!) of files to exclude from the search.
-                Many common types are excluded by default, be sure to overwrite the default if you want to include them.
-                """
-            ),
-        ] = DEFAULT_EXCLUDED_TYPES,
+        included_types: INCLUDE_FILE_TYPES = None,
+        excluded_types: EXCLUDE_FILE_TYPES = DEFAULT_EXCLUDED_TYPES,
         before_context: BEFORE_CONTEXT_PARAM = 1,
         after_context: AFTER_CONTEXT_PARAM = 1,
         max_depth: DEPTH_PARAM = 6,
@@ -640,13 +688,20 @@ class DirectoryEntry(FileSystemEntry):
 
         result: AsyncIterator[RipGrepSearchResult] = ripgrep.arun()
 
-        async for file_match in result:
-            yield FileEntryWithMatches(
-                path=file_match.path,
-                filesystem=self.filesystem,
-                matches=search_result_to_file_lines(file_match),
-                matches_limit_reached=len(file_match.matches) >= matches_per_file,
-            )
+        async for batch in abatched(result, STAT_BATCH_SIZE):
+            batch_paths = [self.filesystem.path / file_match.path for file_match in batch]
+
+            for file_match, path, stat in zip(batch, batch_paths, await astat_paths(batch_paths), strict=True):
+                if stat is None:
+                    continue
+
+                yield FileEntryWithMatches.from_stat(
+                    path=path,
+                    filesystem=self.filesystem,
+                    stat=stat,
+                    matches=search_result_to_file_lines(file_match),
+                    matches_limit_reached=len(file_match.matches) >= matches_per_file,
+                )
 
     async def create_directory(
         self,
@@ -684,14 +739,18 @@ class DirectoryEntry(FileSystemEntry):
         return True
 
 
-def is_binary_mime_type(mime_type: str) -> bool:
-    if mime_type.startswith(("image/", "video/", "audio/")):
-        return True
+def _list_directory_files(path: Path) -> list[Path]:
+    """The paths of the files in a directory. The directory is listed with a single blocking `os.scandir` call."""
+    with os.scandir(path) as entries:
+        return [Path(entry.path) for entry in entries if entry.is_file()]
 
-    if mime_type.startswith("application/") and not (mime_type.endswith(("json", "xml", "sh"))):  # noqa: SIM103
-        return True
 
-    return False
+def classify_file_type_by_name(path: Path) -> FileEntryTypeEnum | None:
+    """Classify a file from its name alone. Returns None when the contents need to be inspected."""
+    if classification := file_classifier.classify_by_name(path):
+        return classification.type
+
+    return None
 
 
 def search_result_to_file_lines(search_result: RipGrepSearchResult) -> FileLines:
@@ -12,6 +12,7 @@ from tree_sitter_language_pack import (
 
 from filesystem_operations_mcp.filesystem.errors import LanguageNotSupportedError
 from filesystem_operations_mcp.filesystem.summarize.text import summarizer
+from filesystem_operations_mcp.filesystem.summarize.tree_cache import TreeCache
 from filesystem_operations_mcp.logging import BASE_LOGGER
 
 logger = BASE_LOGGER.getChild(__name__)
@@ -23,6 +24,9 @@ tag_queries: dict[str, str] = {}
 
 QueryMatch = tuple[int, dict[str, list[Node]]]
 
+tree_cache: TreeCache = TreeCache()
+"""Recently parsed trees, so that summarizing a file again after an edit only re-parses what changed."""
+
 
 def load_tag_queries() -> None:
     """Load all tags for all languages"""
@@ -178,7 +182,11 @@ def prune_branches(last_interesting_node_view: ViewNode, node: Node, interesting
     return view_node
 
 
-def summarize_code(language_name: str, code: str) -> dict[str, Any] | str | None:
+def summarize_code(language_name: str, code: str, path: Path | None = None) -> dict[str, Any] | str | None:
+    """Summarize the definitions and docs in the code.
+
+    If the path of the file the code came from is provided, the parsed tree is cached and later summaries of the same
+    file are parsed incrementally."""
     ensure_initialized()
 
     if language_name not in tag_queries:
@@ -190,7 +198,7 @@ def summarize_code(language_name: str, code: str) -> dict[str, Any] | str | None
     parser: Parser = get_language_parser(language=language)
 
     # Parse the code
-    tree: Tree = parser.parse(code.encode())
+    tree: Tree = tree_cache.parse(parser=parser, language_name=language_name, source=code.encode(), path=path)
 
     # Identify the tags
     tag_query: Query = Query(language, tag_queries[language_name])
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+
+from tree_sitter import Parser, Point, Tree
+
+from filesystem_operations_mcp.logging import BASE_LOGGER
+
+logger = BASE_LOGGER.getChild(__name__)
+
+DEFAULT_MAX_CACHED_TREES = 64
+
+
+@dataclass(frozen=True)
+class LineEdit:
+    """A single contiguous line patch between two versions of a source: `old_count` lines starting at `start_line` were
+    replaced by `new_count` lines."""
+
+    start_line: int
+    old_count: int
+    new_count: int
+
+
+@dataclass
+class CachedTree:
+    language_name: str
+    source: bytes
+    tree: Tree
+
+
+def diff_lines(old_lines: list[bytes], new_lines: list[bytes]) -> LineEdit | None:
+    """Collapse the difference between two versions of a source into a single line patch. Returns None if they are equal."""
+    if old_lines == new_lines:
+        return None
+
+    max_common = min(len(old_lines), len(new_lines))
+
+    prefix = 0
+    while prefix < max_common and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+
+    suffix = 0
+    while suffix < max_common - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+
+    return LineEdit(start_line=prefix, old_count=len(old_lines) - prefix - suffix, new_count=len(new_lines) - prefix - suffix)
+
+
+def _line_position(lines: list[bytes], line_offsets: list[int], index: int) -> tuple[int, Point]:
+    """The byte offset and point of the start of line `index`, or of the end of the source if `index` is past the last line."""
+    if index < len(lines):
+        return line_offsets[index], Point(index, 0)
+
+    return line_offsets[-1] - 1, Point(len(lines) - 1, len(lines[-1]))
+
+
+def apply_line_edit(tree: Tree, old_lines: list[bytes], new_lines: list[bytes], edit: LineEdit) -> None:
+    """Translate a line patch into a tree-sitter edit on `tree`."""
+    # The byte offset at which each line starts, plus one final entry for the end of the source (and its implicit newline)
+    old_offsets = [0, *accumulate(len(line) + 1 for line in old_lines)]
+    new_offsets = [0, *accumulate(len(line) + 1 for line in new_lines)]
+
+    start_byte, start_point = _line_position(old_lines, old_offsets, edit.start_line)
+    old_end_byte, old_end_point = _line_position(old_lines, old_offsets, edit.start_line + edit.old_count)
+    new_end_byte, new_end_point = _line_position(new_lines, new_offsets, edit.start_line + edit.new_count)
+
+    tree.edit(
+        start_byte=start_byte,
+        old_end_byte=old_end_byte,
+        new_end_byte=new_end_byte,
+        start_point=start_point,
+        old_end_point=old_end_point,
+        new_end_point=new_end_point,
+    )
+
+
+class TreeCache:
+    """A bounded, least-recently-used cache of parsed trees keyed by file path.
+
+    When a file that is already in the cache is parsed again, the change between the cached and the new source is
+    translated into a tree-sitter edit and the file is re-parsed incrementally from the cached tree.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_CACHED_TREES) -> None:
+        self.max_entries: int = max_entries
+        self._trees: OrderedDict[Path, CachedTree] = OrderedDict()
+
+        self.full_parses: int = 0
+        self.incremental_parses: int = 0
+        self.unchanged_hits: int = 0
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def clear(self) -> None:
+        self._trees.clear()
+
+    def discard(self, path: Path) -> None:
+        _ = self._trees.pop(path, None)
+
+    def parse(self, parser: Parser, language_name: str, source: bytes, path: Path | None = None) -> Tree:
+        """Parse `source`, re-using the cached tree for `path` when there is one."""
+        if path is None:
+            self.full_parses += 1
+            return parser.parse(source)
+
+        cached = self._trees.get(path)
+
+        if cached is None or cached.language_name != language_name:
+            self.full_parses += 1
+            tree = parser.parse(source)
+        else:
+            old_lines = cached.source.split(b"\n")
+            new_lines = source.split(b"\n")
+
+            edit = diff_lines(old_lines, new_lines)
+
+            if edit is None:
+                self.unchanged_hits += 1
+                tree = cached.tree
+            else:
+                self.incremental_parses += 1
+                apply_line_edit(cached.tree, old_lines, new_lines, edit)
+                tree = parser.parse(source, old_tree=cached.tree)
+
+        self._trees[path] = CachedTree(language_name=language_name, source=source, tree=tree)
+        self._trees.move_to_end(path)
+
+        while len(self._trees) > self.max_entries:
+            _ = self._trees.popitem(last=False)
+
+        return tree
@@ -0,0 +1,61 @@
+import asyncio
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from itertools import batched, chain
+from logging import Logger
+from os import stat_result
+from pathlib import Path
+
+from filesystem_operations_mcp.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(__name__)
+
+STAT_WORKERS = 8
+STAT_CHUNK_SIZE = 64
+"""The number of paths each thread stats per call, so that large result sets are not one executor job per file."""
+
+STAT_BATCH_SIZE = 128
+"""The number of entries listings collect before statting them together."""
+
+
+@cache
+def _stat_executor() -> ThreadPoolExecutor:
+    """A thread pool shared by all stat batches, as batches are small and frequent."""
+    return ThreadPoolExecutor(max_workers=STAT_WORKERS, thread_name_prefix="fso-stat")
+
+
+def stat_paths(paths: Sequence[Path], follow_symlinks: bool = True) -> list[stat_result | None]:
+    """Stat each path, returning None for paths that do not exist or cannot be statted."""
+    results: list[stat_result | None] = []
+
+    for path in paths:
+        try:
+            results.append(path.stat(follow_symlinks=follow_symlinks))
+        except OSError:
+            results.append(None)
+
+    return results
+
+
+async def astat_paths(paths: Sequence[Path], follow_symlinks: bool = True) -> list[stat_result | None]:
+    """Stat a whole set of paths on a thread pool instead of one syscall at a time on the event loop.
+
+    Args:
+        paths: The paths to stat.
+        follow_symlinks: Whether to stat the targets of symlinks (`os.stat`) or the links themselves (`os.lstat`).
+
+    Returns:
+        The stat results in the same order as `paths`, with None for paths that do not exist or cannot be statted.
+    """
+    if not paths:
+        return []
+
+    loop = asyncio.get_running_loop()
+    executor = _stat_executor()
+
+    chunks = batched(paths, STAT_CHUNK_SIZE, strict=False)
+
+    results = await asyncio.gather(*[loop.run_in_executor(executor, stat_paths, chunk, follow_symlinks) for chunk in chunks])
+
+    return list(chain.from_iterable(results))
@@ -0,0 +1,102 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+from logging import Logger
+from pathlib import Path
+
+from filesystem_operations_mcp.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(__name__)
+
+PARTIAL_HASH_CHUNK_BYTES = 64 * 1024
+FULL_HASH_CHUNK_BYTES = 1024 * 1024
+HASH_WORKERS = 8
+
+
+def partial_hash(path: Path, size: int) -> str | None:
+    """Hash the head and tail of a file. Files that fit within the head and tail are hashed in full."""
+    hasher = blake2b(digest_size=16)
+
+    try:
+        with path.open(mode="rb") as f:
+            hasher.update(f.read(PARTIAL_HASH_CHUNK_BYTES))
+
+            if size > PARTIAL_HASH_CHUNK_BYTES:
+                _ = f.seek(max(PARTIAL_HASH_CHUNK_BYTES, size - PARTIAL_HASH_CHUNK_BYTES))
+                hasher.update(f.read(PARTIAL_HASH_CHUNK_BYTES))
+    except OSError:
+        logger.warning(f"Unable to hash {path}, skipping it.")
+        return None
+
+    return hasher.hexdigest()
+
+
+def full_hash(path: Path) -> str | None:
+    """Hash the entire contents of a file."""
+    hasher = blake2b(digest_size=16)
+
+    try:
+        with path.open(mode="rb") as f:
+            while chunk := f.read(FULL_HASH_CHUNK_BYTES):
+                hasher.update(chunk)
+    except OSError:
+        logger.warning(f"Unable to hash {path}, skipping it.")
+        return None
+
+    return hasher.hexdigest()
+
+
+async def _bucket_by_hash(executor: ThreadPoolExecutor, paths: list[Path], hash_function: Callable[[Path], str | None]) -> list[list[Path]]:
+    """Hash the paths on the executor and return the buckets with more than one member."""
+    loop = asyncio.get_running_loop()
+
+    digests = await asyncio.gather(*[loop.run_in_executor(executor, hash_function, path) for path in paths])
+
+    buckets: dict[str, list[Path]] = defaultdict(list)
+
+    for path, digest in zip(paths, digests, strict=True):
+        if digest is not None:
+            buckets[digest].append(path)
+
+    return [bucket for bucket in buckets.values() if len(bucket) > 1]
+
+
+async def find_duplicate_groups(paths_by_size: dict[int, list[Path]], workers: int = HASH_WORKERS) -> list[tuple[int, list[Path]]]:
+    """Find groups of identical files.
+
+    Only sizes shared by more than one file are hashed. Candidates are first compared by a partial hash of their head
+    and tail, and only files whose partial hashes collide are hashed in full.
+
+    Args:
+        paths_by_size: The paths of the candidate files grouped by their size in bytes.
+        workers: The number of threads to hash files with.
+
+    Returns:
+        A list of (size, paths) tuples, one per group of identical files.
+    """
+    colliding_sizes: Iterable[tuple[int, list[Path]]] = ((size, paths) for size, paths in paths_by_size.items() if len(paths) > 1)
+
+    duplicate_groups: list[tuple[int, list[Path]]] = []
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fso-hash") as executor:
+
+        async def _refine(size: int, paths: list[Path]) -> list[tuple[int, list[Path]]]:
+            partial_buckets = await _bucket_by_hash(executor, paths, lambda path: partial_hash(path, size))
+
+            # The partial hash already covered the entire file
+            if size <= PARTIAL_HASH_CHUNK_BYTES * 2:
+                return [(size, bucket) for bucket in partial_buckets]
+
+            groups: list[tuple[int, list[Path]]] = []
+
+            for partial_bucket in partial_buckets:
+                groups.extend((size, bucket) for bucket in await _bucket_by_hash(executor, partial_bucket, full_hash))
+
+            return groups
+
+        for groups in await asyncio.gather(*[_refine(size, paths) for size, paths in colliding_sizes]):
+            duplicate_groups.extend(groups)
+
+    return duplicate_groups
@@ -0,0 +1,50 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from pathlib import Path
+
+from filesystem_operations_mcp.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(__name__)
+
+SCAN_WORKERS = 8
+
+
+def scan_file_sizes(directory: Path, names: set[str]) -> list[tuple[str, int]]:
+    """Scan a directory and return the sizes of the regular files whose names are in `names`."""
+    sizes: list[tuple[str, int]] = []
+
+    try:
+        with os.scandir(directory) as entries:
+            sizes.extend(
+                (entry.name, entry.stat(follow_symlinks=False).st_size)
+                for entry in entries
+                if entry.name in names and entry.is_file(follow_symlinks=False)
+            )
+    except OSError:
+        logger.warning(f"Unable to scan {directory}, skipping it.")
+
+    return sizes
+
+
+async def ascan_file_sizes(names_by_directory: dict[Path, set[str]], workers: int = SCAN_WORKERS) -> dict[Path, list[tuple[str, int]]]:
+    """Scan many directories in parallel, one `os.scandir` call per directory.
+
+    Args:
+        names_by_directory: The names of the files to size, grouped by the directory that contains them.
+        workers: The number of threads to scan directories with.
+
+    Returns:
+        The (name, size) pairs of the files found, grouped by directory.
+    """
+    loop = asyncio.get_running_loop()
+
+    directories = list(names_by_directory)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fso-scan") as executor:
+        sizes = await asyncio.gather(
+            *[loop.run_in_executor(executor, scan_file_sizes, directory, names_by_directory[directory]) for directory in directories]
+        )
+
+    return dict(zip(directories, sizes, strict=True))
@@ -0,0 +1,101 @@
+from collections.abc import Callable
+from functools import cache
+from inspect import signature
+from itertools import chain, repeat
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError, to_jsonable_python
+
+COLUMNAR_PATH_FIELD = "name"
+"""The column holding the name of each file within its directory."""
+
+COLUMNAR_DIRECTORY_FIELD = "directory"
+"""The column holding, for each file, the index of its directory in the `directories` dictionary."""
+
+COLUMNAR_DIRECTORIES_KEY = "directories"
+"""The dictionary of the distinct directories of the files, shared by all rows."""
+
+
+def encode_columnar(results: dict[str, dict[str, Any]]) -> dict[str, list[Any]]:
+    """Encode per-file results keyed by relative path as one array per field.
+
+    Paths are split into a directory and a name, and each distinct directory is stored once in `directories` with rows
+    referring to it by index. Rows that do not have a field hold None in that field's array.
+
+    For example, `{"a/x.py": {"size": 1}, "a/y.md": {"size": 2, "summary": "..."}}` is encoded as
+    `{"directories": ["a"], "directory": [0, 0], "name": ["x.py", "y.md"], "size": [1, 2], "summary": [None, "..."]}`.
+    """
+    relative_paths = sorted(results)
+    rows = [results[relative_path] for relative_path in relative_paths]
+
+    directories: dict[str, int] = {}
+    directory_column: list[int] = []
+    name_column: list[str] = []
+
+    for relative_path in relative_paths:
+        directory, _, name = relative_path.rpartition("/")
+        directory_column.append(directories.setdefault(directory, len(directories)))
+        name_column.append(name)
+
+    fields = dict.fromkeys(chain.from_iterable(rows))
+
+    return {
+        COLUMNAR_DIRECTORIES_KEY: list(directories),
+        COLUMNAR_DIRECTORY_FIELD: directory_column,
+        COLUMNAR_PATH_FIELD: name_column,
+        **{field: list(map(dict.get, rows, repeat(field))) for field in fields},
+    }
+
+
+def decode_columnar(encoded: dict[str, list[Any]]) -> dict[str, dict[str, Any]]:
+    """Decode results encoded by `encode_columnar` back into per-file results keyed by relative path."""
+    directories: list[str] = encoded[COLUMNAR_DIRECTORIES_KEY]
+
+    fields = [field for field in encoded if field not in {COLUMNAR_DIRECTORIES_KEY, COLUMNAR_DIRECTORY_FIELD, COLUMNAR_PATH_FIELD}]
+
+    results: dict[str, dict[str, Any]] = {}
+
+    for row, (directory_index, name) in enumerate(zip(encoded[COLUMNAR_DIRECTORY_FIELD], encoded[COLUMNAR_PATH_FIELD], strict=True)):
+        directory = directories[directory_index]
+        relative_path = f"{directory}/{name}" if directory else name
+
+        results[relative_path] = {field: encoded[field][row] for field in fields if encoded[field][row] is not None}
+
+    return results
+
+
+@cache
+def _plain_model_serializer(model_type: type[BaseModel]) -> Callable[[BaseModel], Any] | None:
+    """The model's plain `model_serializer`, if it has one that takes nothing but the model."""
+    for decorator in model_type.__pydantic_decorators__.model_serializers.values():
+        if decorator.info.mode == "plain" and decorator.info.when_used == "always" and len(signature(decorator.func).parameters) == 1:
+            return decorator.func
+
+    return None
+
+
+def _to_jsonable(value: Any) -> Any:  # pyright: ignore[reportAny]
+    """Convert the values orjson cannot serialize natively.
+
+    Models with a plain `model_serializer` are converted by calling it directly rather than through `model_dump`, which
+    would walk and copy everything the serializer returns before orjson walks it again. Other values (paths, sets,
+    etc.) are converted the way pydantic would, and values pydantic cannot serialize either raise a TypeError, like
+    the stdlib `json` module does."""
+    if isinstance(value, BaseModel):
+        if model_serializer := _plain_model_serializer(type(value)):
+            return model_serializer(value)
+
+        return value.model_dump(mode="python")
+
+    try:
+        return to_jsonable_python(value)
+    except PydanticSerializationError as e:
+        msg = f"Object of type {type(value).__name__} is not JSON serializable"
+        raise TypeError(msg) from e
+
+
+def serialize_tool_result(data: Any) -> str:  # pyright: ignore[reportAny]
+    """Serialize a tool result to JSON with orjson."""
+    return orjson.dumps(data, default=_to_jsonable, option=orjson.OPT_NON_STR_KEYS).decode()
@@ -0,0 +1,109 @@
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from hashlib import blake2b
+from logging import Logger
+from os import stat_result
+from pathlib import Path
+
+import orjson
+
+from filesystem_operations_mcp.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(__name__)
+
+MAX_SNAPSHOTS = 8
+"""The number of snapshots kept per root. Older tokens stop being accepted once their snapshot is pruned."""
+
+TOKEN_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+type FileSignature = tuple[int, int, int]
+"""The size, modification time in nanoseconds and inode of a file."""
+
+type Snapshot = dict[str, FileSignature]
+"""The signature of each file, keyed by its path relative to the root."""
+
+
+def file_signature(stat: stat_result) -> FileSignature:
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    added: list[str]
+    modified: list[str]
+    deleted: list[str]
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> SnapshotDiff:
+    """Compare two snapshots. A file is modified if its size, modification time or inode changed."""
+    return SnapshotDiff(
+        added=sorted(new.keys() - old.keys()),
+        modified=sorted(path for path, signature in new.items() if path in old and old[path] != signature),
+        deleted=sorted(old.keys() - new.keys()),
+    )
+
+
+def default_snapshot_directory(root: Path) -> Path:
+    """The directory snapshots of `root` are persisted in, under the user's cache directory."""
+    cache_home = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    root_key = blake2b(str(root.resolve()).encode(), digest_size=8).hexdigest()
+
+    return cache_home / "filesystem-operations-mcp" / "snapshots" / root_key
+
+
+class SnapshotStore:
+    """Persists snapshots of a root to disk, each identified by an opaque token."""
+
+    def __init__(self, directory: Path, max_snapshots: int = MAX_SNAPSHOTS) -> None:
+        self.directory: Path = directory
+        self.max_snapshots: int = max_snapshots
+
+    def _path(self, token: str) -> Path:
+        return self.directory / f"{token}.json"
+
+    def load(self, token: str) -> Snapshot | None:
+        """Load the snapshot for a token. Returns None for unknown, pruned or malformed tokens."""
+        if not TOKEN_PATTERN.fullmatch(token):
+            return None
+
+        try:
+            raw: dict[str, list[int]] = orjson.loads(self._path(token).read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+        return {path: (signature[0], signature[1], signature[2]) for path, signature in raw.items()}
+
+    def save(self, snapshot: Snapshot) -> str:
+        """Persist a snapshot and return its token, pruning the oldest snapshots beyond `max_snapshots`."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        token = uuid.uuid4().hex
+
+        # Write to a temporary file first so a concurrent reader never sees a partial snapshot
+        temporary_path = self._path(token).with_suffix(".tmp")
+        _ = temporary_path.write_bytes(orjson.dumps(snapshot))
+        _ = temporary_path.replace(self._path(token))
+
+        self._prune()
+
+        return token
+
+    def _prune(self) -> None:
+        modified_times: list[tuple[int, Path]] = []
+
+        for path in self.directory.glob("*.json"):
+            # Another process, or a concurrent prune, may remove a snapshot between the glob and the stat
+            try:
+                modified_times.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                continue
+
+        snapshots = [path for _, path in sorted(modified_times, reverse=True)]
+
+        for stale_snapshot in snapshots[self.max_snapshots :]:
+            try:
+                stale_snapshot.unlink()
+            except OSError:
+                logger.warning(f"Unable to remove stale snapshot {stale_snapshot}, skipping it.")
@@ -1,8 +1,10 @@
 import asyncio
+import time
 from asyncio import TaskGroup
 from asyncio.queues import QueueEmpty, QueueShutDown
 from collections.abc import AsyncIterator, Callable, Coroutine
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from logging import Logger
 from typing import Any
 
@@ -10,9 +12,87 @@ from filesystem_operations_mcp.logging import BASE_LOGGER
 
 logger: Logger = BASE_LOGGER.getChild(__name__)
 
+SCALE_INTERVAL = 0.05
+"""How often, in seconds, the pool re-evaluates how many workers it should run."""
+
+IDLE_TIMEOUT = 0.25
+"""How long, in seconds, a worker above the minimum waits for work before it exits."""
+
+LATENCY_SMOOTHING = 0.2
+"""The weight of the newest sample in the moving average of task latency."""
+
+CONTENTION_FACTOR = 1.5
+"""Growing stops once task latency exceeds the latency observed at the last growth by this factor."""
+
+
+@dataclass
+class WorkerPoolMetrics:
+    """Utilization metrics for a worker pool. Pass an instance to `worker_pool` to have it filled in."""
+
+    items_completed: int = 0
+    items_failed: int = 0
+    items_timed_out: int = 0
+
+    current_workers: int = 0
+    peak_workers: int = 0
+
+    busy_seconds: float = 0
+    """The total time workers spent processing work items."""
+
+    worker_seconds: float = 0
+    """The total time workers were alive, whether busy or idle."""
+
+    average_latency: float = 0
+    """The moving average of the time taken to process a work item."""
+
+    _started_at: float = field(default_factory=time.perf_counter, repr=False)
+    _last_change: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def utilization(self) -> float:
+        """The fraction of worker time spent processing work items."""
+        self._account()
+        return self.busy_seconds / self.worker_seconds if self.worker_seconds else 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started_at
+
+    def _account(self) -> None:
+        now = time.perf_counter()
+        self.worker_seconds += (now - self._last_change) * self.current_workers
+        self._last_change = now
+
+    def worker_started(self) -> None:
+        self._account()
+        self.current_workers += 1
+        self.peak_workers = max(self.peak_workers, self.current_workers)
+
+    def worker_stopped(self) -> None:
+        self._account()
+        self.current_workers -= 1
+
+    def record_latency(self, latency: float) -> None:
+        self.busy_seconds += latency
+        if self.average_latency == 0:
+            self.average_latency = latency
+        else:
+            self.average_latency += LATENCY_SMOOTHING * (latency - self.average_latency)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "completed": self.items_completed,
+            "failed": self.items_failed,
+            "timed_out": self.items_timed_out,
+            "peak_workers": self.peak_workers,
+            "utilization": round(self.utilization, 3),
+            "average_latency": round(self.average_latency, 6),
+            "elapsed": round(self.elapsed, 6),
+        }
+
 
 @asynccontextmanager
-async def worker_pool[WorkType: Any, ResultType: Any | None](
+async def worker_pool[WorkType: Any, ResultType: Any | None](  # noqa: PLR0915
     work_function: Callable[[WorkType], Coroutine[Any, Any, ResultType | None]],
     result_queue: asyncio.Queue[ResultType] | None = None,
     work_queue: asyncio.Queue[WorkType] | None = None,
@@ -20,58 +100,153 @@ async def worker_pool[WorkType: Any, ResultType: Any | None](
     workers: int = 4,
     work_type: type[WorkType] | None = None,  # noqa: ARG001  # pyright: ignore[reportUnusedParameter]
     result_type: type[ResultType] | None = None,  # noqa: ARG001  # pyright: ignore[reportUnusedParameter]
+    *,
+    max_workers: int | None = None,
+    max_queue_size: int = 0,
+    item_timeout: float | None = None,
+    metrics: WorkerPoolMetrics | None = None,
 ) -> AsyncIterator[tuple[asyncio.Queue[WorkType], asyncio.Queue[tuple[WorkType, Exception]]]]:
     """Run a worker pool that performs work that is pushed to it.
 
+    The pool starts with `workers` workers. If `max_workers` is greater than `workers`, the pool adds workers while the
+    work queue is backing up and task latency is not degrading, and workers above `workers` exit once they go idle.
+
     Args:
         work_function: A function that performs work on a work item. The function must take a work item and optionally return a result.
         result_queue: An optional queue to put results into. If you need the results, you must provide a queue.
         work_queue: An optional queue to put work items into. If you need to push work items to the worker pool, you must provide a queue.
         error_queue: An optional queue to put errors into. If you need the errors, you must provide a queue.
-        workers: The number of workers to run. Defaults to 4.
+        workers: The number of workers to run, and the minimum when the pool is adaptive. Defaults to 4.
+        max_workers: The maximum number of workers to scale up to. Defaults to `workers`, i.e. a fixed size pool.
+        max_queue_size: The maximum number of pending work items when the pool creates the work queue. Producers
+            awaiting `put` are held back while the queue is full. Defaults to 0, i.e. unbounded.
+        item_timeout: An optional number of seconds after which processing of a work item is cancelled. Timed out
+            items are put onto the error queue with a `TimeoutError` naming the work function and the limit. The
+            timeout can only fire while the work function is awaiting, so blocking or CPU bound work must be run in a
+            thread, e.g. with `asyncio.to_thread`. This also lets such work run in parallel rather than one item at a
+            time on the event loop.
+        metrics: An optional metrics object to fill in with utilization metrics.
 
     Returns:
         A queue that work items can be added to.
     """
 
     if work_queue is None:
-        work_queue = asyncio.Queue()
+        work_queue = asyncio.Queue(maxsize=max_queue_size)
 
     if error_queue is None:
         error_queue = asyncio.Queue()
 
+    if metrics is None:
+        metrics = WorkerPoolMetrics()
+
+    min_workers: int = workers
+    max_workers = max(max_workers or workers, min_workers)
+
+    operation: str = getattr(work_function, "__qualname__", repr(work_function))
+
+    async def _process(worker_id: int, work_item: WorkType) -> ResultType | None:
+        started = time.perf_counter()
+
+        try:
+            async with asyncio.timeout(item_timeout):
+                result = await work_function(work_item)
+        except TimeoutError:
+            msg = f"{operation} timed out after {item_timeout} seconds"
+            logger.warning(f"{worker_id}: {msg}")
+            metrics.items_timed_out += 1
+            await error_queue.put(item=(work_item, TimeoutError(msg)))
+            return None
+        except Exception as e:
+            logger.exception(f"{worker_id}: Error processing work item")
+            metrics.items_failed += 1
+            await error_queue.put(item=(work_item, e))
+            return None
+        finally:
+            metrics.record_latency(time.perf_counter() - started)
+
+        metrics.items_completed += 1
+
+        return result
+
     async def _worker(worker_id: int) -> None:
         """A worker function that processes work items from the queue."""
 
+        metrics.worker_started()
+
         try:
-            while work_item := await work_queue.get():
-                result: ResultType | None = None
-                try:
-                    result = await work_function(work_item)
+            while True:
+                if metrics.current_workers > min_workers:
+                    try:
+                        work_item = await asyncio.wait_for(work_queue.get(), timeout=IDLE_TIMEOUT)
+                    except TimeoutError:
+                        # Other idle workers may have exited while we waited
+                        if metrics.current_workers > min_workers:
+                            return
+                        continue
+                else:
+                    work_item = await work_queue.get()
 
-                except (asyncio.CancelledError, QueueShutDown):
+                if not work_item:
                     return
-                except Exception as e:
-                    logger.exception(f"{worker_id}: Error processing work item")
-                    await error_queue.put(item=(work_item, e))
+
+                result = await _process(worker_id, work_item)
 
                 if result_queue is not None and result is not None:
                     await result_queue.put(item=result)
 
                 work_queue.task_done()
 
-        except QueueShutDown:
+        except (asyncio.CancelledError, QueueShutDown):
             return
 
+        finally:
+            metrics.worker_stopped()
+
     async with TaskGroup() as task_group:
-        for i in range(workers):
-            _ = task_group.create_task(coro=_worker(worker_id=i))
+        next_worker_id: int = 0
+
+        def _add_worker() -> None:
+            nonlocal next_worker_id
+            _ = task_group.create_task(coro=_worker(worker_id=next_worker_id))
+            next_worker_id += 1
+
+        async def _scaler() -> None:
+            """Add workers while the backlog outgrows the workers we have and latency is not degrading under contention."""
+            latency_at_last_growth: float = 0
+
+            while True:
+                await asyncio.sleep(SCALE_INTERVAL)
+
+                current_workers = metrics.current_workers
+
+                if current_workers >= max_workers or work_queue.qsize() <= current_workers:
+                    continue
+
+                if latency_at_last_growth and metrics.average_latency > latency_at_last_growth * CONTENTION_FACTOR:
+                    continue
+
+                latency_at_last_growth = metrics.average_latency
+
+                for _ in range(min(max_workers - current_workers, max(current_workers, 1))):
+                    _add_worker()
+
+        for _ in range(min_workers):
+            _add_worker()
+
+        scaler = task_group.create_task(coro=_scaler()) if max_workers > min_workers else None
+
+        try:
+            yield work_queue, error_queue
 
-        yield work_queue, error_queue
+            await work_queue.join()
+        finally:
+            if scaler is not None:
+                _ = scaler.cancel()
 
-        await work_queue.join()
+            work_queue.shutdown(immediate=True)
 
-        work_queue.shutdown()
+        logger.debug(f"Worker pool finished: {metrics.summary()}")
 
 
 async def gather_results_from_queue[ResultType](queue: asyncio.Queue[ResultType]) -> list[ResultType]:
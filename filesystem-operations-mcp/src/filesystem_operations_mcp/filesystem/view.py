@@ -1,20 +1,22 @@
 import asyncio
 import inspect
-import json
+import os
 import time
 from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Annotated, Any, ClassVar, Literal, Self
 
+import orjson
 from makefun import wraps as makefun_wraps  # pyright: ignore[reportUnknownVariableType]
 from pydantic import BaseModel, ConfigDict, Field, field_serializer, model_validator
 from pydantic.fields import computed_field
 from pydantic.functional_serializers import model_serializer
 
-from filesystem_operations_mcp.filesystem.nodes import FileEntry, FileEntryTypeEnum, FileEntryWithMatches
+from filesystem_operations_mcp.filesystem.nodes import FileEntry, FileEntryTypeEnum, FileEntryWithMatches, FileLines
 from filesystem_operations_mcp.filesystem.summarize.code import summarize_code
 from filesystem_operations_mcp.filesystem.summarize.markdown import summarize_markdown
 from filesystem_operations_mcp.filesystem.summarize.text import summarizer
-from filesystem_operations_mcp.filesystem.utils.workers import gather_results_from_queue, worker_pool
+from filesystem_operations_mcp.filesystem.utils.serialization import encode_columnar
+from filesystem_operations_mcp.filesystem.utils.workers import WorkerPoolMetrics, gather_results_from_queue, worker_pool
 from filesystem_operations_mcp.logging import BASE_LOGGER
 
 logger = BASE_LOGGER.getChild("view")
@@ -23,6 +25,11 @@ logger = BASE_LOGGER.getChild("view")
 MAX_SUMMARY_BYTES = 1000
 ASYNC_READ_THRESHOLD = 1000
 
+MIN_FILE_WORKERS = 2
+MAX_FILE_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+FILE_WORK_TIMEOUT = 30
+"""The number of seconds after which reading and summarizing a single file is abandoned."""
+
 
 class FileExportableField(BaseModel):
     """The fields of a file that can be included in the response. Enabling a field will include the field in the response."""
@@ -112,8 +119,8 @@ class FileExportableField(BaseModel):
         if not node.tree_sitter_language:
             return {"code_summary_skipped": "Not a summarizable language"}
 
-        summary = summarize_code(node.tree_sitter_language.value, "\n".join(lines))
-        as_json = json.dumps(summary)
+        summary = summarize_code(node.tree_sitter_language.value, "\n".join(lines), path=node.path)
+        as_json = orjson.dumps(summary).decode()
 
         if len(as_json) > MAX_SUMMARY_BYTES:
             return {"summary": as_json[:MAX_SUMMARY_BYTES]}
@@ -179,13 +186,23 @@ class FileExportableField(BaseModel):
         return model, self.apply_read_lines_count(node)
 
     async def aapply(self, node: FileEntry | FileEntryWithMatches) -> dict[str, Any]:
+        """Read and summarize the file.
+
+        Small reads and summarizing are blocking, CPU bound work, so they run in a worker thread where they do not stall
+        the event loop and a timeout around this call can still fire."""
         lines_to_read = self.apply_read_lines_count(node)
 
         if lines_to_read and lines_to_read < ASYNC_READ_THRESHOLD:
-            file_lines = node.file_lines(count=lines_to_read)
-        else:
-            file_lines = await node.afile_lines(count=lines_to_read)
+            return await asyncio.to_thread(self._read_and_apply_file_lines, node, lines_to_read)
+
+        file_lines = await node.afile_lines(count=lines_to_read)
 
+        return await asyncio.to_thread(self._apply_file_lines, node, file_lines)
+
+    def _read_and_apply_file_lines(self, node: FileEntry | FileEntryWithMatches, lines_to_read: int) -> dict[str, Any]:
+        return self._apply_file_lines(node, node.file_lines(count=lines_to_read))
+
+    def _apply_file_lines(self, node: FileEntry | FileEntryWithMatches, file_lines: FileLines) -> dict[str, Any]:
         if node.type == FileEntryTypeEnum.BINARY or not file_lines:
             return {}
 
@@ -241,6 +258,9 @@ class ResponseModel(BaseModel):
     results: dict[str, Any] = Field(default_factory=dict, description="The files in the response.")
     """The files in the response."""
 
+    columnar: bool = Field(default=False, exclude=True)
+    """Whether to encode the results as one array per field instead of one object per file."""
+
     @field_serializer("results")
     def serialize_results(self, results: dict[str, Any]) -> dict[str, Any]:
         return dict(sorted(results.items(), key=lambda x: x[0]))
@@ -275,7 +295,7 @@ class ResponseModel(BaseModel):
             kv["max_results"] = self.max_results
 
         if self.results:
-            kv["results"] = self.results
+            kv["results"] = encode_columnar(self.results) if self.columnar else self.results
 
         return kv
 
@@ -359,6 +379,20 @@ def customizable_file_materializer(
                 default=50,
                 annotation=Annotated[int, Field(description="The maximum number of results to return.")],
             ),
+            inspect.Parameter(
+                "columnar",
+                inspect.Parameter.KEYWORD_ONLY,
+                default=False,
+                annotation=Annotated[
+                    bool,
+                    Field(
+                        description=(
+                            "Return the results as one array per field instead of one object per file, which is much smaller "
+                            "for large listings. Each file's directory is an index into the `directories` array."
+                        )
+                    ),
+                ],
+            ),
         ],
     )
     async def wrapper(
@@ -374,6 +408,7 @@ def customizable_file_materializer(
         owner: bool,
         group: bool,
         max_results: int,
+        columnar: bool,
         *args: Any,  # pyright: ignore[reportAny]
         **kwargs: Any,  # pyright: ignore[reportAny]
     ) -> ResponseModel:
@@ -401,41 +436,47 @@ def customizable_file_materializer(
 
         warnings: list[str] = []
 
-        work_queue: asyncio.Queue[FileEntry | FileEntryWithMatches] = asyncio.Queue()
-
         result_iter: AsyncIterator[FileEntry | FileEntryWithMatches] = func(*args, **kwargs)
 
         results_by_path: dict[str, Any] = {}
 
-        async for node in result_iter:
-            if max_results and len(results_by_path) >= max_results:
-                logger.info(f"Reached max results: {max_results} for call to {func.__name__} with args: {args} and kwargs: {kwargs}")
-                warnings.append(
-                    f"Reached max_results {max_results} results. To get more results, refine the query or increase max_results."
-                )
-                break
+        result_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+        pool_metrics = WorkerPoolMetrics()
 
-            model, line_count = file_fields.apply(node)
+        # Files are read and summarized while the search is still producing results. The bounded work queue holds
+        # the search back if the workers cannot keep up.
+        async with worker_pool(
+            file_fields.aapply,
+            result_queue=result_queue,
+            workers=MIN_FILE_WORKERS,
+            max_workers=MAX_FILE_WORKERS,
+            max_queue_size=MAX_FILE_WORKERS * 4,
+            item_timeout=FILE_WORK_TIMEOUT,
+            metrics=pool_metrics,
+        ) as (work_queue, error_queue):
+            async for node in result_iter:
+                if max_results and len(results_by_path) >= max_results:
+                    logger.info(f"Reached max results: {max_results} for call to {func.__name__} with args: {args} and kwargs: {kwargs}")
+                    warnings.append(
+                        f"Reached max_results {max_results} results. To get more results, refine the query or increase max_results."
+                    )
+                    break
 
-            if line_count:
-                work_queue.put_nowait(node)
+                model, line_count = file_fields.apply(node)
 
-            results_by_path[node.relative_path_str] = model
+                if line_count:
+                    await work_queue.put(node)
 
-        if work_queue.qsize() > 0:
-            result_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+                results_by_path[node.relative_path_str] = model
 
-            async with worker_pool(file_fields.aapply, work_queue=work_queue, result_queue=result_queue, workers=4) as (
-                work_queue,
-                error_queue,
-            ):
-                pass
+        error_results = await gather_results_from_queue(error_queue)
+        errors.extend([str(f"{error_result[0].relative_path_str}: {error_result[1]}") for error_result in error_results])
 
-            error_results = await gather_results_from_queue(error_queue)
-            errors.extend([str(f"{error_result[0].relative_path_str}: {error_result[1]}") for error_result in error_results])
+        for result in await gather_results_from_queue(result_queue):
+            results_by_path.get(result["relative_path_str"], {}).update(result)  # pyright: ignore[reportAny]
 
-            for result in await gather_results_from_queue(result_queue):
-                results_by_path.get(result["relative_path_str"], {}).update(result)  # pyright: ignore[reportAny]
+        logger.info(f"File worker pool for {func.__name__}: {pool_metrics.summary()}")
 
         for result in results_by_path.values():  # pyright: ignore[reportAny]
             _ = result.pop("relative_path_str")  # pyright: ignore[reportAny]
@@ -444,7 +485,9 @@ def customizable_file_materializer(
 
         logger.info(f"Time taken to gather and prepare {len(results_by_path)} files: {total_time} seconds")
 
-        return ResponseModel(results=results_by_path, errors=errors, warnings=warnings, max_results=max_results, duration=total_time)
+        return ResponseModel(
+            results=results_by_path, errors=errors, warnings=warnings, max_results=max_results, duration=total_time, columnar=columnar
+        )
 
     signature = inspect.signature(wrapper)
 
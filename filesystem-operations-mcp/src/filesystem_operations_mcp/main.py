@@ -13,6 +13,7 @@ from git import Repo
 from rpygrep.types import RIPGREP_TYPE_LIST
 
 from filesystem_operations_mcp.filesystem.file_system import FileSystem
+from filesystem_operations_mcp.filesystem.utils.serialization import serialize_tool_result
 from filesystem_operations_mcp.filesystem.view import FileExportableField, customizable_file_materializer
 from filesystem_operations_mcp.logging import BASE_LOGGER
 
@@ -54,6 +55,54 @@ def clone_git_repository(root_git_url: str, directory: str) -> Path:
     return Path(directory)
 
 
+def build_server(root_dir_path: Path, default_summarize: bool = True) -> FastMCP[None]:
+    """Build the MCP server for the filesystem rooted at `root_dir_path`."""
+    mcp: FastMCP[None] = FastMCP(name="Local Filesystem Operations MCP", tool_serializer=serialize_tool_result)
+
+    file_system = FileSystem(path=root_dir_path)
+
+    default_file_fields = FileExportableField(
+        summarize=default_summarize,
+    )
+
+    _ = mcp.add_tool(
+        tool=FunctionTool.from_function(name="find_files", fn=customizable_file_materializer(file_system.afind_files, default_file_fields))
+    )
+    _ = mcp.add_tool(
+        tool=FunctionTool.from_function(
+            name="search_files", fn=customizable_file_materializer(file_system.asearch_files, default_file_fields)
+        )
+    )
+    _ = mcp.add_tool(tool=FunctionTool.from_function(name="get_structure", fn=file_system.get_structure))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.get_directory_stats))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.find_duplicate_files))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.find_changed_files))
+    _ = mcp.add_tool(
+        tool=FunctionTool.from_function(name="get_files", fn=customizable_file_materializer(file_system.aget_files, default_file_fields))
+    )
+
+    _ = mcp.add_tool(FunctionTool.from_function(name="get_file_type_options", fn=get_file_type_options))
+
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.create_file))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.replace_file))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.delete_file))
+
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.append_file_lines))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.delete_file_lines))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.replace_file_lines))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.replace_file_lines_bulk))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.insert_file_lines))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.insert_file_lines_bulk))
+
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.read_file_lines))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.read_file_lines_bulk))
+
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.create_directory))
+    _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.delete_directory))
+
+    return mcp
+
+
 @click.command()
 @click.option("--root-dir", type=str, default=None, help=ROOT_DIR_HELP)
 @click.option("--root-git-url", type=str, default=None, help=ROOT_GIT_URL_HELP)
@@ -76,49 +125,7 @@ async def cli(
 
             root_dir_path = clone_git_repository(root_git_url, directory)
 
-        mcp: FastMCP[None] = FastMCP(name="Local Filesystem Operations MCP")
-
-        file_system = FileSystem(path=root_dir_path)
-
-        default_file_fields = FileExportableField(
-            summarize=default_summarize,
-        )
-
-        _ = mcp.add_tool(
-            tool=FunctionTool.from_function(
-                name="find_files", fn=customizable_file_materializer(file_system.afind_files, default_file_fields)
-            )
-        )
-        _ = mcp.add_tool(
-            tool=FunctionTool.from_function(
-                name="search_files", fn=customizable_file_materializer(file_system.asearch_files, default_file_fields)
-            )
-        )
-        _ = mcp.add_tool(tool=FunctionTool.from_function(name="get_structure", fn=file_system.get_structure))
-        _ = mcp.add_tool(
-            tool=FunctionTool.from_function(
-                name="get_files", fn=customizable_file_materializer(file_system.aget_files, default_file_fields)
-            )
-        )
-
-        _ = mcp.add_tool(FunctionTool.from_function(name="get_file_type_options", fn=get_file_type_options))
-
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.create_file))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.replace_file))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.delete_file))
-
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.append_file_lines))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.delete_file_lines))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.replace_file_lines))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.replace_file_lines_bulk))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.insert_file_lines))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.insert_file_lines_bulk))
-
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.read_file_lines))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.read_file_lines_bulk))
-
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.create_directory))
-        _ = mcp.add_tool(tool=FunctionTool.from_function(fn=file_system.delete_directory))
+        mcp = build_server(root_dir_path=root_dir_path, default_summarize=default_summarize)
 
         await mcp.run_async(transport=mcp_transport)
 
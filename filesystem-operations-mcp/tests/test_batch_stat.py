@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from filesystem_operations_mcp.filesystem.utils.batch_stat import STAT_CHUNK_SIZE, astat_paths
+
+
+async def test_astat_paths(tmp_path: Path):
+    paths: list[Path] = []
+
+    for i in range(STAT_CHUNK_SIZE * 2 + 3):
+        path = tmp_path / f"file_{i}.txt"
+        _ = path.write_text("x" * i)
+        paths.append(path)
+
+    results = await astat_paths(paths)
+
+    assert [result.st_size for result in results if result is not None] == list(range(len(paths)))
+
+
+async def test_astat_paths_missing(tmp_path: Path):
+    existing = tmp_path / "exists.txt"
+    _ = existing.write_text("hello")
+
+    results = await astat_paths([tmp_path / "missing.txt", existing])
+
+    assert results[0] is None
+    assert results[1] is not None
+    assert results[1].st_size == 5
+
+
+async def test_astat_paths_symlinks(tmp_path: Path):
+    target = tmp_path / "target.txt"
+    _ = target.write_text("hello")
+    link = tmp_path / "link.txt"
+    link.symlink_to(target)
+
+    followed, not_followed = (await astat_paths([link]))[0], (await astat_paths([link], follow_symlinks=False))[0]
+
+    assert followed is not None
+    assert not_followed is not None
+    assert followed.st_size == 5
+    assert not_followed.st_ino != followed.st_ino
+
+
+async def test_astat_paths_empty():
+    assert await astat_paths([]) == []
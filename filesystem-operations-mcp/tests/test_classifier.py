@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+from magika.types.content_type_label import ContentTypeLabel
+
+from filesystem_operations_mcp.filesystem.detection.classifier import (
+    FileClassifier,
+    expand_glob_brackets,
+    parse_shebang,
+)
+from filesystem_operations_mcp.filesystem.detection.file_type import FileEntryTypeEnum
+
+
+@pytest.fixture(scope="module")
+def classifier() -> FileClassifier:
+    return FileClassifier()
+
+
+@pytest.mark.parametrize(
+    ("glob", "expected"),
+    [
+        ("[Mm]akefile", ["Makefile", "makefile"]),
+        ("*.[ch]", ["*.c", "*.h"]),
+        ("*.py", ["*.py"]),
+        ("*.[!c]", ["*.[!c]"]),
+    ],
+)
+def test_expand_glob_brackets(glob: str, expected: list[str]):
+    assert expand_glob_brackets(glob) == expected
+
+
+@pytest.mark.parametrize(
+    ("head", "expected"),
+    [
+        (b"#!/bin/bash\necho 'Hello'", "bash"),
+        (b"#!/usr/bin/env python3\n", "python"),
+        (b"#!/usr/bin/env -S python3.12 -u\n", "python"),
+        (b"#!/usr/bin/env\n", None),
+        (b"print('Hello')\n", None),
+    ],
+)
+def test_parse_shebang(head: bytes, expected: str | None):
+    assert parse_shebang(head) == expected
+
+
+@pytest.mark.parametrize(
+    ("name", "expected_type", "expected_label"),
+    [
+        ("main.py", FileEntryTypeEnum.CODE, ContentTypeLabel.PYTHON),
+        ("index.ts", FileEntryTypeEnum.CODE, ContentTypeLabel.TYPESCRIPT),
+        ("Makefile", FileEntryTypeEnum.CODE, ContentTypeLabel.MAKEFILE),
+        ("Dockerfile", FileEntryTypeEnum.CODE, ContentTypeLabel.DOCKERFILE),
+        ("Dockerfile.dev", FileEntryTypeEnum.CODE, ContentTypeLabel.DOCKERFILE),
+        ("Gemfile", FileEntryTypeEnum.CODE, ContentTypeLabel.RUBY),
+        ("README.md", FileEntryTypeEnum.TEXT, ContentTypeLabel.MARKDOWN),
+        ("data.json", FileEntryTypeEnum.DATA, ContentTypeLabel.JSON),
+        ("image.png", FileEntryTypeEnum.BINARY, ContentTypeLabel.PNG),
+        # C and C++ headers share an extension, the type is known but the language is not
+        ("header.h", FileEntryTypeEnum.CODE, None),
+    ],
+)
+def test_classify_by_name(classifier: FileClassifier, name: str, expected_type: FileEntryTypeEnum, expected_label: ContentTypeLabel | None):
+    classification = classifier.classify_by_name(Path(name))
+
+    assert classification is not None
+    assert classification.type == expected_type
+    assert classification.label == expected_label
+
+
+def test_classify_by_name_unresolved(classifier: FileClassifier):
+    assert classifier.classify_by_name(Path("LICENSE")) is None
+    assert classifier.classify_by_name(Path("script.pl")) is None
+
+
+def test_classify_shebang_and_stats(tmp_path: Path):
+    classifier = FileClassifier()
+
+    script = tmp_path / "run"
+    _ = script.write_text("#!/usr/bin/env python3\nprint('Hello')\n")
+
+    unknown = tmp_path / "NOTICE"
+    _ = unknown.write_text("Some notice\n")
+
+    classification = classifier.classify(script)
+    assert classification is not None
+    assert classification.type == FileEntryTypeEnum.CODE
+    assert classification.label == ContentTypeLabel.PYTHON
+    assert classification.source == "shebang"
+
+    assert classifier.classify(tmp_path / "main.py") is not None
+    assert classifier.classify(unknown) is None
+
+    assert classifier.stats.total == 3
+    assert classifier.stats.sources["magika"] == 1
+    assert classifier.stats.hit_rate == pytest.approx(2 / 3)
+
+
+def test_classify_skips_shebang_of_files_with_an_extension(tmp_path: Path):
+    classifier = FileClassifier()
+
+    script = tmp_path / "run.unknownext"
+    _ = script.write_text("#!/usr/bin/env python3\nprint('Hello')\n")
+
+    assert classifier.classify_by_shebang(script) is not None
+    assert classifier.classify(script) is None
@@ -3,6 +3,7 @@ from pathlib import Path
 
 import pytest
 
+from filesystem_operations_mcp.filesystem.errors import SnapshotNotFoundError
 from filesystem_operations_mcp.filesystem.file_system import FileSystem
 from tests.conftest import create_test_structure
 
@@ -20,6 +21,12 @@ async def filesystem(temp_dir: Path):
     return FileSystem(path=temp_dir)
 
 
+@pytest.fixture
+def snapshot_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    return tmp_path
+
+
 async def test_get_structure(filesystem: FileSystem):
     structure = filesystem.get_structure()
     assert structure.directories == ["subdir"]
@@ -40,3 +47,121 @@ async def test_get_files_with_directory(filesystem: FileSystem):
     files = [file async for file in filesystem.aget_files([Path("subdir")])]
     assert len(files) == 3
     assert {f.name for f in files} == {"nested.txt", "script_with_hello.sh", "should_be_ignored.env"}
+
+
+async def test_find_duplicate_files(filesystem: FileSystem, temp_dir: Path):
+    (temp_dir / "copy_of_code.py").write_text("def hello():\n    print('Hello, World!')")
+    (temp_dir / "subdir" / "copy_of_code.py").write_text("def hello():\n    print('Hello, World!')")
+    (temp_dir / "same_size_as_code.py").write_text("def hello():\n    print('Hello, Earth!')")
+
+    response = await filesystem.find_duplicate_files()
+
+    assert len(response.duplicate_groups) == 1
+    group = response.duplicate_groups[0]
+    assert group.paths == ["code_with_hello_world.py", "copy_of_code.py", "subdir/copy_of_code.py"]
+    assert group.wasted_bytes == group.size * 2
+
+
+async def test_find_duplicate_files_large(filesystem: FileSystem, temp_dir: Path):
+    content = b"a" * 300_000
+    (temp_dir / "large_one.txt").write_bytes(content)
+    (temp_dir / "large_two.txt").write_bytes(content)
+    # Same head and tail, different middle
+    (temp_dir / "large_three.txt").write_bytes(content[:150_000] + b"b" + content[150_001:])
+
+    response = await filesystem.find_duplicate_files(included_globs=["large_*"])
+
+    assert [group.paths for group in response.duplicate_groups] == [["large_one.txt", "large_two.txt"]]
+
+
+async def test_find_duplicate_files_respects_excludes(filesystem: FileSystem, temp_dir: Path):
+    (temp_dir / "copy_of_code.py").write_text("def hello():\n    print('Hello, World!')")
+
+    response = await filesystem.find_duplicate_files(excluded_globs=["copy_*"])
+
+    assert response.duplicate_groups == []
+
+
+async def test_get_directory_stats(filesystem: FileSystem):
+    response = await filesystem.get_directory_stats()
+
+    assert list(response.directories) == [".", "subdir"]
+
+    root_stats = response.directories["."]
+    assert root_stats.file_count == 5
+    assert root_stats.total_size == sum(
+        (filesystem.path / name).stat().st_size
+        for name in [
+            "test_with_hello_world.txt",
+            "code_with_hello_world.py",
+            "CaSeSenSiTiVe.txt",
+            "subdir/nested.txt",
+            "subdir/script_with_hello.sh",
+        ]
+    )
+    assert root_stats.types["text"] == 3
+    assert next(iter(root_stats.largest_files)) == "code_with_hello_world.py"
+
+    subdir_stats = response.directories["subdir"]
+    assert subdir_stats.file_count == 2
+    assert set(subdir_stats.largest_files) == {"subdir/nested.txt", "subdir/script_with_hello.sh"}
+
+
+async def test_get_directory_stats_depth_zero(filesystem: FileSystem):
+    response = await filesystem.get_directory_stats(depth=0, largest_files=1)
+
+    assert list(response.directories) == ["."]
+    assert response.directories["."].file_count == 5
+    assert len(response.directories["."].largest_files) == 1
+    assert "max_depth_reached" not in response.model_dump()
+
+
+async def test_get_directory_stats_reports_max_depth_reached(filesystem: FileSystem):
+    response = await filesystem.get_directory_stats(max_depth=1)
+
+    assert response.directories["."].file_count == 3
+    assert response.model_dump()["max_depth_reached"] is True
+
+
+async def test_find_changed_files(filesystem: FileSystem, temp_dir: Path, snapshot_cache: Path):
+    baseline = await filesystem.find_changed_files()
+
+    assert baseline.model_dump() == {"token": baseline.token}
+    assert filesystem.snapshot_store.directory.is_relative_to(snapshot_cache)
+
+    (temp_dir / "new_file.txt").write_text("New content")
+    (temp_dir / "subdir" / "nested.txt").write_text("Changed nested content")
+    (temp_dir / "data.json").unlink()
+
+    response = await filesystem.find_changed_files(since_token=baseline.token)
+
+    assert response.added == ["new_file.txt"]
+    assert response.modified == ["subdir/nested.txt"]
+    assert response.deleted == ["data.json"]
+    assert response.token != baseline.token
+
+    unchanged = await filesystem.find_changed_files(since_token=response.token)
+
+    assert unchanged.model_dump() == {"token": unchanged.token}
+
+
+@pytest.mark.usefixtures("snapshot_cache")
+async def test_find_changed_files_max_results(filesystem: FileSystem, temp_dir: Path):
+    baseline = await filesystem.find_changed_files()
+
+    for i in range(3):
+        (temp_dir / f"new_file_{i}.txt").write_text("New content")
+
+    response = await filesystem.find_changed_files(since_token=baseline.token, max_results=2)
+
+    serialized = response.model_dump()
+    assert serialized["added"] == ["new_file_0.txt", "new_file_1.txt"]
+    assert serialized["added_count"] == 3
+    assert serialized["max_results_reached"] is True
+
+
+@pytest.mark.usefixtures("snapshot_cache")
+@pytest.mark.parametrize("token", ["0" * 32, "../../etc/passwd"], ids=["unknown", "path"])
+async def test_find_changed_files_unknown_token(filesystem: FileSystem, token: str):
+    with pytest.raises(SnapshotNotFoundError):
+        await filesystem.find_changed_files(since_token=token)
@@ -141,6 +141,22 @@ class TestDirectoryEntry:
         assert len(files) == 2
         assert {f.name for f in files} == {"nested.txt", "script_with_hello.sh"}
 
+    async def test_get_files_directory(self, root_directory: DirectoryEntry):
+        files = [file async for file in root_directory.aget_files([Path("subdir")])]
+        assert {f.name for f in files} == {"nested.txt", "script_with_hello.sh", "should_be_ignored.env"}
+        assert all("_stat" in f.__dict__ for f in files)
+
+    async def test_get_files_missing(self, root_directory: DirectoryEntry):
+        with pytest.raises(FileNotFoundError):
+            _ = [file async for file in root_directory.aget_files([Path("missing.txt")])]
+
+    def test_from_stat(self, root_directory: DirectoryEntry):
+        path = root_directory.path / "subdir" / "nested.txt"
+        node = FileEntry.from_stat(path=path, filesystem=root_directory, stat=path.stat())
+        assert node.size == len("Nested content")
+        assert node.relative_path == Path("subdir/nested.txt")
+        assert node.owner == path.stat().st_uid
+
     def test_get_directory(self, root_directory: DirectoryEntry):
         node = root_directory.get_directory("subdir")
         assert node.name == "subdir"
@@ -0,0 +1,76 @@
+from enum import StrEnum
+from pathlib import Path
+
+import orjson
+import pytest
+
+from filesystem_operations_mcp.filesystem.utils.serialization import decode_columnar, encode_columnar, serialize_tool_result
+from filesystem_operations_mcp.filesystem.view import ResponseModel
+
+RESULTS = {
+    "src/pkg/b.py": {"size": 20, "type": "code", "preview": {"1": "import os"}},
+    "README.md": {"size": 5, "type": "text"},
+    "src/pkg/a.py": {"size": 10, "type": "code"},
+    "tests/test_a.py": {"size": 30, "type": "code", "summary": "Tests a"},
+}
+
+
+def test_encode_columnar():
+    encoded = encode_columnar(RESULTS)
+
+    assert encoded == {
+        "directories": ["", "src/pkg", "tests"],
+        "directory": [0, 1, 1, 2],
+        "name": ["README.md", "a.py", "b.py", "test_a.py"],
+        "size": [5, 10, 20, 30],
+        "type": ["text", "code", "code", "code"],
+        "preview": [None, None, {"1": "import os"}, None],
+        "summary": [None, None, None, "Tests a"],
+    }
+
+
+def test_encode_columnar_round_trip():
+    assert decode_columnar(encode_columnar(RESULTS)) == RESULTS
+
+
+def test_encode_columnar_empty():
+    assert encode_columnar({}) == {"directories": [], "directory": [], "name": []}
+
+
+def test_response_model_columnar():
+    response = ResponseModel(results=RESULTS, max_results=50, columnar=True)
+
+    serialized = response.model_dump()
+
+    assert serialized["result_count"] == 4
+    assert serialized["results"]["name"] == ["README.md", "a.py", "b.py", "test_a.py"]
+    assert "columnar" not in serialized
+
+
+def test_response_model_columnar_is_smaller():
+    results = {f"src/pkg/module_{i}.py": {"size": i, "type": "code"} for i in range(100)}
+
+    objects = serialize_tool_result(ResponseModel(results=results, max_results=200))
+    columnar = serialize_tool_result(ResponseModel(results=results, max_results=200, columnar=True))
+
+    assert len(columnar) < len(objects) * 0.6
+
+
+def test_serialize_tool_result():
+    class Color(StrEnum):
+        RED = "red"
+
+    serialized = serialize_tool_result({"path": Path("a/b"), "color": Color.RED, 1: "one"})
+
+    assert orjson.loads(serialized) == {"path": "a/b", "color": "red", "1": "one"}
+
+
+def test_serialize_tool_result_unserializable():
+    with pytest.raises(TypeError, match="Type is not JSON serializable: object"):
+        _ = serialize_tool_result({"value": object()})
+
+
+def test_serialize_tool_result_model():
+    serialized = serialize_tool_result(ResponseModel(results=RESULTS, max_results=2))
+
+    assert orjson.loads(serialized)["limit_reached"] is True
@@ -0,0 +1,53 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from filesystem_operations_mcp.filesystem.utils.snapshot import SnapshotStore, diff_snapshots
+
+
+def test_diff_snapshots():
+    old = {"kept.txt": (1, 10, 100), "changed.txt": (1, 10, 101), "replaced.txt": (1, 10, 102), "removed.txt": (1, 10, 103)}
+    new = {"kept.txt": (1, 10, 100), "changed.txt": (2, 20, 101), "replaced.txt": (1, 10, 999), "added.txt": (1, 10, 104)}
+
+    diff = diff_snapshots(old, new)
+
+    assert diff.added == ["added.txt"]
+    assert diff.modified == ["changed.txt", "replaced.txt"]
+    assert diff.deleted == ["removed.txt"]
+
+
+def test_snapshot_store_round_trip(tmp_path: Path):
+    store = SnapshotStore(directory=tmp_path / "snapshots")
+
+    token = store.save({"a.txt": (1, 2, 3)})
+
+    assert store.load(token) == {"a.txt": (1, 2, 3)}
+    assert store.load("f" * 32) is None
+    assert store.load("not-a-token") is None
+
+
+def test_snapshot_store_prunes(tmp_path: Path):
+    store = SnapshotStore(directory=tmp_path, max_snapshots=2)
+
+    tokens = [store.save({"a.txt": (i, i, i)}) for i in range(4)]
+
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    assert store.load(tokens[-1]) == {"a.txt": (3, 3, 3)}
+
+
+def test_snapshot_store_prune_skips_vanished_snapshots(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    store = SnapshotStore(directory=tmp_path, max_snapshots=1)
+    vanished = tmp_path / f"{'0' * 32}.json"
+    glob = Path.glob
+
+    def glob_with_vanished(self: Path, pattern: str) -> Iterator[Path]:
+        yield from glob(self, pattern)
+        yield vanished
+
+    monkeypatch.setattr(Path, "glob", glob_with_vanished)
+
+    tokens = [store.save({"a.txt": (i, i, i)}) for i in range(2)]
+
+    assert store.load(tokens[-1]) == {"a.txt": (1, 1, 1)}
+    assert store.load(tokens[0]) is None
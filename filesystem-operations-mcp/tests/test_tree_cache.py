@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import pytest
+from tree_sitter import Language, Parser
+from tree_sitter_language_pack import get_binding
+
+from filesystem_operations_mcp.filesystem.summarize.tree_cache import LineEdit, TreeCache, diff_lines
+
+ORIGINAL_CODE = """import os
+
+
+def hello():
+    \"\"\"Say hello.\"\"\"
+    print("Hello, World!")
+
+
+class Greeter:
+    def greet(self, name):
+        return f"Hello, {name}!"
+"""
+
+
+@pytest.fixture
+def parser() -> Parser:
+    return Parser(language=Language(get_binding(language_name="python")))
+
+
+@pytest.mark.parametrize(
+    ("old", "new", "expected"),
+    [
+        (["a", "b", "c"], ["a", "b", "c"], None),
+        (["a", "b", "c"], ["a", "x", "c"], LineEdit(start_line=1, old_count=1, new_count=1)),
+        (["a", "b", "c"], ["a", "x", "y", "b", "c"], LineEdit(start_line=1, old_count=0, new_count=2)),
+        (["a", "b", "c"], ["a", "b", "c", "d"], LineEdit(start_line=3, old_count=0, new_count=1)),
+        (["a", "b", "c"], ["b", "c"], LineEdit(start_line=0, old_count=1, new_count=0)),
+        (["a", "a", "a"], ["a", "a"], LineEdit(start_line=2, old_count=1, new_count=0)),
+    ],
+)
+def test_diff_lines(old: list[str], new: list[str], expected: LineEdit | None):
+    assert diff_lines([line.encode() for line in old], [line.encode() for line in new]) == expected
+
+
+@pytest.mark.parametrize(
+    "new_code",
+    [
+        ORIGINAL_CODE.replace('print("Hello, World!")', 'print("Hello, Earth!")'),
+        ORIGINAL_CODE.replace("def hello():", "def goodbye():\n    pass\n\n\ndef hello():"),
+        ORIGINAL_CODE + "\n\ndef appended():\n    return 1\n",
+        ORIGINAL_CODE.replace("import os\n", ""),
+        ORIGINAL_CODE.rstrip() + "  # trailing comment",
+        "",
+    ],
+    ids=["replace", "insert", "append", "delete_first", "edit_last_line", "delete_all"],
+)
+def test_incremental_parse_matches_full_parse(parser: Parser, new_code: str):
+    tree_cache = TreeCache()
+    path = Path("example.py")
+
+    _ = tree_cache.parse(parser=parser, language_name="python", source=ORIGINAL_CODE.encode(), path=path)
+    incremental_tree = tree_cache.parse(parser=parser, language_name="python", source=new_code.encode(), path=path)
+
+    assert tree_cache.full_parses == 1
+    assert tree_cache.incremental_parses == 1
+    assert str(incremental_tree.root_node) == str(parser.parse(new_code.encode()).root_node)
+
+
+def test_unchanged_source_reuses_tree(parser: Parser):
+    tree_cache = TreeCache()
+    path = Path("example.py")
+
+    first_tree = tree_cache.parse(parser=parser, language_name="python", source=ORIGINAL_CODE.encode(), path=path)
+    second_tree = tree_cache.parse(parser=parser, language_name="python", source=ORIGINAL_CODE.encode(), path=path)
+
+    assert first_tree is second_tree
+    assert tree_cache.unchanged_hits == 1
+
+
+def test_cache_is_bounded(parser: Parser):
+    tree_cache = TreeCache(max_entries=2)
+
+    for name in ["one.py", "two.py", "three.py"]:
+        _ = tree_cache.parse(parser=parser, language_name="python", source=ORIGINAL_CODE.encode(), path=Path(name))
+
+    assert len(tree_cache) == 2
+
+    # The least recently used entry was evicted
+    _ = tree_cache.parse(parser=parser, language_name="python", source=ORIGINAL_CODE.encode(), path=Path("one.py"))
+    assert tree_cache.full_parses == 4
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+from filesystem_operations_mcp.filesystem.utils.workers import WorkerPoolMetrics, gather_results_from_queue, worker_pool
+
+
+async def double(item: int) -> int:
+    await asyncio.sleep(0.001)
+    return item * 2
+
+
+async def test_worker_pool():
+    result_queue: asyncio.Queue[int] = asyncio.Queue()
+    metrics = WorkerPoolMetrics()
+
+    async with worker_pool(double, result_queue=result_queue, workers=2, metrics=metrics) as (work_queue, _):
+        for i in range(1, 11):
+            await work_queue.put(i)
+
+    assert sorted(await gather_results_from_queue(result_queue)) == [i * 2 for i in range(1, 11)]
+    assert metrics.items_completed == 10
+    assert metrics.peak_workers == 2
+    assert metrics.current_workers == 0
+
+
+async def test_worker_pool_grows_with_backlog():
+    metrics = WorkerPoolMetrics()
+
+    async def slow(item: int) -> int:
+        await asyncio.sleep(0.02)
+        return item
+
+    async with worker_pool(slow, workers=1, max_workers=8, metrics=metrics) as (work_queue, _):
+        for i in range(1, 201):
+            await work_queue.put(i)
+
+    assert metrics.items_completed == 200
+    assert metrics.peak_workers > 1
+    assert metrics.peak_workers <= 8
+    assert 0 < metrics.utilization <= 1
+
+
+async def test_worker_pool_backpressure():
+    async with worker_pool(double, workers=1, max_queue_size=2) as (work_queue, _):
+        assert work_queue.maxsize == 2
+
+        for i in range(1, 6):
+            await work_queue.put(i)
+            assert work_queue.qsize() <= 2
+
+
+async def test_worker_pool_item_timeout():
+    metrics = WorkerPoolMetrics()
+    result_queue: asyncio.Queue[int] = asyncio.Queue()
+
+    async def sometimes_slow(item: int) -> int:
+        if item == 2:
+            await asyncio.sleep(10)
+        return item
+
+    async with worker_pool(sometimes_slow, result_queue=result_queue, workers=2, item_timeout=0.05, metrics=metrics) as (
+        work_queue,
+        error_queue,
+    ):
+        for i in range(1, 4):
+            await work_queue.put(i)
+
+    errors = await gather_results_from_queue(error_queue)
+    assert [(item, type(error)) for item, error in errors] == [(2, TimeoutError)]
+    assert str(errors[0][1]) == "test_worker_pool_item_timeout.<locals>.sometimes_slow timed out after 0.05 seconds"
+    assert sorted(await gather_results_from_queue(result_queue)) == [1, 3]
+    assert metrics.items_timed_out == 1
+
+
+async def test_worker_pool_item_timeout_blocking_work():
+    def block(item: int) -> int:
+        time.sleep(0.5)
+        return item
+
+    async def in_thread(item: int) -> int:
+        return await asyncio.to_thread(block, item)
+
+    started = time.perf_counter()
+
+    async with worker_pool(in_thread, workers=4, item_timeout=0.05) as (work_queue, error_queue):
+        for i in range(1, 5):
+            await work_queue.put(i)
+
+    assert time.perf_counter() - started < 0.5
+    assert sorted(item for item, _ in await gather_results_from_queue(error_queue)) == [1, 2, 3, 4]
+
+
+async def test_worker_pool_errors():
+    async def fail_on_odd(item: int) -> int:
+        if item % 2:
+            msg = "odd"
+            raise ValueError(msg)
+        return item
+
+    async with worker_pool(fail_on_odd, workers=2) as (work_queue, error_queue):
+        for i in range(1, 5):
+            await work_queue.put(i)
+
+    errors = await gather_results_from_queue(error_queue)
+    assert sorted(item for item, _ in errors) == [1, 3]
@@ -0,0 +1,98 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.indices.vector_store import VectorStoreIndex
+from llama_index.core.storage.storage_context import StorageContext
+
+from benchmarks.corpus import DEFAULT_SEED, generate_knowledge_base_nodes
+from knowledge_base_mcp.clients.knowledge_base import KnowledgeBaseClient
+from knowledge_base_mcp.llama_index.embeddings.huggingface import EmbeddingsBackend, load_huggingface_embedding
+from knowledge_base_mcp.main import DEFAULT_DOCS_CROSS_ENCODER_MODEL
+
+DEFAULT_EMBEDDINGS_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--nodes", type=int, default=1_000, help="The number of synthetic nodes to benchmark against.")
+    parser.addoption("--corpus-seed", type=int, default=DEFAULT_SEED, help="The seed used to generate the synthetic nodes.")
+    parser.addoption("--max-vectors", type=int, default=100_000, help="The largest vector store to benchmark the HNSW index against.")
+
+
+@pytest.fixture(scope="session")
+def node_count(request: pytest.FixtureRequest) -> int:
+    return request.config.getoption("--nodes")
+
+
+@pytest.fixture(scope="session")
+def max_vectors(request: pytest.FixtureRequest) -> int:
+    return request.config.getoption("--max-vectors")
+
+
+@pytest.fixture(scope="session")
+def corpus_seed(request: pytest.FixtureRequest) -> int:
+    return request.config.getoption("--corpus-seed")
+
+
+def load_embed_model(backend: EmbeddingsBackend) -> BaseEmbedding:
+    """Load the default document embedding model with a backend, skipping when its dependencies are not installed."""
+    _ = pytest.importorskip("llama_index.embeddings.huggingface")
+
+    if backend != "torch":
+        _ = pytest.importorskip("optimum.onnxruntime", reason="Install the onnx extra to benchmark the ONNX backends")
+
+    return load_huggingface_embedding(model_name=DEFAULT_EMBEDDINGS_MODEL, embed_batch_size=64, backend=backend)
+
+
+@pytest.fixture(scope="session")
+def torch_embed_model() -> BaseEmbedding:
+    """The default document embedding model, run through PyTorch."""
+    return load_embed_model(backend="torch")
+
+
+@pytest.fixture(scope="session")
+def onnx_embed_model() -> BaseEmbedding:
+    """The default document embedding model, exported to ONNX and run through ONNX Runtime."""
+    return load_embed_model(backend="onnx")
+
+
+@pytest.fixture(scope="session")
+def onnx_int8_embed_model() -> BaseEmbedding:
+    """The default document embedding model, exported to ONNX with int8 weights and run through ONNX Runtime."""
+    return load_embed_model(backend="onnx-int8")
+
+
+@pytest.fixture(scope="session")
+def runner() -> Iterator[asyncio.Runner]:
+    """A single event loop for the benchmarks, so the stores outlive individual rounds."""
+    with asyncio.Runner() as runner:
+        yield runner
+
+
+@pytest.fixture(scope="session")
+def knowledge_base_client(
+    runner: asyncio.Runner, torch_embed_model: BaseEmbedding, node_count: int, corpus_seed: int
+) -> KnowledgeBaseClient:
+    """A client for an in-memory DuckDB store holding the synthetic nodes, ingested through the node pipeline."""
+    from llama_index.storage.kvstore.duckdb import DuckDBKVStore
+
+    from knowledge_base_mcp.stores.docstores.duckdb import EnhancedDuckDBDocumentStore
+    from knowledge_base_mcp.stores.vector_stores.duckdb import EnhancedDuckDBVectorStore
+
+    vector_store = EnhancedDuckDBVectorStore()
+    docstore = EnhancedDuckDBDocumentStore(duckdb_kvstore=DuckDBKVStore(client=vector_store.client))
+
+    vector_store_index = VectorStoreIndex(
+        nodes=[],
+        storage_context=StorageContext.from_defaults(vector_store=vector_store, docstore=docstore),
+        embed_model=torch_embed_model,
+    )
+
+    knowledge_base_client = KnowledgeBaseClient(vector_store_index=vector_store_index, reranker_model=DEFAULT_DOCS_CROSS_ENCODER_MODEL)
+
+    _ = runner.run(
+        knowledge_base_client.node_to_knowledge_base_pipeline.arun(nodes=generate_knowledge_base_nodes(count=node_count, seed=corpus_seed))
+    )
+
+    return knowledge_base_client
@@ -0,0 +1,96 @@
+"""Generate deterministic synthetic documentation chunks to benchmark against."""
+
+import random
+from pathlib import Path
+
+from llama_index.core.schema import MediaResource, Node
+
+DEFAULT_SEED = 42
+
+SAMPLES_DIR = Path(__file__).parent.parent / "tests" / "samples"
+SAMPLE_CHUNK_SIZE = 1024
+"""The maximum number of characters in a chunk of the sample documents, unless a single paragraph is longer."""
+
+SHORT_CHUNK_WORDS = (5, 40)
+LONG_CHUNK_WORDS = (150, 350)
+LONG_CHUNK_RATIO = 0.3
+"""The fraction of chunks that are long, mirroring the mix of headings, short paragraphs and long sections in docs sites."""
+
+WORDS = [
+    *("index", "query", "search", "vector", "embedding", "document", "node", "chunk", "filter", "score"),
+    *("cluster", "shard", "replica", "mapping", "field", "token", "analyzer", "pipeline", "ingest", "snapshot"),
+    *("the", "a", "of", "to", "and", "in", "is", "for", "with", "that", "by", "on", "as", "from", "are"),
+]
+
+
+def generate_texts(count: int, seed: int = DEFAULT_SEED, long_chunk_ratio: float = LONG_CHUNK_RATIO) -> list[str]:
+    """Generate `count` chunks of text, a `long_chunk_ratio` fraction of them long and the rest short."""
+    rng = random.Random(seed)
+
+    texts: list[str] = []
+
+    for _ in range(count):
+        low, high = LONG_CHUNK_WORDS if rng.random() < long_chunk_ratio else SHORT_CHUNK_WORDS
+        texts.append(" ".join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize() + ".")
+
+    return texts
+
+
+KNOWLEDGE_BASES = 4
+"""The number of knowledge bases the synthetic nodes are spread across."""
+
+
+def knowledge_base_name(index: int) -> str:
+    return f"Benchmark Knowledge Base {index % KNOWLEDGE_BASES}"
+
+
+def generate_knowledge_base_nodes(count: int, seed: int = DEFAULT_SEED) -> list[Node]:
+    """Generate `count` nodes spread round-robin across `KNOWLEDGE_BASES` documentation knowledge bases."""
+    nodes: list[Node] = generate_nodes(count=count, seed=seed)
+
+    for index, node in enumerate(nodes):
+        node.metadata.update({"knowledge_base": knowledge_base_name(index), "knowledge_base_type": "documentation"})
+
+    return nodes
+
+
+def generate_nodes(count: int, seed: int = DEFAULT_SEED, long_chunk_ratio: float = LONG_CHUNK_RATIO) -> list[Node]:
+    """Generate `count` nodes holding synthetic chunks of text."""
+    return [
+        Node(text_resource=MediaResource(text=text)) for text in generate_texts(count=count, seed=seed, long_chunk_ratio=long_chunk_ratio)
+    ]
+
+
+def load_sample_nodes(chunk_size: int = SAMPLE_CHUNK_SIZE) -> list[Node]:
+    """Split the Markdown sample documents into nodes of whole paragraphs, up to `chunk_size` characters each."""
+    nodes: list[Node] = []
+
+    for path in sorted(SAMPLES_DIR.rglob("*.md")):
+        # The readme of a sample only describes where the sample came from
+        if path.name == "readme.md":
+            continue
+
+        paragraphs: list[str] = []
+
+        for paragraph in [*path.read_text().split("\n\n"), None]:
+            if paragraphs and (paragraph is None or len("\n\n".join([*paragraphs, paragraph])) > chunk_size):
+                node_id = f"{path.relative_to(SAMPLES_DIR)}#{len(nodes)}"
+                nodes.append(Node(id_=node_id, text_resource=MediaResource(text="\n\n".join(paragraphs))))
+                paragraphs = []
+
+            if paragraph is not None and paragraph.strip():
+                paragraphs.append(paragraph)
+
+    return nodes
+
+
+def sample_queries(nodes: list[Node], count: int, seed: int = DEFAULT_SEED) -> list[str]:
+    """Pick up to `count` queries from the Markdown headings of the sample nodes."""
+    headings: set[str] = {
+        line.lstrip("#").strip()
+        for node in nodes
+        for line in node.get_content().splitlines()
+        if line.startswith("#") and line.lstrip("#").strip()
+    }
+
+    return random.Random(seed).sample(sorted(headings), k=min(count, len(headings)))
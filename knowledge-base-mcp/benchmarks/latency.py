@@ -0,0 +1,16 @@
+import statistics
+
+from pytest_benchmark.fixture import BenchmarkFixture
+
+
+def record_latency_stats(benchmark: BenchmarkFixture, queries: int) -> None:
+    """Add the p50/p95 latency of a single query to the benchmark report."""
+    durations: list[float] = sorted(duration / queries for duration in benchmark.stats.stats.data)
+
+    benchmark.extra_info.update(
+        {
+            "queries": queries,
+            "p50_query_seconds": statistics.median(durations),
+            "p95_query_seconds": statistics.quantiles(durations, n=20, method="inclusive")[-1] if len(durations) > 1 else durations[0],
+        }
+    )
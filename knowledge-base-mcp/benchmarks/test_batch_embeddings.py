@@ -0,0 +1,32 @@
+import pytest
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.schema import Node
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.corpus import generate_nodes
+from knowledge_base_mcp.llama_index.transformations.batch_embeddings import BatchedNodeEmbedding
+
+ROUNDS = 3
+
+STRATEGIES: dict[str, dict[str, bool | int]] = {
+    "arrival_order": {"sort_by_length": False, "num_workers": 1},
+    "length_sorted": {"sort_by_length": True, "num_workers": 1},
+    "length_sorted_2_workers": {"sort_by_length": True, "num_workers": 2},
+    "length_sorted_4_workers": {"sort_by_length": True, "num_workers": 4},
+}
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES.keys())
+def test_embedding_throughput(
+    benchmark: BenchmarkFixture, torch_embed_model: BaseEmbedding, node_count: int, corpus_seed: int, strategy: str
+) -> None:
+    batched_node_embedding = BatchedNodeEmbedding(embed_model=torch_embed_model, batch_size=64, **STRATEGIES[strategy])
+
+    def _setup() -> tuple[tuple[()], dict[str, list[Node]]]:
+        return (), {"nodes": generate_nodes(count=node_count, seed=corpus_seed)}
+
+    nodes = benchmark.pedantic(batched_node_embedding, setup=_setup, rounds=ROUNDS, warmup_rounds=1)
+
+    assert all(node.embedding is not None for node in nodes)
+
+    benchmark.extra_info.update({"nodes": node_count, "nodes_per_second": node_count / benchmark.stats.stats.median})
@@ -0,0 +1,69 @@
+from collections.abc import Callable
+
+import numpy as np
+import pytest
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.schema import Node
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.corpus import generate_nodes, generate_texts
+
+ROUNDS = 3
+
+BACKEND_FIXTURES = ["torch_embed_model", "onnx_embed_model", "onnx_int8_embed_model"]
+
+PARITY_QUERIES = 100
+PARITY_TOP_K = 10
+MIN_RECALL = 0.9
+"""The fraction of the PyTorch model's top-k neighbours an ONNX backend must also retrieve."""
+
+
+def top_k_neighbours(embed_model: BaseEmbedding, corpus: list[str], queries: list[str], top_k: int) -> np.ndarray:
+    """The indices of the `top_k` most similar corpus texts for each query."""
+    corpus_embeddings = np.array(embed_model.get_text_embedding_batch(texts=corpus))
+    query_embeddings = np.array([embed_model.get_query_embedding(query=query) for query in queries])
+
+    corpus_embeddings /= np.linalg.norm(corpus_embeddings, axis=1, keepdims=True)
+    query_embeddings /= np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+
+    return np.argsort(-(query_embeddings @ corpus_embeddings.T), axis=1)[:, :top_k]
+
+
+@pytest.mark.parametrize("backend", BACKEND_FIXTURES)
+def test_backend_throughput(
+    benchmark: BenchmarkFixture, request: pytest.FixtureRequest, node_count: int, corpus_seed: int, backend: str
+) -> None:
+    embed_model: BaseEmbedding = request.getfixturevalue(backend)
+
+    def _setup() -> tuple[tuple[list[Node]], dict[str, object]]:
+        return (generate_nodes(count=node_count, seed=corpus_seed),), {}
+
+    _ = benchmark.pedantic(embed_model, setup=_setup, rounds=ROUNDS, warmup_rounds=1)
+
+    benchmark.extra_info.update({"nodes": node_count, "nodes_per_second": node_count / benchmark.stats.stats.median})
+
+
+@pytest.mark.parametrize("backend", ["onnx_embed_model", "onnx_int8_embed_model"])
+def test_backend_recall_parity(  # noqa: PLR0917
+    request: pytest.FixtureRequest,
+    record_property: Callable[[str, object], None],
+    torch_embed_model: BaseEmbedding,
+    node_count: int,
+    corpus_seed: int,
+    backend: str,
+) -> None:
+    embed_model: BaseEmbedding = request.getfixturevalue(backend)
+
+    corpus = generate_texts(count=node_count, seed=corpus_seed)
+    queries = generate_texts(count=PARITY_QUERIES, seed=corpus_seed + 1, long_chunk_ratio=0)
+
+    expected = top_k_neighbours(embed_model=torch_embed_model, corpus=corpus, queries=queries, top_k=PARITY_TOP_K)
+    actual = top_k_neighbours(embed_model=embed_model, corpus=corpus, queries=queries, top_k=PARITY_TOP_K)
+
+    recall = np.mean(
+        [len(set(expected_row) & set(actual_row)) / PARITY_TOP_K for expected_row, actual_row in zip(expected, actual, strict=True)]
+    )
+
+    record_property(f"recall@{PARITY_TOP_K}", recall)
+
+    assert recall >= MIN_RECALL, f"{backend} recall@{PARITY_TOP_K} against torch is {recall:.3f}, below {MIN_RECALL}"
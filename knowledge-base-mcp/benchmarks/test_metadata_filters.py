@@ -0,0 +1,108 @@
+from collections.abc import Callable
+
+import duckdb
+import numpy as np
+import pytest
+from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters, VectorStoreQuery
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.latency import record_latency_stats
+from benchmarks.vectors import CLUSTERS, EMBED_DIM, NODES_PER_DOCUMENT, load_vector_store, random_embeddings
+from knowledge_base_mcp.stores.vector_stores.duckdb import DEFAULT_INDEXED_METADATA_KEYS, EnhancedDuckDBVectorStore
+
+VECTORS = 100_000
+
+QUERIES = 20
+ROUNDS = 3
+
+METADATA: dict[str, list[str]] = {
+    "json": [],
+    "columns": DEFAULT_INDEXED_METADATA_KEYS,
+}
+
+_vector_stores: dict[str, EnhancedDuckDBVectorStore] = {}
+
+
+@pytest.fixture(params=METADATA.keys())
+def vector_store(request: pytest.FixtureRequest, corpus_seed: int) -> EnhancedDuckDBVectorStore:
+    """A vector store filtering on the JSON metadata, and one filtering on the columns of the indexed metadata keys."""
+    metadata: str = request.param
+
+    if metadata not in _vector_stores:
+        try:
+            _vector_stores[metadata] = load_vector_store(vector_count=VECTORS, seed=corpus_seed, indexed_metadata_keys=METADATA[metadata])
+        except duckdb.Error as e:
+            pytest.skip(f"The DuckDB extensions could not be loaded: {e}")
+
+    return _vector_stores[metadata]
+
+
+def knowledge_base_filter(index: int) -> MetadataFilter:
+    return MetadataFilter(key="knowledge_base", value=f"kb-{index}")
+
+
+def filtered_queries(vector_store: EnhancedDuckDBVectorStore, seed: int) -> Callable[[], None]:
+    """Search a single knowledge base, as searches of a named knowledge base do."""
+    rng = np.random.default_rng(seed=seed)
+
+    queries = [
+        VectorStoreQuery(
+            query_embedding=embedding.tolist(), similarity_top_k=20, filters=MetadataFilters(filters=[knowledge_base_filter(index)])
+        )
+        for index, embedding in enumerate(random_embeddings(rng=rng, centers=rng.normal(size=(CLUSTERS, EMBED_DIM)), count=QUERIES))
+    ]
+
+    def _run() -> None:
+        for query in queries:
+            _ = vector_store.query_metadata(query=query, metadata_keys=["knowledge_base", "title"])
+
+    return _run
+
+
+def document_lookups(vector_store: EnhancedDuckDBVectorStore, seed: int) -> Callable[[], None]:
+    """Look up the nodes of documents by knowledge base and title, as `get_document` does."""
+    rng = np.random.default_rng(seed=seed)
+
+    filters = [
+        MetadataFilters(
+            filters=[knowledge_base_filter(node % 100), MetadataFilter(key="title", value=f"Document {node // NODES_PER_DOCUMENT}")]
+        )
+        for node in rng.integers(VECTORS, size=QUERIES)
+    ]
+
+    def _run() -> None:
+        for document_filters in filters:
+            _ = vector_store.get_nodes(filters=document_filters)
+
+    return _run
+
+
+def knowledge_base_deletes(vector_store: EnhancedDuckDBVectorStore, seed: int) -> Callable[[], None]:
+    """Delete a knowledge base, rolling the delete back so every round deletes the same nodes."""
+
+    def _run() -> None:
+        for index in range(QUERIES):
+            _ = vector_store.client.begin()
+            _ = vector_store.delete_by_metadata(key="knowledge_base", values=[f"kb-{(seed + index) % 100}"])
+            _ = vector_store.client.rollback()
+
+    return _run
+
+
+OPERATIONS: dict[str, Callable[[EnhancedDuckDBVectorStore, int], Callable[[], None]]] = {
+    "filtered-query": filtered_queries,
+    "get-document": document_lookups,
+    "delete-knowledge-base": knowledge_base_deletes,
+}
+
+
+@pytest.mark.parametrize("operation", OPERATIONS.keys())
+def test_metadata_filter_latency(
+    benchmark: BenchmarkFixture, vector_store: EnhancedDuckDBVectorStore, corpus_seed: int, operation: str
+) -> None:
+    """Latency of filtering on the JSON metadata against filtering on the columns of the indexed metadata keys."""
+    run: Callable[[], None] = OPERATIONS[operation](vector_store, corpus_seed)
+
+    benchmark.pedantic(run, rounds=ROUNDS, warmup_rounds=1)
+
+    record_latency_stats(benchmark, queries=QUERIES)
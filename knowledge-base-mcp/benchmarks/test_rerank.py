@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.corpus import load_sample_nodes, sample_queries
+from benchmarks.latency import record_latency_stats
+from knowledge_base_mcp.llama_index.post_processors.rerank import FlashRankRerankPostprocessor
+from knowledge_base_mcp.main import DEFAULT_DOCS_CROSS_ENCODER_MODEL
+from knowledge_base_mcp.stores.rerank_score_cache import RerankScoreCache
+
+QUERIES = 20
+ROUNDS = 3
+
+CANDIDATES = 200
+"""The number of candidates retrieved for each query, matching the client's retrieval of 200 nodes."""
+
+RECALL_TOP_K = 10
+
+STRATEGIES: dict[str, dict[str, int]] = {
+    "full": {},
+    "max-candidates-50": {"max_candidates": 50},
+    "early-exit-top-10": {"early_exit_top_k": RECALL_TOP_K},
+}
+
+
+@pytest.fixture(scope="module")
+def retrieved_candidates(torch_embed_model: BaseEmbedding, corpus_seed: int) -> list[tuple[str, list[NodeWithScore]]]:
+    """The queries, each with the sample nodes most similar to it in descending order of similarity."""
+    nodes = load_sample_nodes()
+    queries = sample_queries(nodes=nodes, count=QUERIES, seed=corpus_seed)
+
+    node_embeddings = np.array(torch_embed_model.get_text_embedding_batch(texts=[node.get_content() for node in nodes]))
+    query_embeddings = np.array([torch_embed_model.get_query_embedding(query=query) for query in queries])
+
+    node_embeddings /= np.linalg.norm(node_embeddings, axis=1, keepdims=True)
+    query_embeddings /= np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+
+    similarities = query_embeddings @ node_embeddings.T
+
+    return [
+        (query, [NodeWithScore(node=nodes[index], score=float(row[index])) for index in np.argsort(-row)[:CANDIDATES]])
+        for query, row in zip(queries, similarities, strict=True)
+    ]
+
+
+def rerank_all(
+    reranker: FlashRankRerankPostprocessor, retrieved_candidates: list[tuple[str, list[NodeWithScore]]]
+) -> list[list[NodeWithScore]]:
+    """Rerank the candidates of every query, copying them first so their retrieval scores survive across rounds."""
+    return [
+        reranker.postprocess_nodes(
+            nodes=[NodeWithScore(node=candidate.node, score=candidate.score) for candidate in candidates], query_bundle=QueryBundle(query)
+        )
+        for query, candidates in retrieved_candidates
+    ]
+
+
+def top_k_ids(results: list[list[NodeWithScore]]) -> list[set[str]]:
+    return [{node.node.node_id for node in result[:RECALL_TOP_K]} for result in results]
+
+
+@pytest.mark.parametrize("score_cache", ["none", "warm"])
+@pytest.mark.parametrize("strategy", STRATEGIES.keys())
+def test_rerank_latency(
+    benchmark: BenchmarkFixture, retrieved_candidates: list[tuple[str, list[NodeWithScore]]], strategy: str, score_cache: str
+) -> None:
+    """Reranking latency of each strategy, and the recall@k of its results against reranking every candidate."""
+    _ = pytest.importorskip("flashrank")
+
+    cache = RerankScoreCache() if score_cache == "warm" else None
+
+    reranker = FlashRankRerankPostprocessor(model=DEFAULT_DOCS_CROSS_ENCODER_MODEL, score_cache=cache, **STRATEGIES[strategy])
+    full_reranker = FlashRankRerankPostprocessor(model=DEFAULT_DOCS_CROSS_ENCODER_MODEL)
+
+    results: list[list[NodeWithScore]] = benchmark.pedantic(
+        rerank_all, args=(reranker, retrieved_candidates), rounds=ROUNDS, warmup_rounds=1
+    )
+
+    expected: list[set[str]] = top_k_ids(rerank_all(full_reranker, retrieved_candidates))
+    actual: list[set[str]] = top_k_ids(results)
+
+    recall = float(
+        np.mean([len(expected_ids & actual_ids) / RECALL_TOP_K for expected_ids, actual_ids in zip(expected, actual, strict=True)])
+    )
+
+    record_latency_stats(benchmark, queries=len(retrieved_candidates))
+    benchmark.extra_info[f"recall_at_{RECALL_TOP_K}"] = recall
+
+    if cache is not None:
+        benchmark.extra_info["rerank_score_cache"] = cache.stats()
+
+    print(f"{strategy} (score cache: {score_cache}) recall@{RECALL_TOP_K} against full reranking: {recall:.3f}")
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.corpus import generate_texts
+from benchmarks.latency import record_latency_stats
+from knowledge_base_mcp.clients.knowledge_base import KnowledgeBaseClient
+
+QUERIES = 20
+ROUNDS = 5
+
+
+@pytest.mark.parametrize("query_embedding_cache", ["cold", "warm"])
+def test_retrieve_latency(
+    benchmark: BenchmarkFixture,
+    runner: asyncio.Runner,
+    knowledge_base_client: KnowledgeBaseClient,
+    corpus_seed: int,
+    query_embedding_cache: str,
+) -> None:
+    """Retrieval latency with every query embedded again (cold) and with the query embeddings cached (warm)."""
+    queries = generate_texts(count=QUERIES, seed=corpus_seed + 1, long_chunk_ratio=0)
+
+    cache = knowledge_base_client.query_embedding_cache
+    assert cache is not None
+
+    async def _retrieve_all() -> None:
+        for query in queries:
+            _ = await knowledge_base_client.aretrieve(query=query)
+
+    def _setup() -> None:
+        if query_embedding_cache == "cold":
+            cache.clear()
+
+    runner.run(knowledge_base_client.warm_up())
+    runner.run(_retrieve_all())
+
+    benchmark.pedantic(lambda: runner.run(_retrieve_all()), setup=_setup, rounds=ROUNDS, warmup_rounds=0)
+
+    record_latency_stats(benchmark, queries=len(queries))
+    benchmark.extra_info["query_embedding_cache"] = cache.stats()
+
+
+SUMMARY_NODES = 200
+"""The number of nodes retrieved to summarize the results of a search."""
+
+CANDIDATES = 20
+"""The number of nodes whose text a search returns, matching a documentation search for 10 results."""
+
+
+@pytest.mark.parametrize("retrieval", ["full", "metadata-only"])
+def test_summary_retrieval_latency(
+    benchmark: BenchmarkFixture, runner: asyncio.Runner, knowledge_base_client: KnowledgeBaseClient, corpus_seed: int, retrieval: str
+) -> None:
+    """Latency of retrieving the nodes of a search summary with their text, against retrieving only their metadata and
+    fetching the text of the returned candidates."""
+    queries = generate_texts(count=QUERIES, seed=corpus_seed + 1, long_chunk_ratio=0)
+
+    async def _retrieve_all() -> None:
+        for query in queries:
+            if retrieval == "full":
+                _ = (await knowledge_base_client.aretrieve(query=query, top_k=SUMMARY_NODES))[:CANDIDATES]
+                continue
+
+            nodes_with_scores = await knowledge_base_client.aretrieve_metadata(query=query, top_k=SUMMARY_NODES)
+            _ = await knowledge_base_client.afetch_nodes(nodes_with_scores=nodes_with_scores[:CANDIDATES])
+
+    runner.run(knowledge_base_client.warm_up())
+    runner.run(_retrieve_all())
+
+    benchmark.pedantic(lambda: runner.run(_retrieve_all()), rounds=ROUNDS, warmup_rounds=0)
+
+    record_latency_stats(benchmark, queries=len(queries))
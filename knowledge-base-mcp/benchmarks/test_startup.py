@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport
+from pytest_benchmark.fixture import BenchmarkFixture
+
+ROUNDS = 3
+
+READY_TIMEOUT = 300
+READY_POLL_INTERVAL = 0.1
+
+
+def server_transport(*run_args: str) -> StdioTransport:
+    """A fresh in-memory DuckDB server process, so every round pays for the imports and model loading again."""
+    return StdioTransport(
+        command=sys.executable,
+        args=["-m", "knowledge_base_mcp.main", "duckdb", "memory", "run", *run_args],
+        env=dict(os.environ),
+        keep_alive=False,
+    )
+
+
+@pytest.mark.parametrize("run_args", [(), ("--no-warm-up",), ("--search-only",)], ids=["warm-up", "no-warm-up", "search-only"])
+def test_startup_latency(benchmark: BenchmarkFixture, runner: asyncio.Runner, run_args: tuple[str, ...]) -> None:
+    """The time from starting the server until it answers a `list_tools` request."""
+
+    async def _start_and_list_tools() -> None:
+        async with Client(transport=server_transport(*run_args)) as client:
+            _ = await client.list_tools()
+
+    benchmark.pedantic(lambda: runner.run(_start_and_list_tools()), rounds=ROUNDS, warmup_rounds=1)
+
+
+def test_time_to_models_ready(benchmark: BenchmarkFixture, runner: asyncio.Runner) -> None:
+    """The time from starting the server until the models it loads in the background are ready."""
+    _ = pytest.importorskip("llama_index.embeddings.huggingface")
+
+    async def _start_and_wait_until_ready() -> None:
+        async with Client(transport=server_transport()) as client:
+            deadline = time.monotonic() + READY_TIMEOUT
+
+            while time.monotonic() < deadline:
+                status: dict[str, str] = (await client.call_tool("get_model_status")).data  # pyright: ignore[reportAny]
+
+                if all(model_status == "ready" for model_status in status.values()):
+                    return
+
+                await asyncio.sleep(READY_POLL_INTERVAL)
+
+            pytest.fail(f"The models were not ready within {READY_TIMEOUT} seconds: {status}")
+
+    benchmark.pedantic(lambda: runner.run(_start_and_wait_until_ready()), rounds=ROUNDS, warmup_rounds=1)
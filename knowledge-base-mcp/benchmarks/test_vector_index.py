@@ -0,0 +1,88 @@
+import duckdb
+import numpy as np
+import pytest
+from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters, VectorStoreQuery
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.latency import record_latency_stats
+from benchmarks.vectors import CLUSTERS, EMBED_DIM, load_vector_store, random_embeddings
+from knowledge_base_mcp.stores.vector_stores.duckdb import DEFAULT_INDEXED_METADATA_KEYS, EnhancedDuckDBVectorStore, HNSWIndexConfig
+
+VECTOR_COUNTS = [100_000, 1_000_000, 5_000_000]
+"""The sizes of the vector stores, above `--max-vectors` they are skipped."""
+
+QUERIES = 20
+ROUNDS = 3
+
+RECALL_TOP_K = 10
+
+FILTERS: dict[str, MetadataFilters | None] = {
+    "unfiltered": None,
+    "one-knowledge-base": MetadataFilters(filters=[MetadataFilter(key="knowledge_base", value="kb-0")]),
+}
+
+_vector_stores: dict[int, EnhancedDuckDBVectorStore] = {}
+
+
+@pytest.fixture(params=VECTOR_COUNTS, ids=lambda vector_count: f"{vector_count:_}-vectors")
+def vector_store(request: pytest.FixtureRequest, max_vectors: int, corpus_seed: int) -> EnhancedDuckDBVectorStore:
+    """The vector store of each size, loaded once for every benchmark against it."""
+    vector_count: int = request.param
+
+    if vector_count > max_vectors:
+        pytest.skip(f"Run with --max-vectors {vector_count} to benchmark {vector_count:_} vectors")
+
+    if vector_count not in _vector_stores:
+        try:
+            vector_store = load_vector_store(
+                vector_count=vector_count, seed=corpus_seed, indexed_metadata_keys=DEFAULT_INDEXED_METADATA_KEYS
+            )
+            vector_store.create_hnsw_index(hnsw_index=HNSWIndexConfig())
+            _vector_stores[vector_count] = vector_store
+        except duckdb.Error as e:
+            pytest.skip(f"The DuckDB extensions could not be loaded: {e}")
+
+    return _vector_stores[vector_count]
+
+
+def query_all(vector_store: EnhancedDuckDBVectorStore, queries: list[VectorStoreQuery]) -> list[list[str]]:
+    """Query for the ids of the nearest nodes, through the metadata-only queries that searches run."""
+    return [vector_store.query_metadata(query=query, metadata_keys=["knowledge_base"]).ids or [] for query in queries]
+
+
+@pytest.mark.parametrize("filters", FILTERS.keys())
+@pytest.mark.parametrize("search", ["exact", "hnsw"])
+def test_vector_query_latency(
+    benchmark: BenchmarkFixture, vector_store: EnhancedDuckDBVectorStore, corpus_seed: int, search: str, filters: str
+) -> None:
+    """Query latency of an exact search and of the HNSW index, and the recall@k of the index against the exact search."""
+    rng = np.random.default_rng(seed=corpus_seed + 1)
+
+    queries = [
+        VectorStoreQuery(query_embedding=embedding.tolist(), similarity_top_k=RECALL_TOP_K, filters=FILTERS[filters])
+        for embedding in random_embeddings(rng=rng, centers=rng.normal(size=(CLUSTERS, EMBED_DIM)), count=QUERIES)
+    ]
+
+    hnsw_index = vector_store.hnsw_index
+    assert hnsw_index is not None
+
+    vector_store.hnsw_index = None
+    expected: list[list[str]] = query_all(vector_store=vector_store, queries=queries)
+
+    vector_store.hnsw_index = hnsw_index if search == "hnsw" else None
+
+    try:
+        results: list[list[str]] = benchmark.pedantic(query_all, args=(vector_store, queries), rounds=ROUNDS, warmup_rounds=1)
+    finally:
+        vector_store.hnsw_index = hnsw_index
+
+    recall = float(
+        np.mean(
+            [len(set(expected_ids) & set(actual_ids)) / RECALL_TOP_K for expected_ids, actual_ids in zip(expected, results, strict=True)]
+        )
+    )
+
+    record_latency_stats(benchmark, queries=len(queries))
+    benchmark.extra_info[f"recall_at_{RECALL_TOP_K}"] = recall
+
+    print(f"{search} ({filters}) recall@{RECALL_TOP_K} against an exact search: {recall:.3f}")
@@ -0,0 +1,67 @@
+"""Load DuckDB vector stores with deterministic synthetic embeddings to benchmark against."""
+
+import json
+
+import numpy as np
+import pyarrow as pa
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
+
+from knowledge_base_mcp.stores.vector_stores.duckdb import EnhancedDuckDBVectorStore
+
+EMBED_DIM = 384
+"""The dimension of the default document embedding model."""
+
+CLUSTERS = 1_000
+"""The number of topics the synthetic embeddings are clustered around, as embeddings of real documentation are."""
+
+KNOWLEDGE_BASES = 100
+"""The number of knowledge bases the vectors are spread across, so filtering on one keeps 1% of them."""
+
+NODES_PER_DOCUMENT = 10
+
+INSERT_BATCH_SIZE = 100_000
+
+
+def random_embeddings(rng: np.random.Generator, centers: np.ndarray, count: int) -> np.ndarray:
+    """Unit embeddings scattered around randomly chosen cluster centers."""
+    embeddings = centers[rng.integers(len(centers), size=count)] + rng.normal(scale=0.5, size=(count, EMBED_DIM))
+    return (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).astype(np.float32)
+
+
+def load_vector_store(vector_count: int, seed: int, indexed_metadata_keys: list[str] | None = None) -> EnhancedDuckDBVectorStore:
+    """An in-memory vector store holding `vector_count` synthetic embeddings.
+
+    Each node belongs to one of the knowledge bases, and to a document titled after its index. The indexed metadata
+    keys are copied into their columns once every node is loaded, like a store created before they were indexed."""
+    rng = np.random.default_rng(seed=seed)
+    centers = rng.normal(size=(CLUSTERS, EMBED_DIM))
+
+    vector_store = EnhancedDuckDBVectorStore(embed_dim=EMBED_DIM, indexed_metadata_keys=[])
+
+    for start in range(0, vector_count, INSERT_BATCH_SIZE):
+        ids = range(start, min(start + INSERT_BATCH_SIZE, vector_count))
+        embeddings = random_embeddings(rng=rng, centers=centers, count=len(ids))
+
+        nodes = [
+            TextNode(
+                id_=f"node-{index}",
+                metadata={"knowledge_base": f"kb-{index % KNOWLEDGE_BASES}", "title": f"Document {index // NODES_PER_DOCUMENT}"},
+            )
+            for index in ids
+        ]
+
+        batch = pa.table(
+            {
+                "node_id": [node.node_id for node in nodes],
+                "text": [""] * len(ids),
+                "embedding": pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel()), EMBED_DIM),
+                "metadata_": [json.dumps(node_to_metadata_dict(node, remove_text=True, flat_metadata=False)) for node in nodes],
+            }
+        )
+
+        vector_store.client.from_arrow(batch).insert_into(vector_store.table_name)
+
+    vector_store.create_metadata_columns(metadata_keys=indexed_metadata_keys or [])
+
+    return vector_store
@@ -1,27 +1,44 @@
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
 from functools import cached_property
 from typing import TYPE_CHECKING, Any, ClassVar
 
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.core.indices.vector_store import VectorStoreIndex
 from llama_index.core.ingestion.pipeline import IngestionPipeline
-from llama_index.core.postprocessor.types import BaseNodePostprocessor
-from llama_index.core.schema import BaseNode, NodeWithScore, RelatedNodeInfo
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle, RelatedNodeInfo, TextNode
 from llama_index.core.storage.docstore.keyval_docstore import KVDocumentStore
 from llama_index.core.storage.kvstore.types import BaseKVStore
-from llama_index.core.vector_stores.types import FilterCondition, FilterOperator, MetadataFilter, MetadataFilters
-from llama_index.postprocessor.flashrank_rerank import FlashRankRerank
-from pydantic import BaseModel, ConfigDict
-
+from llama_index.core.vector_stores.types import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from knowledge_base_mcp.llama_index.embeddings.lazy import LazyEmbedding
 from knowledge_base_mcp.llama_index.hierarchical_node_parsers.collapse_only_children import CollapseSmallFamilies
 from knowledge_base_mcp.llama_index.hierarchical_node_parsers.leaf_semantic_merging import LeafSemanticMergerNodeParser
+from knowledge_base_mcp.llama_index.post_processors.rerank import FlashRankRerankPostprocessor
 from knowledge_base_mcp.llama_index.transformations.batch_embeddings import BatchedNodeEmbedding
 from knowledge_base_mcp.llama_index.transformations.check_docstore import CheckDocstore
 from knowledge_base_mcp.llama_index.transformations.large_node_detector import LargeNodeDetector
-from knowledge_base_mcp.llama_index.transformations.metadata import ExcludeMetadata, FlattenMetadata
+from knowledge_base_mcp.llama_index.transformations.metadata import AddSizeMetadata, ExcludeMetadata, FlattenMetadata
 from knowledge_base_mcp.llama_index.transformations.write_to_docstore import WriteToDocstore
+from knowledge_base_mcp.stores.docstores.base import EnhancedBaseDocumentStore
+from knowledge_base_mcp.stores.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from knowledge_base_mcp.stores.knowledge_base_catalog import KnowledgeBaseCatalog, KnowledgeBaseEntry
+from knowledge_base_mcp.stores.node_cache import NodeCache
+from knowledge_base_mcp.stores.rerank_score_cache import RerankScoreCache
+from knowledge_base_mcp.stores.search_result_cache import SearchResultCache
 from knowledge_base_mcp.stores.vector_stores.base import EnhancedBaseVectorStore
 from knowledge_base_mcp.utils.logging import BASE_LOGGER
-from knowledge_base_mcp.utils.patches import VectorIndexRetriever
+from knowledge_base_mcp.utils.patches import TimerGroup, VectorIndexRetriever
 
 if TYPE_CHECKING:
     from llama_index.core.base.base_retriever import BaseRetriever
@@ -29,6 +46,11 @@ if TYPE_CHECKING:
 
 logger = BASE_LOGGER.getChild(__name__)
 
+type ProgressCallback = Callable[[float, float | None, str | None], Awaitable[None]]
+"""Reports the progress of a long-running operation, like `fastmcp.Context.report_progress`."""
+
+DELETE_KNOWLEDGE_BASE_STEPS = 2
+
 
 def get_kb_metadata_filter(knowledge_base: list[str] | str) -> MetadataFilter:
     if isinstance(knowledge_base, str):
@@ -53,10 +75,55 @@ class KnowledgeBaseClient(BaseModel):
 
     reranker_model: str
 
-    @cached_property
-    def reranker(self) -> BaseNodePostprocessor:
-        # return SentenceTransformerRerank(top_n=1000, device="cpu")
-        return FlashRankRerank(model=self.reranker_model, top_n=1000)
+    embedding_cache: EmbeddingCache | None = None
+    """A cache of document embeddings, so re-ingesting unchanged content does not re-embed it."""
+
+    embedding_workers: int = 1
+    """The number of batches of nodes to embed concurrently."""
+
+    query_embedding_cache: QueryEmbeddingCache | None = Field(default_factory=QueryEmbeddingCache)
+    """A cache of query embeddings, so repeated queries do not embed the query again."""
+
+    search_result_cache: SearchResultCache | None = None
+    """A cache of search responses, so repeated searches of unchanged knowledge bases are not run again."""
+
+    node_cache: NodeCache | None = Field(default_factory=NodeCache)
+    """A cache of the parent, sibling and child nodes that searches expand their results with."""
+
+    reranker_score_cache: RerankScoreCache | None = Field(default_factory=RerankScoreCache)
+    """A cache of reranker scores, so repeated queries do not score the same nodes again."""
+
+    reranker_max_candidates: int | None = None
+    """The maximum number of nodes the reranker scores per query. Defaults to scoring every node."""
+
+    reranker_early_exit_top_k: int | None = None
+    """Stop reranking once scoring more nodes leaves the top k unchanged. Defaults to scoring every node."""
+
+    hybrid_search: bool = False
+    """Fuse the full-text (BM25) ranking of the query with the vector ranking using reciprocal rank fusion."""
+
+    _reranker: FlashRankRerankPostprocessor | None = PrivateAttr(default=None)
+    _warm_up_task: asyncio.Task[None] | None = PrivateAttr(default=None)
+
+    @property
+    def reranker(self) -> FlashRankRerankPostprocessor:
+        """The reranker. Its model is loaded in a thread the first time it scores, so getting it never blocks."""
+        if self._reranker is None:
+            # return SentenceTransformerRerank(top_n=1000, device="cpu")
+            self._reranker = FlashRankRerankPostprocessor(
+                model=self.reranker_model,
+                top_n=1000,
+                max_candidates=self.reranker_max_candidates,
+                early_exit_top_k=self.reranker_early_exit_top_k,
+                score_cache=self.reranker_score_cache,
+            )
+
+        return self._reranker
+
+    async def aload_embed_model(self) -> None:
+        """Load the embedding model in a thread, if it is loaded lazily, so building pipelines from it does not block the event loop."""
+        if isinstance(self.embed_model, LazyEmbedding):
+            _ = await self.embed_model.aload()
 
     @property
     def docstore(self) -> KVDocumentStore:
@@ -105,8 +172,50 @@ class KnowledgeBaseClient(BaseModel):
                 collection=self.docstore._metadata_collection,  # pyright: ignore[reportPrivateUsage]
             )
 
-    async def delete_knowledge_base(self, knowledge_base: str) -> None:
-        """Remove a knowledge base from the vector store."""
+    async def delete_knowledge_base(self, knowledge_base: str, progress: ProgressCallback | None = None) -> None:
+        """Remove a knowledge base from the docstore and the vector store.
+
+        Stores that support it delete the knowledge base in bulk by its metadata. The knowledge base is removed from the
+        catalog last, so an interrupted delete leaves it listed and is safe to retry."""
+
+        timer_group: TimerGroup = TimerGroup(name="KnowledgeBaseClient.delete_knowledge_base")
+
+        async def _report(step: int, message: str) -> None:
+            logger.info(msg=f"{message} for {knowledge_base}")
+
+            if progress is not None:
+                await progress(step, DELETE_KNOWLEDGE_BASE_STEPS, message)
+
+        try:
+            if isinstance(self.docstore, EnhancedBaseDocumentStore):
+                await _report(step=0, message="Deleting nodes from the docstore")
+
+                with timer_group.time(name="docstore"):
+                    deleted: int = await self.docstore.adelete_by_metadata(key="knowledge_base", values=[knowledge_base])
+
+                await _report(step=1, message=f"Deleted {deleted} nodes from the docstore, deleting nodes from the vector store")
+
+                with timer_group.time(name="vector_store"):
+                    deleted = await self.vector_store.adelete_by_metadata(key="knowledge_base", values=[knowledge_base])
+
+                await _report(step=2, message=f"Deleted {deleted} nodes from the vector store")
+            else:
+                await _report(step=0, message="Deleting nodes one document at a time")
+
+                with timer_group.time(name="documents"):
+                    await self._delete_knowledge_base_nodes(knowledge_base=knowledge_base)
+
+                await _report(step=2, message="Deleted nodes from the docstore and the vector store")
+
+            # The knowledge base stays in the catalog until it is fully deleted, so an interrupted delete can be found and retried
+            await self.knowledge_base_catalog.adelete(knowledge_base=knowledge_base)
+        finally:
+            await self.abump_knowledge_base_generations(knowledge_bases=[knowledge_base])
+
+        logger.info(f"Deleting {knowledge_base} took: {timer_group.model_dump()}")
+
+    async def _delete_knowledge_base_nodes(self, knowledge_base: str) -> None:
+        """Remove a knowledge base one document at a time, for docstores that cannot delete in bulk."""
 
         vector_store_nodes: list[BaseNode] = await self.get_knowledge_base_nodes(knowledge_base)
 
@@ -128,7 +237,8 @@ class KnowledgeBaseClient(BaseModel):
     async def delete_all_knowledge_bases(self) -> None:
         """Remove all knowledge bases from the vector store."""
 
-        knowledge_bases = await self.get_knowledge_bases()
+        # The vector store, not the catalog, is the record of what a search can return
+        knowledge_bases: dict[str, int] = await self.vector_store.metadata_agg(key="knowledge_base")
 
         for knowledge_base in knowledge_bases:
             await self.delete_knowledge_base(knowledge_base)
@@ -147,6 +257,19 @@ class KnowledgeBaseClient(BaseModel):
         for doc_id in docs:
             self.vector_store_index.docstore.delete_document(doc_id=doc_id, raise_error=False)
 
+        await self.knowledge_base_catalog.areplace(entries={})
+
+    async def abump_knowledge_base_generations(self, knowledge_bases: Iterable[str]) -> None:
+        """Record a write to the knowledge bases, so cached search responses and nodes from them are no longer served."""
+
+        knowledge_bases = list(knowledge_bases)
+
+        if self.search_result_cache is not None:
+            await self.search_result_cache.abump(knowledge_bases=knowledge_bases)
+
+        if self.node_cache is not None:
+            self.node_cache.invalidate(knowledge_bases=knowledge_bases)
+
     async def get_knowledge_base_stats(self) -> dict[str, int]:
         """Get statistics about the knowledge bases."""
 
@@ -160,10 +283,50 @@ class KnowledgeBaseClient(BaseModel):
             "nodes": nodes,
         }
 
+    @cached_property
+    def knowledge_base_catalog(self) -> KnowledgeBaseCatalog:
+        """The catalog of knowledge bases, kept alongside the docstore."""
+        return KnowledgeBaseCatalog(kv_store=self._kv_store)
+
     async def get_knowledge_bases(self) -> dict[str, int]:
-        """Get all knowledge bases from the vector store."""
+        """Get all knowledge bases and the number of nodes in each."""
+
+        return {knowledge_base: entry.nodes for knowledge_base, entry in (await self.get_knowledge_base_catalog()).items()}
+
+    async def get_knowledge_base_catalog(self) -> dict[str, KnowledgeBaseEntry]:
+        """Get all knowledge bases with their document and node counts, size and last ingest time."""
+
+        if await self.knowledge_base_catalog.ais_initialized():
+            return await self.knowledge_base_catalog.aget_all()
+
+        # Knowledge bases ingested before the catalog existed are only known to the vector store
+        return await self.rebuild_knowledge_base_catalog()
+
+    async def rebuild_knowledge_base_catalog(self) -> dict[str, KnowledgeBaseEntry]:
+        """Rebuild the catalog of knowledge bases from the node counts in the vector store and the documents in the docstore.
+
+        The size and last ingest time of the rebuilt knowledge bases are unknown until they are ingested again.
+        """
+
+        node_counts: dict[str, int] = await self.vector_store.metadata_agg(key="knowledge_base")
+
+        ref_docs: dict[str, RefDocInfo] = await self.docstore.aget_all_ref_doc_info() or {}
+
+        document_counts: Counter[str] = Counter(
+            knowledge_base for ref_doc in ref_docs.values() if isinstance(knowledge_base := ref_doc.metadata.get("knowledge_base"), str)
+        )
+
+        entries: dict[str, KnowledgeBaseEntry] = {
+            knowledge_base: KnowledgeBaseEntry(documents=document_counts[knowledge_base], nodes=count, size=None)
+            for knowledge_base, count in node_counts.items()
+        }
+
+        if node_counts:
+            logger.info(f"Rebuilding the knowledge base catalog from the vector store with {len(node_counts)} knowledge bases")
 
-        return await self.vector_store.metadata_agg(key="knowledge_base")
+        await self.knowledge_base_catalog.areplace(entries=entries)
+
+        return entries
 
     @property
     def duplicate_document_checker(self) -> CheckDocstore:
@@ -236,7 +399,11 @@ class KnowledgeBaseClient(BaseModel):
                 FlattenMetadata(include_related_nodes=True),
                 # Embeddings
                 LargeNodeDetector.from_embed_model(embed_model=self.embed_model, node_type="leaf", extra_size=1024),
-                BatchedNodeEmbedding(embed_model=self.embed_model),
+                BatchedNodeEmbedding(
+                    embed_model=self.embed_model, embedding_cache=self.embedding_cache, num_workers=self.embedding_workers
+                ),
+                # Record the sizes post-processors need to expand results
+                AddSizeMetadata(),
                 # Write to docstore
                 WriteToDocstore(docstore=self.docstore),
             ],
@@ -258,9 +425,16 @@ class KnowledgeBaseClient(BaseModel):
                 FlattenMetadata(include_related_nodes=True),
                 # Embeddings
                 LargeNodeDetector.from_embed_model(embed_model=self.embed_model, node_type="leaf", extra_size=1024),
-                BatchedNodeEmbedding(embed_model=self.embed_model, leaf_node_only=True),
+                BatchedNodeEmbedding(
+                    embed_model=self.embed_model,
+                    leaf_node_only=True,
+                    embedding_cache=self.embedding_cache,
+                    num_workers=self.embedding_workers,
+                ),
                 LeafSemanticMergerNodeParser(embed_model=self.embed_model),
                 CollapseSmallFamilies(),
+                # Record the sizes post-processors need to expand results
+                AddSizeMetadata(),
                 # Write to docstore
                 WriteToDocstore(docstore=self.docstore),
             ],
@@ -273,6 +447,110 @@ class KnowledgeBaseClient(BaseModel):
 
         return knowledge_base_pipeline
 
+    async def aget_query_embedding(self, query: str) -> list[float]:
+        """Embed a query, re-using the embedding of an earlier query with the same normalized text."""
+
+        if self.query_embedding_cache is None:
+            return await self.embed_model.aget_query_embedding(query=query)
+
+        if (embedding := self.query_embedding_cache.get(query=query)) is not None:
+            return embedding
+
+        embedding = await self.embed_model.aget_query_embedding(query=query)
+
+        self.query_embedding_cache.put(query=query, embedding=embedding)
+
+        logger.debug(f"Query embedding cache: {self.query_embedding_cache.stats()}")
+
+        return embedding
+
+    async def aget_query_embeddings(self, queries: list[str]) -> list[list[float]]:
+        """Embed several queries with a single call to the model, re-using the embeddings of earlier queries."""
+
+        embeddings: dict[str, list[float]] = {}
+
+        if self.query_embedding_cache is not None:
+            embeddings = {query: embedding for query in queries if (embedding := self.query_embedding_cache.get(query=query)) is not None}
+
+        if missing_queries := list(dict.fromkeys(query for query in queries if query not in embeddings)):
+            if isinstance(self.embed_model, LazyEmbedding):
+                new_embeddings: list[list[float]] = await self.embed_model.aget_query_embeddings(queries=missing_queries)
+            else:
+                new_embeddings = [await self.embed_model.aget_query_embedding(query=query) for query in missing_queries]
+
+            for query, embedding in zip(missing_queries, new_embeddings, strict=True):
+                embeddings[query] = embedding
+
+                if self.query_embedding_cache is not None:
+                    self.query_embedding_cache.put(query=query, embedding=embedding)
+
+        return [embeddings[query] for query in queries]
+
+    async def warm_up(self) -> None:
+        """Load the embedding model and the reranker and run them once, so the first query does not pay for their lazy initialization."""
+
+        warm_up_text: str = "Warming up the knowledge base"
+
+        timer_group: TimerGroup = TimerGroup(name="KnowledgeBaseClient.warm_up")
+
+        with timer_group.time(name="embed_model"):
+            await self.aload_embed_model()
+
+            _ = await self.embed_model.aget_query_embedding(query=warm_up_text)
+            _ = await self.embed_model.aget_text_embedding(text=warm_up_text)
+
+        with timer_group.time(name="reranker"):
+            reranker: FlashRankRerankPostprocessor = self.reranker
+            _ = await asyncio.to_thread(reranker.load)
+            _ = await reranker.apostprocess_nodes(nodes=[NodeWithScore(node=TextNode(text=warm_up_text))], query_str=warm_up_text)
+
+        logger.info(f"Warm-up took: {timer_group.model_dump()}")
+
+    def start_warm_up(self) -> None:
+        """Warm up the models in the background, so a server can accept connections while they load."""
+
+        async def _warm_up() -> None:
+            try:
+                await self.warm_up()
+            except Exception:
+                logger.exception("Failed to warm up the embedding model and reranker, they will be loaded on first use")
+
+        self._warm_up_task = asyncio.create_task(_warm_up())
+
+    def _model_status(self, loaded: bool) -> str:
+        if loaded:
+            return "ready"
+
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            return "loading"
+
+        return "not loaded"
+
+    async def get_model_status(self) -> dict[str, str]:
+        """Get whether the embedding model and the reranker are loaded. Models that are not loaded yet load on first use."""
+
+        embed_model_loaded: bool = not isinstance(self.embed_model, LazyEmbedding) or self.embed_model.loaded
+
+        return {
+            "embed_model": self._model_status(loaded=embed_model_loaded),
+            "reranker": self._model_status(loaded=self._reranker is not None and self._reranker.loaded),
+        }
+
+    @property
+    def query_mode(self) -> VectorStoreQueryMode:
+        return VectorStoreQueryMode.HYBRID if self.hybrid_search else VectorStoreQueryMode.DEFAULT
+
+    @property
+    def search_configuration(self) -> dict[str, Any]:
+        """The configuration that changes search responses, so cached responses are not served after it changes."""
+        return {
+            "embedding_model": self.embed_model.model_name,
+            "reranker_model": self.reranker_model,
+            "reranker_max_candidates": self.reranker_max_candidates,
+            "reranker_early_exit_top_k": self.reranker_early_exit_top_k,
+            "hybrid_search": self.hybrid_search,
+        }
+
     async def aretrieve(
         self,
         query: str,
@@ -290,16 +568,77 @@ class KnowledgeBaseClient(BaseModel):
             top_k=top_k,
         )
 
-        return await retriever.aretrieve(query)
+        query_bundle: QueryBundle = QueryBundle(query_str=query, embedding=await self.aget_query_embedding(query=query))
 
-    def get_knowledge_base_retriever(
+        return await retriever.aretrieve(query_bundle)
+
+    async def aretrieve_metadata(
+        self,
+        query: str,
+        *,
+        knowledge_base: list[str] | str | None = None,
+        knowledge_base_types: list[str] | str | None = None,
+        extra_filters: MetadataFilters | None = None,
+        top_k: int = 200,
+        metadata_keys: list[str] | None = None,
+        query_embedding: list[float] | None = None,
+    ) -> list[NodeWithScore]:
+        """Retrieve the most similar nodes without their text, carrying only the metadata keys (the knowledge base by default).
+
+        The nodes are enough to summarize the results, and `afetch_nodes` fetches the full nodes of the final candidates.
+        The query is embedded unless its embedding is provided.
+        """
+
+        vector_store_query: VectorStoreQuery = VectorStoreQuery(
+            query_embedding=query_embedding or await self.aget_query_embedding(query=query),
+            similarity_top_k=top_k,
+            query_str=query,
+            mode=self.query_mode,
+            filters=self.get_knowledge_base_filters(
+                knowledge_base_types=knowledge_base_types, knowledge_base=knowledge_base, extra_filters=extra_filters
+            ),
+        )
+
+        query_result: VectorStoreQueryResult = await self.vector_store.aquery_metadata(
+            query=vector_store_query, metadata_keys=metadata_keys or ["knowledge_base"]
+        )
+
+        return [
+            NodeWithScore(node=node, score=score)
+            for node, score in zip(query_result.nodes or [], query_result.similarities or [], strict=True)
+        ]
+
+    async def afetch_nodes(self, nodes_with_scores: list[NodeWithScore]) -> list[NodeWithScore]:
+        """Replace the metadata-only nodes from `aretrieve_metadata` with the full nodes, keeping their order and scores.
+
+        Nodes that appear more than once, like the shared results of several queries, are fetched once."""
+
+        node_ids: list[str] = list(dict.fromkeys(node_with_score.node.node_id for node_with_score in nodes_with_scores))
+
+        if not node_ids:
+            return []
+
+        nodes_by_id: dict[str, BaseNode] = {node.node_id: node for node in await self.vector_store.aget_nodes(node_ids=node_ids)}
+
+        # Like the retriever, fall back to the docstore for nodes the vector store does not hold the content of
+        if missing_node_ids := [node_id for node_id in node_ids if node_id not in nodes_by_id or nodes_by_id[node_id].get_content() == ""]:
+            # `aget_nodes` raises for missing nodes even without `raise_error`, and nodes can be deleted after the retrieval
+            docstore_nodes = [await self.docstore.aget_document(doc_id=node_id, raise_error=False) for node_id in missing_node_ids]
+            nodes_by_id.update({node.node_id: node for node in docstore_nodes if node is not None})
+
+        return [
+            NodeWithScore(node=nodes_by_id[node_with_score.node.node_id], score=node_with_score.score)
+            for node_with_score in nodes_with_scores
+            if node_with_score.node.node_id in nodes_by_id
+        ]
+
+    def get_knowledge_base_filters(
         self,
         knowledge_base_types: list[str] | str | None,
         knowledge_base: list[str] | str | None = None,
         extra_filters: MetadataFilters | None = None,
-        top_k: int = 50,
-    ) -> VectorIndexRetriever:
-        """Get a retriever for the specified knowledge base, if none is provided, return a retriever for all knowledge bases."""
+    ) -> MetadataFilters | None:
+        """Get the metadata filters for the specified knowledge base, or None to search all knowledge bases."""
 
         metadata_filters: MetadataFilters = MetadataFilters(condition=FilterCondition.AND, filters=[])
 
@@ -312,9 +651,25 @@ class KnowledgeBaseClient(BaseModel):
         if extra_filters:
             metadata_filters.filters.extend(extra_filters.filters)
 
+        return metadata_filters if metadata_filters.filters else None
+
+    def get_knowledge_base_retriever(
+        self,
+        knowledge_base_types: list[str] | str | None,
+        knowledge_base: list[str] | str | None = None,
+        extra_filters: MetadataFilters | None = None,
+        top_k: int = 50,
+    ) -> VectorIndexRetriever:
+        """Get a retriever for the specified knowledge base, if none is provided, return a retriever for all knowledge bases.
+
+        With `hybrid_search`, the retriever's queries fuse full-text matches of the query into the vector results."""
+
         retriever: BaseRetriever = self.vector_store_index.as_retriever(
             similarity_top_k=top_k,
-            filters=metadata_filters if metadata_filters.filters else None,
+            vector_store_query_mode=self.query_mode,
+            filters=self.get_knowledge_base_filters(
+                knowledge_base_types=knowledge_base_types, knowledge_base=knowledge_base, extra_filters=extra_filters
+            ),
         )
 
         if not isinstance(retriever, VectorIndexRetriever):
@@ -0,0 +1,159 @@
+from functools import partial
+from logging import Logger
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+from llama_index.core.utils import get_cache_dir
+
+from knowledge_base_mcp.llama_index.embeddings.lazy import LazyEmbedding
+from knowledge_base_mcp.utils.logging import BASE_LOGGER
+
+if TYPE_CHECKING:
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    from onnxruntime import SessionOptions
+
+logger: Logger = BASE_LOGGER.getChild(__name__)
+
+type EmbeddingsBackend = Literal["torch", "onnx", "onnx-int8"]
+"""The runtime embedding models are run with on the CPU."""
+
+type QuantizationConfig = Literal["arm64", "avx2", "avx512", "avx512_vnni"]
+"""The instruction set int8 quantized ONNX models are tuned for."""
+
+EMBEDDINGS_BACKENDS: list[str] = ["torch", "onnx", "onnx-int8"]
+QUANTIZATION_CONFIGS: list[str] = ["arm64", "avx2", "avx512", "avx512_vnni"]
+
+ONNX_MODEL_FILE_NAME = "model.onnx"
+
+
+def onnx_export_dir(model_name: str) -> Path:
+    """The directory a model is exported to ONNX in, under the llama-index cache directory."""
+    return Path(get_cache_dir()) / "onnx" / model_name.replace("/", "--")
+
+
+def onnx_model_file_name(quantization: QuantizationConfig | None = None) -> str:
+    """The file name a model is exported to ONNX as, optionally quantized to int8."""
+    return f"model_qint8_{quantization}.onnx" if quantization else ONNX_MODEL_FILE_NAME
+
+
+def embedding_model_name(model_name: str, backend: EmbeddingsBackend = "torch", quantization: QuantizationConfig = "avx2") -> str:
+    """The name embeddings from a model are cached under.
+
+    Embeddings from an exported or quantized model differ slightly from the original, so they must not share cache entries.
+    """
+    if backend == "torch":
+        return model_name
+
+    return f"{model_name}:{Path(onnx_model_file_name(quantization=quantization if backend == 'onnx-int8' else None)).stem}"
+
+
+def export_onnx_model(model_name: str, export_dir: Path, quantization: QuantizationConfig | None = None) -> str:
+    """Export a sentence-transformers model to ONNX, optionally with dynamic int8 quantization.
+
+    Exports are kept in `export_dir` and re-used, so only the first run pays for the export.
+
+    Returns:
+        The file name of the exported model, which sentence-transformers looks up in `export_dir` and its `onnx` directory.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    file_name: str = onnx_model_file_name(quantization=quantization)
+
+    if (export_dir / file_name).exists() or (export_dir / "onnx" / file_name).exists():
+        return file_name
+
+    logger.info(f"Exporting {model_name} to ONNX in {export_dir}")
+
+    # Loading a model that has no ONNX weights with the ONNX backend converts its PyTorch weights
+    model = SentenceTransformer(model_name_or_path=model_name, backend="onnx", device="cpu")
+    model.save(path=str(export_dir))
+
+    if quantization:
+        logger.info(f"Quantizing {model_name} to int8 for {quantization}")
+        export_dynamic_quantized_onnx_model(model=model, quantization_config=quantization, model_name_or_path=str(export_dir))
+
+    return file_name
+
+
+def onnx_session_options(intra_op_threads: int | None = None) -> "SessionOptions":
+    """Session options for running a single model per process on the CPU."""
+    from onnxruntime import GraphOptimizationLevel, SessionOptions
+
+    session_options = SessionOptions()
+    session_options.graph_optimization_level = GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    if intra_op_threads:
+        session_options.intra_op_num_threads = intra_op_threads
+        session_options.inter_op_num_threads = 1
+
+    return session_options
+
+
+def load_huggingface_embedding(
+    model_name: str,
+    embed_batch_size: int,
+    backend: EmbeddingsBackend = "torch",
+    intra_op_threads: int | None = None,
+    quantization: QuantizationConfig = "avx2",
+) -> "HuggingFaceEmbedding":
+    """Load a sentence-transformers embedding model to run with PyTorch, or with ONNX Runtime on the CPU.
+
+    Args:
+        model_name: The name of the model on the Hugging Face Hub.
+        embed_batch_size: The number of texts to embed at once.
+        backend: `torch` runs the model with PyTorch. `onnx` exports it to ONNX and runs it with ONNX Runtime, and
+            `onnx-int8` additionally quantizes its weights to int8.
+        intra_op_threads: The number of threads a single inference may use. Defaults to the runtime's choice.
+        quantization: The instruction set to quantize for when the backend is `onnx-int8`.
+    """
+    if backend == "torch":
+        from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+        if intra_op_threads:
+            import torch
+
+            torch.set_num_threads(intra_op_threads)
+
+        return HuggingFaceEmbedding(model_name=model_name, embed_batch_size=embed_batch_size)
+
+    from knowledge_base_mcp.llama_index.embeddings.onnx import OnnxHuggingFaceEmbedding
+
+    export_dir: Path = onnx_export_dir(model_name=model_name)
+    file_name: str = export_onnx_model(
+        model_name=model_name, export_dir=export_dir, quantization=quantization if backend == "onnx-int8" else None
+    )
+
+    return OnnxHuggingFaceEmbedding(
+        model_name=embedding_model_name(model_name=model_name, backend=backend, quantization=quantization),
+        export_dir=export_dir,
+        base_model_name=model_name,
+        embed_batch_size=embed_batch_size,
+        device="cpu",
+        model_kwargs={
+            "file_name": file_name,
+            "provider": "CPUExecutionProvider",
+            "session_options": onnx_session_options(intra_op_threads=intra_op_threads),
+        },
+    )
+
+
+def lazy_huggingface_embedding(
+    model_name: str,
+    embed_batch_size: int,
+    backend: EmbeddingsBackend = "torch",
+    intra_op_threads: int | None = None,
+    quantization: QuantizationConfig = "avx2",
+) -> LazyEmbedding:
+    """Defer `load_huggingface_embedding` until the model is first used, or until it is loaded in the background."""
+    return LazyEmbedding(
+        loader=partial(
+            load_huggingface_embedding,
+            model_name=model_name,
+            embed_batch_size=embed_batch_size,
+            backend=backend,
+            intra_op_threads=intra_op_threads,
+            quantization=quantization,
+        ),
+        model_name=embedding_model_name(model_name=model_name, backend=backend, quantization=quantization),
+        embed_batch_size=embed_batch_size,
+    )
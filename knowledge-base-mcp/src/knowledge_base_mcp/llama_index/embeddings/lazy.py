@@ -0,0 +1,134 @@
+import asyncio
+from collections.abc import Callable
+from logging import Logger
+from threading import Lock
+from typing import TYPE_CHECKING, Any, TypeGuard, override
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from pydantic import PrivateAttr
+
+from knowledge_base_mcp.utils.logging import BASE_LOGGER
+
+if TYPE_CHECKING:
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+logger: Logger = BASE_LOGGER.getChild(__name__)
+
+
+def _on_event_loop() -> bool:
+    try:
+        _ = asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+
+    return True
+
+
+def _is_huggingface_embedding(embedding: BaseEmbedding) -> TypeGuard["HuggingFaceEmbedding"]:
+    try:
+        from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    except ImportError:
+        return False
+
+    return isinstance(embedding, HuggingFaceEmbedding)
+
+
+class LazyEmbedding(BaseEmbedding):
+    """An embedding model that is only loaded the first time it is used.
+
+    Importing and loading a model takes several seconds, which servers that never embed anything, or that load the model
+    in the background after they start, should not have to wait for.
+
+    The model name is known up front, so the embeddings cache can be keyed without loading the model.
+    """
+
+    _loader: Callable[[], BaseEmbedding] = PrivateAttr()
+    _embedding: BaseEmbedding | None = PrivateAttr(default=None)
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+    _async_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+    def __init__(self, loader: Callable[[], BaseEmbedding], **kwargs: Any) -> None:  # pyright: ignore[reportAny]
+        super().__init__(**kwargs)  # pyright: ignore[reportAny]
+        self._loader = loader
+
+    @classmethod
+    @override
+    def class_name(cls) -> str:
+        return "LazyEmbedding"
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the model has been loaded."""
+        return self._embedding is not None
+
+    def load(self) -> BaseEmbedding:
+        """Load the model, if it has not been loaded yet. Concurrent callers wait for a single load.
+
+        Code running on the event loop should call `aload` first, as waiting here blocks the event loop."""
+        if self._embedding is None and _on_event_loop():
+            logger.warning(f"Loading embedding model {self.model_name} on the event loop, which blocks it until the model is loaded")
+
+        with self._lock:
+            if self._embedding is None:
+                logger.info(f"Loading embedding model {self.model_name}")
+                self._embedding = self._loader()
+                logger.info(f"Done loading embedding model {self.model_name}")
+
+        return self._embedding
+
+    async def aload(self) -> BaseEmbedding:
+        """Load the model in a thread, so the event loop keeps serving requests while it loads."""
+        if self._embedding is not None:
+            return self._embedding
+
+        # Concurrent callers wait on the event loop for a single load, instead of each occupying a thread
+        async with self._async_lock:
+            return await asyncio.to_thread(self.load)
+
+    @override
+    def to_dict(self, **kwargs: Any) -> dict[str, Any]:  # pyright: ignore[reportAny]
+        """The serialized wrapped model, which describes details like its maximum input length."""
+        return self.load().to_dict(**kwargs)  # pyright: ignore[reportAny]
+
+    @override
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self.load()._get_query_embedding(query)  # pyright: ignore[reportPrivateUsage]
+
+    @override
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await (await self.aload())._aget_query_embedding(query)  # pyright: ignore[reportPrivateUsage]
+
+    @override
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self.load()._get_text_embedding(text)  # pyright: ignore[reportPrivateUsage]
+
+    @override
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return await (await self.aload())._aget_text_embedding(text)  # pyright: ignore[reportPrivateUsage]
+
+    @override
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return self.load()._get_text_embeddings(texts)  # pyright: ignore[reportPrivateUsage]
+
+    @override
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return await (await self.aload())._aget_text_embeddings(texts)  # pyright: ignore[reportPrivateUsage]
+
+    def get_query_embeddings(self, queries: list[str]) -> list[Embedding]:
+        """Embed the queries with a single call to the model for Hugging Face models, and one query at a time otherwise.
+
+        `HuggingFaceEmbedding` has no public way to embed several queries, so they are embedded with the query prompt the
+        way its `_get_query_embedding` embeds a single one.
+        """
+        embedding: BaseEmbedding = self.load()
+
+        if _is_huggingface_embedding(embedding=embedding):
+            return embedding._embed(queries, prompt_name="query")  # pyright: ignore[reportPrivateUsage]
+
+        return [embedding.get_query_embedding(query=query) for query in queries]
+
+    async def aget_query_embeddings(self, queries: list[str]) -> list[Embedding]:
+        """Embed the queries in a thread, so the event loop keeps serving requests while they are embedded."""
+        _ = await self.aload()
+
+        return await asyncio.to_thread(self.get_query_embeddings, queries)
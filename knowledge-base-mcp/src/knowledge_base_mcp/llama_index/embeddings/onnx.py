@@ -0,0 +1,36 @@
+from pathlib import Path
+from typing import Any, override
+
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from llama_index.embeddings.huggingface.utils import get_query_instruct_for_model_name, get_text_instruct_for_model_name
+
+
+class OnnxHuggingFaceEmbedding(HuggingFaceEmbedding):
+    """A sentence-transformers model exported to ONNX, run with ONNX Runtime and named after the model it was exported from.
+
+    `HuggingFaceEmbedding` loads a model from its name, which for an export is the directory it was exported to. This
+    model loads from `export_dir` and keeps `model_name`, so embeddings are cached under the name of the export rather
+    than a local path.
+    """
+
+    def __init__(self, model_name: str, export_dir: Path, base_model_name: str, **kwargs: Any) -> None:  # pyright: ignore[reportAny]
+        """
+        Args:
+            model_name: The name embeddings from the model are cached under.
+            export_dir: The directory the model was exported to.
+            base_model_name: The name of the exported model on the Hugging Face Hub, which its instructions are looked up by.
+        """
+        super().__init__(  # pyright: ignore[reportUnknownMemberType]
+            model_name=str(export_dir),
+            query_instruction=get_query_instruct_for_model_name(base_model_name),
+            text_instruction=get_text_instruct_for_model_name(base_model_name),
+            backend="onnx",
+            **kwargs,
+        )
+
+        self.model_name = model_name
+
+    @classmethod
+    @override
+    def class_name(cls) -> str:
+        return "OnnxHuggingFaceEmbedding"
@@ -11,6 +11,7 @@ from llama_index.core.schema import (
 )
 from llama_index.core.storage.docstore.types import BaseDocumentStore
 
+from knowledge_base_mcp.stores.node_cache import NodeCache, aget_nodes, get_nodes
 from knowledge_base_mcp.utils.logging import BASE_LOGGER
 
 logger: Logger = BASE_LOGGER.getChild(suffix=__name__)
@@ -30,6 +31,9 @@ class GetChildNodesPostprocessor(BaseNodePostprocessor):
     keep_parent_nodes: bool = Field(default=True)
     """Whether to keep the parent nodes in the results."""
 
+    node_cache: NodeCache | None = Field(default=None)
+    """A cache of nodes shared across queries, so hot child nodes are not fetched from the doc store again."""
+
     @classmethod
     @override
     def class_name(cls) -> str:
@@ -43,13 +47,27 @@ class GetChildNodesPostprocessor(BaseNodePostprocessor):
     ) -> list[NodeWithScore]:
         """Postprocess nodes."""
 
+        return self.expand_child_nodes(nodes=nodes, child_nodes=self.gather_child_nodes(nodes_with_scores=nodes))
+
+    @override
+    async def _apostprocess_nodes(
+        self,
+        nodes: list[NodeWithScore],
+        query_bundle: QueryBundle | None = None,
+    ) -> list[NodeWithScore]:
+        """Postprocess nodes (async)."""
+
+        return self.expand_child_nodes(nodes=nodes, child_nodes=await self.agather_child_nodes(nodes_with_scores=nodes))
+
+    def expand_child_nodes(self, nodes: list[NodeWithScore], child_nodes: list[BaseNode]) -> list[NodeWithScore]:
+        """Add the child nodes of the parent nodes, scored like their parent node."""
+
         childless_nodes: list[NodeWithScore] = [node for node in nodes if not node.node.child_nodes]
 
         parent_nodes: list[NodeWithScore] = [node for node in nodes if node.node.child_nodes]
 
         resultant_nodes: list[NodeWithScore] = []
 
-        child_nodes: list[BaseNode] = self.gather_child_nodes(nodes_with_scores=parent_nodes)
         child_nodes_by_id: dict[str, BaseNode] = {child_node.node_id: child_node for child_node in child_nodes}
 
         for parent_node in parent_nodes:
@@ -68,13 +86,21 @@ class GetChildNodesPostprocessor(BaseNodePostprocessor):
 
         return resultant_nodes + childless_nodes
 
+    def child_node_ids(self, nodes_with_scores: list[NodeWithScore]) -> list[str]:
+        """Get the deduplicated ids of the child nodes of the given nodes."""
+
+        return list(
+            dict.fromkeys(child_node.node_id for node in nodes_with_scores if node.node.child_nodes for child_node in node.node.child_nodes)
+        )
+
     def gather_child_nodes(self, nodes_with_scores: list[NodeWithScore]) -> list[BaseNode]:
         """Get the deduplicated set of child nodes for the given nodes."""
 
-        child_nodes_ids: set[str] = {
-            child_node.node_id for node in nodes_with_scores if node.node.child_nodes for child_node in node.node.child_nodes
-        }
+        return get_nodes(node_ids=self.child_node_ids(nodes_with_scores), fetch=self.doc_store.get_nodes, node_cache=self.node_cache)
 
-        new_child_nodes: list[BaseNode] = self.doc_store.get_nodes(node_ids=list(child_nodes_ids))
+    async def agather_child_nodes(self, nodes_with_scores: list[NodeWithScore]) -> list[BaseNode]:
+        """Get the deduplicated set of child nodes for the given nodes, with a single fetch from the doc store."""
 
-        return new_child_nodes
+        return await aget_nodes(
+            node_ids=self.child_node_ids(nodes_with_scores), fetch=self.doc_store.aget_nodes, node_cache=self.node_cache
+        )
@@ -6,27 +6,18 @@ from llama_index.core.bridge.pydantic import Field
 from llama_index.core.postprocessor.types import BaseNodePostprocessor
 from llama_index.core.schema import (
     BaseNode,
-    MetadataMode,
     NodeWithScore,
     QueryBundle,
 )
 from llama_index.core.storage.docstore.types import BaseDocumentStore
 
+from knowledge_base_mcp.llama_index.transformations.metadata import content_size, recorded_child_count, recorded_content_size
+from knowledge_base_mcp.stores.node_cache import NodeCache, aget_nodes, get_nodes
 from knowledge_base_mcp.utils.logging import BASE_LOGGER
 
 logger: Logger = BASE_LOGGER.getChild(suffix=__name__)
 
 
-def get_scored_nodes_size(nodes: list[NodeWithScore]) -> int:
-    """Get the size of the nodes."""
-    return sum(len(node.node.get_content(metadata_mode=MetadataMode.NONE).strip()) for node in nodes)
-
-
-def get_nodes_size(nodes: list[BaseNode]) -> int:
-    """Get the size of the nodes."""
-    return sum(len(node.get_content(metadata_mode=MetadataMode.NONE).strip()) for node in nodes)
-
-
 class GetParentNodesPostprocessor(BaseNodePostprocessor):
     """Get the parent nodes of the child nodes."""
 
@@ -45,6 +36,9 @@ class GetParentNodesPostprocessor(BaseNodePostprocessor):
     maximum_size: int | None = Field(default=None)
     """The maximum size of the parent node to bring in."""
 
+    node_cache: NodeCache | None = Field(default=None)
+    """A cache of nodes shared across queries, so hot parent nodes are not fetched from the doc store again."""
+
     @classmethod
     @override
     def class_name(cls) -> str:
@@ -58,15 +52,34 @@ class GetParentNodesPostprocessor(BaseNodePostprocessor):
     ) -> list[NodeWithScore]:
         """Postprocess nodes."""
 
+        return self.merge_parent_nodes(nodes=nodes, parent_nodes=self.gather_parent_nodes(nodes_with_scores=nodes))
+
+    @override
+    async def _apostprocess_nodes(
+        self,
+        nodes: list[NodeWithScore],
+        query_bundle: QueryBundle | None = None,
+    ) -> list[NodeWithScore]:
+        """Postprocess nodes (async)."""
+
+        return self.merge_parent_nodes(nodes=nodes, parent_nodes=await self.agather_parent_nodes(nodes_with_scores=nodes))
+
+    def merge_parent_nodes(self, nodes: list[NodeWithScore], parent_nodes: list[BaseNode]) -> list[NodeWithScore]:
+        """Replace the child nodes with their parent nodes, where the parent node meets the coverage and size criteria."""
+
         resultant_nodes: list[NodeWithScore] = []
 
         scored_nodes_by_id: dict[str, NodeWithScore] = {node.node_id: node for node in nodes}
+        parent_nodes_by_id: dict[str, BaseNode] = {parent_node.node_id: parent_node for parent_node in parent_nodes}
 
         nodes_without_parents: list[NodeWithScore] = [node for node in nodes if not node.node.parent_node]
 
-        parent_nodes: list[BaseNode] = self.gather_parent_nodes(nodes_with_scores=nodes)
+        for parent_id, children in self.children_by_parent_id(nodes_with_scores=nodes).items():
+            if (parent_node := parent_nodes_by_id.get(parent_id)) is None:
+                # The parent node was ruled out by its recorded size, so it was never fetched.
+                resultant_nodes.extend(children)
+                continue
 
-        for parent_node in parent_nodes:
             if not parent_node.child_nodes:
                 msg = f"No child nodes found for the parent node {parent_node.node_id}!"
                 raise ValueError(msg)
@@ -76,14 +89,11 @@ class GetParentNodesPostprocessor(BaseNodePostprocessor):
             ]
 
             child_coverage = len(scored_children) / len(parent_node.child_nodes)
-            parent_size = get_nodes_size(nodes=[parent_node])
 
-            # If the child coverage is too low or the parent size is too small, skip this node.
-            small_enough: bool = parent_size < (self.minimum_size or 0)
-            low_coverage: bool = child_coverage < self.minimum_coverage
-            too_large: bool = (parent_size > self.maximum_size) if self.maximum_size else False
+            recorded_size: int | None = recorded_content_size(related_node=parent) if (parent := children[0].node.parent_node) else None
+            parent_size: int = recorded_size if recorded_size is not None else content_size(node=parent_node)
 
-            if not small_enough and (low_coverage or too_large):
+            if not self.brings_in_parent(parent_size=parent_size, child_coverage=child_coverage):
                 logger.debug(
                     f"Skipping parent node {parent_node.node_id} because it does not meet the minimum child coverage or size criteria."
                 )
@@ -98,6 +108,30 @@ class GetParentNodesPostprocessor(BaseNodePostprocessor):
 
         return resultant_nodes + nodes_without_parents
 
+    def brings_in_parent(self, parent_size: int, child_coverage: float) -> bool:
+        """Whether a parent node of this size, with this fraction of its children in the results, replaces its children."""
+
+        # If the child coverage is too low or the parent size is too large, skip the parent unless it is small.
+        small_enough: bool = parent_size < (self.minimum_size or 0)
+        low_coverage: bool = child_coverage < self.minimum_coverage
+        too_large: bool = (parent_size > self.maximum_size) if self.maximum_size else False
+
+        return small_enough or not (low_coverage or too_large)
+
+    def is_ruled_out(self, children: list[NodeWithScore]) -> bool:
+        """Whether the recorded size and child count of the children's parent node rule it out, without fetching it."""
+
+        if not (parent := children[0].node.parent_node):
+            return False
+
+        parent_size: int | None = recorded_content_size(related_node=parent)
+        child_count: int | None = recorded_child_count(related_node=parent)
+
+        if parent_size is None or not child_count:
+            return False
+
+        return not self.brings_in_parent(parent_size=parent_size, child_coverage=len(children) / child_count)
+
     def new_scored_node(self, parent_node: BaseNode, children: list[NodeWithScore]) -> NodeWithScore:
         """Create a new scored node from the parent node and the children."""
 
@@ -105,16 +139,34 @@ class GetParentNodesPostprocessor(BaseNodePostprocessor):
 
         return NodeWithScore(node=parent_node, score=sum(scores) / len(scores))
 
-    def gather_parent_nodes(self, nodes_with_scores: list[NodeWithScore]) -> list[BaseNode]:
-        """Get the deduplicated set of parent nodes for the given nodes."""
+    def children_by_parent_id(self, nodes_with_scores: list[NodeWithScore]) -> dict[str, list[NodeWithScore]]:
+        """Group the deduplicated nodes by the id of their parent node, in order of appearance."""
 
-        nodes_with_parents: list[NodeWithScore] = [node for node in nodes_with_scores if node.node.parent_node]
+        children_by_parent_id: dict[str, dict[str, NodeWithScore]] = defaultdict(dict)
 
-        nodes_by_parent_id: dict[str, list[NodeWithScore]] = defaultdict(list)
-        for node in nodes_with_parents:
+        for node in nodes_with_scores:
             if node.node.parent_node:
-                nodes_by_parent_id[node.node.parent_node.node_id].append(node)
+                _ = children_by_parent_id[node.node.parent_node.node_id].setdefault(node.node_id, node)
+
+        return {parent_id: list(children.values()) for parent_id, children in children_by_parent_id.items()}
+
+    def parent_node_ids(self, nodes_with_scores: list[NodeWithScore]) -> list[str]:
+        """Get the deduplicated ids of the parent nodes of the given nodes that are not ruled out by their recorded size."""
+
+        return [
+            parent_id
+            for parent_id, children in self.children_by_parent_id(nodes_with_scores=nodes_with_scores).items()
+            if not self.is_ruled_out(children=children)
+        ]
+
+    def gather_parent_nodes(self, nodes_with_scores: list[NodeWithScore]) -> list[BaseNode]:
+        """Get the deduplicated set of parent nodes for the given nodes."""
+
+        return get_nodes(node_ids=self.parent_node_ids(nodes_with_scores), fetch=self.doc_store.get_nodes, node_cache=self.node_cache)
 
-        parent_nodes: list[BaseNode] = self.doc_store.get_nodes(node_ids=list(nodes_by_parent_id.keys()))
+    async def agather_parent_nodes(self, nodes_with_scores: list[NodeWithScore]) -> list[BaseNode]:
+        """Get the deduplicated set of parent nodes for the given nodes, with a single fetch from the doc store."""
 
-        return parent_nodes
+        return await aget_nodes(
+            node_ids=self.parent_node_ids(nodes_with_scores), fetch=self.doc_store.aget_nodes, node_cache=self.node_cache
+        )
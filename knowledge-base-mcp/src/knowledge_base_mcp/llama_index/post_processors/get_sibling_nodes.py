@@ -5,23 +5,20 @@ from llama_index.core.bridge.pydantic import Field
 from llama_index.core.postprocessor.types import BaseNodePostprocessor
 from llama_index.core.schema import (
     BaseNode,
-    MetadataMode,
     NodeWithScore,
     QueryBundle,
+    RelatedNodeInfo,
 )
 from llama_index.core.storage.docstore.types import BaseDocumentStore
 from llama_index.core.vector_stores.types import BasePydanticVectorStore
 
+from knowledge_base_mcp.llama_index.transformations.metadata import content_size, recorded_content_size
+from knowledge_base_mcp.stores.node_cache import NodeCache, aget_nodes, get_nodes
 from knowledge_base_mcp.utils.logging import BASE_LOGGER
 
 logger: Logger = BASE_LOGGER.getChild(suffix=__name__)
 
 
-def get_nodes_size(nodes: list[NodeWithScore]) -> int:
-    """Get the size of the nodes."""
-    return sum(len(node.node.get_content(metadata_mode=MetadataMode.NONE).strip()) for node in nodes)
-
-
 class GetSiblingNodesPostprocessor(BaseNodePostprocessor):
     """Get the sibling nodes of the given nodes. The score for the nodes is the
     average of the scores of the previous and next nodes if they exist."""
@@ -35,6 +32,9 @@ class GetSiblingNodesPostprocessor(BaseNodePostprocessor):
     maximum_size: int = Field(default=1024)
     """The maximum size of the sibling node to bring in."""
 
+    node_cache: NodeCache | None = Field(default=None)
+    """A cache of nodes shared across queries, so hot sibling nodes are not fetched again."""
+
     @classmethod
     @override
     def class_name(cls) -> str:
@@ -48,15 +48,36 @@ class GetSiblingNodesPostprocessor(BaseNodePostprocessor):
     ) -> list[NodeWithScore]:
         """Postprocess nodes."""
 
-        expandable_nodes: list[NodeWithScore] = [node for node in nodes if node.node.prev_node or node.node.next_node]
-        expandable_nodes_by_id: dict[str, NodeWithScore] = {node.node_id: node for node in expandable_nodes}
+        return self.add_sibling_nodes(nodes=nodes, sibling_nodes=self.gather_siblings(nodes_with_scores=nodes))
 
-        new_nodes: list[NodeWithScore] = nodes.copy()
+    @override
+    async def _apostprocess_nodes(
+        self,
+        nodes: list[NodeWithScore],
+        query_bundle: QueryBundle | None = None,
+    ) -> list[NodeWithScore]:
+        """Postprocess nodes (async)."""
+
+        return self.add_sibling_nodes(nodes=nodes, sibling_nodes=await self.agather_siblings(nodes_with_scores=nodes))
 
-        sibling_nodes: list[BaseNode] = self.gather_siblings(nodes_with_scores=expandable_nodes)
+    def add_sibling_nodes(self, nodes: list[NodeWithScore], sibling_nodes: list[BaseNode]) -> list[NodeWithScore]:
+        """Add the sibling nodes that are small enough, scored by the nodes next to them."""
+
+        expandable_nodes_by_id: dict[str, NodeWithScore] = {
+            node.node_id: node for node in nodes if node.node.prev_node or node.node.next_node
+        }
+
+        recorded_sizes: dict[str, int | None] = {
+            sibling.node_id: recorded_content_size(related_node=sibling) for sibling in self.siblings(nodes)
+        }
+
+        new_nodes: list[NodeWithScore] = nodes.copy()
 
         for sibling_node in sibling_nodes:
-            if len(sibling_node.get_content(metadata_mode=MetadataMode.NONE).strip()) > self.maximum_size:
+            if (sibling_size := recorded_sizes.get(sibling_node.node_id)) is None:
+                sibling_size = content_size(node=sibling_node)
+
+            if sibling_size > self.maximum_size:
                 continue
 
             sibling_nodes_scores: list[float] = []
@@ -75,32 +96,65 @@ class GetSiblingNodesPostprocessor(BaseNodePostprocessor):
 
         return new_nodes
 
-    def gather_siblings(self, nodes_with_scores: list[NodeWithScore]) -> list[BaseNode]:
-        """Get the deduplicated set of sibling nodes for the given nodes."""
+    def siblings(self, nodes_with_scores: list[NodeWithScore]) -> list[RelatedNodeInfo]:
+        """Get the previous and next nodes of the given nodes that are not already in the results."""
 
         current_node_ids: set[str] = {node.node_id for node in nodes_with_scores}
 
-        prev_sibling_nodes_ids: set[str] = {
-            node.node.prev_node.node_id
+        return [
+            sibling
             for node in nodes_with_scores
-            if node.node.prev_node and node.node.prev_node.node_id not in current_node_ids
-        }
-        next_sibling_nodes_ids: set[str] = {
-            node.node.next_node.node_id
-            for node in nodes_with_scores
-            if node.node.next_node and node.node.next_node.node_id not in current_node_ids
-        }
+            for sibling in (node.node.prev_node, node.node.next_node)
+            if sibling and sibling.node_id not in current_node_ids
+        ]
+
+    def sibling_node_ids(self, nodes_with_scores: list[NodeWithScore]) -> list[str]:
+        """Get the deduplicated ids of the sibling nodes to fetch, leaving out siblings whose recorded size is too large."""
 
-        nodes_to_fetch = prev_sibling_nodes_ids | next_sibling_nodes_ids
+        return list(
+            dict.fromkeys(
+                sibling.node_id
+                for sibling in self.siblings(nodes_with_scores)
+                if (recorded_content_size(related_node=sibling) or 0) <= self.maximum_size
+            )
+        )
+
+    def fetch_siblings(self, node_ids: list[str]) -> list[BaseNode]:
+        """Fetch the sibling nodes from the vector store if it stores text, and the rest from the doc store."""
 
         new_sibling_nodes: list[BaseNode] = []
 
         if self.vector_store and self.vector_store.stores_text:
-            new_sibling_nodes = self.vector_store.get_nodes(node_ids=list(nodes_to_fetch))
+            new_sibling_nodes = self.vector_store.get_nodes(node_ids=node_ids)
 
-        missing_nodes = nodes_to_fetch - {node.node_id for node in new_sibling_nodes}
+        fetched_node_ids: set[str] = {node.node_id for node in new_sibling_nodes}
 
-        if missing_nodes:
-            new_sibling_nodes.extend(self.doc_store.get_nodes(node_ids=list(missing_nodes)))
+        if missing_nodes := [node_id for node_id in node_ids if node_id not in fetched_node_ids]:
+            new_sibling_nodes.extend(self.doc_store.get_nodes(node_ids=missing_nodes))
 
         return new_sibling_nodes
+
+    async def afetch_siblings(self, node_ids: list[str]) -> list[BaseNode]:
+        """Fetch the sibling nodes from the vector store if it stores text, and the rest from the doc store."""
+
+        new_sibling_nodes: list[BaseNode] = []
+
+        if self.vector_store and self.vector_store.stores_text:
+            new_sibling_nodes = await self.vector_store.aget_nodes(node_ids=node_ids)
+
+        fetched_node_ids: set[str] = {node.node_id for node in new_sibling_nodes}
+
+        if missing_nodes := [node_id for node_id in node_ids if node_id not in fetched_node_ids]:
+            new_sibling_nodes.extend(await self.doc_store.aget_nodes(node_ids=missing_nodes))
+
+        return new_sibling_nodes
+
+    def gather_siblings(self, nodes_with_scores: list[NodeWithScore]) -> list[BaseNode]:
+        """Get the deduplicated set of sibling nodes for the given nodes."""
+
+        return get_nodes(node_ids=self.sibling_node_ids(nodes_with_scores), fetch=self.fetch_siblings, node_cache=self.node_cache)
+
+    async def agather_siblings(self, nodes_with_scores: list[NodeWithScore]) -> list[BaseNode]:
+        """Get the deduplicated set of sibling nodes for the given nodes, with a single fetch per store."""
+
+        return await aget_nodes(node_ids=self.sibling_node_ids(nodes_with_scores), fetch=self.afetch_siblings, node_cache=self.node_cache)
@@ -0,0 +1,169 @@
+import heapq
+from abc import abstractmethod
+from logging import Logger
+from threading import Lock
+from typing import TYPE_CHECKING, Any, ClassVar, override
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+from pydantic import ConfigDict
+
+from knowledge_base_mcp.stores.embedding_cache import content_hash
+from knowledge_base_mcp.stores.rerank_score_cache import RerankScoreCache
+from knowledge_base_mcp.utils.logging import BASE_LOGGER
+
+if TYPE_CHECKING:
+    from flashrank import Ranker
+
+logger: Logger = BASE_LOGGER.getChild(suffix=__name__)
+
+
+def node_score(node: NodeWithScore) -> float:
+    """The score of a node, with unscored nodes ranked last."""
+    return node.score if node.score is not None else float("-inf")
+
+
+class RerankPostprocessor(BaseNodePostprocessor):
+    """Rerank nodes with a cross-encoder, scoring only as many candidates as needed.
+
+    Candidates are scored in descending retrieval order. With `early_exit_top_k`, they are scored in batches and scoring
+    stops once a batch leaves the top k unchanged. Candidates that are not scored are dropped from the results.
+    """
+
+    model_config: ClassVar[ConfigDict] = ConfigDict(use_attribute_docstrings=True, arbitrary_types_allowed=True)
+    """The model config."""
+
+    top_n: int = Field(default=1000)
+    """The number of nodes to return, sorted by score."""
+
+    max_candidates: int | None = Field(default=None)
+    """The maximum number of candidates to score. Defaults to scoring every candidate."""
+
+    early_exit_top_k: int | None = Field(default=None)
+    """Stop scoring once a batch of candidates leaves the top k unchanged. Defaults to scoring every candidate."""
+
+    early_exit_batch_size: int = Field(default=16, ge=1)
+    """The number of candidates to score between checks of the top k."""
+
+    score_cache: RerankScoreCache | None = Field(default=None)
+    """A cache of scores by query and content, so repeated queries do not score the same content again."""
+
+    @abstractmethod
+    def _score(self, query: str, texts: list[str]) -> list[float]:
+        """Score each of the texts for the query."""
+
+    def _cached_scores(self, query: str, nodes: list[NodeWithScore]) -> list[float]:
+        texts: list[str] = [node.node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+
+        if self.score_cache is None:
+            return self._score(query=query, texts=texts)
+
+        content_hashes: list[str] = [content_hash(content=text) for text in texts]
+
+        scores: dict[str, float] = self.score_cache.get_many(query=query, content_hashes=content_hashes)
+
+        if missing := [index for index, text_hash in enumerate(content_hashes) if text_hash not in scores]:
+            new_scores: list[float] = self._score(query=query, texts=[texts[index] for index in missing])
+
+            fresh_scores: dict[str, float] = {content_hashes[index]: score for index, score in zip(missing, new_scores, strict=True)}
+
+            self.score_cache.put_many(query=query, scores=fresh_scores)
+            scores.update(fresh_scores)
+
+        return [scores[text_hash] for text_hash in content_hashes]
+
+    def _top_k_ids(self, nodes: list[NodeWithScore], k: int) -> set[str]:
+        return {node.node.node_id for node in heapq.nlargest(k, nodes, key=node_score)}
+
+    @override
+    def _postprocess_nodes(
+        self,
+        nodes: list[NodeWithScore],
+        query_bundle: QueryBundle | None = None,
+    ) -> list[NodeWithScore]:
+        """Postprocess nodes."""
+
+        if query_bundle is None:
+            msg = "Missing query bundle in extra info."
+            raise ValueError(msg)
+
+        candidates: list[NodeWithScore] = sorted(nodes, key=node_score, reverse=True)[: self.max_candidates]
+
+        batch_size: int = self.early_exit_batch_size if self.early_exit_top_k else max(len(candidates), 1)
+
+        scored_nodes: list[NodeWithScore] = []
+        top_k_ids: set[str] = set()
+
+        for start in range(0, len(candidates), batch_size):
+            batch: list[NodeWithScore] = candidates[start : start + batch_size]
+
+            for node, score in zip(batch, self._cached_scores(query=query_bundle.query_str, nodes=batch), strict=True):
+                node.score = score
+
+            scored_nodes.extend(batch)
+
+            if not self.early_exit_top_k or len(scored_nodes) < self.early_exit_top_k:
+                continue
+
+            previous_top_k_ids, top_k_ids = top_k_ids, self._top_k_ids(nodes=scored_nodes, k=self.early_exit_top_k)
+
+            if top_k_ids == previous_top_k_ids:
+                break
+
+        logger.debug(f"Scored {len(scored_nodes)} of {len(nodes)} candidates")
+
+        if self.score_cache is not None:
+            logger.debug(f"Rerank score cache: {self.score_cache.stats()}")
+
+        return sorted(scored_nodes, key=node_score, reverse=True)[: self.top_n]
+
+
+class FlashRankRerankPostprocessor(RerankPostprocessor):
+    """Rerank nodes with a FlashRank cross-encoder, which is loaded the first time it scores.
+
+    Scoring runs in a thread (see `apostprocess_nodes`), so loading the model never blocks the event loop.
+    """
+
+    model: str = Field(default="ms-marco-TinyBERT-L-2-v2")
+    """The FlashRank model name."""
+
+    max_length: int = Field(default=512)
+    """The maximum length of the text passed to the reranker."""
+
+    _ranker: "Ranker | None" = PrivateAttr(default=None)
+    _ranker_lock: Lock = PrivateAttr(default_factory=Lock)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the model has been loaded."""
+        return self._ranker is not None
+
+    def load(self) -> "Ranker":
+        """Load the model, if it has not been loaded yet. Concurrent callers wait for a single load."""
+        with self._ranker_lock:
+            if self._ranker is None:
+                from flashrank import Ranker
+
+                logger.info(f"Loading reranker model {self.model}")
+                self._ranker = Ranker(model_name=self.model, max_length=self.max_length)
+                logger.info(f"Done loading reranker model {self.model}")
+
+        return self._ranker
+
+    @classmethod
+    @override
+    def class_name(cls) -> str:
+        return "FlashRankRerankPostprocessor"
+
+    @override
+    def _score(self, query: str, texts: list[str]) -> list[float]:
+        from flashrank import RerankRequest
+
+        results: list[dict[str, Any]] = self.load().rerank(  # pyright: ignore[reportUnknownMemberType]
+            RerankRequest(query=query, passages=[{"id": index, "text": text} for index, text in enumerate(texts)])
+        )
+
+        scores_by_index: dict[int, float] = {result["id"]: float(result["score"]) for result in results}  # pyright: ignore[reportAny]
+
+        return [scores_by_index[index] for index in range(len(texts))]
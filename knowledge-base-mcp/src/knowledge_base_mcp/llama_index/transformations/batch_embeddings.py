@@ -1,4 +1,6 @@
+import asyncio
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
 from typing import Any, ClassVar, override
 
@@ -6,19 +8,29 @@ from llama_index.core.embeddings import BaseEmbedding
 from llama_index.core.schema import (
     BaseNode,
     Document,
+    MetadataMode,
     TransformComponent,
 )
 from pydantic import ConfigDict, Field
 
+from knowledge_base_mcp.stores.embedding_cache import EmbeddingCache, content_hash
 from knowledge_base_mcp.utils.logging import BASE_LOGGER
 
 logger: Logger = BASE_LOGGER.getChild(__name__)
 
 LARGE_BATCH_SIZE_THRESHOLD = 1000
 
+type EmbeddingBatch = list[tuple[BaseNode, str]]
+"""A batch of nodes to embed, each with the hash of its content, which is empty when there is no embedding cache."""
+
 
 class BatchedNodeEmbedding(TransformComponent):
-    """Embeds nodes in sequential batches."""
+    """Embeds nodes in batches of nodes of similar length.
+
+    Nodes are sorted by the length of their content before they are batched, so that short nodes are not padded to the
+    length of the longest node in a mixed batch. Embeddings are set on the nodes themselves, so the nodes are returned in
+    their original order.
+    """
 
     model_config: ClassVar[ConfigDict] = ConfigDict(use_attribute_docstrings=True, arbitrary_types_allowed=True)
 
@@ -26,36 +38,118 @@ class BatchedNodeEmbedding(TransformComponent):
 
     leaf_node_only: bool = Field(default=False, description="Whether to only embed leaf nodes.")
 
+    sort_by_length: bool = Field(default=True, description="Whether to batch nodes of similar length together.")
+
+    num_workers: int = Field(default=1, ge=1, description="The number of batches to embed concurrently.")
+
     embed_model: BaseEmbedding
 
-    def _get_batches(self, nodes: Sequence[BaseNode]) -> list[Sequence[BaseNode]]:
-        """Get batches of nodes."""
+    embedding_cache: EmbeddingCache | None = Field(default=None, description="A cache of embeddings keyed by the content of the node.")
+
+    def _apply_cached_embeddings(self, nodes: list[BaseNode], contents: list[str]) -> list[tuple[BaseNode, str, int]]:
+        """Set the embeddings of nodes whose content is cached and return the nodes that still need to be embedded, each
+        with the hash and the length of its content."""
+
+        if self.embedding_cache is None:
+            return [(node, "", len(content)) for node, content in zip(nodes, contents, strict=True)]
+
+        content_hashes: list[str] = [content_hash(content) for content in contents]
+
+        cached_embeddings: dict[str, list[float]] = (
+            self.embedding_cache.get_many(model_name=self.embed_model.model_name, content_hashes=content_hashes) if nodes else {}
+        )
+
+        uncached_nodes: list[tuple[BaseNode, str, int]] = []
+
+        for node, content, node_content_hash in zip(nodes, contents, content_hashes, strict=True):
+            if (embedding := cached_embeddings.get(node_content_hash)) is not None:
+                node.embedding = embedding
+            else:
+                uncached_nodes.append((node, node_content_hash, len(content)))
+
+        if nodes:
+            logger.info(f"Embedding cache served {len(nodes) - len(uncached_nodes)} of {len(nodes)} nodes ({self.embedding_cache.stats()})")
+
+        return uncached_nodes
+
+    def _cache_embeddings(self, batch: EmbeddingBatch) -> None:
+        """Add the embeddings of freshly embedded nodes to the cache."""
+
+        if self.embedding_cache is None:
+            return
+
+        self.embedding_cache.put_many(
+            model_name=self.embed_model.model_name,
+            embeddings={node_content_hash: node.embedding for node, node_content_hash in batch if node.embedding is not None},
+        )
+
+    def _get_batches(self, nodes: Sequence[BaseNode]) -> list[EmbeddingBatch]:
+        """Get batches of the nodes that are not already in the embedding cache.
+
+        The content of each node is built once, for both the cache lookup and the sort by length."""
 
         if self.leaf_node_only:
             leaf_nodes: list[BaseNode] = [node for node in nodes if node.child_nodes is None and not isinstance(node, Document)]
         else:
             leaf_nodes = list(nodes)
 
-        if len(leaf_nodes) > LARGE_BATCH_SIZE_THRESHOLD:
-            logger.warning(f"Large batch of {len(leaf_nodes)} leaf nodes, embedding in batches of {self.batch_size}")
+        uncached_nodes: list[tuple[BaseNode, str, int]] = self._apply_cached_embeddings(
+            nodes=leaf_nodes, contents=[node.get_content(metadata_mode=MetadataMode.EMBED) for node in leaf_nodes]
+        )
+
+        if self.sort_by_length:
+            # Characters are a cheap proxy for tokens, longest first so the slowest batches start first
+            uncached_nodes.sort(key=lambda uncached_node: uncached_node[2], reverse=True)
+
+        if len(uncached_nodes) > LARGE_BATCH_SIZE_THRESHOLD:
+            logger.warning(f"Large batch of {len(uncached_nodes)} leaf nodes, embedding in batches of {self.batch_size}")
+
+        return [
+            [(node, node_content_hash) for node, node_content_hash, _ in uncached_nodes[i : i + self.batch_size]]
+            for i in range(0, len(uncached_nodes), self.batch_size)
+        ]
+
+    def _embed_batch(self, batch: EmbeddingBatch) -> None:
+        """Embed a batch of nodes and cache the embeddings."""
 
-        return [leaf_nodes[i : i + self.batch_size] for i in range(0, len(leaf_nodes), self.batch_size)]
+        _ = self.embed_model(nodes=[node for node, _ in batch])
+        self._cache_embeddings(batch=batch)
+
+    def _embed_batches(self, batches: list[EmbeddingBatch]) -> None:
+        """Embed the batches, up to `num_workers` at a time."""
+
+        if self.num_workers == 1 or len(batches) <= 1:
+            for batch in batches:
+                self._embed_batch(batch=batch)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.num_workers, len(batches)), thread_name_prefix="embed") as executor:
+            for _ in executor.map(self._embed_batch, batches):
+                pass
 
     @override
     def __call__(self, nodes: Sequence[BaseNode], **kwargs: Any) -> Sequence[BaseNode]:  # pyright: ignore[reportAny]
         """Embed the leaf nodes."""
 
-        for batch in self._get_batches(nodes=nodes):
-            _ = self.embed_model(nodes=batch)
+        self._embed_batches(batches=self._get_batches(nodes=nodes))
 
         return nodes
 
     @override
     async def acall(self, nodes: Sequence[BaseNode], **kwargs: Any) -> Sequence[BaseNode]:  # pyright: ignore[reportAny]
-        """Async embed the leaf nodes."""
+        """Async embed the leaf nodes.
+
+        The embedding cache is read and written in a thread, so its DuckDB queries do not block the event loop."""
+
+        batches: list[EmbeddingBatch] = await asyncio.to_thread(self._get_batches, nodes=nodes)
+
+        if self.num_workers > 1:
+            await asyncio.to_thread(self._embed_batches, batches=batches)
+            return nodes
 
-        for batch in self._get_batches(nodes=nodes):
-            _ = await self.embed_model.acall(nodes=batch)
+        for batch in batches:
+            _ = await self.embed_model.acall(nodes=[node for node, _ in batch])
+            await asyncio.to_thread(self._cache_embeddings, batch=batch)
 
         return nodes
 
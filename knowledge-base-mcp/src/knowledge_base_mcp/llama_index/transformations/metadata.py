@@ -4,11 +4,35 @@ from typing import Any, override
 
 from llama_index.core.schema import (
     BaseNode,
+    MetadataMode,
     RelatedNodeInfo,
     TransformComponent,
 )
 from pydantic import ConfigDict, Field
 
+CONTENT_SIZE_KEY = "content_size"
+"""The metadata key of the size of a related node's content."""
+
+CHILD_COUNT_KEY = "child_count"
+"""The metadata key of the number of children of a related node."""
+
+
+def content_size(node: BaseNode) -> int:
+    """The size of the node's content, without metadata."""
+    return len(node.get_content(metadata_mode=MetadataMode.NONE).strip())
+
+
+def recorded_content_size(related_node: RelatedNodeInfo) -> int | None:
+    """The size of the related node's content, if it was recorded at ingestion."""
+    size = related_node.metadata.get(CONTENT_SIZE_KEY)
+    return size if isinstance(size, int) else None
+
+
+def recorded_child_count(related_node: RelatedNodeInfo) -> int | None:
+    """The number of children of the related node, if it was recorded at ingestion."""
+    child_count = related_node.metadata.get(CHILD_COUNT_KEY)
+    return child_count if isinstance(child_count, int) else None
+
 
 class AddMetadata(TransformComponent):
     """Adds metadata to the node."""
@@ -188,3 +212,28 @@ class FlattenMetadata(TransformComponent):
                 new_value = str(value)  # pyright: ignore[reportAny]
 
             metadata[key] = new_value
+
+
+class AddSizeMetadata(TransformComponent):
+    """Adds the content size and child count of each node to the metadata of the relationships that point at it.
+
+    Post-processors read the size of a parent or sibling from the nodes they already have, instead of fetching it. The
+    node's own metadata is left alone, as it is part of the node's hash. Only relationships between nodes of the same
+    batch are annotated.
+    """
+
+    @override
+    def __call__(self, nodes: Sequence[BaseNode], **kwargs: Any) -> Sequence[BaseNode]:  # pyright: ignore[reportAny]
+        sizes: dict[str, dict[str, int]] = {
+            node.node_id: {CONTENT_SIZE_KEY: content_size(node=node), CHILD_COUNT_KEY: len(node.child_nodes or [])} for node in nodes
+        }
+
+        for node in nodes:
+            for relationship in node.relationships.values():
+                related_nodes: list[RelatedNodeInfo] = relationship if isinstance(relationship, list) else [relationship]
+
+                for related_node in related_nodes:
+                    if size := sizes.get(related_node.node_id):
+                        related_node.metadata.update(size)
+
+        return nodes
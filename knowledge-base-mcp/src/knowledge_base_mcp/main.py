@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, Any, ClassVar
 import asyncclick as click
 from fastmcp import FastMCP
 from fastmcp.server.server import Transport
+from fastmcp.tools import Tool as FastMCPTool
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.bridge.pydantic import BaseModel, ConfigDict
 from llama_index.core.indices.loading import load_indices_from_storage  # pyright: ignore[reportUnknownVariableType]
@@ -16,11 +17,27 @@ from llama_index.core.storage.index_store.types import BaseIndexStore
 from llama_index.core.storage.storage_context import StorageContext
 
 from knowledge_base_mcp.clients.knowledge_base import KnowledgeBaseClient
+from knowledge_base_mcp.llama_index.embeddings.huggingface import (
+    EMBEDDINGS_BACKENDS,
+    QUANTIZATION_CONFIGS,
+    EmbeddingsBackend,
+    QuantizationConfig,
+    lazy_huggingface_embedding,
+)
 from knowledge_base_mcp.servers.github import GitHubServer
 from knowledge_base_mcp.servers.ingest.filesystem import FilesystemIngestServer
 from knowledge_base_mcp.servers.ingest.web import WebIngestServer
 from knowledge_base_mcp.servers.manage import KnowledgeBaseManagementServer
 from knowledge_base_mcp.servers.search.docs import DocumentationSearchServer
+from knowledge_base_mcp.stores.embedding_cache import DEFAULT_QUERY_CACHE_SIZE, DEFAULT_QUERY_CACHE_TTL, EmbeddingCache, QueryEmbeddingCache
+from knowledge_base_mcp.stores.node_cache import DEFAULT_NODE_CACHE_SIZE, NodeCache
+from knowledge_base_mcp.stores.rerank_score_cache import DEFAULT_RERANK_SCORE_CACHE_SIZE, RerankScoreCache
+from knowledge_base_mcp.stores.search_result_cache import (
+    DEFAULT_SEARCH_RESULT_CACHE_SIZE,
+    DuckDBSearchResultCache,
+    InMemorySearchResultCache,
+    SearchResultCache,
+)
 from knowledge_base_mcp.stores.vector_stores import EnhancedBaseVectorStore
 from knowledge_base_mcp.utils.logging import BASE_LOGGER
 from knowledge_base_mcp.utils.patches import apply_patches
@@ -42,6 +59,8 @@ class Store(BaseModel):
     document: BaseDocumentStore
     index: BaseIndexStore
     embeddings: BaseEmbedding
+    embeddings_cache: EmbeddingCache | None = None
+    embeddings_workers: int = 1
     rerank_model_name: str
 
     @cached_property
@@ -78,7 +97,29 @@ class PartialCliContext(BaseModel):
     model_config: ClassVar[ConfigDict] = ConfigDict(arbitrary_types_allowed=True)
 
     document_embeddings: BaseEmbedding
+    document_embeddings_workers: int
+    document_embeddings_cache: bool
+    document_embeddings_cache_path: Path | None
     document_reranker_model: str
+    duckdb_hnsw_index: dict[str, int | bool] | None = None
+    """The parameters of the HNSW index of the DuckDB vector store, or None to search every embedding."""
+    duckdb_indexed_metadata_keys: list[str] | None = None
+    """The metadata keys the DuckDB vector store copies into indexed columns, or None for the default keys."""
+
+    def embeddings_cache(self, default_path: Path | None = None) -> EmbeddingCache | None:
+        """Open the document embeddings cache at its path, falling back to `default_path`.
+
+        Without a path there is no cache, as an in-memory cache would hold a copy of every embedding and be lost on exit."""
+        if not self.document_embeddings_cache:
+            return None
+
+        if (cache_path := self.document_embeddings_cache_path or default_path) is None:
+            logger.info("No document embeddings cache path, not caching document embeddings")
+            return None
+
+        logger.info(f"Loading document embeddings cache: {cache_path}")
+
+        return EmbeddingCache(database_path=cache_path)
 
 
 class CliContext(BaseModel):
@@ -90,30 +131,53 @@ class CliContext(BaseModel):
 DEFAULT_DOCS_CROSS_ENCODER_MODEL = "ms-marco-TinyBERT-L-2-v2"
 DEFAULT_DOCS_EMBEDDINGS_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 DEFAULT_DOCS_EMBEDDINGS_BATCH_SIZE = 64
+DEFAULT_DOCS_EMBEDDINGS_WORKERS = 1
+DEFAULT_DOCS_EMBEDDINGS_CACHE_NAME = "embeddings_cache.duckdb"
 
 
 @click.group()
 @click.pass_context
 @click.option("--document-embeddings-model", type=str, default=DEFAULT_DOCS_EMBEDDINGS_MODEL)
 @click.option("--document-embeddings-batch-size", type=int, default=DEFAULT_DOCS_EMBEDDINGS_BATCH_SIZE)
+@click.option("--document-embeddings-backend", type=click.Choice(EMBEDDINGS_BACKENDS), default="torch")
+@click.option("--document-embeddings-quantization", type=click.Choice(QUANTIZATION_CONFIGS), default="avx2")
+@click.option("--document-embeddings-threads", type=click.IntRange(min=1), default=None)
+@click.option("--document-embeddings-workers", type=click.IntRange(min=1), default=DEFAULT_DOCS_EMBEDDINGS_WORKERS)
+@click.option("--document-embeddings-cache/--no-document-embeddings-cache", default=True)
+@click.option(
+    "--document-embeddings-cache-path",
+    envvar="DOCUMENT_EMBEDDINGS_CACHE_PATH",
+    type=click.Path(path_type=Path),
+    default=None,
+    show_envvar=True,
+)
 @click.option("--document-reranker-model", type=str, default=DEFAULT_DOCS_CROSS_ENCODER_MODEL)
-def cli(
+def cli(  # noqa: PLR0917
     ctx: click.Context,
     document_embeddings_model: str,
     document_embeddings_batch_size: int,
+    document_embeddings_backend: EmbeddingsBackend,
+    document_embeddings_quantization: QuantizationConfig,
+    document_embeddings_threads: int | None,
+    document_embeddings_workers: int,
+    document_embeddings_cache: bool,
+    document_embeddings_cache_path: Path | None,
     document_reranker_model: str,
 ) -> None:
-    logger.info(f"Loading document model {document_embeddings_model} for embeddings")
-    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-
+    # The models are loaded on first use, or in the background once the server is running
     ctx.obj = PartialCliContext(
-        document_embeddings=HuggingFaceEmbedding(
+        document_embeddings=lazy_huggingface_embedding(
             model_name=document_embeddings_model,
             embed_batch_size=document_embeddings_batch_size,
+            backend=document_embeddings_backend,
+            intra_op_threads=document_embeddings_threads,
+            quantization=document_embeddings_quantization,
         ),
+        document_embeddings_workers=document_embeddings_workers,
+        document_embeddings_cache=document_embeddings_cache,
+        document_embeddings_cache_path=document_embeddings_cache_path,
         document_reranker_model=document_reranker_model,
     )
-    logger.info("Done loading document and code models")
 
 
 @cli.group(name="elasticsearch")
@@ -123,8 +187,11 @@ def cli(
 @click.option("--username", type=str, envvar="ES_USERNAME", default=None, show_envvar=True)
 @click.option("--password", type=str, envvar="ES_PASSWORD", default=None, show_envvar=True)
 @click.option("--api-key", type=str, envvar="ES_API_KEY", default=None, show_envvar=True)
+@click.option(
+    "--knn-candidates-per-result", type=click.IntRange(min=1), envvar="ES_KNN_CANDIDATES_PER_RESULT", default=10, show_envvar=True
+)
 @click.pass_context
-async def elasticsearch(
+async def elasticsearch(  # noqa: PLR0917
     ctx: click.Context,
     url: str,
     index_docs_vectors: str,
@@ -132,12 +199,13 @@ async def elasticsearch(
     username: str | None,
     password: str | None,
     api_key: str | None,
+    knn_candidates_per_result: int,
 ) -> None:
     old_cli_ctx: PartialCliContext = ctx.obj  # pyright: ignore[reportAny]
-    from llama_index.storage.docstore.elasticsearch import ElasticsearchDocumentStore
     from llama_index.storage.index_store.elasticsearch import ElasticsearchIndexStore
     from llama_index.storage.kvstore.elasticsearch import ElasticsearchKVStore
 
+    from knowledge_base_mcp.stores.docstores.elasticsearch import EnhancedElasticsearchDocumentStore
     from knowledge_base_mcp.stores.vector_stores.elasticsearch import EnhancedElasticsearchStore
 
     logger.info(f"Loading Elasticsearch document and code stores: {url}")
@@ -148,6 +216,7 @@ async def elasticsearch(
         es_username=username,
         es_password=password,
         es_api_key=api_key,
+        knn_candidates_per_result=knn_candidates_per_result,
     )
 
     es_client: AsyncElasticsearch = elasticsearch_docs_vector_store.client  # pyright: ignore[reportAny]
@@ -159,43 +228,81 @@ async def elasticsearch(
     ctx.obj = CliContext(
         docs_stores=Store(
             vectors=elasticsearch_docs_vector_store,
-            document=ElasticsearchDocumentStore(elasticsearch_kvstore=docs_kv_store),
+            document=EnhancedElasticsearchDocumentStore(elasticsearch_kvstore=docs_kv_store),
             index=ElasticsearchIndexStore(elasticsearch_kvstore=docs_kv_store),
             embeddings=old_cli_ctx.document_embeddings,
+            embeddings_cache=old_cli_ctx.embeddings_cache(),
+            embeddings_workers=old_cli_ctx.document_embeddings_workers,
             rerank_model_name=old_cli_ctx.document_reranker_model,
         ),
     )
 
 
 @cli.group(name="duckdb")
-def duckdb_group() -> None:
-    pass
+@click.option("--hnsw-index/--no-hnsw-index", envvar="DUCKDB_HNSW_INDEX", default=False, show_envvar=True)
+@click.option("--hnsw-ef-construction", envvar="DUCKDB_HNSW_EF_CONSTRUCTION", type=click.IntRange(min=1), default=128, show_envvar=True)
+@click.option("--hnsw-ef-search", envvar="DUCKDB_HNSW_EF_SEARCH", type=click.IntRange(min=1), default=64, show_envvar=True)
+@click.option("--hnsw-m", envvar="DUCKDB_HNSW_M", type=click.IntRange(min=2), default=16, show_envvar=True)
+@click.option(
+    "--hnsw-experimental-persistence/--no-hnsw-experimental-persistence",
+    envvar="DUCKDB_HNSW_EXPERIMENTAL_PERSISTENCE",
+    default=False,
+    show_envvar=True,
+)
+@click.option("--indexed-metadata-key", "indexed_metadata_keys", type=str, multiple=True, default=None)
+@click.pass_context
+def duckdb_group(  # noqa: PLR0917
+    ctx: click.Context,
+    hnsw_index: bool,
+    hnsw_ef_construction: int,
+    hnsw_ef_search: int,
+    hnsw_m: int,
+    hnsw_experimental_persistence: bool,
+    indexed_metadata_keys: tuple[str, ...],
+) -> None:
+    cli_ctx: PartialCliContext = ctx.obj  # pyright: ignore[reportAny]
+
+    if indexed_metadata_keys:
+        cli_ctx.duckdb_indexed_metadata_keys = list(indexed_metadata_keys)
+
+    if hnsw_index:
+        cli_ctx.duckdb_hnsw_index = {
+            "ef_construction": hnsw_ef_construction,
+            "ef_search": hnsw_ef_search,
+            "m": hnsw_m,
+            "experimental_persistence": hnsw_experimental_persistence,
+        }
 
 
 @duckdb_group.group(name="memory")
 @click.option("--db-in-memory", envvar="DUCKDB_MEMORY_DB_IN_MEMORY", type=bool, default=True)
 @click.pass_context
 async def duckdb_memory(ctx: click.Context, db_in_memory: bool) -> None:  # noqa: ARG001  # pyright: ignore[reportUnusedParameter]
-    from llama_index.storage.docstore.duckdb import DuckDBDocumentStore
     from llama_index.storage.index_store.duckdb import DuckDBIndexStore
     from llama_index.storage.kvstore.duckdb import DuckDBKVStore
 
-    from knowledge_base_mcp.stores.vector_stores.duckdb import EnhancedDuckDBVectorStore
+    from knowledge_base_mcp.stores.docstores.duckdb import EnhancedDuckDBDocumentStore
+    from knowledge_base_mcp.stores.vector_stores.duckdb import EnhancedDuckDBVectorStore, HNSWIndexConfig
 
     logger.info("Loading DuckDB document and code stores in memory")
 
     old_cli_ctx: PartialCliContext = ctx.obj  # pyright: ignore[reportAny]
 
-    docs_vector_store = EnhancedDuckDBVectorStore()
+    docs_vector_store = EnhancedDuckDBVectorStore(
+        hnsw_index=HNSWIndexConfig.model_validate(old_cli_ctx.duckdb_hnsw_index) if old_cli_ctx.duckdb_hnsw_index else None,
+        indexed_metadata_keys=old_cli_ctx.duckdb_indexed_metadata_keys,
+    )
 
     docs_kv_store = DuckDBKVStore(client=docs_vector_store.client)
 
     ctx.obj = CliContext(
         docs_stores=Store(
             vectors=docs_vector_store,
-            document=DuckDBDocumentStore(duckdb_kvstore=docs_kv_store),
+            document=EnhancedDuckDBDocumentStore(duckdb_kvstore=docs_kv_store),
             index=DuckDBIndexStore(duckdb_kvstore=docs_kv_store),
             embeddings=old_cli_ctx.document_embeddings,
+            embeddings_cache=old_cli_ctx.embeddings_cache(),
+            embeddings_workers=old_cli_ctx.document_embeddings_workers,
             rerank_model_name=old_cli_ctx.document_reranker_model,
         ),
     )
@@ -207,11 +314,11 @@ async def duckdb_memory(ctx: click.Context, db_in_memory: bool) -> None:  # noqa
 @click.option("--db-name-vectors", envvar="DUCKDB_PERSISTENT_DB_NAME_VECTORS", type=str, default="vectors.duckdb")
 @click.pass_context
 async def duckdb_persistent(ctx: click.Context, db_dir: Path, db_name_docs: str, db_name_vectors: str) -> None:
-    from llama_index.storage.docstore.duckdb import DuckDBDocumentStore
     from llama_index.storage.index_store.duckdb import DuckDBIndexStore
     from llama_index.storage.kvstore.duckdb import DuckDBKVStore
 
-    from knowledge_base_mcp.stores.vector_stores.duckdb import EnhancedDuckDBVectorStore
+    from knowledge_base_mcp.stores.docstores.duckdb import EnhancedDuckDBDocumentStore
+    from knowledge_base_mcp.stores.vector_stores.duckdb import EnhancedDuckDBVectorStore, HNSWIndexConfig
 
     cli_ctx: PartialCliContext = ctx.obj  # pyright: ignore[reportAny]
 
@@ -224,10 +331,17 @@ async def duckdb_persistent(ctx: click.Context, db_dir: Path, db_name_docs: str,
 
     ctx.obj = CliContext(
         docs_stores=Store(
-            vectors=EnhancedDuckDBVectorStore(database_name=db_name_vectors, persist_dir=str(db_dir)),
-            document=DuckDBDocumentStore(duckdb_kvstore=docs_kv_store),
+            vectors=EnhancedDuckDBVectorStore(
+                database_name=db_name_vectors,
+                persist_dir=str(db_dir),
+                hnsw_index=HNSWIndexConfig.model_validate(cli_ctx.duckdb_hnsw_index) if cli_ctx.duckdb_hnsw_index else None,
+                indexed_metadata_keys=cli_ctx.duckdb_indexed_metadata_keys,
+            ),
+            document=EnhancedDuckDBDocumentStore(duckdb_kvstore=docs_kv_store),
             index=DuckDBIndexStore(duckdb_kvstore=docs_kv_store),
             embeddings=cli_ctx.document_embeddings,
+            embeddings_cache=cli_ctx.embeddings_cache(default_path=db_dir / DEFAULT_DOCS_EMBEDDINGS_CACHE_NAME),
+            embeddings_workers=cli_ctx.document_embeddings_workers,
             rerank_model_name=cli_ctx.document_reranker_model,
         ),
     )
@@ -236,19 +350,73 @@ async def duckdb_persistent(ctx: click.Context, db_dir: Path, db_name_docs: str,
 @duckdb_persistent.command()
 @click.option("--transport", type=click.Choice(["stdio", "http", "sse", "streamable-http"]), default="stdio")
 @click.option("--search-only", is_flag=True, default=False)
+@click.option("--query-embeddings-cache-size", type=click.IntRange(min=0), default=DEFAULT_QUERY_CACHE_SIZE)
+@click.option("--query-embeddings-cache-ttl", type=click.FloatRange(min=0), default=DEFAULT_QUERY_CACHE_TTL)
+@click.option("--search-results-cache-size", type=click.IntRange(min=0), default=DEFAULT_SEARCH_RESULT_CACHE_SIZE)
+@click.option(
+    "--search-results-cache-path",
+    envvar="SEARCH_RESULTS_CACHE_PATH",
+    type=click.Path(path_type=Path),
+    default=None,
+    show_envvar=True,
+)
+@click.option("--node-cache-size", type=click.IntRange(min=0), default=DEFAULT_NODE_CACHE_SIZE)
+@click.option("--reranker-score-cache-size", type=click.IntRange(min=0), default=DEFAULT_RERANK_SCORE_CACHE_SIZE)
+@click.option("--reranker-max-candidates", type=click.IntRange(min=1), default=None)
+@click.option("--reranker-early-exit-top-k", type=click.IntRange(min=1), default=None)
+@click.option("--hybrid-search/--no-hybrid-search", default=False)
+@click.option("--warm-up/--no-warm-up", default=True)
 @click.pass_context
-async def run(ctx: click.Context, transport: Transport, search_only: bool):
+async def run(  # noqa: PLR0917
+    ctx: click.Context,
+    transport: Transport,
+    search_only: bool,
+    query_embeddings_cache_size: int,
+    query_embeddings_cache_ttl: float,
+    search_results_cache_size: int,
+    search_results_cache_path: Path | None,
+    node_cache_size: int,
+    reranker_score_cache_size: int,
+    reranker_max_candidates: int | None,
+    reranker_early_exit_top_k: int | None,
+    hybrid_search: bool,
+    warm_up: bool,
+):
     logger.info("Building Knowledge Base MCP Server")
 
     cli_ctx: CliContext = ctx.obj  # pyright: ignore[reportAny]
 
+    search_result_cache: SearchResultCache | None = None
+
+    if search_results_cache_size and search_results_cache_path:
+        logger.info(f"Loading search results cache: {search_results_cache_path}")
+        search_result_cache = DuckDBSearchResultCache(database_path=search_results_cache_path, max_entries=search_results_cache_size)
+    elif search_results_cache_size:
+        search_result_cache = InMemorySearchResultCache(max_entries=search_results_cache_size)
+
     knowledge_base_client: KnowledgeBaseClient = KnowledgeBaseClient(
         vector_store_index=cli_ctx.docs_stores.vector_store_index,
         reranker_model=cli_ctx.docs_stores.rerank_model_name,
+        embedding_cache=cli_ctx.docs_stores.embeddings_cache,
+        embedding_workers=cli_ctx.docs_stores.embeddings_workers,
+        query_embedding_cache=(
+            QueryEmbeddingCache(max_entries=query_embeddings_cache_size, ttl=query_embeddings_cache_ttl)
+            if query_embeddings_cache_size
+            else None
+        ),
+        search_result_cache=search_result_cache,
+        node_cache=NodeCache(max_entries=node_cache_size) if node_cache_size else None,
+        reranker_score_cache=RerankScoreCache(max_entries=reranker_score_cache_size) if reranker_score_cache_size else None,
+        reranker_max_candidates=reranker_max_candidates,
+        reranker_early_exit_top_k=reranker_early_exit_top_k,
+        hybrid_search=hybrid_search,
     )
 
     kbmcp: FastMCP[Any] = FastMCP(name="Knowledge Base MCP")
 
+    # Report whether the models are loaded, as they may still be loading in the background
+    _ = kbmcp.add_tool(tool=FastMCPTool.from_function(fn=knowledge_base_client.get_model_status))
+
     # Documentation MCP Registration
     docs_search_server: DocumentationSearchServer = DocumentationSearchServer(
         knowledge_base_client=knowledge_base_client,
@@ -274,6 +442,9 @@ async def run(ctx: click.Context, transport: Transport, search_only: bool):
         web_ingest_server: WebIngestServer = WebIngestServer(knowledge_base_client=knowledge_base_client)
         _ = await kbmcp.import_server(server=web_ingest_server.as_ingest_server())
 
+    if warm_up:
+        knowledge_base_client.start_warm_up()
+
     # Run the server
     await kbmcp.run_async(transport=transport)
 
@@ -1,5 +1,5 @@
 from collections import defaultdict
-from functools import cached_property
+from functools import cached_property, partial
 from logging import Logger
 from typing import TYPE_CHECKING, Annotated, ClassVar, Literal, Self, override
 
@@ -206,8 +206,10 @@ class GitHubServer(BaseSearchServer, BaseIngestServer):
         return [
             RemoveDuplicateNodesPostprocessor(by_id=True, by_hash=True),
             self.knowledge_base_client.reranker,
-            GetParentNodesPostprocessor(doc_store=self.knowledge_base_client.docstore, keep_child_nodes=False),
-            GetChildNodesPostprocessor(doc_store=self.knowledge_base_client.docstore),
+            GetParentNodesPostprocessor(
+                doc_store=self.knowledge_base_client.docstore, keep_child_nodes=False, node_cache=self.knowledge_base_client.node_cache
+            ),
+            GetChildNodesPostprocessor(doc_store=self.knowledge_base_client.docstore, node_cache=self.knowledge_base_client.node_cache),
         ]
 
     def _convert_to_github_issues(self, nodes_with_scores: list[NodeWithScore]) -> list[GitHubIssue]:
@@ -243,6 +245,26 @@ class GitHubServer(BaseSearchServer, BaseIngestServer):
         repository: Annotated[str | None, Field(description="The indexed repository to search for issues in.")] = None,
     ) -> GitHubSearchResponse:
         """Query the GitHub issues"""
+        return await self.cached_search(
+            search=partial(
+                self._query,
+                query=query,
+                knowledge_bases=knowledge_bases,
+                result_count=result_count,
+                issues_only=issues_only,
+                repository=repository,
+            ),
+            response_type=GitHubSearchResponse,
+            query=query,
+            knowledge_bases=knowledge_bases,
+            result_count=result_count,
+            issues_only=issues_only,
+            repository=repository,
+        )
+
+    async def _query(
+        self, query: str, knowledge_bases: list[str] | None, result_count: int, issues_only: bool, repository: str | None
+    ) -> GitHubSearchResponse:
         timer_group: TimerGroup = TimerGroup(name="DocumentationSearchServer.query")
 
         extra_filters: list[MetadataFilter | MetadataFilters] = []
@@ -252,16 +274,16 @@ class GitHubServer(BaseSearchServer, BaseIngestServer):
             extra_filters.append(MetadataFilter(key="type", value="issue"))
 
         with timer_group.time(name="fetch_results"):
-            nodes_with_scores = await self.knowledge_base_client.aretrieve(
+            nodes_with_scores = await self.knowledge_base_client.aretrieve_metadata(
                 query=query,
                 knowledge_base=knowledge_bases,
                 knowledge_base_types=[self.knowledge_base_type],
                 extra_filters=MetadataFilters(filters=extra_filters) if extra_filters else None,
             )
 
-        summary: BaseSummaryResult = self.format_summary(nodes_with_scores=nodes_with_scores)
+            summary: BaseSummaryResult = self.format_summary(nodes_with_scores=nodes_with_scores)
 
-        nodes_with_scores = nodes_with_scores[:result_count]
+            nodes_with_scores = await self.knowledge_base_client.afetch_nodes(nodes_with_scores=nodes_with_scores[:result_count])
 
         with timer_group.time(name="apply_post_processors"):
             nodes_with_scores = await self.apply_post_processors(
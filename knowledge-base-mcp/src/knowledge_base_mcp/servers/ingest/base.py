@@ -113,6 +113,13 @@ class BaseIngestServer(BaseKnowledgeBaseServer, ABC):
                 logger.exception(f"{preamble} Received an unknown error while processing batch.")
                 ingest_result.errors += 1
                 return
+            finally:
+                # Even a failed batch may have written some of its nodes
+                await self.knowledge_base_client.abump_knowledge_base_generations(
+                    knowledge_bases={node.metadata["knowledge_base"] for node in batch_of_nodes if "knowledge_base" in node.metadata}
+                )
+
+            await self.knowledge_base_client.knowledge_base_catalog.arecord_ingest(nodes=nodes)
 
             ingest_result.documents += len([node for node in nodes if isinstance(node, Document)])
             ingest_result.parsed_nodes += len([node for node in nodes if not isinstance(node, Document)])
@@ -154,6 +161,9 @@ class BaseIngestServer(BaseKnowledgeBaseServer, ABC):
 
         ingest_result: IngestResult = IngestResult()
 
+        # The pipelines are sized from the embedding model, which must not be loaded on the event loop
+        await self.knowledge_base_client.aload_embed_model()
+
         queue_nodes, process_queued_nodes = create_memory_object_stream[Sequence[BaseNode]](max_buffer_size=16)  # In Batches
         queue_documents, process_queued_documents = create_memory_object_stream[Sequence[Document]](
             max_buffer_size=256
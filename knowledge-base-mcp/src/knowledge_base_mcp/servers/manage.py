@@ -1,7 +1,7 @@
 from logging import Logger
 from typing import Any
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from fastmcp.tools import Tool as FastMCPTool
 
 from knowledge_base_mcp.servers.base import BaseKnowledgeBaseServer
@@ -18,12 +18,20 @@ class KnowledgeBaseManagementServer(BaseKnowledgeBaseServer):
     def get_management_tools(self) -> list[FastMCPTool]:
         return [
             FastMCPTool.from_function(fn=self.knowledge_base_client.get_knowledge_bases),
-            FastMCPTool.from_function(fn=self.knowledge_base_client.delete_knowledge_base),
+            FastMCPTool.from_function(fn=self.knowledge_base_client.get_knowledge_base_catalog),
+            FastMCPTool.from_function(fn=self.knowledge_base_client.rebuild_knowledge_base_catalog),
+            FastMCPTool.from_function(fn=self.delete_knowledge_base),
             FastMCPTool.from_function(fn=self.knowledge_base_client.delete_all_knowledge_bases),
             FastMCPTool.from_function(fn=self.knowledge_base_client.get_knowledge_base_stats),
             FastMCPTool.from_function(fn=self.knowledge_base_client.clean_knowledge_base_hash_store),
         ]
 
+    async def delete_knowledge_base(self, knowledge_base: str, context: Context | None = None) -> None:
+        """Remove a knowledge base, reporting its progress. If the delete is interrupted, it is safe to run again."""
+        await self.knowledge_base_client.delete_knowledge_base(
+            knowledge_base=knowledge_base, progress=context.report_progress if context is not None else None
+        )
+
     def as_management_server(self) -> FastMCP[Any]:
         """Get the management tools for the server."""
         mcp: FastMCP[Any] = FastMCP[Any](name=self.server_name)
@@ -1,4 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
 from functools import cached_property
 from logging import Logger
 from typing import TYPE_CHECKING, Annotated, Any, ClassVar
@@ -22,8 +24,13 @@ from knowledge_base_mcp.utils.patches import TimerGroup
 if TYPE_CHECKING:
     from llama_index.core.schema import BaseNode
 
+    from knowledge_base_mcp.stores.search_result_cache import SearchResultCache
+
 logger: Logger = BASE_LOGGER.getChild(suffix=__name__)
 
+MAX_BATCH_QUERIES = 10
+"""The most queries a batch search takes, as the queries are embedded and their candidates fetched together."""
+
 
 QueryStringField = Annotated[
     str,
@@ -34,6 +41,24 @@ QueryStringField = Annotated[
 ]
 
 
+def check_query_batch(queries: list[str]) -> None:
+    """Reject batches with more queries than `MAX_BATCH_QUERIES`, for callers that bypass the tool's validation."""
+    if len(queries) > MAX_BATCH_QUERIES:
+        msg = f"A batch search takes at most {MAX_BATCH_QUERIES} queries, got {len(queries)}."
+        raise ValueError(msg)
+
+
+QueryStringsField = Annotated[
+    list[str],
+    Field(
+        description="Several related plain language queries to search the knowledge base for at once.",
+        min_length=1,
+        max_length=MAX_BATCH_QUERIES,
+        examples=[["What is the FastAPI library?", "How do I declare a path parameter in FastAPI?"]],
+    ),
+]
+
+
 QueryKnowledgeBasesField = Annotated[
     list[str],
     Field(
@@ -176,6 +201,100 @@ class BaseSearchServer(BaseKnowledgeBaseServer, ABC):
     #         response_synthesizer=synthesizer,
     #     )
 
+    async def cached_search[ResponseT: BaseModel](
+        self,
+        search: Callable[[], Awaitable[ResponseT]],
+        response_type: type[ResponseT],
+        query: str,
+        knowledge_bases: list[str] | None,
+        **parameters: Any,  # pyright: ignore[reportAny]
+    ) -> ResponseT:
+        """Serve a search from the search result cache, or run it and cache its response.
+
+        Args:
+            search: Runs the search.
+            response_type: The type of the search's response.
+            query: The query of the search.
+            knowledge_bases: The knowledge bases the search is restricted to, if any.
+            parameters: Any other parameters of the search that change its response.
+        """
+        search_result_cache: SearchResultCache | None = self.knowledge_base_client.search_result_cache
+
+        if search_result_cache is None:
+            return await search()
+
+        # The key is taken before the search runs, so a write to the knowledge bases during the search retires the response
+        key: str = await search_result_cache.akey(
+            search=self.knowledge_base_type,
+            query=query,
+            knowledge_bases=knowledge_bases,
+            parameters={**parameters, **self.knowledge_base_client.search_configuration},
+        )
+
+        if (cached_response := await search_result_cache.aget(key=key, response_type=response_type)) is not None:
+            logger.info(f"Serving cached search response: {search_result_cache.stats()}")
+            return cached_response
+
+        response: ResponseT = await search()
+
+        await search_result_cache.aput(key=key, response=response)
+
+        return response
+
+    async def cached_search_batch[ResponseT: BaseModel](
+        self,
+        search: Callable[[list[str]], Awaitable[list[ResponseT]]],
+        response_type: type[ResponseT],
+        queries: list[str],
+        knowledge_bases: list[str] | None,
+        **parameters: Any,  # pyright: ignore[reportAny]
+    ) -> list[ResponseT]:
+        """Serve each query of a batch from the search result cache, and run the others together in a single search.
+
+        Responses are cached under the same keys as `cached_search`, so a batch and single searches share their responses.
+
+        Args:
+            search: Runs the search for the queries, returning a response per query.
+            response_type: The type of the search's responses.
+            queries: The queries of the search.
+            knowledge_bases: The knowledge bases the search is restricted to, if any.
+            parameters: Any other parameters of the search that change its responses.
+        """
+        check_query_batch(queries=queries)
+
+        search_result_cache: SearchResultCache | None = self.knowledge_base_client.search_result_cache
+
+        keys: dict[str, str] = {}
+        responses: dict[str, ResponseT] = {}
+
+        if search_result_cache is not None:
+            keys = {
+                query: await search_result_cache.akey(
+                    search=self.knowledge_base_type,
+                    query=query,
+                    knowledge_bases=knowledge_bases,
+                    parameters={**parameters, **self.knowledge_base_client.search_configuration},
+                )
+                for query in queries
+            }
+
+            responses = {
+                query: cached_response
+                for query, key in keys.items()
+                if (cached_response := await search_result_cache.aget(key=key, response_type=response_type)) is not None
+            }
+
+        if missing_queries := [query for query in dict.fromkeys(queries) if query not in responses]:
+            for query, response in zip(missing_queries, await search(missing_queries), strict=True):
+                if search_result_cache is not None:
+                    await search_result_cache.aput(key=keys[query], response=response)
+
+                responses[query] = response
+
+        logger.info(f"Searched {len(missing_queries)} of {len(queries)} queries, the others were served from the cache")
+
+        return [responses[query] for query in queries]
+
     @classmethod
     async def apply_post_processors(
         cls, query: str, nodes_with_scores: list[NodeWithScore], post_processors: list[BaseNodePostprocessor]
@@ -206,25 +325,71 @@ class BaseSearchServer(BaseKnowledgeBaseServer, ABC):
         return BaseSearchResult(nodes_with_scores=nodes_with_scores)
 
     async def query(
-        self, query: QueryStringField, knowledge_bases: QueryKnowledgeBasesField | None = None, result_count: int = 200
+        self,
+        query: QueryStringField,
+        knowledge_bases: QueryKnowledgeBasesField | None = None,
+        result_count: int = 200,
+        candidate_count: int | None = None,
     ) -> BaseSearchResponse:
-        """Query the knowledge base"""
+        """Query the knowledge base, summarizing the top `result_count` nodes and returning the top `candidate_count` of them.
+
+        Only the metadata of the summarized nodes is retrieved, the text is fetched for the returned candidates alone."""
+
+        responses: list[SearchResponse] = await self.query_batch(
+            queries=[query], knowledge_bases=knowledge_bases, result_count=result_count, candidate_count=candidate_count
+        )
+
+        return responses[0]
 
-        nodes_with_scores: list[NodeWithScore] = await self.knowledge_base_client.aretrieve(
-            query=query, knowledge_base=knowledge_bases, top_k=result_count
+    async def query_batch(
+        self,
+        queries: QueryStringsField,
+        knowledge_bases: QueryKnowledgeBasesField | None = None,
+        result_count: int = 200,
+        candidate_count: int | None = None,
+    ) -> list[SearchResponse]:
+        """Query the knowledge base with several queries at once, like `query`, returning a response per query.
+
+        The queries are embedded with a single call to the model and searched concurrently, and candidates shared between
+        queries are fetched once."""
+
+        check_query_batch(queries=queries)
+
+        query_embeddings: list[list[float]] = await self.knowledge_base_client.aget_query_embeddings(queries=queries)
+
+        retrieved_nodes: list[list[NodeWithScore]] = await asyncio.gather(
+            *[
+                self.knowledge_base_client.aretrieve_metadata(
+                    query=query, knowledge_base=knowledge_bases, top_k=result_count, query_embedding=query_embedding
+                )
+                for query, query_embedding in zip(queries, query_embeddings, strict=True)
+            ]
+        )
+
+        summaries: list[BaseSummaryResult] = [self.format_summary(nodes_with_scores=nodes) for nodes in retrieved_nodes]
+
+        candidates: list[list[NodeWithScore]] = [nodes[:candidate_count] for nodes in retrieved_nodes]
+
+        fetched_nodes: list[NodeWithScore] = await self.knowledge_base_client.afetch_nodes(
+            nodes_with_scores=[candidate for query_candidates in candidates for candidate in query_candidates]
         )
 
-        summary: BaseSummaryResult = self.format_summary(nodes_with_scores=nodes_with_scores)
+        nodes_by_id: dict[str, BaseNode] = {fetched_node.node.node_id: fetched_node.node for fetched_node in fetched_nodes}
+
+        responses: list[SearchResponse] = []
+
+        for query, summary, query_candidates in zip(queries, summaries, candidates, strict=True):
+            nodes_with_scores: list[NodeWithScore] = [
+                NodeWithScore(node=nodes_by_id[candidate.node.node_id], score=candidate.score)
+                for candidate in query_candidates
+                if candidate.node.node_id in nodes_by_id
+            ]
 
-        # processed_nodes: list[NodeWithScore] = await self.apply_post_processors(
-        #     query=query,
-        #     nodes_with_scores=nodes_with_scores,
-        #     post_processors=self.result_post_processors,
-        # )
+            result: BaseSearchResult = self.format_results(nodes_with_scores=nodes_with_scores)
 
-        result: BaseSearchResult = self.format_results(nodes_with_scores=nodes_with_scores)
+            responses.append(SearchResponse(query=query, summary=summary, results=result))
 
-        return SearchResponse(query=query, summary=summary, results=result)
+        return responses
 
     # async def get_results(
     #     self,
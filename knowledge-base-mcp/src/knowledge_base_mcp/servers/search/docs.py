@@ -1,6 +1,7 @@
-from functools import cached_property
+import math
+from functools import cached_property, partial
 from logging import Logger
-from typing import Any, override
+from typing import TYPE_CHECKING, Any, override
 
 from fastmcp.server.server import FastMCP
 from fastmcp.tools import Tool as FastMCPTool
@@ -18,13 +19,23 @@ from knowledge_base_mcp.servers.search.base import (
     BaseSearchServer,
     QueryKnowledgeBasesField,
     QueryStringField,
+    QueryStringsField,
     SearchResponse,
 )
 from knowledge_base_mcp.utils.logging import BASE_LOGGER
 from knowledge_base_mcp.utils.patches import TimerGroup
 
+if TYPE_CHECKING:
+    from llama_index.core.schema import NodeWithScore
+
 logger: Logger = BASE_LOGGER.getChild(suffix="DocumentationSearchServer")
 
+RERANK_CANDIDATES_PER_RESULT = 2
+"""The number of candidates the reranker scores for each result of a search."""
+
+HYBRID_RERANK_CANDIDATES_PER_RESULT = 1.5
+"""The number of candidates the reranker scores for each result of a hybrid search, which ranks exact matches higher."""
+
 
 class DocumentationSearchResponse(BaseSearchResponse):
     """A response to a search query with a summary"""
@@ -46,6 +57,7 @@ class DocumentationSearchServer(BaseSearchServer):
         """Get the search tools for the server."""
         return [
             FastMCPTool.from_function(fn=self.query),
+            FastMCPTool.from_function(fn=self.query_batch),
         ]
 
     @override
@@ -65,6 +77,7 @@ class DocumentationSearchServer(BaseSearchServer):
         get_sibling_nodes_postprocessor = GetSiblingNodesPostprocessor(
             doc_store=self.knowledge_base_client.docstore,
             vector_store=self.knowledge_base_client.vector_store,  # pyright: ignore[reportArgumentType]
+            node_cache=self.knowledge_base_client.node_cache,
         )
 
         rerank_nodes_postprocessor = self.knowledge_base_client.reranker
@@ -76,6 +89,7 @@ class DocumentationSearchServer(BaseSearchServer):
             minimum_size=1024,
             maximum_size=4096,
             keep_child_nodes=False,
+            node_cache=self.knowledge_base_client.node_cache,
         )
 
         # Remove duplicate nodes
@@ -94,34 +108,93 @@ class DocumentationSearchServer(BaseSearchServer):
 
     @override
     async def query(
-        self, query: QueryStringField, knowledge_bases: QueryKnowledgeBasesField | None = None, result_count: int = 20
+        self,
+        query: QueryStringField,
+        knowledge_bases: QueryKnowledgeBasesField | None = None,
+        result_count: int = 20,
+        candidate_count: int | None = None,
     ) -> DocumentationSearchResponse:
-        """Query the documentation"""
+        """Query the documentation, reranking `candidate_count` candidates (by default a multiple of `result_count`)."""
+        return await self.cached_search(
+            search=partial(
+                self._query, query=query, knowledge_bases=knowledge_bases, result_count=result_count, candidate_count=candidate_count
+            ),
+            response_type=DocumentationSearchResponse,
+            query=query,
+            knowledge_bases=knowledge_bases,
+            result_count=result_count,
+            candidate_count=candidate_count,
+        )
+
+    async def _query(
+        self, query: str, knowledge_bases: list[str] | None, result_count: int, candidate_count: int | None
+    ) -> DocumentationSearchResponse:
+        responses: list[DocumentationSearchResponse] = await self._query_batch(
+            queries=[query], knowledge_bases=knowledge_bases, result_count=result_count, candidate_count=candidate_count
+        )
+
+        return responses[0]
+
+    @override
+    async def query_batch(
+        self,
+        queries: QueryStringsField,
+        knowledge_bases: QueryKnowledgeBasesField | None = None,
+        result_count: int = 20,
+        candidate_count: int | None = None,
+    ) -> list[DocumentationSearchResponse]:
+        """Query the documentation with several related queries at once, returning the results of each query in order.
+
+        Prefer this to several calls to `query`: the whole batch takes about as long as a single query."""
+        return await self.cached_search_batch(
+            search=partial(self._query_batch, knowledge_bases=knowledge_bases, result_count=result_count, candidate_count=candidate_count),
+            response_type=DocumentationSearchResponse,
+            queries=queries,
+            knowledge_bases=knowledge_bases,
+            result_count=result_count,
+            candidate_count=candidate_count,
+        )
+
+    def rerank_candidate_count(self, result_count: int) -> int:
+        """The number of candidates to rerank for a search returning `result_count` results."""
+        per_result: float = (
+            HYBRID_RERANK_CANDIDATES_PER_RESULT if self.knowledge_base_client.hybrid_search else RERANK_CANDIDATES_PER_RESULT
+        )
+
+        return math.ceil(result_count * per_result)
+
+    async def _query_batch(
+        self, queries: list[str], knowledge_bases: list[str] | None, result_count: int, candidate_count: int | None
+    ) -> list[DocumentationSearchResponse]:
         timer_group: TimerGroup = TimerGroup(name="DocumentationSearchServer.query")
 
         with timer_group.time(name="fetch_results"):
-            base_result: BaseSearchResponse = await super().query(query=query, knowledge_bases=knowledge_bases)
-
-        if not isinstance(base_result, SearchResponse):
-            msg = f"Expected a SearchResponse, got {type(base_result)}"
-            raise TypeError(msg)
+            base_results: list[SearchResponse] = await super().query_batch(
+                queries=queries,
+                knowledge_bases=knowledge_bases,
+                candidate_count=self.rerank_candidate_count(result_count=result_count) if candidate_count is None else candidate_count,
+            )
 
-        nodes_with_scores = base_result.results.nodes_with_scores[: result_count * 2]
+        responses: list[DocumentationSearchResponse] = []
 
+        # Candidates shared between queries were fetched once, and are expanded from the shared node cache after the first query
         with timer_group.time(name="apply_post_processors"):
-            nodes_with_scores = await self.apply_post_processors(
-                query=query,
-                nodes_with_scores=nodes_with_scores,
-                post_processors=self.result_post_processors,
-            )
+            for base_result in base_results:
+                nodes_with_scores: list[NodeWithScore] = await self.apply_post_processors(
+                    query=base_result.query,
+                    nodes_with_scores=base_result.results.nodes_with_scores,
+                    post_processors=self.result_post_processors,
+                )
 
-        logger.info(f"Query took: {timer_group.model_dump()}")
+                tree_search_response: TreeSearchResponse = TreeSearchResponse.from_nodes(nodes=nodes_with_scores[:result_count])
 
-        nodes_with_scores = nodes_with_scores[:result_count]
+                responses.append(
+                    DocumentationSearchResponse(query=base_result.query, summary=base_result.summary, results=tree_search_response)
+                )
 
-        tree_search_response: TreeSearchResponse = TreeSearchResponse.from_nodes(nodes=nodes_with_scores)
+        logger.info(f"Query of {len(queries)} queries took: {timer_group.model_dump()}")
 
-        return DocumentationSearchResponse(query=query, summary=base_result.summary, results=tree_search_response)
+        return responses
 
     # async def query(self, query: QueryStringField, knowledge_bases: QueryKnowledgeBasesField | None = None) -> SearchResponseWithSummary:
     #     """Query the documentation"""
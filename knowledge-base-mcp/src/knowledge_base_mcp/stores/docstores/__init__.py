@@ -0,0 +1,3 @@
+from knowledge_base_mcp.stores.docstores.base import EnhancedBaseDocumentStore
+
+__all__ = ["EnhancedBaseDocumentStore"]
@@ -0,0 +1,12 @@
+from typing import Protocol, runtime_checkable
+
+
+@runtime_checkable
+class EnhancedBaseDocumentStore(Protocol):
+    """An enhanced document store."""
+
+    async def adelete_by_metadata(self, key: str, values: list[str]) -> int:
+        """Delete the nodes whose metadata key has one of the values, with their hashes and reference documents.
+
+        Returns the number of nodes deleted. Deleting again is a no-op, so an interrupted delete is safe to retry."""
+        ...
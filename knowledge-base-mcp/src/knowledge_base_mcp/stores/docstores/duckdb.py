@@ -0,0 +1,74 @@
+import asyncio
+
+from llama_index.core.constants import DATA_KEY
+from llama_index.storage.docstore.duckdb import DuckDBDocumentStore
+from llama_index.storage.kvstore.duckdb import DuckDBKVStore
+
+
+class EnhancedDuckDBDocumentStore(DuckDBDocumentStore):
+    """A DuckDB document store that deletes nodes in bulk with a single transaction."""
+
+    def __init__(self, duckdb_kvstore: DuckDBKVStore, namespace: str | None = None) -> None:
+        super().__init__(duckdb_kvstore=duckdb_kvstore, namespace=namespace)
+
+        self._duckdb_kvstore: DuckDBKVStore = duckdb_kvstore
+
+    def delete_by_metadata(self, key: str, values: list[str]) -> int:
+        """
+        Delete the nodes whose metadata key has one of the values, with their hashes and reference documents
+        """
+        table_name: str = self._duckdb_kvstore.table_name
+
+        node_parameters: dict[str, str | list[str]] = {
+            "node_collection": self._node_collection,
+            "node_path": f"$.{DATA_KEY}.metadata.{key}",
+            "values": values,
+        }
+        ref_doc_parameters: dict[str, str | list[str]] = {
+            "ref_doc_collection": self._ref_doc_collection,
+            "ref_doc_path": f"$.metadata.{key}",
+            "values": values,
+        }
+
+        matching_nodes = (
+            f"SELECT key FROM {table_name} WHERE collection = $node_collection AND json_extract_string(value, $node_path) IN $values"  # noqa: S608
+        )
+        matching_ref_docs = (
+            f"SELECT key FROM {table_name} WHERE collection = $ref_doc_collection AND json_extract_string(value, $ref_doc_path) IN $values"  # noqa: S608
+        )
+
+        connection = self._duckdb_kvstore.client
+
+        _ = connection.begin()
+
+        try:
+            # The hashes are found through their nodes and reference documents, so they are deleted first
+            _ = connection.execute(
+                query=f"""
+                DELETE FROM {table_name}
+                WHERE collection = $metadata_collection AND (
+                    key IN ({matching_nodes}) OR json_extract_string(value, '$.ref_doc_id') IN ({matching_ref_docs})
+                );
+                """,  # noqa: S608
+                parameters={**node_parameters, **ref_doc_parameters, "metadata_collection": self._metadata_collection},
+            )
+
+            deleted = connection.execute(
+                query=f"DELETE FROM {table_name} WHERE collection = $node_collection AND key IN ({matching_nodes});",  # noqa: S608
+                parameters=node_parameters,
+            ).fetchone()
+
+            _ = connection.execute(
+                query=f"DELETE FROM {table_name} WHERE collection = $ref_doc_collection AND key IN ({matching_ref_docs});",  # noqa: S608
+                parameters=ref_doc_parameters,
+            )
+
+            _ = connection.commit()
+        except Exception:
+            _ = connection.rollback()
+            raise
+
+        return int(deleted[0]) if deleted else 0
+
+    async def adelete_by_metadata(self, key: str, values: list[str]) -> int:
+        return await asyncio.to_thread(self.delete_by_metadata, key, values)
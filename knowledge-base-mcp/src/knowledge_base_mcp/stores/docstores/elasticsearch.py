@@ -0,0 +1,46 @@
+from typing import Any
+
+from llama_index.core.constants import DATA_KEY
+from llama_index.storage.docstore.elasticsearch import ElasticsearchDocumentStore
+from llama_index.storage.kvstore.elasticsearch import ElasticsearchKVStore
+
+REF_DOC_PAGE_SIZE = 1000
+
+
+class EnhancedElasticsearchDocumentStore(ElasticsearchDocumentStore):
+    """An Elasticsearch document store that deletes nodes in bulk with `delete_by_query`."""
+
+    def __init__(self, elasticsearch_kvstore: ElasticsearchKVStore, namespace: str | None = None) -> None:
+        super().__init__(elasticsearch_kvstore=elasticsearch_kvstore, namespace=namespace)
+
+        self._elasticsearch_kvstore: ElasticsearchKVStore = elasticsearch_kvstore
+
+    async def _delete_by_query(self, collection: str, query: dict[str, Any]) -> int:
+        """Delete the matching documents of a collection, which the key-value store keeps in an index of the same name."""
+        response = await self._elasticsearch_kvstore._client.delete_by_query(  # pyright: ignore[reportPrivateUsage]
+            index=collection, query=query, slices="auto", conflicts="proceed", refresh=True, ignore_unavailable=True
+        )
+
+        return int(response["deleted"])
+
+    async def adelete_by_metadata(self, key: str, values: list[str]) -> int:
+        """
+        Delete the nodes whose metadata key has one of the values, with their hashes and reference documents
+        """
+        ref_doc_query: dict[str, Any] = {"terms": {f"metadata.{key}.keyword": values}}
+
+        # The hashes are found through their reference documents, so each page of reference documents is deleted after its hashes
+        while ref_doc_ids := [
+            hit["_id"]  # pyright: ignore[reportAny]
+            for hit in (
+                await self._elasticsearch_kvstore._client.search(  # pyright: ignore[reportPrivateUsage]
+                    index=self._ref_doc_collection, query=ref_doc_query, source=False, size=REF_DOC_PAGE_SIZE, ignore_unavailable=True
+                )
+            )["hits"]["hits"]
+        ]:
+            _ = await self._delete_by_query(collection=self._metadata_collection, query={"terms": {"ref_doc_id.keyword": ref_doc_ids}})
+            _ = await self._delete_by_query(collection=self._ref_doc_collection, query={"ids": {"values": ref_doc_ids}})
+
+        return await self._delete_by_query(
+            collection=self._node_collection, query={"terms": {f"{DATA_KEY}.metadata.{key}.keyword": values}}
+        )
@@ -0,0 +1,175 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+from hashlib import sha256
+from logging import Logger
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+
+import duckdb
+from duckdb import DuckDBPyConnection
+
+from knowledge_base_mcp.utils.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(__name__)
+
+DEFAULT_TABLE_NAME = "embedding_cache"
+
+DEFAULT_QUERY_CACHE_SIZE = 1024
+DEFAULT_QUERY_CACHE_TTL = 3600.0
+
+
+def content_hash(content: str) -> str:
+    """The sha256 hash of the content that is embedded for a node."""
+    return sha256(content.encode()).hexdigest()
+
+
+def normalize_query(query: str) -> str:
+    """Normalize the whitespace of a query, so near-identical queries share a cache entry.
+
+    Case is kept, as cased embedding models embed queries that differ only in case differently."""
+    return " ".join(query.split())
+
+
+class EmbeddingCache:
+    """A DuckDB backed cache of embeddings keyed by the embedding model and a hash of the embedded content.
+
+    The cache is independent of the vector store, so re-ingesting unchanged content skips the embedding model regardless
+    of whether the nodes end up in DuckDB or Elasticsearch.
+    """
+
+    def __init__(self, database_path: Path | str = ":memory:", table_name: str = DEFAULT_TABLE_NAME) -> None:
+        self.database_path: str = str(database_path)
+        self.table_name: str = table_name
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._lock: Lock = Lock()
+        self._client: DuckDBPyConnection = duckdb.connect(database=self.database_path)
+
+        _ = self._client.execute(
+            query=f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                model_name VARCHAR,
+                content_hash VARCHAR,
+                embedding DOUBLE[],
+                PRIMARY KEY (model_name, content_hash)
+            );
+            """
+        )
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hit_ratio, 3), "entries": len(self)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            result = self._client.execute(query=f"SELECT count(*) FROM {self.table_name}").fetchone()  # noqa: S608
+
+        return result[0] if result else 0
+
+    def get_many(self, model_name: str, content_hashes: Sequence[str]) -> dict[str, list[float]]:
+        """Get the cached embeddings for the content hashes. Hashes that are not cached are absent from the result."""
+        if not content_hashes:
+            return {}
+
+        with self._lock:
+            rows: list[tuple[str, list[float]]] = self._client.execute(
+                query=f"""
+                SELECT content_hash, embedding FROM {self.table_name}
+                WHERE model_name = ? AND content_hash IN (SELECT unnest(?::VARCHAR[]));
+                """,  # noqa: S608
+                parameters=[model_name, list(content_hashes)],
+            ).fetchall()
+
+        embeddings: dict[str, list[float]] = dict(rows)
+
+        hits = sum(1 for content_hash in content_hashes if content_hash in embeddings)
+        self.hits += hits
+        self.misses += len(content_hashes) - hits
+
+        return embeddings
+
+    def put_many(self, model_name: str, embeddings: dict[str, list[float]]) -> None:
+        """Cache the embeddings, keyed by content hash. Content that is already cached is left as is."""
+        if not embeddings:
+            return
+
+        with self._lock:
+            _ = self._client.execute(
+                query=f"INSERT OR IGNORE INTO {self.table_name} SELECT ?, unnest(?::VARCHAR[]), unnest(?::DOUBLE[][]);",
+                parameters=[model_name, list(embeddings.keys()), list(embeddings.values())],
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            _ = self._client.execute(query=f"DELETE FROM {self.table_name};")  # noqa: S608
+
+    def close(self) -> None:
+        with self._lock:
+            self._client.close()
+
+
+class QueryEmbeddingCache:
+    """An in-process, least-recently-used cache of query embeddings keyed by the normalized text of the query.
+
+    Entries expire `ttl` seconds after they are added, so a long-running server does not hold on to stale queries
+    forever.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_QUERY_CACHE_SIZE, ttl: float = DEFAULT_QUERY_CACHE_TTL) -> None:
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._embeddings: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._embeddings)
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hit_ratio, 3), "entries": len(self)}
+
+    def get(self, query: str) -> list[float] | None:
+        """Get the cached embedding of a query, or None if it is not cached or has expired."""
+        key = normalize_query(query)
+
+        cached = self._embeddings.get(key)
+
+        if cached is None or cached[0] <= monotonic():
+            if cached is not None:
+                del self._embeddings[key]
+
+            self.misses += 1
+            return None
+
+        self._embeddings.move_to_end(key)
+        self.hits += 1
+
+        return cached[1]
+
+    def put(self, query: str, embedding: list[float]) -> None:
+        key = normalize_query(query)
+
+        self._embeddings[key] = (monotonic() + self.ttl, embedding)
+        self._embeddings.move_to_end(key)
+
+        while len(self._embeddings) > self.max_entries:
+            _ = self._embeddings.popitem(last=False)
+
+    def clear(self) -> None:
+        self._embeddings.clear()
@@ -0,0 +1,122 @@
+import asyncio
+import datetime
+from collections.abc import Sequence
+from logging import Logger
+
+from llama_index.core.schema import BaseNode, Document, MetadataMode
+from llama_index.core.storage.kvstore.types import BaseKVStore
+from pydantic import BaseModel, Field
+
+from knowledge_base_mcp.utils.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(suffix=__name__)
+
+DEFAULT_CATALOG_COLLECTION = "knowledge_base_catalog"
+
+CATALOG_INITIALIZED_KEY = "initialized"
+
+
+class KnowledgeBaseEntry(BaseModel):
+    """The catalog entry of a knowledge base."""
+
+    documents: int = Field(default=0, description="The number of documents in the knowledge base.")
+    nodes: int = Field(default=0, description="The number of searchable nodes in the knowledge base.")
+    size: int | None = Field(
+        default=0,
+        description="The number of characters of text in the searchable nodes, or None when unknown, like after a rebuild of the catalog.",
+    )
+    last_ingest: datetime.datetime | None = Field(
+        default=None,
+        description="When nodes were last ingested into the knowledge base, or None when unknown, like after a rebuild of the catalog.",
+    )
+
+    def add(self, other: "KnowledgeBaseEntry") -> "KnowledgeBaseEntry":
+        return KnowledgeBaseEntry(
+            documents=self.documents + other.documents,
+            nodes=self.nodes + other.nodes,
+            size=self.size + other.size if self.size is not None and other.size is not None else None,
+            last_ingest=max(filter(None, [self.last_ingest, other.last_ingest]), default=None),
+        )
+
+    @classmethod
+    def from_ingested_nodes(cls, nodes: Sequence[BaseNode]) -> dict[str, "KnowledgeBaseEntry"]:
+        """Count the documents, and the embedded nodes the vector store holds, that a batch wrote to each knowledge base."""
+        now: datetime.datetime = datetime.datetime.now(tz=datetime.UTC)
+
+        entries: dict[str, KnowledgeBaseEntry] = {}
+
+        for node in nodes:
+            if (knowledge_base := node.metadata.get("knowledge_base")) is None:
+                continue
+
+            if isinstance(node, Document):
+                ingested = cls(documents=1, last_ingest=now)
+            elif node.embedding is not None:
+                ingested = cls(nodes=1, size=len(node.get_content(metadata_mode=MetadataMode.NONE)), last_ingest=now)
+            else:
+                continue
+
+            entries[knowledge_base] = entries.get(knowledge_base, cls()).add(other=ingested)
+
+        return entries
+
+
+class KnowledgeBaseCatalog:
+    """A catalog of the knowledge bases, kept in a collection of the docstore's key-value store.
+
+    The ingest and delete paths keep it up to date, so listing the knowledge bases reads one entry per knowledge base
+    instead of aggregating the metadata of every node in the vector store. Until the catalog is first built from the
+    vector store, it only knows the knowledge bases ingested since, so it records in a second collection when it was built.
+    """
+
+    def __init__(self, kv_store: BaseKVStore, collection: str = DEFAULT_CATALOG_COLLECTION) -> None:
+        self.kv_store: BaseKVStore = kv_store
+        self.collection: str = collection
+        self.state_collection: str = f"{collection}_state"
+
+        # Concurrent ingest workers update the same entries, so updates are serialized to not lose counts
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def ais_initialized(self) -> bool:
+        """Whether the catalog was built from the vector store, and so lists every knowledge base."""
+        return await self.kv_store.aget(key=CATALOG_INITIALIZED_KEY, collection=self.state_collection) is not None
+
+    async def aget_all(self) -> dict[str, KnowledgeBaseEntry]:
+        entries: dict[str, dict[str, object]] = await self.kv_store.aget_all(collection=self.collection)
+
+        return {knowledge_base: KnowledgeBaseEntry.model_validate(entry) for knowledge_base, entry in sorted(entries.items())}
+
+    async def arecord(self, entries: dict[str, KnowledgeBaseEntry]) -> None:
+        """Add the counts of the entries to the catalog."""
+        async with self._lock:
+            for knowledge_base, ingested in entries.items():
+                current: dict[str, object] | None = await self.kv_store.aget(key=knowledge_base, collection=self.collection)
+
+                entry: KnowledgeBaseEntry = ingested if current is None else KnowledgeBaseEntry.model_validate(current).add(other=ingested)
+
+                await self.kv_store.aput(key=knowledge_base, val=entry.model_dump(mode="json"), collection=self.collection)
+
+        logger.debug(f"Recorded {len(entries)} knowledge bases in the catalog")
+
+    async def arecord_ingest(self, nodes: Sequence[BaseNode]) -> None:
+        """Add the documents and nodes a batch of ingestion wrote to the catalog."""
+        await self.arecord(entries=KnowledgeBaseEntry.from_ingested_nodes(nodes=nodes))
+
+    async def areplace(self, entries: dict[str, KnowledgeBaseEntry]) -> None:
+        """Replace the whole catalog, like when it is rebuilt from the vector store."""
+        async with self._lock:
+            for knowledge_base in await self.kv_store.aget_all(collection=self.collection):
+                _ = await self.kv_store.adelete(key=knowledge_base, collection=self.collection)
+
+            for knowledge_base, entry in entries.items():
+                await self.kv_store.aput(key=knowledge_base, val=entry.model_dump(mode="json"), collection=self.collection)
+
+            await self.kv_store.aput(
+                key=CATALOG_INITIALIZED_KEY,
+                val={"at": datetime.datetime.now(tz=datetime.UTC).isoformat()},
+                collection=self.state_collection,
+            )
+
+    async def adelete(self, knowledge_base: str) -> None:
+        async with self._lock:
+            _ = await self.kv_store.adelete(key=knowledge_base, collection=self.collection)
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+
+from llama_index.core.schema import BaseNode
+
+DEFAULT_NODE_CACHE_SIZE = 4096
+
+
+class NodeCache:
+    """An in-process, least-recently-used cache of nodes fetched from the docstore, keyed by node id.
+
+    Searches expand their results with the same parent, sibling and child nodes again and again, so the post-processors
+    share this cache across queries. Writes to a knowledge base invalidate its nodes.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_NODE_CACHE_SIZE) -> None:
+        self.max_entries: int = max_entries
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._nodes: OrderedDict[str, BaseNode] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hit_ratio, 3), "entries": len(self)}
+
+    def get_many(self, node_ids: Iterable[str]) -> dict[str, BaseNode]:
+        """Get the cached nodes. Nodes that are not cached are absent from the result."""
+        nodes: dict[str, BaseNode] = {}
+
+        for node_id in node_ids:
+            if (node := self._nodes.get(node_id)) is None:
+                self.misses += 1
+                continue
+
+            self._nodes.move_to_end(node_id)
+            self.hits += 1
+            nodes[node_id] = node
+
+        return nodes
+
+    def put_many(self, nodes: Iterable[BaseNode]) -> None:
+        for node in nodes:
+            self._nodes[node.node_id] = node
+            self._nodes.move_to_end(node.node_id)
+
+        while len(self._nodes) > self.max_entries:
+            _ = self._nodes.popitem(last=False)
+
+    def invalidate(self, knowledge_bases: Iterable[str]) -> None:
+        """Remove the nodes of the knowledge bases, and any node that does not record its knowledge base."""
+        stale_knowledge_bases: set[str | None] = {*knowledge_bases, None}
+
+        for node_id in [node_id for node_id, node in self._nodes.items() if node.metadata.get("knowledge_base") in stale_knowledge_bases]:
+            del self._nodes[node_id]
+
+    def clear(self) -> None:
+        self._nodes.clear()
+
+
+def _split_cached(node_ids: Iterable[str], node_cache: NodeCache | None) -> tuple[list[str], dict[str, BaseNode], list[str]]:
+    """Deduplicate the node ids, and split them into the nodes served from the cache and the ids that must be fetched."""
+    unique_node_ids: list[str] = list(dict.fromkeys(node_ids))
+
+    cached_nodes: dict[str, BaseNode] = node_cache.get_many(node_ids=unique_node_ids) if node_cache is not None else {}
+
+    return unique_node_ids, cached_nodes, [node_id for node_id in unique_node_ids if node_id not in cached_nodes]
+
+
+def _merge_fetched(
+    node_ids: list[str], cached_nodes: dict[str, BaseNode], fetched_nodes: list[BaseNode], node_cache: NodeCache | None
+) -> list[BaseNode]:
+    if node_cache is not None:
+        node_cache.put_many(nodes=fetched_nodes)
+
+    nodes_by_id: dict[str, BaseNode] = {**cached_nodes, **{node.node_id: node for node in fetched_nodes}}
+
+    return [nodes_by_id[node_id] for node_id in node_ids if node_id in nodes_by_id]
+
+
+def get_nodes(node_ids: Iterable[str], fetch: Callable[[list[str]], list[BaseNode]], node_cache: NodeCache | None = None) -> list[BaseNode]:
+    """Get the nodes in the order of their ids, fetching every node missing from the cache with a single call to `fetch`."""
+    unique_node_ids, cached_nodes, missing_node_ids = _split_cached(node_ids=node_ids, node_cache=node_cache)
+
+    fetched_nodes: list[BaseNode] = fetch(missing_node_ids) if missing_node_ids else []
+
+    return _merge_fetched(node_ids=unique_node_ids, cached_nodes=cached_nodes, fetched_nodes=fetched_nodes, node_cache=node_cache)
+
+
+async def aget_nodes(
+    node_ids: Iterable[str], fetch: Callable[[list[str]], Awaitable[list[BaseNode]]], node_cache: NodeCache | None = None
+) -> list[BaseNode]:
+    """Get the nodes in the order of their ids, fetching every node missing from the cache with a single call to `fetch`."""
+    unique_node_ids, cached_nodes, missing_node_ids = _split_cached(node_ids=node_ids, node_cache=node_cache)
+
+    fetched_nodes: list[BaseNode] = await fetch(missing_node_ids) if missing_node_ids else []
+
+    return _merge_fetched(node_ids=unique_node_ids, cached_nodes=cached_nodes, fetched_nodes=fetched_nodes, node_cache=node_cache)
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from collections.abc import Sequence
+
+DEFAULT_RERANK_SCORE_CACHE_SIZE = 65536
+
+
+class RerankScoreCache:
+    """An in-process, least-recently-used cache of reranker scores keyed by the query and a hash of the scored content.
+
+    Nodes are shared between the results of similar queries, and repeated queries rerank the same nodes, so the scores
+    of a cross-encoder are worth keeping around even though every entry is specific to a single query.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_RERANK_SCORE_CACHE_SIZE) -> None:
+        self.max_entries: int = max_entries
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._scores: OrderedDict[tuple[str, str], float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hit_ratio, 3), "entries": len(self)}
+
+    def get_many(self, query: str, content_hashes: Sequence[str]) -> dict[str, float]:
+        """Get the cached scores of the content for the query. Content that is not cached is absent from the result."""
+        scores: dict[str, float] = {}
+
+        for content_hash in content_hashes:
+            key = (query, content_hash)
+
+            if (score := self._scores.get(key)) is None:
+                self.misses += 1
+                continue
+
+            self._scores.move_to_end(key)
+            self.hits += 1
+            scores[content_hash] = score
+
+        return scores
+
+    def put_many(self, query: str, scores: dict[str, float]) -> None:
+        for content_hash, score in scores.items():
+            key = (query, content_hash)
+
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+
+        while len(self._scores) > self.max_entries:
+            _ = self._scores.popitem(last=False)
+
+    def clear(self) -> None:
+        self._scores.clear()
@@ -0,0 +1,275 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Iterable, Sequence
+from hashlib import sha256
+from logging import Logger
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Any, ClassVar
+
+import duckdb
+from duckdb import DuckDBPyConnection
+from pydantic import BaseModel
+
+from knowledge_base_mcp.utils.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(__name__)
+
+ALL_KNOWLEDGE_BASES = "*"
+"""The generation bumped by a write to any knowledge base, which searches across all knowledge bases are keyed by."""
+
+DEFAULT_SEARCH_RESULT_CACHE_SIZE = 256
+
+DEFAULT_RESULTS_TABLE_NAME = "search_results"
+DEFAULT_GENERATIONS_TABLE_NAME = "knowledge_base_generations"
+
+
+class SearchResultCache(ABC):
+    """A cache of search responses, keyed by the search and the generations of the knowledge bases it covers.
+
+    Every write to a knowledge base bumps its generation, which changes the key of every search that covers it, so a
+    response computed before the write is never served after it.
+
+    Async callers use `akey`, `aget`, `aput` and `abump`, which run off the event loop for caches that block on I/O.
+    """
+
+    blocking: ClassVar[bool] = False
+    """Whether the cache blocks on I/O, so its async methods run it in a thread."""
+
+    def __init__(self) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The fraction of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hit_ratio, 3), "entries": len(self)}
+
+    def key(self, search: str, query: str, knowledge_bases: Sequence[str] | None, parameters: dict[str, Any]) -> str:  # pyright: ignore[reportExplicitAny]
+        """The key of a search, which must be taken before the search runs so a write during the search retires its response.
+
+        Args:
+            search: The kind of search, so different servers do not share responses.
+            query: The query of the search.
+            knowledge_bases: The knowledge bases the search is restricted to, or None for all knowledge bases.
+            parameters: Any other parameters that change the response, like the number of results.
+        """
+        scope: list[str] = sorted(set(knowledge_bases)) if knowledge_bases else [ALL_KNOWLEDGE_BASES]
+
+        generations: dict[str, int] = self.generations(knowledge_bases=scope)
+
+        payload: str = json.dumps([search, query, generations, parameters], sort_keys=True, default=str)
+
+        return sha256(payload.encode()).hexdigest()
+
+    def get[ResponseT: BaseModel](self, key: str, response_type: type[ResponseT]) -> ResponseT | None:
+        """Get the cached response for a key, or None if it is not cached."""
+        response: ResponseT | None = self._get(key=key, response_type=response_type)
+
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return response
+
+    def bump(self, knowledge_bases: Iterable[str]) -> None:
+        """Bump the generations of knowledge bases that were written to, and of searches across all knowledge bases."""
+        self._bump(knowledge_bases={*knowledge_bases, ALL_KNOWLEDGE_BASES})
+
+    async def akey(self, search: str, query: str, knowledge_bases: Sequence[str] | None, parameters: dict[str, Any]) -> str:  # pyright: ignore[reportExplicitAny]
+        """Async `key`."""
+        return await self._arun(self.key, search=search, query=query, knowledge_bases=knowledge_bases, parameters=parameters)
+
+    async def aget[ResponseT: BaseModel](self, key: str, response_type: type[ResponseT]) -> ResponseT | None:
+        """Async `get`."""
+        return await self._arun(self.get, key=key, response_type=response_type)
+
+    async def aput(self, key: str, response: BaseModel) -> None:
+        """Async `put`."""
+        await self._arun(self.put, key=key, response=response)
+
+    async def abump(self, knowledge_bases: Iterable[str]) -> None:
+        """Async `bump`."""
+        await self._arun(self.bump, knowledge_bases=knowledge_bases)
+
+    async def _arun[ReturnT](self, function: Callable[..., ReturnT], **kwargs: Any) -> ReturnT:  # pyright: ignore[reportAny, reportExplicitAny]
+        if self.blocking:
+            return await asyncio.to_thread(function, **kwargs)
+
+        return function(**kwargs)
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def generations(self, knowledge_bases: Sequence[str]) -> dict[str, int]:
+        """The current generation of each of the knowledge bases."""
+
+    @abstractmethod
+    def put(self, key: str, response: BaseModel) -> None:
+        """Cache the response of a search."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all cached responses. Generations are kept, so keys taken before clearing stay retired."""
+
+    @abstractmethod
+    def _get[ResponseT: BaseModel](self, key: str, response_type: type[ResponseT]) -> ResponseT | None: ...
+
+    @abstractmethod
+    def _bump(self, knowledge_bases: set[str]) -> None: ...
+
+
+class InMemorySearchResultCache(SearchResultCache):
+    """An in-process, least-recently-used cache of search responses."""
+
+    def __init__(self, max_entries: int = DEFAULT_SEARCH_RESULT_CACHE_SIZE) -> None:
+        super().__init__()
+
+        self.max_entries: int = max_entries
+
+        self._responses: OrderedDict[str, BaseModel] = OrderedDict()
+        self._generations: defaultdict[str, int] = defaultdict(int)
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def generations(self, knowledge_bases: Sequence[str]) -> dict[str, int]:
+        return {knowledge_base: self._generations[knowledge_base] for knowledge_base in knowledge_bases}
+
+    def put(self, key: str, response: BaseModel) -> None:
+        self._responses[key] = response
+        self._responses.move_to_end(key)
+
+        while len(self._responses) > self.max_entries:
+            _ = self._responses.popitem(last=False)
+
+    def clear(self) -> None:
+        self._responses.clear()
+
+    def _get[ResponseT: BaseModel](self, key: str, response_type: type[ResponseT]) -> ResponseT | None:
+        response: BaseModel | None = self._responses.get(key)
+
+        if not isinstance(response, response_type):
+            return None
+
+        self._responses.move_to_end(key)
+
+        return response
+
+    def _bump(self, knowledge_bases: set[str]) -> None:
+        for knowledge_base in knowledge_bases:
+            self._generations[knowledge_base] += 1
+
+
+class DuckDBSearchResultCache(SearchResultCache):
+    """A DuckDB backed cache of search responses, which survives restarts along with the generations of the knowledge bases.
+
+    Once it holds more than `max_entries` responses, the oldest responses are removed.
+    """
+
+    blocking: ClassVar[bool] = True
+
+    def __init__(
+        self,
+        database_path: Path | str,
+        max_entries: int = DEFAULT_SEARCH_RESULT_CACHE_SIZE,
+        results_table_name: str = DEFAULT_RESULTS_TABLE_NAME,
+        generations_table_name: str = DEFAULT_GENERATIONS_TABLE_NAME,
+    ) -> None:
+        super().__init__()
+
+        self.database_path: str = str(database_path)
+        self.max_entries: int = max_entries
+        self.results_table_name: str = results_table_name
+        self.generations_table_name: str = generations_table_name
+
+        self._lock: Lock = Lock()
+        self._client: DuckDBPyConnection = duckdb.connect(database=self.database_path)
+
+        _ = self._client.execute(
+            query=f"""
+            CREATE TABLE IF NOT EXISTS {self.results_table_name} (
+                key VARCHAR PRIMARY KEY,
+                response VARCHAR,
+                created_at DOUBLE
+            );
+            CREATE TABLE IF NOT EXISTS {self.generations_table_name} (
+                knowledge_base VARCHAR PRIMARY KEY,
+                generation BIGINT
+            );
+            """
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            result = self._client.execute(query=f"SELECT count(*) FROM {self.results_table_name}").fetchone()  # noqa: S608
+
+        return result[0] if result else 0
+
+    def generations(self, knowledge_bases: Sequence[str]) -> dict[str, int]:
+        with self._lock:
+            rows: list[tuple[str, int]] = self._client.execute(
+                query=f"""
+                SELECT knowledge_base, generation FROM {self.generations_table_name}
+                WHERE knowledge_base IN (SELECT unnest(?::VARCHAR[]));
+                """,  # noqa: S608
+                parameters=[list(knowledge_bases)],
+            ).fetchall()
+
+        generations: dict[str, int] = dict(rows)
+
+        return {knowledge_base: generations.get(knowledge_base, 0) for knowledge_base in knowledge_bases}
+
+    def put(self, key: str, response: BaseModel) -> None:
+        with self._lock:
+            _ = self._client.execute(
+                query=f"INSERT OR REPLACE INTO {self.results_table_name} VALUES (?, ?, ?);",  # noqa: S608
+                parameters=[key, response.model_dump_json(), time()],
+            )
+            _ = self._client.execute(
+                query=f"""
+                DELETE FROM {self.results_table_name} WHERE key IN (
+                    SELECT key FROM {self.results_table_name} ORDER BY created_at DESC OFFSET ?
+                );
+                """,  # noqa: S608
+                parameters=[self.max_entries],
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            _ = self._client.execute(query=f"DELETE FROM {self.results_table_name};")  # noqa: S608
+
+    def close(self) -> None:
+        with self._lock:
+            self._client.close()
+
+    def _get[ResponseT: BaseModel](self, key: str, response_type: type[ResponseT]) -> ResponseT | None:
+        with self._lock:
+            result = self._client.execute(
+                query=f"SELECT response FROM {self.results_table_name} WHERE key = ?;",  # noqa: S608
+                parameters=[key],
+            ).fetchone()
+
+        if result is None:
+            return None
+
+        return response_type.model_validate_json(result[0])  # pyright: ignore[reportAny]
+
+    def _bump(self, knowledge_bases: set[str]) -> None:
+        with self._lock:
+            _ = self._client.execute(
+                query=f"""
+                INSERT INTO {self.generations_table_name} SELECT unnest(?::VARCHAR[]), 1
+                ON CONFLICT (knowledge_base) DO UPDATE SET generation = generation + 1;
+                """,
+                parameters=[sorted(knowledge_bases)],
+            )
@@ -1,7 +1,7 @@
 from typing import Protocol, runtime_checkable
 
 from llama_index.core.schema import BaseNode
-from llama_index.core.vector_stores.types import MetadataFilters, VectorStore
+from llama_index.core.vector_stores.types import MetadataFilters, VectorStore, VectorStoreQuery, VectorStoreQueryResult
 
 
 @runtime_checkable
@@ -10,6 +10,17 @@ class EnhancedBaseVectorStore(VectorStore, Protocol):
 
     async def metadata_agg(self, key: str) -> dict[str, int]: ...
 
+    async def aquery_metadata(self, query: VectorStoreQuery, metadata_keys: list[str]) -> VectorStoreQueryResult:
+        """Query the vector store for the top k most similar nodes, without their text or embedding.
+
+        The nodes of the result carry only the requested metadata keys, as strings. Hybrid queries fuse the full-text
+        ranking of the query string with the vector ranking, using reciprocal rank fusion."""
+        ...
+
+    async def adelete_by_metadata(self, key: str, values: list[str]) -> int:
+        """Delete the nodes whose metadata key has one of the values, returning the number of nodes deleted."""
+        ...
+
     def get_nodes(self, node_ids: list[str] | None = None, filters: MetadataFilters | None = None) -> list[BaseNode]: ...
 
     def clear(self) -> None: ...
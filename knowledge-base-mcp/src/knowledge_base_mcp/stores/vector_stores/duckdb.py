@@ -1,9 +1,76 @@
-from typing import Any
+import asyncio
+import json
+import threading
+from collections.abc import Sequence
+from logging import Logger
+from typing import Any, override
 
+import duckdb
+import pyarrow
+from duckdb import ColumnExpression, ConstantExpression, DuckDBPyRelation, Expression, FunctionExpression, StarExpression
+from llama_index.core.schema import BaseNode, TextNode
+from llama_index.core.vector_stores.types import (
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
 from llama_index.vector_stores.duckdb import DuckDBVectorStore
+from pydantic import BaseModel, Field, PrivateAttr
+
+from knowledge_base_mcp.stores.vector_stores.fusion import reciprocal_rank_fusion
+from knowledge_base_mcp.utils.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(suffix=__name__)
+
+DEFAULT_INDEXED_METADATA_KEYS: list[str] = ["knowledge_base", "knowledge_base_type", "title"]
+"""The metadata keys that searches, document lookups and deletes filter on."""
+
+METADATA_COLUMN_PREFIX = "metadata_"
+
+DEFAULT_TEXT_INDEX_REFRESH_DELAY = 5.0
+"""The seconds without writes after which the full-text index is rebuilt, so a burst of writes rebuilds it once."""
+
+
+class HNSWIndexConfig(BaseModel):
+    """The parameters of an HNSW index over the embeddings, built with the DuckDB `vss` extension."""
+
+    ef_construction: int = Field(default=128, ge=1, description="The number of candidates considered while building the index.")
+    ef_search: int = Field(default=64, ge=1, description="The number of candidates considered while searching the index.")
+    m: int = Field(default=16, ge=2, description="The maximum number of neighbors of each vector in the index.")
+    filtered_oversample: int = Field(
+        default=4,
+        ge=1,
+        description="For filtered queries, how many candidates to take from the index for each requested result before filtering.",
+    )
+    experimental_persistence: bool = Field(
+        default=False,
+        description=(
+            "Allow the index in an on-disk database, through the experimental persistence of the `vss` extension. "
+            "The index is not recovered safely from the write-ahead log, so a crash can corrupt it or lose the database."
+        ),
+    )
 
 
 class EnhancedDuckDBVectorStore(DuckDBVectorStore):
+    hnsw_index: HNSWIndexConfig | None = None
+    """The HNSW index searched for approximate nearest neighbors. Without it, queries compare every embedding."""
+
+    indexed_metadata_keys: list[str] = Field(default_factory=list)
+    """The metadata keys copied into their own indexed columns, so filters on them do not parse the JSON metadata."""
+
+    text_index_refresh_delay: float = DEFAULT_TEXT_INDEX_REFRESH_DELAY
+    """The seconds without writes after which the full-text index is rebuilt in the background."""
+
+    _text_index_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _text_index_state_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _text_index_writes: int = PrivateAttr(default=0)
+    _text_index_built_writes: int | None = PrivateAttr(default=None)
+    _text_index_searched: bool = PrivateAttr(default=False)
+    _text_index_timer: threading.Timer | None = PrivateAttr(default=None)
+
     def __init__(
         self,
         database_name: str = ":memory:",
@@ -11,6 +78,10 @@ class EnhancedDuckDBVectorStore(DuckDBVectorStore):
         embed_dim: int = 384,
         text_search_config: dict[str, Any] | None = None,
         persist_dir: str = "./storage",
+        *,
+        hnsw_index: HNSWIndexConfig | None = None,
+        indexed_metadata_keys: list[str] | None = None,
+        text_index_refresh_delay: float = DEFAULT_TEXT_INDEX_REFRESH_DELAY,
         **kwargs: Any,  # pyright: ignore[reportAny]
     ) -> None:
         super().__init__(  # pyright: ignore[reportUnknownMemberType]
@@ -22,21 +93,444 @@ class EnhancedDuckDBVectorStore(DuckDBVectorStore):
             **kwargs,
         )
 
+        self.text_index_refresh_delay = text_index_refresh_delay
+
+        self.create_metadata_columns(
+            metadata_keys=DEFAULT_INDEXED_METADATA_KEYS if indexed_metadata_keys is None else indexed_metadata_keys
+        )
+
+        if hnsw_index is not None:
+            self.create_hnsw_index(hnsw_index=hnsw_index)
+
+    @classmethod
+    def metadata_column(cls, key: str) -> str:
+        return f"{METADATA_COLUMN_PREFIX}{key}"
+
+    def create_metadata_columns(self, metadata_keys: list[str]) -> None:
+        """Copy the metadata keys into VARCHAR columns with an ART index, filling them in for the nodes already stored.
+
+        Columns created for other keys before are kept up to date too. Filters on the keys compare the columns, which
+        DuckDB pushes down into the scan and prunes with zone maps, and answers from the index when they are selective.
+        """
+        for key in metadata_keys:
+            if not key.isidentifier():
+                msg = f"Metadata key {key!r} cannot be copied into a column, it is not a valid identifier."
+                raise ValueError(msg)
+
+        table_columns: list[str] = self.table.columns
+
+        if missing_keys := [key for key in metadata_keys if self.metadata_column(key=key) not in table_columns]:
+            self._add_metadata_columns(metadata_keys=missing_keys)
+
+        self.indexed_metadata_keys = [
+            column.removeprefix(METADATA_COLUMN_PREFIX)
+            for column in self.table.columns
+            if column.startswith(METADATA_COLUMN_PREFIX) and column != "metadata_"
+        ]
+
+        # DuckDB cannot index a column in the transaction that filled it in
+        for key in self.indexed_metadata_keys:
+            column = self.metadata_column(key=key)
+            _ = self.client.execute(f"CREATE INDEX IF NOT EXISTS {self.table_name}_{column} ON {self.table_name} ({column})")
+
+    def _add_metadata_columns(self, metadata_keys: list[str]) -> None:
+        """Add the columns of the metadata keys and fill them in with a single update, rolling back if any step fails."""
+        logger.info(f"Copying metadata keys {metadata_keys} into columns of {self.table_name}")
+
+        columns: list[str] = [self.metadata_column(key=key) for key in metadata_keys]
+
+        _ = self.client.begin()
+
+        try:
+            for column in columns:
+                _ = self.client.execute(f"ALTER TABLE {self.table_name} ADD COLUMN {column} VARCHAR")
+
+            assignments: str = ", ".join(
+                f"{column} = json_extract_string(metadata_, '$.{key}')" for key, column in zip(metadata_keys, columns, strict=True)
+            )
+
+            _ = self.client.execute(f"UPDATE {self.table_name} SET {assignments}")  # noqa: S608
+        except duckdb.Error:
+            _ = self.client.rollback()
+            raise
+
+        _ = self.client.commit()
+
+    def _metadata_expression(self, key: str) -> Expression:
+        """The value of a metadata key as a string, read from its column when it has one."""
+        if key in self.indexed_metadata_keys:
+            return ColumnExpression(self.metadata_column(key=key))
+
+        return FunctionExpression("json_extract_string", ColumnExpression("metadata_"), ConstantExpression(f"$.{key}"))
+
+    @override
+    def _build_metadata_filter_expression(self, key: str, value: Any, operator: FilterOperator) -> Expression:  # pyright: ignore[reportAny]
+        """Compare string values of indexed metadata keys with their columns, in a form DuckDB can push down."""
+        values: list[Any] = value if isinstance(value, list) else [value]  # pyright: ignore[reportUnknownVariableType]
+
+        if key not in self.indexed_metadata_keys or not values or not all(isinstance(item, str) for item in values):  # pyright: ignore[reportUnknownVariableType]
+            return super()._build_metadata_filter_expression(key, value, operator)  # pyright: ignore[reportAny]
+
+        column = ColumnExpression(self.metadata_column(key=key))
+
+        if operator == FilterOperator.IN:
+            return column.isin(*[ConstantExpression(item) for item in values])
+
+        if operator == FilterOperator.NIN:
+            return column.isnotin(*[ConstantExpression(item) for item in values])
+
+        return self._build_filter_expression(column, ConstantExpression(value), operator)
+
+    @override
+    def _node_to_arrow_row(self, node: BaseNode) -> dict[str, Any]:
+        row: dict[str, Any] = super()._node_to_arrow_row(node)  # pyright: ignore[reportAny]
+
+        for key in self.indexed_metadata_keys:
+            value: Any = node.metadata.get(key)  # pyright: ignore[reportAny]
+            row[self.metadata_column(key=key)] = value if value is None or isinstance(value, str) else json.dumps(value)
+
+        return row
+
+    @override
+    def add(self, nodes: Sequence[BaseNode], **add_kwargs: Any) -> list[str]:  # pyright: ignore[reportAny]
+        """Add nodes to the vector store, matching the columns of the rows to the columns of the table by name."""
+        rows: list[dict[str, Any]] = [self._node_to_arrow_row(node) for node in nodes]
+
+        self.client.from_arrow(pyarrow.Table.from_pylist(rows)).select(
+            *[ColumnExpression(column) for column in self.table.columns]
+        ).insert_into(self.table.alias)
+
+        self._text_index_changed()
+
+        return [node.node_id for node in nodes]
+
+    @override
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:  # pyright: ignore[reportAny]
+        super().delete(ref_doc_id, **delete_kwargs)
+        self._text_index_changed()
+
+    @override
+    def delete_nodes(
+        self,
+        node_ids: list[str] | None = None,
+        filters: MetadataFilters | None = None,
+        **delete_kwargs: Any,  # pyright: ignore[reportAny]
+    ) -> None:
+        super().delete_nodes(node_ids, filters, **delete_kwargs)
+        self._text_index_changed()
+
+    @override
+    def clear(self, **clear_kwargs: Any) -> None:  # pyright: ignore[reportAny]
+        super().clear(**clear_kwargs)
+        self._text_index_changed()
+
+    @property
+    def text_index_schema(self) -> str:
+        return f"fts_main_{self.table_name}"
+
+    @property
+    def text_index_stale(self) -> bool:
+        """Whether nodes were written or deleted since the full-text index was last built."""
+        return self._text_index_built_writes != self._text_index_writes
+
+    def text_index_exists(self) -> bool:
+        schemas = self.client.execute(
+            "SELECT count(*) FROM duckdb_schemas() WHERE schema_name = ?", parameters=[self.text_index_schema]
+        ).fetchone()
+
+        return bool(schemas and schemas[0])
+
+    def refresh_text_index(self) -> None:
+        """Build the full-text index of the node texts, if nodes were written or deleted since it was last built.
+
+        DuckDB's `fts` indexes are not updated by writes to their table. Once hybrid queries have used the index, writes
+        schedule a rebuild in the background after `text_index_refresh_delay` seconds without further writes, and
+        queries search the existing index until the rebuild is committed.
+        """
+        with self._text_index_lock:
+            # Writes during the rebuild leave the index stale
+            writes: int = self._text_index_writes
+
+            if writes == self._text_index_built_writes:
+                return
+
+            options: dict[str, Any] = {**(self.text_search_config or {}), "overwrite": True}
+
+            settings: str = ", ".join(
+                f"{option} = {ConstantExpression(int(value) if isinstance(value, bool) else value)}" for option, value in options.items()
+            )
+
+            logger.info(f"Building full-text index {self.text_index_schema} of {self.table_name}")
+
+            # Other connections search the previous index until the transaction commits
+            _ = self.client.begin()
+
+            try:
+                _ = self.client.execute(f"PRAGMA create_fts_index('{self.table_name}', 'node_id', 'text', {settings})")
+            except duckdb.Error:
+                _ = self.client.rollback()
+                raise
+
+            _ = self.client.commit()
+
+            self._text_index_built_writes = writes
+
+    def _refresh_text_index_in_background(self) -> None:
+        try:
+            self.refresh_text_index()
+        except duckdb.Error:
+            logger.exception(f"Failed to build full-text index {self.text_index_schema}, it is rebuilt after the next write")
+
+    def _schedule_text_index_refresh(self, delay: float, debounce: bool) -> None:
+        """Rebuild the full-text index in a background thread after the delay.
+
+        With `debounce`, a pending rebuild is pushed back to the end of the delay, otherwise it is left as scheduled.
+        """
+        with self._text_index_state_lock:
+            if self._text_index_timer is not None and self._text_index_timer.is_alive():
+                if not debounce:
+                    return
+
+                self._text_index_timer.cancel()
+
+            self._text_index_timer = threading.Timer(interval=delay, function=self._refresh_text_index_in_background)
+            self._text_index_timer.daemon = True
+            self._text_index_timer.start()
+
+    def _text_index_changed(self) -> None:
+        """Mark the full-text index stale, scheduling a rebuild if hybrid queries have used it."""
+        with self._text_index_state_lock:
+            self._text_index_writes += 1
+
+        if self._text_index_searched:
+            self._schedule_text_index_refresh(delay=self.text_index_refresh_delay, debounce=True)
+
+    @property
+    def hnsw_index_name(self) -> str:
+        return f"{self.table_name}_embedding_hnsw"
+
+    def create_hnsw_index(self, hnsw_index: HNSWIndexConfig) -> None:
+        """Create the HNSW index over the embeddings, if it does not exist yet.
+
+        Queries that order by `array_cosine_distance` and take the top k are answered from the index. On-disk databases
+        only get the index when `experimental_persistence` is set, as the `vss` extension does not replay the index from
+        the write-ahead log safely after a crash.
+        """
+        if self.embed_dim is None:
+            msg = "An HNSW index requires embeddings of a fixed dimension."
+            raise ValueError(msg)
+
+        if self.database_name != ":memory:" and not hnsw_index.experimental_persistence:
+            msg = (
+                "An HNSW index in an on-disk database relies on the experimental persistence of the `vss` extension, "
+                "which can corrupt the index when the write-ahead log is replayed after a crash. Opt in with "
+                "`experimental_persistence` or use an in-memory database."
+            )
+            raise ValueError(msg)
+
+        self.client.install_extension("vss")
+        self.client.load_extension("vss")
+
+        if hnsw_index.experimental_persistence:
+            _ = self.client.execute("SET hnsw_enable_experimental_persistence = true")
+
+        logger.info(f"Creating HNSW index {self.hnsw_index_name} on {self.table_name} (this can take a while for large tables)")
+
+        _ = self.client.execute(f"""
+            CREATE INDEX IF NOT EXISTS {self.hnsw_index_name} ON {self.table_name}
+            USING HNSW (embedding)
+            WITH (metric = 'cosine', ef_construction = {hnsw_index.ef_construction}, ef_search = {hnsw_index.ef_search}, M = {hnsw_index.m})
+        """)
+
+        self.hnsw_index = hnsw_index
+
+    def compact_hnsw_index(self) -> None:
+        """Remove deleted embeddings from the HNSW index, which only marks them as deleted."""
+        if self.hnsw_index is not None:
+            _ = self.client.execute(f"PRAGMA hnsw_compact_index('{self.hnsw_index_name}')")
+
+    def _query_embedding_expression(self, query: VectorStoreQuery) -> Expression:
+        return ConstantExpression(query.query_embedding).cast(self._get_embedding_type(self.embed_dim))
+
+    def _exact_top_k(self, query: VectorStoreQuery, columns: list[Expression]) -> DuckDBPyRelation:
+        """The top k nodes matching the filters, found by comparing the query with every embedding."""
+        inner_query = self.table.select(
+            StarExpression(),
+            FunctionExpression(
+                "array_cosine_similarity" if self.embed_dim is not None else "list_cosine_similarity",
+                ColumnExpression("embedding"),
+                self._query_embedding_expression(query=query),
+            ).alias("score"),
+        ).filter(self._build_metadata_filter_expressions(metadata_filters=query.filters))
+
+        return (
+            inner_query.select(*columns)
+            .filter(ColumnExpression("score").isnotnull())
+            .sort(ColumnExpression("score").desc())
+            .limit(query.similarity_top_k)
+        )
+
+    def _approximate_top_k(self, query: VectorStoreQuery, columns: list[Expression], candidates: int) -> DuckDBPyRelation:
+        """The top k nodes among the nearest candidates in the HNSW index that match the filters.
+
+        The candidates are ordered by `array_cosine_distance` and limited directly on the table, which is the shape of
+        query the `vss` extension answers from the index. The filters apply to the candidates afterwards.
+        """
+        query_embedding: Expression = self._query_embedding_expression(query=query)
+
+        nearest_candidates: DuckDBPyRelation = self.table.sort(
+            FunctionExpression("array_cosine_distance", ColumnExpression("embedding"), query_embedding).asc()
+        ).limit(candidates)
+
+        return (
+            nearest_candidates.filter(self._build_metadata_filter_expressions(metadata_filters=query.filters))
+            .select(
+                StarExpression(),
+                FunctionExpression("array_cosine_similarity", ColumnExpression("embedding"), query_embedding).alias("score"),
+            )
+            .select(*columns)
+            .sort(ColumnExpression("score").desc())
+            .limit(query.similarity_top_k)
+        )
+
+    def _text_top_k(self, query: VectorStoreQuery, columns: list[Expression]) -> DuckDBPyRelation:
+        """The top k nodes matching the filters, ranked by the BM25 score of their text for the query."""
+        bm25 = f"{self.text_index_schema}.match_bm25(node_id, {ConstantExpression(query.query_str)})"
+
+        return (
+            self.client.sql(f"SELECT *, {bm25} AS score FROM {self.table_name}")  # noqa: S608
+            .filter(ColumnExpression("score").isnotnull())
+            .filter(self._build_metadata_filter_expressions(metadata_filters=query.filters))
+            .select(*columns)
+            .sort(ColumnExpression("score").desc())
+            .limit(query.similarity_top_k)
+        )
+
+    def _top_k_rows(self, query: VectorStoreQuery, columns: list[Expression]) -> list[dict[str, Any]]:
+        """The rows of the top k nodes, fusing the vector and full-text rankings of hybrid queries."""
+        vector_rows: list[dict[str, Any]] = self._vector_top_k_rows(query=query, columns=columns)
+
+        if query.mode != VectorStoreQueryMode.HYBRID or not query.query_str:
+            return vector_rows
+
+        self._text_index_searched = True
+
+        if self.text_index_stale:
+            self._schedule_text_index_refresh(delay=0, debounce=False)
+
+        if not self.text_index_exists():
+            logger.debug(f"Full-text index {self.text_index_schema} is being built, answering with the vector results only")
+            return vector_rows
+
+        text_rows: list[dict[str, Any]] = (
+            self.client.execute(self._text_top_k(query=query, columns=columns).sql_query()).arrow().to_pylist()
+        )
+
+        rows_by_id: dict[str, dict[str, Any]] = {row["node_id"]: row for row in [*text_rows, *vector_rows]}
+
+        fused_scores: list[tuple[str, float]] = reciprocal_rank_fusion(
+            rankings=[[row["node_id"] for row in vector_rows], [row["node_id"] for row in text_rows]], top_k=query.similarity_top_k
+        )
+
+        return [{**rows_by_id[node_id], "score": score} for node_id, score in fused_scores]
+
+    def _vector_top_k_rows(self, query: VectorStoreQuery, columns: list[Expression]) -> list[dict[str, Any]]:
+        """The rows of the top k nodes, from the HNSW index when there is one.
+
+        A filtered query takes more candidates from the index than it returns. When too few of them match the filters,
+        the filters are too selective for the index and the query falls back to comparing every embedding.
+        """
+        if self.hnsw_index is None:
+            return self.client.execute(self._exact_top_k(query=query, columns=columns).sql_query()).arrow().to_pylist()
+
+        filtered: bool = query.filters is not None and len(query.filters.filters) > 0
+
+        candidates: int = query.similarity_top_k * (self.hnsw_index.filtered_oversample if filtered else 1)
+
+        rows: list[dict[str, Any]] = (
+            self.client.execute(self._approximate_top_k(query=query, columns=columns, candidates=candidates).sql_query())
+            .arrow()
+            .to_pylist()
+        )
+
+        if filtered and len(rows) < query.similarity_top_k:
+            logger.debug(f"{len(rows)} of {candidates} HNSW candidates matched the filters, falling back to an exact search")
+
+            return self.client.execute(self._exact_top_k(query=query, columns=columns).sql_query()).arrow().to_pylist()
+
+        return rows
+
+    @override
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:  # pyright: ignore[reportAny]
+        """Query the vector store for the top k most similar nodes."""
+        rows: list[dict[str, Any]] = self._top_k_rows(
+            query=query,
+            columns=[ColumnExpression(column) for column in ("node_id", "text", "embedding", "metadata_", "score")],
+        )
+
+        return self._arrow_row_to_query_result(rows)
+
     async def metadata_agg(self, key: str) -> dict[str, int]:
         """
         Get the unique values for a metadata key in the index
         """
 
-        # fetching the table description to ensure the table is initialized
-        _ = self.table.description
+        value = self._metadata_expression(key=key)
 
         command = f"""
-            SELECT json_extract_string(metadata_, '$.{key}') as kb, count(*) as count FROM documents
-            WHERE metadata_.{key} IS NOT NULL
-            GROUP BY json_extract_string(metadata_, '$.{key}')
+            SELECT {value} as kb, count(*) as count FROM {self.table_name}
+            WHERE {value} IS NOT NULL
+            GROUP BY {value}
             ORDER BY kb ASC;
             """  # noqa: S608
 
         results = self.client.execute(query=command).fetchall()
 
         return dict(results)
+
+    def query_metadata(self, query: VectorStoreQuery, metadata_keys: list[str]) -> VectorStoreQueryResult:
+        """
+        Query the vector store for the top k most similar nodes, projecting only their id, score and the metadata keys
+        """
+
+        rows: list[dict[str, Any]] = self._top_k_rows(
+            query=query,
+            columns=[
+                ColumnExpression("node_id"),
+                ColumnExpression("score"),
+                *[self._metadata_expression(key=key).alias(f"metadata_{index}") for index, key in enumerate(metadata_keys)],
+            ],
+        )
+
+        nodes: list[TextNode] = [
+            TextNode(
+                id_=row["node_id"],
+                metadata={key: value for index, key in enumerate(metadata_keys) if (value := row[f"metadata_{index}"]) is not None},
+            )
+            for row in rows
+        ]
+
+        return VectorStoreQueryResult(nodes=nodes, similarities=[row["score"] for row in rows], ids=[row["node_id"] for row in rows])
+
+    async def aquery_metadata(self, query: VectorStoreQuery, metadata_keys: list[str]) -> VectorStoreQueryResult:
+        return await asyncio.to_thread(self.query_metadata, query, metadata_keys)
+
+    def delete_by_metadata(self, key: str, values: list[str]) -> int:
+        """
+        Delete the nodes whose metadata key has one of the values with a single statement
+        """
+
+        filter_expression = self._build_metadata_filter_expressions(
+            metadata_filters=MetadataFilters(filters=[MetadataFilter(key=key, value=values, operator=FilterOperator.IN)])
+        )
+
+        deleted = self.client.execute(f"DELETE FROM {self.table.alias} WHERE {filter_expression}").fetchone()  # noqa: S608
+
+        if deleted and deleted[0]:
+            self.compact_hnsw_index()
+            self._text_index_changed()
+
+        return int(deleted[0]) if deleted else 0
+
+    async def adelete_by_metadata(self, key: str, values: list[str]) -> int:
+        return await asyncio.to_thread(self.delete_by_metadata, key, values)
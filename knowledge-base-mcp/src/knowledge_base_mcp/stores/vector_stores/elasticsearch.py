@@ -1,12 +1,90 @@
+import asyncio
+from logging import Logger
+from typing import Any
+
+from llama_index.core.schema import BaseNode, TextNode
+from llama_index.core.vector_stores.types import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
 from llama_index.vector_stores.elasticsearch import ElasticsearchStore
-from llama_index.vector_stores.elasticsearch.base import asyncio
+
+from knowledge_base_mcp.stores.vector_stores.fusion import reciprocal_rank_fusion
+from knowledge_base_mcp.utils.logging import BASE_LOGGER
+
+logger: Logger = BASE_LOGGER.getChild(suffix=__name__)
+
+DELETE_PROGRESS_INTERVAL = 1.0
+"""The number of seconds between checks on the progress of a bulk delete."""
+
+KNN_CANDIDATES_PER_RESULT = 10
+"""The number of candidates each shard considers in a kNN search for each requested result."""
+
+RANGE_OPERATORS: dict[FilterOperator, str] = {
+    FilterOperator.GT: "gt",
+    FilterOperator.GTE: "gte",
+    FilterOperator.LT: "lt",
+    FilterOperator.LTE: "lte",
+}
+
+TERM_OPERATORS: dict[FilterOperator, str] = {
+    FilterOperator.EQ: "term",
+    FilterOperator.NE: "term",
+    FilterOperator.IN: "terms",
+    FilterOperator.NIN: "terms",
+}
+
+CONDITION_OCCURRENCES: dict[FilterCondition, str] = {
+    FilterCondition.AND: "must",
+    FilterCondition.OR: "should",
+    FilterCondition.NOT: "must_not",
+}
+
+
+def metadata_filter_to_query(metadata_filter: MetadataFilter | MetadataFilters) -> dict[str, Any]:
+    """Translate metadata filters into an Elasticsearch query.
+
+    Strings are compared with the `keyword` sub-field of the metadata key, like in deletes and aggregations, and ranges
+    compare the metadata key itself.
+    """
+    if isinstance(metadata_filter, MetadataFilters):
+        occurrence: str = CONDITION_OCCURRENCES[metadata_filter.condition or FilterCondition.AND]
+        return {"bool": {occurrence: [metadata_filter_to_query(metadata_filter=item) for item in metadata_filter.filters]}}
+
+    key: str = f"metadata.{metadata_filter.key}"
+    value: Any = metadata_filter.value  # pyright: ignore[reportAny]
+    operator: FilterOperator = metadata_filter.operator
+
+    if operator in RANGE_OPERATORS:
+        return {"range": {key: {RANGE_OPERATORS[operator]: value}}}
+
+    if operator not in TERM_OPERATORS:
+        msg = f"Metadata filter operator {operator} is not supported by Elasticsearch queries."
+        raise ValueError(msg)
+
+    values: list[Any] = value if isinstance(value, list) else [value]  # pyright: ignore[reportUnknownVariableType]
+    term_key: str = f"{key}.keyword" if all(isinstance(item, str) for item in values) else key  # pyright: ignore[reportUnknownVariableType]
+
+    query: dict[str, Any] = {TERM_OPERATORS[operator]: {term_key: value}}
+
+    return {"bool": {"must_not": query}} if operator in {FilterOperator.NE, FilterOperator.NIN} else query
 
 
 class EnhancedElasticsearchStore(ElasticsearchStore):
     """An enhanced Elasticsearch vector store."""
 
-    def __init__(self, *args, **kwargs):
+    knn_candidates_per_result: int = KNN_CANDIDATES_PER_RESULT
+    """The number of candidates each shard considers in a kNN search for each requested result. Higher values trade
+    latency for recall."""
+
+    def __init__(self, *args, knn_candidates_per_result: int = KNN_CANDIDATES_PER_RESULT, **kwargs):
         super().__init__(*args, **kwargs)
+        self.knn_candidates_per_result = knn_candidates_per_result
         asyncio.get_event_loop().run_until_complete(self._store._create_index_if_not_exists())
 
     async def aclear(self) -> None:
@@ -14,6 +92,31 @@ class EnhancedElasticsearchStore(ElasticsearchStore):
 
         await self._store._create_index_if_not_exists()
 
+    async def adelete_by_metadata(self, key: str, values: list[str]) -> int:
+        """
+        Delete the nodes whose metadata key has one of the values with a sliced `delete_by_query`, logging its progress
+        """
+        response = await self._store.client.delete_by_query(
+            index=self.index_name,
+            query={"terms": {f"metadata.{key}.keyword": values}},
+            slices="auto",
+            conflicts="proceed",
+            refresh=True,
+            wait_for_completion=False,
+        )
+
+        while not (task := await self._store.client.tasks.get(task_id=response["task"]))["completed"]:
+            status: dict[str, Any] = task["task"]["status"]
+            logger.info(f"Deleted {status['deleted']} of {status['total']} nodes from {self.index_name}")
+
+            await asyncio.sleep(DELETE_PROGRESS_INTERVAL)
+
+        if failures := task["response"]["failures"]:
+            msg = f"Failed to delete {len(failures)} nodes from {self.index_name}: {failures[:3]}"
+            raise RuntimeError(msg)
+
+        return int(task["response"]["deleted"])
+
     async def metadata_agg(self, key: str) -> dict[str, int]:
         """
         Get the unique values for a metadata key in the index
@@ -21,3 +124,77 @@ class EnhancedElasticsearchStore(ElasticsearchStore):
         query = {"size": 0, "aggs": {"metadata_keys": {"terms": {"field": f"metadata.{key}.keyword", "size": 1000}}}}
         response = await self._store.client.search(index=self.index_name, body=query)
         return {doc["key"]: doc["doc_count"] for doc in response["aggregations"]["metadata_keys"]["buckets"]}
+
+    async def _search_hits(self, body: dict[str, Any]) -> list[dict[str, Any]]:
+        response = await self._store.client.search(index=self.index_name, body=body)
+        return response["hits"]["hits"]
+
+    async def aquery_metadata(self, query: VectorStoreQuery, metadata_keys: list[str]) -> VectorStoreQueryResult:
+        """
+        Query the vector store for the top k most similar nodes, returning only their id, score and the metadata keys
+
+        Hybrid queries also run a `match` query on the node text, and fuse both rankings with reciprocal rank fusion
+        """
+        filters: list[dict[str, Any]] = (
+            [metadata_filter_to_query(metadata_filter=query.filters)] if query.filters is not None and query.filters.filters else []
+        )
+        source: list[str] | bool = [f"metadata.{key}" for key in metadata_keys] or False
+
+        knn: dict[str, Any] = {
+            "field": self.vector_field,
+            "query_vector": query.query_embedding,
+            "k": query.similarity_top_k,
+            "num_candidates": query.similarity_top_k * self.knn_candidates_per_result,
+        }
+
+        if filters:
+            knn["filter"] = filters
+
+        searches = [self._search_hits(body={"knn": knn, "size": query.similarity_top_k, "_source": source})]
+
+        if query.mode == VectorStoreQueryMode.HYBRID and query.query_str:
+            text_query: dict[str, Any] = {"bool": {"must": {"match": {self.text_field: query.query_str}}, "filter": filters}}
+            searches.append(self._search_hits(body={"query": text_query, "size": query.similarity_top_k, "_source": source}))
+
+        rankings: list[list[dict[str, Any]]] = await asyncio.gather(*searches)
+
+        hits_by_id: dict[str, dict[str, Any]] = {hit["_id"]: hit for ranking in reversed(rankings) for hit in ranking}
+
+        scores: list[tuple[str, float]] = (
+            [(hit["_id"], hit["_score"]) for hit in rankings[0]]
+            if len(rankings) == 1
+            else reciprocal_rank_fusion(rankings=[[hit["_id"] for hit in ranking] for ranking in rankings], top_k=query.similarity_top_k)
+        )
+
+        nodes: list[TextNode] = [
+            TextNode(
+                id_=node_id,
+                metadata={
+                    key: str(value)
+                    for key in metadata_keys
+                    if (value := hits_by_id[node_id].get("_source", {}).get("metadata", {}).get(key)) is not None
+                },
+            )
+            for node_id, _ in scores
+        ]
+
+        return VectorStoreQueryResult(nodes=nodes, similarities=[score for _, score in scores], ids=[node_id for node_id, _ in scores])
+
+    async def aquery(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Query the vector store, fusing the kNN and `match` rankings of hybrid queries before fetching the nodes."""
+        if query.mode != VectorStoreQueryMode.HYBRID or not query.query_str:
+            return await super().aquery(query, **kwargs)
+
+        fused: VectorStoreQueryResult = await self.aquery_metadata(query=query, metadata_keys=[])
+
+        nodes_by_id: dict[str, BaseNode] = {node.node_id: node for node in await self.aget_nodes(node_ids=fused.ids)}
+
+        ranked: list[tuple[str, float]] = [
+            (node_id, score) for node_id, score in zip(fused.ids or [], fused.similarities or [], strict=True) if node_id in nodes_by_id
+        ]
+
+        return VectorStoreQueryResult(
+            nodes=[nodes_by_id[node_id] for node_id, _ in ranked],
+            similarities=[score for _, score in ranked],
+            ids=[node_id for node_id, _ in ranked],
+        )
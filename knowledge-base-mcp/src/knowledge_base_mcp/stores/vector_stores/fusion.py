@@ -0,0 +1,17 @@
+from collections.abc import Sequence
+
+DEFAULT_RRF_K = 60
+"""The rank offset of reciprocal rank fusion, which keeps the top few ranks of one ranking from outweighing the others."""
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], top_k: int, k: int = DEFAULT_RRF_K) -> list[tuple[str, float]]:
+    """Fuse rankings of node ids into the top k node ids by their summed reciprocal ranks, `1 / (k + rank)`.
+
+    Ranks start at 1. Ties keep the order in which the nodes first appear in the rankings."""
+    scores: dict[str, float] = {}
+
+    for ranking in rankings:
+        for rank, node_id in enumerate(ranking, start=1):
+            scores[node_id] = scores.get(node_id, 0) + 1 / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
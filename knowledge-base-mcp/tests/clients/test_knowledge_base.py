@@ -0,0 +1,183 @@
+import asyncio
+import time
+from itertools import pairwise
+from typing import Any
+
+import pytest
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.indices.vector_store import VectorStoreIndex
+from llama_index.core.schema import Document, NodeRelationship, NodeWithScore, TextNode
+from llama_index.core.storage import StorageContext
+from llama_index.storage.kvstore.duckdb import DuckDBKVStore
+
+from knowledge_base_mcp.clients.knowledge_base import KnowledgeBaseClient
+from knowledge_base_mcp.llama_index.embeddings.lazy import LazyEmbedding
+from knowledge_base_mcp.main import DEFAULT_DOCS_CROSS_ENCODER_MODEL
+from knowledge_base_mcp.stores.docstores.duckdb import EnhancedDuckDBDocumentStore
+from knowledge_base_mcp.stores.search_result_cache import InMemorySearchResultCache
+from knowledge_base_mcp.stores.vector_stores.duckdb import EnhancedDuckDBVectorStore
+
+EMBED_DIM = 4
+
+MODEL_LOAD_SECONDS = 0.5
+
+
+def make_knowledge_base_client(embed_model: BaseEmbedding) -> KnowledgeBaseClient:
+    vector_store = EnhancedDuckDBVectorStore(embed_dim=EMBED_DIM)
+    docstore = EnhancedDuckDBDocumentStore(duckdb_kvstore=DuckDBKVStore())
+
+    storage_context = StorageContext.from_defaults(vector_store=vector_store, docstore=docstore)
+    vector_store_index = VectorStoreIndex(storage_context=storage_context, embed_model=embed_model, nodes=[])
+
+    return KnowledgeBaseClient(vector_store_index=vector_store_index, reranker_model=DEFAULT_DOCS_CROSS_ENCODER_MODEL)
+
+
+@pytest.fixture
+def knowledge_base_client() -> KnowledgeBaseClient:
+    return make_knowledge_base_client(embed_model=MockEmbedding(embed_dim=EMBED_DIM))
+
+
+def ingested_nodes(knowledge_base: str, text: str) -> list[Document | TextNode]:
+    """A document and the embedded node parsed from it."""
+    document = Document(text=text, metadata={"knowledge_base": knowledge_base})
+
+    node = TextNode(text=text, metadata={"knowledge_base": knowledge_base}, embedding=[0.5] * EMBED_DIM)
+    node.relationships[NodeRelationship.SOURCE] = document.as_related_node_info()
+
+    return [document, node]
+
+
+async def write_nodes(knowledge_base_client: KnowledgeBaseClient, nodes: list[Document | TextNode]) -> None:
+    """Write the nodes to the docstore and the embedded nodes to the vector store, like the ingest pipeline."""
+    await knowledge_base_client.docstore.async_add_documents(docs=nodes)
+    _ = await knowledge_base_client.vector_store.async_add(nodes=[node for node in nodes if node.embedding is not None])
+
+
+async def test_catalog_lists_knowledge_bases_ingested_before_it_existed(knowledge_base_client: KnowledgeBaseClient) -> None:
+    await write_nodes(knowledge_base_client, nodes=ingested_nodes(knowledge_base="before", text="Ingested before the catalog"))
+
+    # The first ingest after the upgrade records only its own knowledge base in the catalog
+    after: list[Document | TextNode] = ingested_nodes(knowledge_base="after", text="Ingested after the catalog")
+    await write_nodes(knowledge_base_client, nodes=after)
+    await knowledge_base_client.knowledge_base_catalog.arecord_ingest(nodes=after)
+
+    assert await knowledge_base_client.get_knowledge_bases() == {"after": 1, "before": 1}
+
+    catalog = await knowledge_base_client.get_knowledge_base_catalog()
+
+    assert (catalog["before"].documents, catalog["before"].size, catalog["before"].last_ingest) == (1, None, None)
+    assert await knowledge_base_client.knowledge_base_catalog.ais_initialized()
+
+
+async def test_delete_all_knowledge_bases_deletes_knowledge_bases_missing_from_the_catalog(
+    knowledge_base_client: KnowledgeBaseClient,
+) -> None:
+    await write_nodes(knowledge_base_client, nodes=ingested_nodes(knowledge_base="before", text="Ingested before the catalog"))
+    await knowledge_base_client.knowledge_base_catalog.areplace(entries={})
+
+    await knowledge_base_client.delete_all_knowledge_bases()
+
+    assert await knowledge_base_client.vector_store.metadata_agg(key="knowledge_base") == {}
+
+
+async def test_fetch_nodes_hydrates_the_retrieved_metadata(knowledge_base_client: KnowledgeBaseClient) -> None:
+    await write_nodes(knowledge_base_client, nodes=ingested_nodes(knowledge_base="a", text="About the first knowledge base"))
+    await write_nodes(knowledge_base_client, nodes=ingested_nodes(knowledge_base="b", text="About the second knowledge base"))
+
+    retrieved = await knowledge_base_client.aretrieve_metadata(
+        query="knowledge base", knowledge_base="a", query_embedding=[0.5] * EMBED_DIM
+    )
+
+    assert [(result.node.metadata, result.node.get_content()) for result in retrieved] == [({"knowledge_base": "a"}, "")]
+
+    # The shared results of several queries keep their place and score
+    fetched = await knowledge_base_client.afetch_nodes(nodes_with_scores=[*retrieved, *retrieved])
+
+    assert [(result.node.node_id, result.node.get_content(), result.score) for result in fetched] == [
+        (retrieved[0].node.node_id, "About the first knowledge base", retrieved[0].score)
+    ] * 2
+
+
+async def test_fetch_nodes_falls_back_to_the_docstore(knowledge_base_client: KnowledgeBaseClient) -> None:
+    document, node = ingested_nodes(knowledge_base="a", text="Only the docstore holds this text")
+    await knowledge_base_client.docstore.async_add_documents(docs=[document, node])
+    _ = await knowledge_base_client.vector_store.async_add(nodes=[node.model_copy(update={"text": ""})])
+
+    fetched = await knowledge_base_client.afetch_nodes(
+        nodes_with_scores=[
+            NodeWithScore(node=TextNode(id_=node.node_id), score=1.0),
+            NodeWithScore(node=TextNode(id_="missing"), score=0.5),
+        ]
+    )
+
+    assert [(result.node.get_content(), result.score) for result in fetched] == [("Only the docstore holds this text", 1.0)]
+
+
+@pytest.mark.parametrize(
+    "configuration",
+    [{"reranker_model": "other-reranker"}, {"reranker_max_candidates": 50}, {"reranker_early_exit_top_k": 10}, {"hybrid_search": True}],
+)
+def test_search_configuration_changes_the_cache_key(knowledge_base_client: KnowledgeBaseClient, configuration: dict[str, object]) -> None:
+    search_result_cache = InMemorySearchResultCache()
+    reconfigured_client = knowledge_base_client.model_copy(update=configuration)
+
+    keys = {
+        search_result_cache.key(search="docs", query="query", knowledge_bases=None, parameters=client.search_configuration)
+        for client in [knowledge_base_client, reconfigured_client]
+    }
+
+    assert len(keys) == 2
+
+
+class SlowRanker:
+    """A FlashRank ranker that takes a while to load, and scores every passage the same."""
+
+    def __init__(self, model_name: str, max_length: int) -> None:
+        time.sleep(MODEL_LOAD_SECONDS)
+
+    def rerank(self, request: Any) -> list[dict[str, Any]]:  # pyright: ignore[reportExplicitAny]
+        return [{"id": passage["id"], "score": 1.0} for passage in request.passages]  # pyright: ignore[reportAny]
+
+
+def load_slow_embedding() -> BaseEmbedding:
+    time.sleep(MODEL_LOAD_SECONDS)
+    return MockEmbedding(embed_dim=EMBED_DIM)
+
+
+async def test_warm_up_keeps_the_event_loop_responsive(monkeypatch: pytest.MonkeyPatch) -> None:
+    flashrank = pytest.importorskip("flashrank")
+    monkeypatch.setattr(flashrank, "Ranker", SlowRanker)
+
+    knowledge_base_client = make_knowledge_base_client(
+        embed_model=LazyEmbedding(loader=load_slow_embedding, model_name="mock:lazy", embed_batch_size=2)
+    )
+
+    ticks: list[float] = []
+
+    async def tick() -> None:
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+
+    knowledge_base_client.start_warm_up()
+
+    assert await knowledge_base_client.get_model_status() == {"embed_model": "loading", "reranker": "loading"}
+
+    # A search during warm-up embeds its query and reranks, waiting for the models without blocking the event loop
+    _ = await knowledge_base_client.aget_query_embeddings(queries=["query"])
+    reranked = await knowledge_base_client.reranker.apostprocess_nodes(nodes=[NodeWithScore(node=TextNode(text="text"))], query_str="query")
+
+    _ = ticker.cancel()
+
+    longest_tick: float = max(later - earlier for earlier, later in pairwise(ticks))
+
+    assert longest_tick < MODEL_LOAD_SECONDS / 2
+    assert [node.score for node in reranked] == [1.0]
+
+    await asyncio.wait_for(asyncio.shield(knowledge_base_client._warm_up_task), timeout=5)  # pyright: ignore[reportPrivateUsage, reportArgumentType]
+
+    assert await knowledge_base_client.get_model_status() == {"embed_model": "ready", "reranker": "ready"}
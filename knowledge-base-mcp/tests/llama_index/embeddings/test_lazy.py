@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import override
+
+import pytest
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.embeddings import MockEmbedding
+from pydantic import Field
+
+from knowledge_base_mcp.llama_index.embeddings.lazy import LazyEmbedding
+
+
+class CountingLoader:
+    """A loader that records how many times it was called."""
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+
+    def __call__(self) -> BaseEmbedding:
+        self.calls += 1
+        return MockEmbedding(embed_dim=4, model_name="mock")
+
+
+@pytest.fixture
+def loader() -> CountingLoader:
+    return CountingLoader()
+
+
+@pytest.fixture
+def lazy_embedding(loader: CountingLoader) -> LazyEmbedding:
+    return LazyEmbedding(loader=loader, model_name="mock:lazy", embed_batch_size=2)
+
+
+def test_not_loaded_until_used(lazy_embedding: LazyEmbedding, loader: CountingLoader) -> None:
+    assert not lazy_embedding.loaded
+    assert lazy_embedding.model_name == "mock:lazy"
+    assert loader.calls == 0
+
+    assert lazy_embedding.get_query_embedding(query="query") == [0.5] * 4
+
+    assert lazy_embedding.loaded
+    assert loader.calls == 1
+
+
+def test_text_embeddings(lazy_embedding: LazyEmbedding, loader: CountingLoader) -> None:
+    assert lazy_embedding.get_text_embedding(text="text") == [0.5] * 4
+    assert lazy_embedding.get_text_embedding_batch(texts=["one", "two", "three"]) == [[0.5] * 4] * 3
+
+    assert loader.calls == 1
+
+
+async def test_async_embeddings(lazy_embedding: LazyEmbedding, loader: CountingLoader) -> None:
+    assert await lazy_embedding.aget_query_embedding(query="query") == [0.5] * 4
+    assert await lazy_embedding.aget_text_embedding(text="text") == [0.5] * 4
+    assert await lazy_embedding.aget_text_embedding_batch(texts=["one", "two", "three"]) == [[0.5] * 4] * 3
+
+    assert loader.calls == 1
+
+
+def test_concurrent_loads_load_once(lazy_embedding: LazyEmbedding, loader: CountingLoader) -> None:
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        models = list(executor.map(lambda _: lazy_embedding.load(), range(8)))
+
+    assert loader.calls == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_to_dict_describes_wrapped_model(lazy_embedding: LazyEmbedding) -> None:
+    assert lazy_embedding.to_dict()["class_name"] == "MockEmbedding"
+
+
+async def test_query_embeddings(lazy_embedding: LazyEmbedding, loader: CountingLoader) -> None:
+    assert lazy_embedding.get_query_embeddings(queries=["one", "two"]) == [[0.5] * 4] * 2
+    assert await lazy_embedding.aget_query_embeddings(queries=["one", "two", "three"]) == [[0.5] * 4] * 3
+
+    assert loader.calls == 1
+
+
+class CountingQueryEmbedding(MockEmbedding):
+    """A model that records the queries it embeds through the public API."""
+
+    queries: list[str] = Field(default_factory=list)
+
+    @override
+    def get_query_embedding(self, query: str) -> Embedding:
+        self.queries.append(query)
+        return super().get_query_embedding(query=query)
+
+
+def test_query_embeddings_of_other_models_use_the_public_api() -> None:
+    model = CountingQueryEmbedding(embed_dim=4)
+    lazy_embedding = LazyEmbedding(loader=lambda: model, model_name="mock:lazy")
+
+    assert lazy_embedding.get_query_embeddings(queries=["one", "two"]) == [[0.5] * 4] * 2
+    assert model.queries == ["one", "two"]
@@ -3,6 +3,7 @@ from llama_index.core.schema import Node, NodeWithScore
 from llama_index.core.storage.docstore.simple_docstore import SimpleDocumentStore
 
 from knowledge_base_mcp.llama_index.post_processors.get_child_nodes import GetChildNodesPostprocessor
+from knowledge_base_mcp.stores.node_cache import NodeCache
 from tests.llama_index.post_processors.conftest import get_node_ids, score_nodes
 
 
@@ -35,6 +36,23 @@ class Test1p2c:
         assert len(result) == 3
         assert get_node_ids(result) == sorted(["p1", "p1_c1", "p1_c2"])
 
+    async def test_async_with_node_cache(
+        self,
+        doc_store: SimpleDocumentStore,
+        query_result_parent_nodes: list[NodeWithScore],
+    ):
+        node_cache = NodeCache()
+        cached_postprocessor: GetChildNodesPostprocessor = GetChildNodesPostprocessor(doc_store=doc_store, node_cache=node_cache)
+
+        result = await cached_postprocessor.apostprocess_nodes(nodes=query_result_parent_nodes)
+        assert get_node_ids(result) == sorted(["p1", "p1_c1", "p1_c2"])
+
+        # The second query is served from the node cache, even once the child nodes are gone from the doc store
+        doc_store.delete_document("p1_c1")
+        result = await cached_postprocessor.apostprocess_nodes(nodes=query_result_parent_nodes)
+        assert get_node_ids(result) == sorted(["p1", "p1_c1", "p1_c2"])
+        assert node_cache.stats() == {"hits": 2, "misses": 2, "hit_ratio": 0.5, "entries": 2}
+
     def test_toss_parent_nodes(
         self,
         doc_store: SimpleDocumentStore,
@@ -3,6 +3,8 @@ from llama_index.core.schema import Node, NodeWithScore
 from llama_index.core.storage.docstore.simple_docstore import SimpleDocumentStore
 
 from knowledge_base_mcp.llama_index.post_processors.get_parent_nodes import GetParentNodesPostprocessor
+from knowledge_base_mcp.llama_index.transformations.metadata import AddSizeMetadata
+from knowledge_base_mcp.stores.node_cache import NodeCache
 from tests.llama_index.post_processors.conftest import get_node_ids, score_nodes
 
 
@@ -51,6 +53,22 @@ class Test1p2c:
         assert len(result) == 1
         assert get_node_ids(result) == ["p1"]
 
+    async def test_async_with_node_cache(
+        self,
+        doc_store: SimpleDocumentStore,
+        query_result_one_child_node: list[NodeWithScore],
+        query_result_both_child_nodes: list[NodeWithScore],
+    ):
+        node_cache = NodeCache()
+        cached_postprocessor: GetParentNodesPostprocessor = GetParentNodesPostprocessor(doc_store=doc_store, node_cache=node_cache)
+
+        result = await cached_postprocessor.apostprocess_nodes(nodes=query_result_both_child_nodes)
+        assert get_node_ids(result) == ["p1"]
+
+        result = await cached_postprocessor.apostprocess_nodes(nodes=query_result_one_child_node)
+        assert get_node_ids(result) == ["p1"]
+        assert node_cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "entries": 1}
+
     def test_minimum_size(
         self,
         doc_store: SimpleDocumentStore,
@@ -81,6 +99,21 @@ class Test1p2c:
         assert len(result) == 1
         assert get_node_ids(result) == ["p1_c1"]
 
+    def test_recorded_size_rules_out_parent_without_fetching(
+        self,
+        doc_store: SimpleDocumentStore,
+        example_1p_2c: tuple[Node, Node, Node],
+        query_result_both_child_nodes: list[NodeWithScore],
+    ):
+        _ = AddSizeMetadata()(list(example_1p_2c))
+
+        # Fetching the parent node would fail, as it is gone from the doc store
+        doc_store.delete_document("p1")
+
+        custom_postprocessor: GetParentNodesPostprocessor = GetParentNodesPostprocessor(doc_store=doc_store, maximum_size=50)
+        result = custom_postprocessor.postprocess_nodes(nodes=query_result_both_child_nodes)
+        assert get_node_ids(result) == ["p1_c1", "p1_c2"]
+
     def test_1_threshold(
         self,
         doc_store: SimpleDocumentStore,
@@ -0,0 +1,93 @@
+from typing import override
+
+import pytest
+from llama_index.core.schema import MediaResource, Node, NodeWithScore
+
+from knowledge_base_mcp.llama_index.post_processors.rerank import RerankPostprocessor
+from knowledge_base_mcp.stores.rerank_score_cache import RerankScoreCache
+
+
+class LengthRerankPostprocessor(RerankPostprocessor):
+    """A reranker that scores texts by their length, and records the texts it scores."""
+
+    scored_texts: list[str] = []  # noqa: RUF012
+
+    @override
+    def _score(self, query: str, texts: list[str]) -> list[float]:
+        self.scored_texts.extend(texts)
+        return [float(len(text)) for text in texts]
+
+
+def retrieved_nodes(*texts: str) -> list[NodeWithScore]:
+    """Nodes retrieved in the order of the texts, with descending retrieval scores."""
+    return [
+        NodeWithScore(node=Node(id_=text, text_resource=MediaResource(text=text)), score=1 - index / len(texts))
+        for index, text in enumerate(texts)
+    ]
+
+
+def get_node_ids(nodes: list[NodeWithScore]) -> list[str]:
+    return [node.node.node_id for node in nodes]
+
+
+def test_reranks_by_score() -> None:
+    postprocessor = LengthRerankPostprocessor(scored_texts=[])
+
+    result = postprocessor.postprocess_nodes(nodes=retrieved_nodes("a", "ccc", "bb"), query_str="query")
+
+    assert get_node_ids(result) == ["ccc", "bb", "a"]
+    assert [node.score for node in result] == [3.0, 2.0, 1.0]
+
+
+def test_top_n() -> None:
+    postprocessor = LengthRerankPostprocessor(scored_texts=[], top_n=2)
+
+    result = postprocessor.postprocess_nodes(nodes=retrieved_nodes("a", "ccc", "bb"), query_str="query")
+
+    assert get_node_ids(result) == ["ccc", "bb"]
+
+
+def test_max_candidates_scores_the_best_retrieved_nodes() -> None:
+    postprocessor = LengthRerankPostprocessor(scored_texts=[], max_candidates=2)
+
+    nodes = retrieved_nodes("a", "ccc", "bb")
+    result = postprocessor.postprocess_nodes(nodes=list(reversed(nodes)), query_str="query")
+
+    assert postprocessor.scored_texts == ["a", "ccc"]
+    assert get_node_ids(result) == ["ccc", "a"]
+
+
+def test_early_exit_stops_once_the_top_k_is_stable() -> None:
+    postprocessor = LengthRerankPostprocessor(scored_texts=[], early_exit_top_k=2, early_exit_batch_size=2)
+
+    result = postprocessor.postprocess_nodes(nodes=retrieved_nodes("dddd", "ccc", "a", "b", "e", "f", "gg", "hh"), query_str="query")
+
+    # The top 2 is set by the first batch and left unchanged by the second, so the last two batches are never scored
+    assert postprocessor.scored_texts == ["dddd", "ccc", "a", "b"]
+    assert get_node_ids(result) == ["dddd", "ccc", "a", "b"]
+
+
+def test_early_exit_keeps_scoring_while_the_top_k_changes() -> None:
+    postprocessor = LengthRerankPostprocessor(scored_texts=[], early_exit_top_k=2, early_exit_batch_size=2)
+
+    result = postprocessor.postprocess_nodes(nodes=retrieved_nodes("a", "b", "ccc", "dddd", "e", "f", "g", "h"), query_str="query")
+
+    assert postprocessor.scored_texts == ["a", "b", "ccc", "dddd", "e", "f"]
+    assert get_node_ids(result)[:2] == ["dddd", "ccc"]
+
+
+@pytest.mark.parametrize("query", ["query", "other query"])
+def test_score_cache(query: str) -> None:
+    score_cache = RerankScoreCache()
+    postprocessor = LengthRerankPostprocessor(scored_texts=[], score_cache=score_cache)
+
+    _ = postprocessor.postprocess_nodes(nodes=retrieved_nodes("a", "bb"), query_str="query")
+    result = postprocessor.postprocess_nodes(nodes=retrieved_nodes("a", "bb", "ccc"), query_str=query)
+
+    if query == "query":
+        assert postprocessor.scored_texts == ["a", "bb", "ccc"]
+        assert score_cache.stats() == {"hits": 2, "misses": 3, "hit_ratio": 0.4, "entries": 3}
+    else:
+        assert postprocessor.scored_texts == ["a", "bb", "a", "bb", "ccc"]
+
+    assert get_node_ids(result) == ["ccc", "bb", "a"]
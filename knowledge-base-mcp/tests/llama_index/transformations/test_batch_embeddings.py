@@ -0,0 +1,130 @@
+from typing import override
+
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import BaseNode, MediaResource, MetadataMode, Node
+
+from knowledge_base_mcp.llama_index.transformations.batch_embeddings import BatchedNodeEmbedding
+from knowledge_base_mcp.stores.embedding_cache import EmbeddingCache
+
+
+class CountingEmbedding(MockEmbedding):
+    """A mock embedding model that records the texts it embeds."""
+
+    embedded_texts: list[str] = []  # noqa: RUF012
+
+    @override
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        self.embedded_texts.extend(texts)
+        return [[float(len(text)), *([0.5] * (self.embed_dim - 1))] for text in texts]
+
+    @override
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._get_text_embeddings(texts=texts)
+
+
+class CountingNode(Node):
+    """A node that records how many times its content is built."""
+
+    content_builds: list[str] = []  # noqa: RUF012
+
+    @override
+    def get_content(self, metadata_mode: MetadataMode = MetadataMode.NONE) -> str:
+        content = super().get_content(metadata_mode=metadata_mode)
+        self.content_builds.append(content)
+        return content
+
+
+def make_nodes(*texts: str) -> list[BaseNode]:
+    return [Node(text_resource=MediaResource(text=text)) for text in texts]
+
+
+@pytest.fixture
+def embed_model() -> CountingEmbedding:
+    return CountingEmbedding(embed_dim=4, model_name="counting", embedded_texts=[])
+
+
+def test_call(embed_model: CountingEmbedding) -> None:
+    batched_node_embedding = BatchedNodeEmbedding(embed_model=embed_model, batch_size=2)
+
+    nodes = batched_node_embedding(nodes=make_nodes("one", "three", "fifteen"))
+
+    assert [node.embedding for node in nodes] == [[3.0, 0.5, 0.5, 0.5], [5.0, 0.5, 0.5, 0.5], [7.0, 0.5, 0.5, 0.5]]
+    assert embed_model.embedded_texts == ["fifteen", "three", "one"]
+
+
+def test_call_unsorted(embed_model: CountingEmbedding) -> None:
+    batched_node_embedding = BatchedNodeEmbedding(embed_model=embed_model, batch_size=2, sort_by_length=False)
+
+    _ = batched_node_embedding(nodes=make_nodes("one", "three", "fifteen"))
+
+    assert embed_model.embedded_texts == ["one", "three", "fifteen"]
+
+
+@pytest.mark.parametrize("num_workers", [1, 4])
+async def test_acall_restores_order(embed_model: CountingEmbedding, num_workers: int) -> None:
+    texts = [f"node {'x' * (i * 7 % 13)}" for i in range(20)]
+    batched_node_embedding = BatchedNodeEmbedding(embed_model=embed_model, batch_size=3, num_workers=num_workers)
+
+    nodes = await batched_node_embedding.acall(nodes=make_nodes(*texts))
+
+    assert [node.get_content() for node in nodes] == texts
+    assert [node.embedding[0] for node in nodes if node.embedding is not None] == [float(len(text)) for text in texts]
+    assert sorted(embed_model.embedded_texts) == sorted(texts)
+
+
+def test_call_concurrent(embed_model: CountingEmbedding) -> None:
+    texts = [f"node {i}" for i in range(50)]
+    batched_node_embedding = BatchedNodeEmbedding(embed_model=embed_model, batch_size=4, num_workers=4)
+
+    nodes = batched_node_embedding(nodes=make_nodes(*texts))
+
+    assert all(node.embedding is not None and node.embedding[0] == float(len(text)) for node, text in zip(nodes, texts, strict=True))
+    assert len(embed_model.embedded_texts) == 50
+
+
+class TestEmbeddingCache:
+    def test_cache_hits_skip_the_model(self, embed_model: CountingEmbedding) -> None:
+        embedding_cache = EmbeddingCache()
+        batched_node_embedding = BatchedNodeEmbedding(embed_model=embed_model, batch_size=2, embedding_cache=embedding_cache)
+
+        first_nodes = batched_node_embedding(nodes=make_nodes("one", "three"))
+        second_nodes = batched_node_embedding(nodes=make_nodes("one", "three", "fifteen"))
+
+        assert embed_model.embedded_texts == ["three", "one", "fifteen"]
+        assert [node.embedding for node in second_nodes[:2]] == [node.embedding for node in first_nodes]
+
+        assert embedding_cache.hits == 2
+        assert embedding_cache.misses == 3
+        assert embedding_cache.hit_ratio == pytest.approx(0.4)
+
+    async def test_acall_cache_hits_skip_the_model(self, embed_model: CountingEmbedding) -> None:
+        embedding_cache = EmbeddingCache()
+        batched_node_embedding = BatchedNodeEmbedding(embed_model=embed_model, embedding_cache=embedding_cache)
+
+        _ = await batched_node_embedding.acall(nodes=make_nodes("one", "three"))
+        nodes = await batched_node_embedding.acall(nodes=make_nodes("one", "three"))
+
+        assert embed_model.embedded_texts == ["three", "one"]
+        assert all(node.embedding is not None for node in nodes)
+        assert embedding_cache.hits == 2
+
+    def test_cache_is_keyed_by_model(self, embed_model: CountingEmbedding) -> None:
+        embedding_cache = EmbeddingCache()
+        other_embed_model = CountingEmbedding(embed_dim=4, model_name="other", embedded_texts=[])
+
+        _ = BatchedNodeEmbedding(embed_model=embed_model, embedding_cache=embedding_cache)(nodes=make_nodes("one"))
+        _ = BatchedNodeEmbedding(embed_model=other_embed_model, embedding_cache=embedding_cache)(nodes=make_nodes("one"))
+
+        assert embed_model.embedded_texts == ["one"]
+        assert other_embed_model.embedded_texts == ["one"]
+
+    def test_content_is_built_once_per_node(self, embed_model: CountingEmbedding) -> None:
+        batched_node_embedding = BatchedNodeEmbedding(embed_model=embed_model, batch_size=2, embedding_cache=EmbeddingCache())
+
+        nodes = [CountingNode(text_resource=MediaResource(text=text), content_builds=[]) for text in ["one", "three"]]
+
+        _ = batched_node_embedding(nodes=nodes)
+
+        # Once for the cache lookup, write-back and sort, and once by the embedding model itself
+        assert [node.content_builds for node in nodes] == [["one", "one"], ["three", "three"]]
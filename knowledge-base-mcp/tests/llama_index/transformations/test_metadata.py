@@ -1,7 +1,10 @@
-from llama_index.core.schema import MediaResource, MetadataMode, Node
+from llama_index.core.schema import MediaResource, MetadataMode, Node, NodeRelationship
 
 from knowledge_base_mcp.llama_index.transformations.metadata import (
+    CHILD_COUNT_KEY,
+    CONTENT_SIZE_KEY,
     AddMetadata,
+    AddSizeMetadata,
     ExcludeMetadata,
     FlattenMetadata,
     IncludeMetadata,
@@ -175,3 +178,31 @@ class TestFlattenMetadata:
 
         assert this_node.metadata.get("key1") == '{"key11": "value11", "key12": "value12"}'
         assert this_node.metadata.get("key2") == "value21, value22"
+
+
+class TestAddSizeMetadata:
+    def test_call(self):
+        parent: Node = Node(id_="parent", text_resource=MediaResource(text="parent content"), extra_info={"key1": "value1"})
+        first_child: Node = Node(id_="first_child", text_resource=MediaResource(text=" first "))
+        second_child: Node = Node(id_="second_child", text_resource=MediaResource(text="second"))
+
+        parent.relationships[NodeRelationship.CHILD] = [first_child.as_related_node_info(), second_child.as_related_node_info()]
+        first_child.relationships[NodeRelationship.PARENT] = parent.as_related_node_info()
+        first_child.relationships[NodeRelationship.NEXT] = second_child.as_related_node_info()
+        second_child.relationships[NodeRelationship.PARENT] = parent.as_related_node_info()
+        second_child.relationships[NodeRelationship.PREVIOUS] = first_child.as_related_node_info()
+
+        parent_hash = parent.hash
+
+        _ = AddSizeMetadata()([parent, first_child, second_child])
+
+        assert first_child.parent_node
+        assert first_child.parent_node.metadata == {"key1": "value1", CONTENT_SIZE_KEY: 14, CHILD_COUNT_KEY: 2}
+        assert first_child.next_node
+        assert first_child.next_node.metadata == {CONTENT_SIZE_KEY: 6, CHILD_COUNT_KEY: 0}
+        assert second_child.prev_node
+        assert second_child.prev_node.metadata == {CONTENT_SIZE_KEY: 5, CHILD_COUNT_KEY: 0}
+
+        # The node's own metadata, and so its hash, is left alone
+        assert parent.metadata == {"key1": "value1"}
+        assert parent.hash == parent_hash
@@ -10,7 +10,9 @@ from syrupy.assertion import SnapshotAssertion
 from knowledge_base_mcp.clients.knowledge_base import KnowledgeBaseClient
 from knowledge_base_mcp.main import DEFAULT_DOCS_CROSS_ENCODER_MODEL
 from knowledge_base_mcp.servers.ingest.filesystem import FilesystemIngestServer
+from knowledge_base_mcp.servers.search.base import MAX_BATCH_QUERIES
 from knowledge_base_mcp.servers.search.docs import DocumentationSearchServer
+from knowledge_base_mcp.stores.search_result_cache import InMemorySearchResultCache
 from tests.servers.conftest import embedding_model
 
 if TYPE_CHECKING:
@@ -173,6 +175,91 @@ class TestSearch:
 
         assert response == yaml_snapshot
 
+    async def test_search_is_cached_until_the_knowledge_base_changes(
+        self,
+        knowledge_base_client: KnowledgeBaseClient,
+        documentation_search_server: DocumentationSearchServer,
+        vector_store_index_with_documents: VectorStoreIndex,
+    ):
+        search_result_cache = InMemorySearchResultCache()
+        knowledge_base_client.search_result_cache = search_result_cache
+
+        response: DocumentationSearchResponse = await documentation_search_server.query("Who is the best?")
+
+        assert await documentation_search_server.query("Who is the best?") is response
+        assert await documentation_search_server.query("Who is the best?", result_count=5) is not response
+        assert search_result_cache.hits == 1
+
+        await knowledge_base_client.abump_knowledge_base_generations(knowledge_bases=["test"])
+
+        assert await documentation_search_server.query("Who is the best?") is not response
+        assert search_result_cache.hits == 1
+
+    async def test_search_batch(
+        self,
+        knowledge_base_client: KnowledgeBaseClient,
+        documentation_search_server: DocumentationSearchServer,
+        vector_store_index_with_documents: VectorStoreIndex,
+    ):
+        search_result_cache = InMemorySearchResultCache()
+        knowledge_base_client.search_result_cache = search_result_cache
+
+        single_response: DocumentationSearchResponse = await documentation_search_server.query("Who is the best?")
+
+        responses: list[DocumentationSearchResponse] = await documentation_search_server.query_batch(
+            ["Which node is first?", "Who is the best?", "Which node is first?"]
+        )
+
+        assert [response.query for response in responses] == ["Which node is first?", "Who is the best?", "Which node is first?"]
+
+        # Queries of a batch share the cache with single queries
+        assert responses[1] is single_response
+        assert responses[0] is responses[2]
+        assert search_result_cache.hits == 1
+
+        assert responses[0].summary.root == {"test": 3}
+        assert sorted(responses[0].results.root["test"].root["Hello, world document!"].headings) == sorted(["# Parent Node"])
+
+    async def test_search_batch_limits_the_number_of_queries(
+        self,
+        documentation_search_server: DocumentationSearchServer,
+        vector_store_index_with_documents: VectorStoreIndex,
+    ):
+        with pytest.raises(ValueError, match="at most"):
+            _ = await documentation_search_server.query_batch([f"Query {index}" for index in range(MAX_BATCH_QUERIES + 1)])
+
+    async def test_search_batch_candidate_count(
+        self,
+        documentation_search_server: DocumentationSearchServer,
+        vector_store_index_with_documents: VectorStoreIndex,
+    ):
+        responses: list[DocumentationSearchResponse] = await documentation_search_server.query_batch(
+            ["Who is the best?"], candidate_count=1
+        )
+
+        assert len(responses[0].results.root["test"].root) == 1
+
+    async def test_delete_knowledge_base(
+        self,
+        knowledge_base_client: KnowledgeBaseClient,
+        vector_store_index_with_documents: VectorStoreIndex,
+    ):
+        assert await knowledge_base_client.get_knowledge_bases() == {"test": 3}
+
+        progress: list[tuple[float, float | None, str | None]] = []
+
+        async def record_progress(step: float, total: float | None, message: str | None) -> None:
+            progress.append((step, total, message))
+
+        await knowledge_base_client.delete_knowledge_base(knowledge_base="test", progress=record_progress)
+
+        assert await knowledge_base_client.get_knowledge_bases() == {}
+        assert knowledge_base_client.docstore.docs == {}
+        assert [step for step, _, _ in progress] == [0, 1, 2]
+
+        # Deleting again is a no-op, so an interrupted delete can be retried
+        await knowledge_base_client.delete_knowledge_base(knowledge_base="test")
+
     # class TestBenchmark:
     #     @pytest.fixture
     #     async def vector_store_index_with_documents(self, filesystem_ingest_server: FilesystemIngestServer, playground_beats: Path):
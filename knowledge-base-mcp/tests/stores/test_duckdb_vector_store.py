@@ -0,0 +1,327 @@
+import logging
+import random
+import time
+from pathlib import Path
+
+import duckdb
+import pytest
+from duckdb import ColumnExpression
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import FilterOperator, MetadataFilter, MetadataFilters, VectorStoreQuery, VectorStoreQueryMode
+
+from knowledge_base_mcp.stores.vector_stores.duckdb import EnhancedDuckDBVectorStore, HNSWIndexConfig, logger
+
+EMBED_DIM = 4
+
+ID_AND_SCORE = [ColumnExpression("node_id"), ColumnExpression("score")]
+
+
+def make_node(node_id: str, embedding: list[float], **metadata: str) -> TextNode:
+    return TextNode(id_=node_id, text=f"The text of {node_id}", metadata=metadata, embedding=embedding)
+
+
+NODES: list[TextNode] = [
+    make_node("a1", [1.0, 0.0, 0.0, 0.0], knowledge_base="a", title="First"),
+    make_node("a2", [0.9, 0.1, 0.0, 0.0], knowledge_base="a", title="Second"),
+    make_node("b1", [0.0, 1.0, 0.0, 0.0], knowledge_base="b", title="First"),
+]
+
+
+@pytest.fixture
+def vector_store() -> EnhancedDuckDBVectorStore:
+    vector_store = EnhancedDuckDBVectorStore(embed_dim=EMBED_DIM)
+    _ = vector_store.add(nodes=NODES)
+    return vector_store
+
+
+def knowledge_base_filter(*knowledge_bases: str, operator: FilterOperator = FilterOperator.IN) -> MetadataFilters:
+    return MetadataFilters(filters=[MetadataFilter(key="knowledge_base", value=list(knowledge_bases), operator=operator)])
+
+
+def query(filters: MetadataFilters | None = None, top_k: int = 10) -> VectorStoreQuery:
+    return VectorStoreQuery(query_embedding=[1.0, 0.0, 0.0, 0.0], similarity_top_k=top_k, filters=filters)
+
+
+class TestMetadataColumns:
+    def test_add_fills_the_columns(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        rows = vector_store.client.execute(
+            f"SELECT node_id, metadata_knowledge_base, metadata_title, metadata_knowledge_base_type FROM {vector_store.table_name} ORDER BY node_id"  # noqa: S608
+        ).fetchall()
+
+        assert rows == [("a1", "a", "First", None), ("a2", "a", "Second", None), ("b1", "b", "First", None)]
+
+    def test_migrates_an_existing_table(self) -> None:
+        vector_store = EnhancedDuckDBVectorStore(embed_dim=EMBED_DIM, indexed_metadata_keys=[])
+        _ = vector_store.add(nodes=NODES)
+
+        assert vector_store.indexed_metadata_keys == []
+
+        vector_store.create_metadata_columns(metadata_keys=["knowledge_base"])
+        vector_store.create_metadata_columns(metadata_keys=["knowledge_base"])
+
+        assert vector_store.indexed_metadata_keys == ["knowledge_base"]
+        assert vector_store.client.execute(
+            f"SELECT metadata_knowledge_base FROM {vector_store.table_name} ORDER BY node_id"  # noqa: S608
+        ).fetchall() == [("a",), ("a",), ("b",)]
+
+    def test_failed_migration_rolls_back(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        columns = vector_store.table.columns
+
+        # Identifiers are case-insensitive, so the column of `Title` collides with the column of `title`
+        with pytest.raises(duckdb.Error):
+            vector_store.create_metadata_columns(metadata_keys=["extra", "Title"])
+
+        assert vector_store.table.columns == columns
+
+        # The connection is not left inside the failed transaction
+        _ = vector_store.client.begin()
+        _ = vector_store.client.commit()
+
+    def test_rejects_keys_that_are_not_identifiers(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        with pytest.raises(ValueError, match="not a valid identifier"):
+            vector_store.create_metadata_columns(metadata_keys=["not an identifier"])
+
+    @pytest.mark.parametrize(
+        ("filters", "column", "expected_ids"),
+        [
+            (knowledge_base_filter("a"), "metadata_knowledge_base", ["a1", "a2"]),
+            (knowledge_base_filter("b", operator=FilterOperator.NIN), "metadata_knowledge_base", ["a1", "a2"]),
+            (
+                MetadataFilters(filters=[MetadataFilter(key="knowledge_base", value="b", operator=FilterOperator.EQ)]),
+                "metadata_knowledge_base",
+                ["b1"],
+            ),
+            (
+                MetadataFilters(filters=[MetadataFilter(key="title", value="First", operator=FilterOperator.EQ)]),
+                "metadata_title",
+                ["a1", "b1"],
+            ),
+        ],
+    )
+    def test_filters_on_the_columns(
+        self, vector_store: EnhancedDuckDBVectorStore, filters: MetadataFilters, column: str, expected_ids: list[str]
+    ) -> None:
+        filter_expression = vector_store._build_metadata_filter_expressions(metadata_filters=filters)  # pyright: ignore[reportPrivateUsage]
+
+        assert column in str(filter_expression)
+        assert "json_extract" not in str(filter_expression)
+        assert vector_store.query(query(filters=filters)).ids == expected_ids
+
+    async def test_metadata_agg(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        assert await vector_store.metadata_agg(key="knowledge_base") == {"a": 2, "b": 1}
+        assert await vector_store.metadata_agg(key="title") == {"First": 2, "Second": 1}
+
+    def test_delete_by_metadata(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        assert vector_store.delete_by_metadata(key="knowledge_base", values=["a"]) == 2
+
+        assert vector_store.query(query()).ids == ["b1"]
+
+
+def random_nodes(count: int, knowledge_base: str, seed: int) -> list[TextNode]:
+    generator = random.Random(seed)  # noqa: S311
+
+    return [
+        make_node(f"{knowledge_base}{i}", [generator.uniform(-1, 1) for _ in range(EMBED_DIM)], knowledge_base=knowledge_base)
+        for i in range(count)
+    ]
+
+
+class TestHNSWIndex:
+    @pytest.fixture
+    def hnsw_vector_store(self) -> EnhancedDuckDBVectorStore:
+        vector_store = EnhancedDuckDBVectorStore(embed_dim=EMBED_DIM, hnsw_index=HNSWIndexConfig())
+        _ = vector_store.add(nodes=random_nodes(count=200, knowledge_base="a", seed=1))
+        return vector_store
+
+    def test_creates_the_index(self, hnsw_vector_store: EnhancedDuckDBVectorStore) -> None:
+        index_names = hnsw_vector_store.client.execute("SELECT index_name FROM duckdb_indexes()").fetchall()
+
+        assert (hnsw_vector_store.hnsw_index_name,) in index_names
+
+    def test_queries_are_answered_from_the_index(self, hnsw_vector_store: EnhancedDuckDBVectorStore) -> None:
+        approximate = hnsw_vector_store._approximate_top_k(query=query(top_k=5), columns=ID_AND_SCORE, candidates=5)  # pyright: ignore[reportPrivateUsage]
+
+        plan = hnsw_vector_store.client.execute(f"EXPLAIN {approximate.sql_query()}").fetchall()
+
+        assert "HNSW_INDEX_SCAN" in str(plan)
+
+    def test_approximate_results_match_exact_results(self, hnsw_vector_store: EnhancedDuckDBVectorStore) -> None:
+        exact = hnsw_vector_store._exact_top_k(query=query(top_k=5), columns=ID_AND_SCORE).fetchall()  # pyright: ignore[reportPrivateUsage]
+
+        assert hnsw_vector_store.query(query(top_k=5)).ids == [node_id for (node_id, _) in exact]
+
+    def test_filtered_queries_oversample(self, hnsw_vector_store: EnhancedDuckDBVectorStore, caplog: pytest.LogCaptureFixture) -> None:
+        _ = hnsw_vector_store.add(nodes=random_nodes(count=200, knowledge_base="b", seed=2))
+
+        filters = knowledge_base_filter("a")
+        exact = hnsw_vector_store._exact_top_k(query=query(filters=filters, top_k=5), columns=ID_AND_SCORE).fetchall()  # pyright: ignore[reportPrivateUsage]
+
+        with caplog.at_level(logging.DEBUG, logger=logger.name):
+            assert hnsw_vector_store.query(query(filters=filters, top_k=5)).ids == [node_id for (node_id, _) in exact]
+
+        assert "falling back to an exact search" not in caplog.text
+
+    def test_selective_filters_fall_back_to_an_exact_search(
+        self, hnsw_vector_store: EnhancedDuckDBVectorStore, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        # The nodes of `b` point away from the query, so none of them are among the nearest candidates in the index
+        _ = hnsw_vector_store.add(
+            nodes=[make_node(f"b{i}", [-1.0, 0.0, 0.0, float(i)], knowledge_base="b") for i in range(1, 4)],
+        )
+
+        with caplog.at_level(logging.DEBUG, logger=logger.name):
+            result = hnsw_vector_store.query(query(filters=knowledge_base_filter("b"), top_k=3))
+
+        assert "falling back to an exact search" in caplog.text
+        assert result.ids == ["b3", "b2", "b1"]
+
+    def test_on_disk_databases_require_opting_into_persistence(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="experimental persistence"):
+            _ = EnhancedDuckDBVectorStore(
+                database_name="knowledge_base.duckdb", persist_dir=str(tmp_path), embed_dim=EMBED_DIM, hnsw_index=HNSWIndexConfig()
+            )
+
+    def test_on_disk_databases_persist_the_index_when_opted_in(self, tmp_path: Path) -> None:
+        vector_store = EnhancedDuckDBVectorStore(
+            database_name="knowledge_base.duckdb",
+            persist_dir=str(tmp_path),
+            embed_dim=EMBED_DIM,
+            hnsw_index=HNSWIndexConfig(experimental_persistence=True),
+        )
+        _ = vector_store.add(nodes=NODES)
+
+        assert vector_store.query(query(top_k=2)).ids == ["a1", "a2"]
+
+
+TEXT_NODES: list[TextNode] = [
+    TextNode(id_="t1", text="How to configure the reranker", metadata={"knowledge_base": "a"}, embedding=[1.0, 0.0, 0.0, 0.0]),
+    TextNode(id_="t2", text="Handling the ERR_TIMEOUT error code", metadata={"knowledge_base": "a"}, embedding=[0.0, 1.0, 0.0, 0.0]),
+    TextNode(id_="t3", text="Embedding models and their dimensions", metadata={"knowledge_base": "b"}, embedding=[0.0, 0.0, 1.0, 0.0]),
+]
+
+
+def hybrid_query(query_str: str, top_k: int = 10) -> VectorStoreQuery:
+    return VectorStoreQuery(
+        query_embedding=[1.0, 0.0, 0.0, 0.0], query_str=query_str, similarity_top_k=top_k, mode=VectorStoreQueryMode.HYBRID
+    )
+
+
+def text_ranking(vector_store: EnhancedDuckDBVectorStore, query_str: str) -> list[str]:
+    """The nodes that exist in the table and match the query in the full-text index, best match first."""
+    rows = vector_store.client.execute(
+        f"""
+        SELECT node_id FROM (SELECT node_id, {vector_store.text_index_schema}.match_bm25(node_id, ?) AS score FROM {vector_store.table_name})
+        WHERE score IS NOT NULL ORDER BY score DESC
+        """,  # noqa: S608
+        parameters=[query_str],
+    ).fetchall()
+    return [node_id for (node_id,) in rows]
+
+
+def wait_for_text_index(vector_store: EnhancedDuckDBVectorStore) -> None:
+    for _ in range(100):
+        if not vector_store.text_index_stale:
+            return
+        time.sleep(0.05)
+
+    pytest.fail("The full-text index was not rebuilt in the background")
+
+
+class TestHybridSearch:
+    @pytest.fixture
+    def text_vector_store(self) -> EnhancedDuckDBVectorStore:
+        # A long delay, so tests control when the index is rebuilt
+        vector_store = EnhancedDuckDBVectorStore(embed_dim=EMBED_DIM, text_index_refresh_delay=60)
+        _ = vector_store.add(nodes=TEXT_NODES)
+        vector_store.refresh_text_index()
+        return vector_store
+
+    def test_fuses_text_matches_into_the_vector_results(self, text_vector_store: EnhancedDuckDBVectorStore) -> None:
+        assert text_vector_store.query(query(top_k=2)).ids == ["t1", "t2"]
+
+        result = text_vector_store.query(hybrid_query("ERR_TIMEOUT", top_k=2))
+
+        assert result.ids is not None
+        assert result.ids[0] == "t2"
+
+    def test_filters_text_matches(self, text_vector_store: EnhancedDuckDBVectorStore) -> None:
+        query = hybrid_query("embedding dimensions")
+        query.filters = knowledge_base_filter("a")
+
+        assert "t3" not in (text_vector_store.query(query).ids or [])
+
+    def test_first_query_builds_the_index_in_the_background(self) -> None:
+        vector_store = EnhancedDuckDBVectorStore(embed_dim=EMBED_DIM)
+        _ = vector_store.add(nodes=TEXT_NODES)
+
+        assert not vector_store.text_index_exists()
+
+        # Without an index yet, the query answers with the vector results
+        assert vector_store.query(hybrid_query("ERR_TIMEOUT", top_k=2)).ids == ["t1", "t2"]
+
+        wait_for_text_index(vector_store)
+
+        assert text_ranking(vector_store, "ERR_TIMEOUT") == ["t2"]
+
+    def test_added_nodes_are_searched_once_the_index_is_rebuilt(self, text_vector_store: EnhancedDuckDBVectorStore) -> None:
+        added = TextNode(id_="t4", text="Rotating the API tokens", metadata={"knowledge_base": "a"}, embedding=[0.0, 0.0, 0.0, 1.0])
+
+        _ = text_vector_store.query(hybrid_query("tokens"))
+        _ = text_vector_store.add(nodes=[added])
+
+        # Queries do not rebuild the stale index
+        assert text_vector_store.text_index_stale
+        assert text_ranking(text_vector_store, "tokens") == []
+        assert text_vector_store.text_index_stale
+
+        text_vector_store.refresh_text_index()
+
+        assert not text_vector_store.text_index_stale
+        assert text_ranking(text_vector_store, "tokens") == ["t4"]
+
+    def test_writes_rebuild_the_index_in_the_background(self, text_vector_store: EnhancedDuckDBVectorStore) -> None:
+        text_vector_store.text_index_refresh_delay = 0.1
+        added = TextNode(id_="t4", text="Rotating the API tokens", metadata={"knowledge_base": "a"}, embedding=[0.0, 0.0, 0.0, 1.0])
+
+        _ = text_vector_store.query(hybrid_query("tokens"))
+        _ = text_vector_store.add(nodes=[added])
+
+        wait_for_text_index(text_vector_store)
+
+        assert text_ranking(text_vector_store, "tokens") == ["t4"]
+
+    def test_deleted_nodes_are_not_returned_by_a_stale_index(self, text_vector_store: EnhancedDuckDBVectorStore) -> None:
+        assert text_ranking(text_vector_store, "embedding dimensions") == ["t3"]
+
+        assert text_vector_store.delete_by_metadata(key="knowledge_base", values=["b"]) == 1
+
+        assert text_vector_store.text_index_stale
+        assert text_ranking(text_vector_store, "embedding dimensions") == []
+        assert "t3" not in (text_vector_store.query(hybrid_query("embedding dimensions")).ids or [])
+
+
+class TestQueryMetadata:
+    def test_returns_only_the_metadata_keys(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        result = vector_store.query_metadata(query(top_k=2), metadata_keys=["knowledge_base", "title"])
+
+        assert result.ids == ["a1", "a2"]
+        assert result.similarities == vector_store.query(query(top_k=2)).similarities
+        assert [node.metadata for node in result.nodes or []] == [
+            {"knowledge_base": "a", "title": "First"},
+            {"knowledge_base": "a", "title": "Second"},
+        ]
+        assert all(node.get_content() == "" and node.embedding is None for node in result.nodes or [])
+
+    def test_skips_missing_metadata_keys(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        result = vector_store.query_metadata(query(top_k=1), metadata_keys=["knowledge_base", "knowledge_base_type", "missing"])
+
+        assert [node.metadata for node in result.nodes or []] == [{"knowledge_base": "a"}]
+
+    def test_applies_filters_and_top_k(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        assert vector_store.query_metadata(query(filters=knowledge_base_filter("b")), metadata_keys=["title"]).ids == ["b1"]
+        assert vector_store.query_metadata(query(top_k=1), metadata_keys=[]).ids == ["a1"]
+
+    async def test_aquery_metadata(self, vector_store: EnhancedDuckDBVectorStore) -> None:
+        result = await vector_store.aquery_metadata(query(filters=knowledge_base_filter("a")), metadata_keys=["title"])
+
+        assert [node.metadata for node in result.nodes or []] == [{"title": "First"}, {"title": "Second"}]
@@ -0,0 +1,44 @@
+from typing import Any
+
+import pytest
+from llama_index.core.vector_stores.types import FilterCondition, FilterOperator, MetadataFilter, MetadataFilters
+
+_ = pytest.importorskip("llama_index.vector_stores.elasticsearch")
+
+from knowledge_base_mcp.stores.vector_stores.elasticsearch import metadata_filter_to_query  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    ("metadata_filter", "expected"),
+    [
+        (MetadataFilter(key="knowledge_base", value="a"), {"term": {"metadata.knowledge_base.keyword": "a"}}),
+        (
+            MetadataFilter(key="knowledge_base", value=["a", "b"], operator=FilterOperator.IN),
+            {"terms": {"metadata.knowledge_base.keyword": ["a", "b"]}},
+        ),
+        (
+            MetadataFilter(key="knowledge_base", value=["a"], operator=FilterOperator.NIN),
+            {"bool": {"must_not": {"terms": {"metadata.knowledge_base.keyword": ["a"]}}}},
+        ),
+        (MetadataFilter(key="stars", value=3, operator=FilterOperator.NE), {"bool": {"must_not": {"term": {"metadata.stars": 3}}}}),
+        (MetadataFilter(key="stars", value=3, operator=FilterOperator.GTE), {"range": {"metadata.stars": {"gte": 3}}}),
+        (
+            MetadataFilters(
+                filters=[MetadataFilter(key="type", value="issue"), MetadataFilter(key="repository", value="org/repo")],
+                condition=FilterCondition.OR,
+            ),
+            {"bool": {"should": [{"term": {"metadata.type.keyword": "issue"}}, {"term": {"metadata.repository.keyword": "org/repo"}}]}},
+        ),
+        (
+            MetadataFilters(filters=[MetadataFilter(key="knowledge_base", value=["a"], operator=FilterOperator.IN)]),
+            {"bool": {"must": [{"terms": {"metadata.knowledge_base.keyword": ["a"]}}]}},
+        ),
+    ],
+)
+def test_metadata_filter_to_query(metadata_filter: MetadataFilter | MetadataFilters, expected: dict[str, Any]) -> None:  # pyright: ignore[reportExplicitAny]
+    assert metadata_filter_to_query(metadata_filter=metadata_filter) == expected
+
+
+def test_metadata_filter_to_query_rejects_unsupported_operators() -> None:
+    with pytest.raises(ValueError, match="not supported"):
+        _ = metadata_filter_to_query(metadata_filter=MetadataFilter(key="title", value="docs", operator=FilterOperator.TEXT_MATCH))
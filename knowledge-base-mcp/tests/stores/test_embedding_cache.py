@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+
+from knowledge_base_mcp.stores import embedding_cache as embedding_cache_module
+from knowledge_base_mcp.stores.embedding_cache import EmbeddingCache, QueryEmbeddingCache, content_hash, normalize_query
+
+
+def test_content_hash() -> None:
+    assert content_hash("hello") == content_hash("hello")
+    assert content_hash("hello") != content_hash("hello!")
+
+
+def test_get_many_returns_only_cached_embeddings() -> None:
+    embedding_cache = EmbeddingCache()
+
+    embedding_cache.put_many(model_name="model", embeddings={"a": [0.1, 0.2], "b": [0.3, 0.4]})
+
+    assert embedding_cache.get_many(model_name="model", content_hashes=["a", "c"]) == {"a": [0.1, 0.2]}
+    assert embedding_cache.get_many(model_name="other", content_hashes=["a"]) == {}
+
+    assert embedding_cache.stats() == {"hits": 1, "misses": 2, "hit_ratio": 0.333, "entries": 2}
+
+
+def test_put_many_keeps_existing_embeddings() -> None:
+    embedding_cache = EmbeddingCache()
+
+    embedding_cache.put_many(model_name="model", embeddings={"a": [0.1, 0.2]})
+    embedding_cache.put_many(model_name="model", embeddings={"a": [0.9, 0.9], "b": [0.3, 0.4]})
+
+    assert embedding_cache.get_many(model_name="model", content_hashes=["a", "b"]) == {"a": [0.1, 0.2], "b": [0.3, 0.4]}
+
+
+def test_persists_across_instances(tmp_path: Path) -> None:
+    database_path = tmp_path / "embeddings_cache.duckdb"
+
+    embedding_cache = EmbeddingCache(database_path=database_path)
+    embedding_cache.put_many(model_name="model", embeddings={"a": [0.1, 0.2]})
+    embedding_cache.close()
+
+    assert EmbeddingCache(database_path=database_path).get_many(model_name="model", content_hashes=["a"]) == {"a": [0.1, 0.2]}
+
+
+def test_normalize_query() -> None:
+    assert normalize_query("  What is  the Python\tLanguage? ") == "What is the Python Language?"
+
+
+class TestQueryEmbeddingCache:
+    def test_normalized_queries_share_an_entry(self) -> None:
+        query_embedding_cache = QueryEmbeddingCache()
+
+        query_embedding_cache.put(query="What is Python?", embedding=[0.1, 0.2])
+
+        assert query_embedding_cache.get(query=" What is  python?") is None
+        assert query_embedding_cache.get(query=" What is  Python?") == [0.1, 0.2]
+        assert query_embedding_cache.get(query="What is Java?") is None
+
+        assert query_embedding_cache.stats() == {"hits": 1, "misses": 2, "hit_ratio": 0.333, "entries": 1}
+
+    def test_evicts_least_recently_used(self) -> None:
+        query_embedding_cache = QueryEmbeddingCache(max_entries=2)
+
+        query_embedding_cache.put(query="one", embedding=[1.0])
+        query_embedding_cache.put(query="two", embedding=[2.0])
+
+        _ = query_embedding_cache.get(query="one")
+
+        query_embedding_cache.put(query="three", embedding=[3.0])
+
+        assert query_embedding_cache.get(query="one") == [1.0]
+        assert query_embedding_cache.get(query="two") is None
+        assert query_embedding_cache.get(query="three") == [3.0]
+
+    def test_entries_expire(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        now: float = 1000.0
+        monkeypatch.setattr(embedding_cache_module, "monotonic", lambda: now)
+
+        query_embedding_cache = QueryEmbeddingCache(ttl=60)
+        query_embedding_cache.put(query="one", embedding=[1.0])
+
+        now += 59
+        assert query_embedding_cache.get(query="one") == [1.0]
+
+        now += 1
+        assert query_embedding_cache.get(query="one") is None
+        assert len(query_embedding_cache) == 0
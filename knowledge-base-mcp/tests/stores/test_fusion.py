@@ -0,0 +1,22 @@
+import pytest
+
+from knowledge_base_mcp.stores.vector_stores.fusion import reciprocal_rank_fusion
+
+
+def test_nodes_in_both_rankings_come_first() -> None:
+    fused = reciprocal_rank_fusion(rankings=[["a", "b", "c"], ["d", "c", "a"]], top_k=4, k=1)
+
+    assert [node_id for node_id, _ in fused] == ["a", "c", "d", "b"]
+    assert fused[0][1] == pytest.approx(1 / 2 + 1 / 4)
+
+
+def test_top_k() -> None:
+    fused = reciprocal_rank_fusion(rankings=[["a", "b", "c"], []], top_k=2)
+
+    assert [node_id for node_id, _ in fused] == ["a", "b"]
+
+
+def test_ties_keep_the_order_of_first_appearance() -> None:
+    fused = reciprocal_rank_fusion(rankings=[["a", "b"], ["b", "a"]], top_k=2)
+
+    assert [node_id for node_id, _ in fused] == ["a", "b"]
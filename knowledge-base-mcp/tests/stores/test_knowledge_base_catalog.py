@@ -0,0 +1,78 @@
+import datetime
+
+import pytest
+from llama_index.core.schema import Document, TextNode
+from llama_index.core.storage.kvstore.simple_kvstore import SimpleKVStore
+
+from knowledge_base_mcp.stores.knowledge_base_catalog import KnowledgeBaseCatalog, KnowledgeBaseEntry
+
+
+@pytest.fixture
+def catalog() -> KnowledgeBaseCatalog:
+    return KnowledgeBaseCatalog(kv_store=SimpleKVStore())
+
+
+def ingested_nodes(knowledge_base: str) -> list[TextNode]:
+    return [
+        Document(text="A document", metadata={"knowledge_base": knowledge_base}),
+        TextNode(text="An embedded node", metadata={"knowledge_base": knowledge_base}, embedding=[0.5]),
+        TextNode(text="A parent node that is not embedded", metadata={"knowledge_base": knowledge_base}),
+        TextNode(text="A node without a knowledge base", embedding=[0.5]),
+    ]
+
+
+def test_entries_from_ingested_nodes() -> None:
+    entries = KnowledgeBaseEntry.from_ingested_nodes(nodes=ingested_nodes(knowledge_base="a"))
+
+    assert list(entries) == ["a"]
+    assert entries["a"].model_dump(exclude={"last_ingest"}) == {"documents": 1, "nodes": 1, "size": len("An embedded node")}
+    assert entries["a"].last_ingest is not None
+
+
+async def test_record_ingest_adds_up(catalog: KnowledgeBaseCatalog) -> None:
+    await catalog.arecord_ingest(nodes=ingested_nodes(knowledge_base="a"))
+    await catalog.arecord_ingest(nodes=[*ingested_nodes(knowledge_base="a"), *ingested_nodes(knowledge_base="b")])
+
+    entries = await catalog.aget_all()
+
+    assert list(entries) == ["a", "b"]
+    assert (entries["a"].documents, entries["a"].nodes, entries["a"].size) == (2, 2, 2 * len("An embedded node"))
+    assert (entries["b"].documents, entries["b"].nodes) == (1, 1)
+
+
+async def test_delete_and_replace(catalog: KnowledgeBaseCatalog) -> None:
+    await catalog.arecord_ingest(nodes=[*ingested_nodes(knowledge_base="a"), *ingested_nodes(knowledge_base="b")])
+
+    await catalog.adelete(knowledge_base="a")
+
+    assert list(await catalog.aget_all()) == ["b"]
+
+    await catalog.areplace(entries={"c": KnowledgeBaseEntry(nodes=3)})
+
+    assert await catalog.aget_all() == {"c": KnowledgeBaseEntry(nodes=3)}
+
+
+def test_last_ingest_is_the_latest() -> None:
+    earlier = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+    later = datetime.datetime(2025, 6, 1, tzinfo=datetime.UTC)
+
+    entry = KnowledgeBaseEntry(nodes=1, last_ingest=later).add(other=KnowledgeBaseEntry(nodes=1, last_ingest=earlier))
+
+    assert entry.last_ingest == later
+    assert KnowledgeBaseEntry().add(other=KnowledgeBaseEntry()).last_ingest is None
+
+
+def test_unknown_size_stays_unknown() -> None:
+    entry = KnowledgeBaseEntry(nodes=1, size=None).add(other=KnowledgeBaseEntry(nodes=1, size=10))
+
+    assert (entry.nodes, entry.size) == (2, None)
+
+
+async def test_initialized_once_replaced(catalog: KnowledgeBaseCatalog) -> None:
+    await catalog.arecord_ingest(nodes=ingested_nodes(knowledge_base="a"))
+
+    assert not await catalog.ais_initialized()
+
+    await catalog.areplace(entries={})
+
+    assert await catalog.ais_initialized()
@@ -0,0 +1,76 @@
+from llama_index.core.schema import BaseNode, MediaResource, Node
+
+from knowledge_base_mcp.stores.node_cache import NodeCache, aget_nodes, get_nodes
+
+
+def new_node(node_id: str, knowledge_base: str | None = "a") -> Node:
+    metadata = {"knowledge_base": knowledge_base} if knowledge_base else {}
+    return Node(id_=node_id, text_resource=MediaResource(text=node_id), metadata=metadata)
+
+
+class RecordingFetch:
+    """Fetches nodes by id, and records the ids of every fetch."""
+
+    def __init__(self, *nodes: Node) -> None:
+        self.nodes: dict[str, Node] = {node.node_id: node for node in nodes}
+        self.fetches: list[list[str]] = []
+
+    def __call__(self, node_ids: list[str]) -> list[BaseNode]:
+        self.fetches.append(node_ids)
+        return [self.nodes[node_id] for node_id in node_ids if node_id in self.nodes]
+
+    async def afetch(self, node_ids: list[str]) -> list[BaseNode]:
+        return self(node_ids)
+
+
+def test_get_nodes_fetches_missing_nodes_once() -> None:
+    node_cache = NodeCache()
+    fetch = RecordingFetch(new_node("1"), new_node("2"), new_node("3"))
+
+    nodes = get_nodes(node_ids=["2", "1", "2"], fetch=fetch, node_cache=node_cache)
+    assert [node.node_id for node in nodes] == ["2", "1"]
+
+    nodes = get_nodes(node_ids=["3", "1", "2", "missing"], fetch=fetch, node_cache=node_cache)
+    assert [node.node_id for node in nodes] == ["3", "1", "2"]
+
+    assert fetch.fetches == [["2", "1"], ["3", "missing"]]
+    assert node_cache.stats() == {"hits": 2, "misses": 4, "hit_ratio": 0.333, "entries": 3}
+
+
+async def test_aget_nodes() -> None:
+    node_cache = NodeCache()
+    fetch = RecordingFetch(new_node("1"), new_node("2"))
+
+    _ = await aget_nodes(node_ids=["1", "2"], fetch=fetch.afetch, node_cache=node_cache)
+    nodes = await aget_nodes(node_ids=["1", "2"], fetch=fetch.afetch, node_cache=node_cache)
+
+    assert [node.node_id for node in nodes] == ["1", "2"]
+    assert fetch.fetches == [["1", "2"]]
+
+
+def test_get_nodes_without_cache() -> None:
+    fetch = RecordingFetch(new_node("1"))
+
+    _ = get_nodes(node_ids=["1"], fetch=fetch)
+    _ = get_nodes(node_ids=["1"], fetch=fetch)
+
+    assert fetch.fetches == [["1"], ["1"]]
+
+
+def test_least_recently_used_nodes_are_evicted() -> None:
+    node_cache = NodeCache(max_entries=2)
+
+    node_cache.put_many(nodes=[new_node("1"), new_node("2")])
+    _ = node_cache.get_many(node_ids=["1"])
+    node_cache.put_many(nodes=[new_node("3")])
+
+    assert set(node_cache.get_many(node_ids=["1", "2", "3"])) == {"1", "3"}
+
+
+def test_invalidate_removes_the_nodes_of_the_knowledge_bases() -> None:
+    node_cache = NodeCache()
+
+    node_cache.put_many(nodes=[new_node("1", knowledge_base="a"), new_node("2", knowledge_base="b"), new_node("3", knowledge_base=None)])
+    node_cache.invalidate(knowledge_bases=["a"])
+
+    assert set(node_cache.get_many(node_ids=["1", "2", "3"])) == {"2"}
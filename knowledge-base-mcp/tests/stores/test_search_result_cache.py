@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from knowledge_base_mcp.stores.search_result_cache import DuckDBSearchResultCache, InMemorySearchResultCache, SearchResultCache
+
+
+class Response(BaseModel):
+    results: list[str]
+
+
+@pytest.fixture(params=["memory", "duckdb"])
+def search_result_cache(request: pytest.FixtureRequest, tmp_path: Path) -> SearchResultCache:
+    if request.param == "memory":
+        return InMemorySearchResultCache(max_entries=2)
+
+    return DuckDBSearchResultCache(database_path=tmp_path / "search_results.duckdb", max_entries=2)
+
+
+def test_get_returns_cached_response(search_result_cache: SearchResultCache) -> None:
+    key = search_result_cache.key(search="docs", query="query", knowledge_bases=["a"], parameters={"result_count": 20})
+
+    assert search_result_cache.get(key=key, response_type=Response) is None
+
+    search_result_cache.put(key=key, response=Response(results=["one"]))
+
+    assert search_result_cache.get(key=key, response_type=Response) == Response(results=["one"])
+    assert search_result_cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "entries": 1}
+
+
+async def test_async_methods(search_result_cache: SearchResultCache) -> None:
+    key = await search_result_cache.akey(search="docs", query="query", knowledge_bases=["a"], parameters={})
+
+    await search_result_cache.aput(key=key, response=Response(results=["one"]))
+
+    assert await search_result_cache.aget(key=key, response_type=Response) == Response(results=["one"])
+
+    await search_result_cache.abump(knowledge_bases=["a"])
+
+    assert await search_result_cache.akey(search="docs", query="query", knowledge_bases=["a"], parameters={}) != key
+
+
+def test_key_depends_on_the_search(search_result_cache: SearchResultCache) -> None:
+    key = search_result_cache.key(search="docs", query="query", knowledge_bases=["a", "b"], parameters={"result_count": 20})
+
+    assert key == search_result_cache.key(search="docs", query="query", knowledge_bases=["b", "a"], parameters={"result_count": 20})
+    assert key != search_result_cache.key(search="github", query="query", knowledge_bases=["a", "b"], parameters={"result_count": 20})
+    assert key != search_result_cache.key(search="docs", query="other", knowledge_bases=["a", "b"], parameters={"result_count": 20})
+    assert key != search_result_cache.key(search="docs", query="query", knowledge_bases=["a"], parameters={"result_count": 20})
+    assert key != search_result_cache.key(search="docs", query="query", knowledge_bases=["a", "b"], parameters={"result_count": 10})
+
+
+def test_bump_retires_searches_covering_the_knowledge_base(search_result_cache: SearchResultCache) -> None:
+    def _key(knowledge_bases: list[str] | None) -> str:
+        return search_result_cache.key(search="docs", query="query", knowledge_bases=knowledge_bases, parameters={})
+
+    keys_before = {"a": _key(["a"]), "b": _key(["b"]), "all": _key(None)}
+
+    search_result_cache.bump(knowledge_bases=["a"])
+
+    assert _key(["a"]) != keys_before["a"]
+    assert _key(None) != keys_before["all"]
+    assert _key(["b"]) == keys_before["b"]
+
+
+def test_oldest_responses_are_evicted(search_result_cache: SearchResultCache) -> None:
+    for query in ["one", "two", "three"]:
+        key = search_result_cache.key(search="docs", query=query, knowledge_bases=None, parameters={})
+        search_result_cache.put(key=key, response=Response(results=[query]))
+
+    assert len(search_result_cache) == 2
+
+    first_key = search_result_cache.key(search="docs", query="one", knowledge_bases=None, parameters={})
+    assert search_result_cache.get(key=first_key, response_type=Response) is None
+
+
+def test_duckdb_persists_across_instances(tmp_path: Path) -> None:
+    database_path = tmp_path / "search_results.duckdb"
+
+    search_result_cache = DuckDBSearchResultCache(database_path=database_path)
+    search_result_cache.bump(knowledge_bases=["a"])
+    key = search_result_cache.key(search="docs", query="query", knowledge_bases=["a"], parameters={})
+    search_result_cache.put(key=key, response=Response(results=["one"]))
+    search_result_cache.close()
+
+    reopened_search_result_cache = DuckDBSearchResultCache(database_path=database_path)
+
+    assert reopened_search_result_cache.generations(knowledge_bases=["a", "b"]) == {"a": 1, "b": 0}
+    assert reopened_search_result_cache.key(search="docs", query="query", knowledge_bases=["a"], parameters={}) == key
+    assert reopened_search_result_cache.get(key=key, response_type=Response) == Response(results=["one"])